@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ApiappConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apiApp'
+    verbose_name = 'API REST de lectura'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
@@ -0,0 +1,312 @@
+# apiApp/fhir.py
+"""
+Exportación masiva FHIR R4 en NDJSON (estilo $export)
+
+Cada tipo FHIR se arma desde uno o más modelos locales:
+- Patient:        Paciente (madre) y RegistroRecienNacido (RN)
+- EpisodeOfCare:  FichaObstetrica
+- Encounter:      RegistroParto (hospitalización del parto)
+- Procedure:      RegistroParto (tipo de parto)
+- Observation:    RegistroRecienNacido (peso, talla y Apgar)
+
+Los registros se recorren por lotes keyset (pk > último) y cada lote se lee
+con .iterator(chunk_size=...), de modo que la memoria usada no depende del
+tamaño de la tabla.
+"""
+import gzip
+import json
+from datetime import datetime, time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.models import EventoOutbox
+from gestionApp.models import Paciente
+from matronaApp.models import FichaObstetrica
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+
+TAMANO_LOTE = 2000
+
+SISTEMA_RUN = 'http://regcivil.cl/Validacion/RUN'
+SISTEMA_LOCAL = 'urn:obstetric-care'
+SISTEMA_LOINC = 'http://loinc.org'
+SISTEMA_SNOMED = 'http://snomed.info/sct'
+
+GENERO_PERSONA = {'Femenino': 'female', 'Masculino': 'male', 'Intersexual': 'other'}
+GENERO_RN = {'FEMENINO': 'female', 'MASCULINO': 'male', 'INDETERMINADO': 'unknown'}
+
+PROCEDIMIENTO_PARTO = {
+    'EUTOCICO': ('48782003', 'Parto vaginal eutócico'),
+    'DISTOCICO': ('236973005', 'Parto vaginal distócico'),
+    'CESAREA_URGENCIA': ('11466000', 'Cesárea de urgencia'),
+    'CESAREA_ELECTIVA': ('11466000', 'Cesárea electiva'),
+}
+
+
+def _ref(tipo, id_local):
+    return {'reference': f'{tipo}/{id_local}'}
+
+
+def _fecha(valor):
+    return valor.isoformat() if valor else None
+
+
+def _limpio(recurso):
+    """Quita claves vacías para no inflar el NDJSON"""
+    return {clave: valor for clave, valor in recurso.items() if valor not in (None, '', [], {})}
+
+
+# ============================================
+# CONVERSIONES A RECURSOS FHIR
+# ============================================
+
+def paciente_a_patient(paciente):
+    persona = paciente.persona
+    return _limpio({
+        'resourceType': 'Patient',
+        'id': f'pac-{paciente.pk}',
+        'identifier': [{'system': SISTEMA_RUN, 'value': persona.Rut}],
+        'active': paciente.activo,
+        'name': [{
+            'family': persona.Apellido_Paterno,
+            'given': [persona.Nombre],
+            'extension': [{
+                'url': 'http://hl7.org/fhir/StructureDefinition/humanname-mothers-family',
+                'valueString': persona.Apellido_Materno,
+            }],
+        }],
+        'gender': GENERO_PERSONA.get(persona.Sexo, 'unknown'),
+        'birthDate': _fecha(persona.Fecha_nacimiento),
+        'telecom': [{'system': 'phone', 'value': persona.Telefono}] if persona.Telefono else [],
+        'address': [{'text': persona.Direccion}] if persona.Direccion else [],
+        'maritalStatus': {'text': paciente.get_Estado_civil_display()},
+    })
+
+
+def recien_nacido_a_patient(rn):
+    return _limpio({
+        'resourceType': 'Patient',
+        'id': f'rn-{rn.pk}',
+        'identifier': [{'system': f'{SISTEMA_LOCAL}/recien-nacido', 'value': str(rn.pk)}],
+        'gender': GENERO_RN.get(rn.sexo, 'unknown'),
+        'birthDate': _fecha(rn.fecha_nacimiento.date()) if rn.fecha_nacimiento else None,
+        'link': [{
+            'other': _ref('Patient', f'pac-{rn.registro_parto.ficha.paciente_id}'),
+            'type': 'seealso',
+        }],
+    })
+
+
+def ficha_a_episode_of_care(ficha):
+    return _limpio({
+        'resourceType': 'EpisodeOfCare',
+        'id': f'ficha-{ficha.pk}',
+        'identifier': [{'system': f'{SISTEMA_LOCAL}/ficha', 'value': ficha.numero_ficha}],
+        'status': 'active' if ficha.activa else 'finished',
+        'type': [{'text': 'Atención obstétrica'}],
+        'patient': _ref('Patient', f'pac-{ficha.paciente_id}'),
+        'period': {'start': _fecha(ficha.fecha_creacion)},
+    })
+
+
+def parto_a_encounter(parto):
+    return _limpio({
+        'resourceType': 'Encounter',
+        'id': f'parto-{parto.pk}',
+        'identifier': [{'system': f'{SISTEMA_LOCAL}/parto', 'value': parto.numero_registro}],
+        'status': 'finished' if parto.fecha_hora_parto else 'in-progress',
+        'class': {
+            'system': 'http://terminology.hl7.org/CodeSystem/v3-ActCode',
+            'code': 'IMP',
+            'display': 'inpatient encounter',
+        },
+        'subject': _ref('Patient', f'pac-{parto.ficha.paciente_id}'),
+        'episodeOfCare': [_ref('EpisodeOfCare', f'ficha-{parto.ficha_id}')],
+        'period': {
+            'start': _fecha(parto.fecha_hora_admision),
+            'end': _fecha(parto.fecha_hora_parto),
+        },
+    })
+
+
+def parto_a_procedure(parto):
+    codigo, texto = PROCEDIMIENTO_PARTO.get(parto.tipo_parto, (None, parto.tipo_parto))
+    return _limpio({
+        'resourceType': 'Procedure',
+        'id': f'parto-{parto.pk}',
+        'status': 'completed' if parto.fecha_hora_parto else 'in-progress',
+        'code': {
+            'coding': [{'system': SISTEMA_SNOMED, 'code': codigo, 'display': texto}] if codigo else [],
+            'text': texto,
+        },
+        'subject': _ref('Patient', f'pac-{parto.ficha.paciente_id}'),
+        'encounter': _ref('Encounter', f'parto-{parto.pk}'),
+        'performedDateTime': _fecha(parto.fecha_hora_parto),
+    })
+
+
+def recien_nacido_a_observations(rn):
+    medidas = [
+        ('peso', '8339-4', 'Peso al nacer', rn.peso, 'g'),
+        ('talla', '89269-5', 'Talla al nacer', rn.talla, 'cm'),
+        ('apgar-1', '9272-6', 'Apgar 1 minuto', rn.apgar_1_minuto, '{score}'),
+        ('apgar-5', '9274-2', 'Apgar 5 minutos', rn.apgar_5_minutos, '{score}'),
+    ]
+    for sufijo, loinc, texto, valor, unidad in medidas:
+        if valor is None:
+            continue
+        yield {
+            'resourceType': 'Observation',
+            'id': f'rn-{rn.pk}-{sufijo}',
+            'status': 'final',
+            'category': [{'coding': [{
+                'system': 'http://terminology.hl7.org/CodeSystem/observation-category',
+                'code': 'vital-signs',
+            }]}],
+            'code': {'coding': [{'system': SISTEMA_LOINC, 'code': loinc, 'display': texto}]},
+            'subject': _ref('Patient', f'rn-{rn.pk}'),
+            'effectiveDateTime': _fecha(rn.fecha_nacimiento),
+            'valueQuantity': {
+                'value': valor,
+                'unit': unidad,
+                'system': 'http://unitsofmeasure.org',
+                'code': unidad,
+            },
+        }
+
+
+# ============================================
+# FUENTES POR TIPO FHIR
+# ============================================
+
+class FuenteFhir:
+    """
+    Un modelo local que aporta recursos a un tipo FHIR.
+
+    `campo_modificacion` se usa para _since; si el modelo no tiene uno
+    confiable se consultan los eventos del outbox de ese modelo.
+    """
+
+    def __init__(self, modelo, convertir, relaciones=(), campo_modificacion=None, muchos=False):
+        self.modelo = modelo
+        self.convertir = convertir
+        self.relaciones = relaciones
+        self.campo_modificacion = campo_modificacion
+        self.muchos = muchos
+
+    def queryset(self, desde=None):
+        queryset = self.modelo._default_manager.all()
+        if self.relaciones:
+            queryset = queryset.select_related(*self.relaciones)
+        if desde is None:
+            return queryset
+        if self.campo_modificacion:
+            return queryset.filter(**{f'{self.campo_modificacion}__gte': desde})
+        modificados = EventoOutbox.objects.filter(
+            tipo=self.modelo._meta.label_lower,
+            fecha_creacion__gte=desde,
+        ).values('objeto_id')
+        return queryset.filter(pk__in=modificados)
+
+    def recursos(self, desde=None, lote=TAMANO_LOTE):
+        for objeto in iterar_por_lotes(self.queryset(desde), lote):
+            if self.muchos:
+                yield from self.convertir(objeto)
+            else:
+                yield self.convertir(objeto)
+
+
+FUENTES = {
+    'Patient': [
+        FuenteFhir(Paciente, paciente_a_patient, relaciones=('persona',)),
+        FuenteFhir(RegistroRecienNacido, recien_nacido_a_patient, relaciones=('registro_parto__ficha',)),
+    ],
+    'EpisodeOfCare': [
+        FuenteFhir(FichaObstetrica, ficha_a_episode_of_care, campo_modificacion='fecha_modificacion'),
+    ],
+    'Encounter': [
+        FuenteFhir(RegistroParto, parto_a_encounter, relaciones=('ficha',),
+                   campo_modificacion='fecha_modificacion'),
+    ],
+    'Procedure': [
+        FuenteFhir(RegistroParto, parto_a_procedure, relaciones=('ficha',),
+                   campo_modificacion='fecha_modificacion'),
+    ],
+    'Observation': [
+        FuenteFhir(RegistroRecienNacido, recien_nacido_a_observations, muchos=True),
+    ],
+}
+
+TIPOS = list(FUENTES)
+
+
+# ============================================
+# RECORRIDO Y ESCRITURA
+# ============================================
+
+def iterar_por_lotes(queryset, lote=TAMANO_LOTE):
+    """
+    Recorre el queryset por lotes keyset ordenados por pk. Cada lote es una
+    consulta corta (pk > último visto), evitando OFFSET y cursores abiertos.
+    """
+    queryset = queryset.order_by('pk')
+    ultimo = None
+    while True:
+        pagina = queryset if ultimo is None else queryset.filter(pk__gt=ultimo)
+        cantidad = 0
+        for objeto in pagina[:lote].iterator(chunk_size=lote):
+            cantidad += 1
+            ultimo = objeto.pk
+            yield objeto
+        if cantidad < lote:
+            return
+
+
+def parsear_since(valor):
+    """
+    Acepta fecha (YYYY-MM-DD) o fecha-hora ISO 8601. Retorna un datetime
+    aware, None si no se indicó, o lanza ValueError si el formato es inválido.
+    """
+    if not valor:
+        return None
+    fecha_hora = parse_datetime(valor)
+    if fecha_hora is None:
+        fecha = parse_date(valor)
+        if fecha is None:
+            raise ValueError(f'_since inválido: {valor}')
+        fecha_hora = datetime.combine(fecha, time.min)
+    if timezone.is_naive(fecha_hora):
+        fecha_hora = timezone.make_aware(fecha_hora)
+    return fecha_hora
+
+
+def lineas_ndjson(tipo, desde=None, lote=TAMANO_LOTE):
+    """Genera las líneas NDJSON (bytes) de un tipo FHIR"""
+    for fuente in FUENTES[tipo]:
+        for recurso in fuente.recursos(desde, lote):
+            linea = json.dumps(recurso, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+            yield linea.encode('utf-8') + b'\n'
+
+
+def exportar_a_gzip(tipo, ruta, desde=None, lote=TAMANO_LOTE):
+    """Escribe <ruta> como NDJSON comprimido con gzip. Retorna la cantidad de recursos."""
+    total = 0
+    with gzip.open(ruta, 'wb') as archivo:
+        for linea in lineas_ndjson(tipo, desde, lote):
+            archivo.write(linea)
+            total += 1
+    return total
+
+
+def directorio_exportaciones():
+    return Path(getattr(settings, 'EXPORTACIONES_ROOT', Path(settings.BASE_DIR) / 'exportaciones_fhir'))
+
+
+def ruta_exportacion(lote, tipo):
+    """Archivo de `tipo` de la exportación asíncrona `lote` (uuid)"""
+    return directorio_exportaciones() / str(lote) / f'{tipo}.ndjson.gz'
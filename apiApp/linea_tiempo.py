@@ -0,0 +1,338 @@
+# apiApp/linea_tiempo.py
+"""
+Línea de tiempo clínica de una paciente
+
+Junta en un solo listado, del más reciente al más antiguo, los eventos de
+ingresos, fichas, indicaciones de medicamentos, administraciones,
+registros TENS, tratamientos, partos, recién nacidos y controles previos
+(BD legacy).
+
+Cada fuente se lee con su propio cursor keyset en el orden de su índice
+(paciente o ficha, fecha descendente) y los cursores se mezclan con
+heapq.merge. Un cursor pide filas de a pocas y solo cuando la mezcla las
+necesita (el lote se duplica si la fuente sigue aportando), así una página
+de 50 eventos lee unas 50 filas más un lote chico por fuente aunque la
+paciente tenga miles de eventos. La página siguiente parte del cursor
+opaco que devuelve la anterior (posición del último evento), sin OFFSET.
+
+    linea_tiempo.pagina(paciente_pk, limite=50)
+    linea_tiempo.pagina(paciente_pk, cursor=anterior['cursor'], tipos=['partos'])
+
+Los eventos que solo tienen fecha (sin hora) se ubican a las 00:00 de ese
+día. Si la BD legacy no responde, la página se entrega sin sus controles y
+con 'controles_previos' en `no_disponibles`.
+"""
+import base64
+import heapq
+import json
+import logging
+from datetime import datetime, time
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from gestionApp.models import Paciente
+from legacyApp.models import ControlesPrevios
+from matronaApp.models import IngresoPaciente, FichaObstetrica, MedicamentoFicha, AdministracionMedicamento
+from tensApp.models import RegistroTens, Tratamiento_aplicado
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+logger = logging.getLogger(__name__)
+
+LIMITE = 50
+LIMITE_MAXIMO = 200
+LOTE_MINIMO = 5
+
+
+def _instante(fecha, hora=None):
+    """datetime con zona horaria de una fecha (y hora) o de un datetime"""
+    if not isinstance(fecha, datetime):
+        fecha = datetime.combine(fecha, hora or time.min)
+    return timezone.make_aware(fecha) if timezone.is_naive(fecha) else fecha
+
+
+def _menores(columnas, incluir_iguales):
+    """
+    Q de las filas cuya tupla `columnas` ([(campo, valor), ...]) es menor
+    (o igual, con `incluir_iguales`) en orden lexicográfico
+    """
+    condiciones = []
+    iguales = {}
+    for campo, valor in columnas:
+        condiciones.append(Q(**iguales, **{f'{campo}__lt': valor}))
+        iguales[campo] = valor
+    if incluir_iguales:
+        condiciones.append(Q(**iguales))
+    return reduce(or_, condiciones)
+
+
+class Evento:
+    __slots__ = ('tipo', 'id', 'instante', 'titulo', 'datos', 'clave')
+
+    def __init__(self, fuente, id, instante, titulo, datos):
+        self.tipo = fuente.tipo
+        self.id = id
+        self.instante = instante
+        self.titulo = titulo
+        self.datos = datos
+        # Orden total de la línea de tiempo (descendente)
+        self.clave = (instante, fuente.orden, id)
+
+    def como_dict(self):
+        return {
+            'tipo': self.tipo,
+            'id': self.id,
+            'fecha': self.instante,
+            'titulo': self.titulo,
+            'datos': self.datos,
+        }
+
+
+class _Paciente:
+    """Lo que necesitan los filtros de las fuentes, consultado una vez"""
+
+    def __init__(self, pk, rut):
+        self.pk = pk
+        self.rut = rut
+        self._fichas = None
+
+    @property
+    def fichas(self):
+        if self._fichas is None:
+            self._fichas = list(FichaObstetrica.objects.filter(paciente_id=self.pk).order_by().values_list('pk', flat=True))
+        return self._fichas
+
+
+# ============================================
+# FUENTES
+# ============================================
+
+class FuenteLineaTiempo:
+    """
+    Un tipo de evento. `filtro(paciente)` da los filtros de la paciente (None:
+    no tiene eventos de este tipo), `campos_fecha` las columnas que ordenan
+    (fecha o fecha + hora), `campos` {clave en datos: ruta ORM} y
+    `titulo(datos)` el texto del evento.
+    """
+
+    def __init__(self, tipo, modelo, campos_fecha, filtro, campos, titulo, alias=None):
+        self.tipo = tipo
+        self.modelo = modelo
+        self.campos_fecha = campos_fecha
+        self.filtro = filtro
+        self.campos = campos
+        self.titulo = titulo
+        self.alias = alias
+        self.orden = None
+
+    def _valores_fecha(self, instante):
+        """`instante` como valores de campos_fecha, para comparar en la BD"""
+        local = timezone.localtime(instante)
+        valores = []
+        for nombre in self.campos_fecha:
+            campo = self.modelo._meta.get_field(nombre)
+            if isinstance(campo, models.DateTimeField):
+                valores.append(instante)
+            elif isinstance(campo, models.DateField):
+                valores.append(local.date())
+            else:
+                valores.append(local.time())
+        return valores
+
+    def despues_de(self, posicion):
+        """Q de los eventos de esta fuente que siguen a `posicion` (más antiguos)"""
+        instante, orden, pk = posicion
+        valores = self._valores_fecha(instante)
+        columnas = list(zip(self.campos_fecha, valores))
+        if _instante(*valores) < instante:
+            # Columnas sin hora: los eventos de ese día (00:00) ya son anteriores
+            return _menores(columnas, incluir_iguales=True)
+        if orden == self.orden:
+            return _menores(columnas + [('pk', pk)], incluir_iguales=False)
+        # Con el mismo instante, las fuentes de menor orden van después
+        return _menores(columnas, incluir_iguales=self.orden < orden)
+
+    def queryset(self, paciente):
+        filtros = self.filtro(paciente)
+        if filtros is None:
+            return None
+        manager = self.modelo.objects
+        queryset = manager.using(self.alias) if self.alias else manager.all()
+        return (queryset
+                .filter(**filtros, **{f'{campo}__isnull': False for campo in self.campos_fecha})
+                .order_by(*(f'-{campo}' for campo in self.campos_fecha), '-pk'))
+
+    def eventos(self, paciente, posicion, lote, maximo, no_disponibles):
+        """
+        Eventos posteriores a `posicion` en orden descendente. Consulta de a
+        `lote` filas (duplicándolo hasta `maximo`) a medida que se consumen.
+        """
+        queryset = self.queryset(paciente)
+        if queryset is None:
+            return
+        rutas = ['pk', *self.campos_fecha, *self.campos.values()]
+        while True:
+            pendientes = queryset if posicion is None else queryset.filter(self.despues_de(posicion))
+            try:
+                filas = list(pendientes.values(*rutas)[:lote])
+            except Exception as e:
+                if self.alias is None:
+                    raise
+                logger.warning('Línea de tiempo sin %s (BD %s): %s', self.tipo, self.alias, e)
+                no_disponibles.add(self.tipo)
+                return
+            for fila in filas:
+                evento = self.evento(fila)
+                posicion = evento.clave
+                yield evento
+            if len(filas) < lote:
+                return
+            lote = min(lote * 2, maximo)
+
+    def evento(self, fila):
+        datos = {clave: fila[ruta] for clave, ruta in self.campos.items()}
+        instante = _instante(*(fila[campo] for campo in self.campos_fecha))
+        return Evento(self, fila['pk'], instante, self.titulo(datos), datos)
+
+
+def _por_fichas(ruta, **otros):
+    """Filtro de fuentes que cuelgan de la ficha"""
+    def filtro(paciente):
+        if not paciente.fichas:
+            return None
+        return {ruta: paciente.fichas, **otros}
+    return filtro
+
+
+FUENTES = [
+    FuenteLineaTiempo(
+        'controles_previos', ControlesPrevios, ('fecha_control',),
+        lambda paciente: {'paciente_rut__iexact': paciente.rut} if paciente.rut else None,
+        {'semanas_gestacion': 'semanas_gestacion', 'presion_sistolica': 'presion_sistolica',
+         'presion_diastolica': 'presion_diastolica', 'peso_kg': 'peso_kg'},
+        lambda datos: 'Control prenatal previo',
+        alias='legacy',
+    ),
+    FuenteLineaTiempo(
+        'ingresos', IngresoPaciente, ('fecha_ingreso', 'hora_ingreso'),
+        lambda paciente: {'paciente_id': paciente.pk},
+        {'numero_ficha': 'numero_ficha', 'motivo_ingreso': 'motivo_ingreso',
+         'edad_gestacional_semanas': 'edad_gestacional_semanas'},
+        lambda datos: f"Ingreso {datos['numero_ficha']}",
+    ),
+    FuenteLineaTiempo(
+        'fichas', FichaObstetrica, ('fecha_creacion',),
+        lambda paciente: {'paciente_id': paciente.pk},
+        {'numero_ficha': 'numero_ficha', 'sala': 'sala', 'activa': 'activa'},
+        lambda datos: f"Ficha {datos['numero_ficha']} abierta",
+    ),
+    FuenteLineaTiempo(
+        'medicamentos', MedicamentoFicha, ('fecha_inicio',),
+        _por_fichas('ficha_id__in'),
+        {'nombre_medicamento': 'nombre_medicamento', 'dosis': 'dosis',
+         'via_administracion': 'via_administracion', 'frecuencia': 'frecuencia', 'activo': 'activo'},
+        lambda datos: f"Indicación: {datos['nombre_medicamento']} {datos['dosis']}",
+    ),
+    FuenteLineaTiempo(
+        'registros_tens', RegistroTens, ('fecha',),
+        _por_fichas('ficha_id__in'),
+        {'turno': 'turno', 'temperatura': 'temperatura', 'frecuencia_cardiaca': 'frecuencia_cardiaca',
+         'presion_arterial_sistolica': 'presion_arterial_sistolica',
+         'presion_arterial_diastolica': 'presion_arterial_diastolica',
+         'saturacion_oxigeno': 'saturacion_oxigeno'},
+        lambda datos: 'Control de signos vitales (TENS)',
+    ),
+    FuenteLineaTiempo(
+        'tratamientos', Tratamiento_aplicado, ('fecha_aplicacion', 'hora_aplicacion'),
+        lambda paciente: {'paciente_id': paciente.pk},
+        {'nombre_medicamento': 'nombre_medicamento', 'dosis': 'dosis',
+         'aplicado_exitosamente': 'aplicado_exitosamente', 'activo': 'activo'},
+        lambda datos: f"Tratamiento: {datos['nombre_medicamento']}",
+    ),
+    FuenteLineaTiempo(
+        'administraciones', AdministracionMedicamento, ('fecha_hora_administracion',),
+        _por_fichas('medicamento_ficha__ficha_id__in'),
+        {'medicamento': 'medicamento_ficha__nombre_medicamento',
+         'administrado_exitosamente': 'administrado_exitosamente'},
+        lambda datos: f"Administración: {datos['medicamento']}",
+    ),
+    FuenteLineaTiempo(
+        'partos', RegistroParto, ('fecha_hora_admision',),
+        _por_fichas('ficha_id__in', activo=True),
+        {'numero_registro': 'numero_registro', 'tipo_parto': 'tipo_parto',
+         'fecha_hora_parto': 'fecha_hora_parto'},
+        lambda datos: f"Admisión a parto {datos['numero_registro']}",
+    ),
+    FuenteLineaTiempo(
+        'recien_nacidos', RegistroRecienNacido, ('fecha_nacimiento',),
+        _por_fichas('registro_parto__ficha_id__in'),
+        {'sexo': 'sexo', 'peso': 'peso', 'talla': 'talla',
+         'apgar_1_minuto': 'apgar_1_minuto', 'apgar_5_minutos': 'apgar_5_minutos'},
+        lambda datos: 'Nacimiento',
+    ),
+]
+for _orden, _fuente in enumerate(FUENTES):
+    _fuente.orden = _orden
+
+TIPOS = [fuente.tipo for fuente in FUENTES]
+
+
+# ============================================
+# CURSOR Y PAGINACIÓN
+# ============================================
+
+def codificar_cursor(clave):
+    instante, orden, pk = clave
+    crudo = json.dumps([instante.isoformat(), orden, pk]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """(instante, orden, pk) de un cursor; ValueError si es inválido"""
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        instante, orden, pk = json.loads(crudo)
+        instante = parse_datetime(instante)
+        if instante is None or not isinstance(orden, int) or not 0 <= orden < len(FUENTES) or not isinstance(pk, int):
+            raise ValueError
+        return _instante(instante), orden, pk
+    except (TypeError, ValueError) as e:
+        raise ValueError('Cursor inválido.') from e
+
+
+def pagina(paciente_pk, cursor=None, limite=LIMITE, tipos=None):
+    """
+    {'eventos': [...], 'cursor': de la página siguiente o None,
+    'no_disponibles': [tipos que no se pudieron leer]}.
+    Paciente.DoesNotExist si no existe; ValueError si el cursor es inválido.
+    """
+    rut = Paciente.objects.filter(pk=paciente_pk).values_list('persona__Rut', flat=True).first()
+    if rut is None:
+        raise Paciente.DoesNotExist(paciente_pk)
+    paciente = _Paciente(paciente_pk, rut.strip())
+    posicion = decodificar_cursor(cursor) if cursor else None
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    fuentes = [fuente for fuente in FUENTES if tipos is None or fuente.tipo in tipos]
+
+    # Alcanza para la página si los eventos se reparten parejo entre las fuentes
+    lote = max(LOTE_MINIMO, -(-(limite + 1) // len(fuentes))) if fuentes else LOTE_MINIMO
+    no_disponibles = set()
+    mezcla = heapq.merge(
+        *(fuente.eventos(paciente, posicion, lote, limite + 1, no_disponibles) for fuente in fuentes),
+        key=lambda evento: evento.clave,
+        reverse=True,
+    )
+    eventos = list(islice(mezcla, limite + 1))
+    hay_mas = len(eventos) > limite
+    eventos = eventos[:limite]
+    return {
+        'eventos': [evento.como_dict() for evento in eventos],
+        'cursor': codificar_cursor(eventos[-1].clave) if hay_mas else None,
+        'no_disponibles': sorted(no_disponibles),
+    }
@@ -0,0 +1,46 @@
+"""
+Exportación masiva FHIR en NDJSON comprimido (un archivo por tipo)
+Uso:
+    python manage.py exportar_fhir --destino /srv/exportes
+    python manage.py exportar_fhir --destino /srv/exportes --since 2025-01-01 --tipos Patient,Encounter
+
+Genera <destino>/<Tipo>.ndjson.gz
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apiApp import fhir
+from core.replica import usar_replica
+
+
+class Command(BaseCommand):
+    help = 'Exporta pacientes, fichas, partos y recién nacidos como FHIR NDJSON (gzip)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', required=True, help='Directorio de salida')
+        parser.add_argument('--since', default=None, help='Solo recursos modificados desde (ISO 8601)')
+        parser.add_argument('--tipos', default=','.join(fhir.TIPOS), help='Tipos FHIR separados por coma')
+        parser.add_argument('--lote', type=int, default=fhir.TAMANO_LOTE, help='Registros por lote')
+
+    def handle(self, *args, **options):
+        try:
+            desde = fhir.parsear_since(options['since'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        tipos = [tipo.strip() for tipo in options['tipos'].split(',') if tipo.strip()]
+        desconocidos = [tipo for tipo in tipos if tipo not in fhir.FUENTES]
+        if desconocidos:
+            raise CommandError(f"Tipos no soportados: {', '.join(desconocidos)}")
+
+        destino = Path(options['destino'])
+        destino.mkdir(parents=True, exist_ok=True)
+
+        with usar_replica():
+            for tipo in tipos:
+                ruta = destino / f'{tipo}.ndjson.gz'
+                total = fhir.exportar_a_gzip(tipo, ruta, desde, options['lote'])
+                self.stdout.write(f'  {tipo}: {total} recursos → {ruta}')
+
+        self.stdout.write(self.style.SUCCESS('✅ Exportación FHIR finalizada'))
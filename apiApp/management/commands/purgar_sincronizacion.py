@@ -0,0 +1,46 @@
+"""
+Elimina entradas antiguas de la bitácora de sincronización
+Uso: python manage.py purgar_sincronizacion --dias 30
+
+Los dispositivos con un token anterior al purgado deben pedir una
+instantánea completa (llamar a /api/v1/sync/ sin token): la API les
+responde 410 con {"resync": true} según la marca de PurgaSincronizacion.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apiApp.models import CambioSincronizacion, PurgaSincronizacion
+
+
+class Command(BaseCommand):
+    help = 'Elimina cambios de sincronización más antiguos que N días (por lotes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30)
+        parser.add_argument('--lote', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        total = 0
+        hasta_id = None
+        while True:
+            ids = list(
+                CambioSincronizacion.objects
+                .filter(fecha__lt=limite)
+                .order_by('id')
+                .values_list('id', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            # La marca se guarda antes de borrar: un token nunca queda sin cambios
+            # y sin marca a la vez
+            hasta_id = ids[-1]
+            PurgaSincronizacion.objects.create(hasta_id=hasta_id)
+            total += CambioSincronizacion.objects.filter(id__in=ids).delete()[0]
+
+        if hasta_id is not None:
+            PurgaSincronizacion.objects.filter(hasta_id__lt=hasta_id).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} cambios eliminados'))
@@ -0,0 +1,175 @@
+# apiApp/mixins.py
+"""
+Mixins compartidos por la API REST de lectura
+
+- CamposDinamicosMixin: sparse fieldsets (?fields=a,b,c) en los serializers
+- ConsultaOptimizadaMixin: select_related/prefetch_related según los campos pedidos
+- ETagMixin: ETag + If-None-Match para que los clientes consulten barato
+"""
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+PARAMETRO_CAMPOS = 'fields'
+
+
+def campos_solicitados(request):
+    """
+    Retorna el conjunto de campos pedidos en ?fields=, o None si no se pidió
+    un subconjunto (se devuelven todos los campos del serializer).
+    """
+    if request is None:
+        return None
+    valor = request.query_params.get(PARAMETRO_CAMPOS, '').strip()
+    if not valor:
+        return None
+    return {campo.strip() for campo in valor.split(',') if campo.strip()}
+
+
+def _sin_debil(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+# ============================================
+# SERIALIZERS
+# ============================================
+
+class CamposDinamicosMixin:
+    """
+    Permite que el cliente elija los campos a devolver con ?fields=.
+    El campo 'id' se mantiene siempre para que el cliente pueda identificar filas.
+    """
+
+    campos_obligatorios = ('id',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        pedidos = campos_solicitados(self.context.get('request'))
+        if pedidos is None:
+            return
+        permitidos = pedidos | set(self.campos_obligatorios)
+        for nombre in list(self.fields):
+            if nombre not in permitidos:
+                self.fields.pop(nombre)
+
+
+# ============================================
+# VIEWSETS
+# ============================================
+
+class ConsultaOptimizadaMixin:
+    """
+    Aplica select_related/prefetch_related solo para los campos solicitados.
+
+    Cada viewset declara:
+        relaciones_select = {'campo_api': ('ruta__fk', ...)}
+        relaciones_prefetch = {'campo_api': ('ruta_m2m', ...)}
+    Si el cliente no usa ?fields=, se aplican todas las relaciones declaradas.
+    """
+
+    relaciones_select = {}
+    relaciones_prefetch = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        pedidos = campos_solicitados(self.request)
+
+        select = set()
+        for campo, rutas in self.relaciones_select.items():
+            if pedidos is None or campo in pedidos:
+                select.update(rutas)
+
+        prefetch = set()
+        for campo, rutas in self.relaciones_prefetch.items():
+            if pedidos is None or campo in pedidos:
+                prefetch.update(rutas)
+
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset
+
+
+class ETagMixin:
+    """
+    Agrega ETag a las respuestas GET y responde 304 si coincide con If-None-Match.
+
+    Si el viewset define `campo_version` (p. ej. 'fecha_modificacion'), el detalle
+    calcula el ETag con una consulta mínima antes de serializar, evitando
+    materializar el registro completo cuando el cliente ya tiene la versión vigente.
+
+    `campo_version` solo cambia con el registro principal: los datos de
+    relaciones que se serializan (RUT de la persona, ids de un M2M, ...) se
+    declaran en `relaciones_version` ({'campo_api': ('ruta', ...)}) y entran
+    en el ETag cuando el cliente pide ese campo.
+    """
+
+    campo_version = None
+    relaciones_version = {}
+
+    def _etag_coincide(self, request, etag):
+        # Comparación débil (RFC 9110, 13.1.2), como ConditionalGetMiddleware:
+        # CompresionMiddleware entrega el ETag como W/"..." y el cliente lo
+        # devuelve así en If-None-Match
+        cabecera = request.META.get('HTTP_IF_NONE_MATCH')
+        if not cabecera:
+            return False
+        etags = parse_etags(cabecera)
+        return '*' in etags or _sin_debil(etag) in {_sin_debil(e) for e in etags}
+
+    def _respuesta_no_modificada(self, etag):
+        respuesta = HttpResponseNotModified()
+        respuesta['ETag'] = etag
+        return respuesta
+
+    def _etag_version(self, request):
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        pedidos = campos_solicitados(request)
+        rutas = [self.campo_version]
+        for campo, extra in self.relaciones_version.items():
+            if pedidos is None or campo in pedidos:
+                rutas.extend(extra)
+        # Mismo queryset que get_object(): un registro que la vista no
+        # mostraría (inactivo, de otro establecimiento) no da 304
+        filas = list(self.filter_queryset(self.get_queryset())
+                     .prefetch_related(None)
+                     .filter(**{self.lookup_field: lookup})
+                     .order_by()
+                     .values_list(*rutas))
+        if not filas:
+            return None
+        # Una fila por cada registro relacionado (M2M, inversas): se ordenan
+        base = f"{self.basename}:{lookup}:{request.query_params.get(PARAMETRO_CAMPOS, '')}:{sorted(map(repr, filas))}"
+        return quote_etag(hashlib.sha1(base.encode()).hexdigest())
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.campo_version:
+            etag = self._etag_version(request)
+            if etag and self._etag_coincide(request, etag):
+                return self._respuesta_no_modificada(etag)
+            respuesta = super().retrieve(request, *args, **kwargs)
+            if etag:
+                respuesta['ETag'] = etag
+            return respuesta
+        return super().retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or getattr(response, 'data', None) is None
+            or response.has_header('ETag')
+        ):
+            return response
+
+        contenido = JSONRenderer().render(response.data)
+        etag = quote_etag(hashlib.sha1(contenido).hexdigest())
+        if self._etag_coincide(request, etag):
+            return self._respuesta_no_modificada(etag)
+        response['ETag'] = etag
+        return response
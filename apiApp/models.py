@@ -0,0 +1,91 @@
+from django.db import models
+
+
+# ============================================
+# MODELO: CAMBIO DE SINCRONIZACIÓN
+# ============================================
+
+class CambioSincronizacion(models.Model):
+    """
+    Bitácora de cambios para la sincronización incremental de tablets.
+    El id autoincremental funciona como token de cambio.
+    """
+
+    GUARDADO = 'G'
+    ELIMINADO = 'E'
+    TRASLADO = 'T'
+    OPERACION_CHOICES = [
+        (GUARDADO, 'Guardado'),
+        (ELIMINADO, 'Eliminado'),
+        (TRASLADO, 'Traslado de sala'),
+    ]
+
+    recurso = models.CharField(
+        max_length=30,
+        verbose_name='Recurso'
+    )
+
+    objeto_id = models.BigIntegerField(
+        verbose_name='ID del Registro'
+    )
+
+    ficha_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID de Ficha Obstétrica'
+    )
+
+    operacion = models.CharField(
+        max_length=1,
+        choices=OPERACION_CHOICES,
+        default=GUARDADO,
+        verbose_name='Operación'
+    )
+
+    sala_origen = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name='Sala de Origen',
+        help_text='Solo en traslados: sala de la que salió la ficha'
+    )
+
+    fecha = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha del Cambio'
+    )
+
+    class Meta:
+        verbose_name = 'Cambio de Sincronización'
+        verbose_name_plural = 'Cambios de Sincronización'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['ficha_id', 'id']),
+            models.Index(fields=['fecha']),
+            models.Index(fields=['sala_origen', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.recurso}#{self.objeto_id} ({self.get_operacion_display()})"
+
+
+class PurgaSincronizacion(models.Model):
+    """
+    Marca de agua del comando purgar_sincronizacion: hasta qué token se
+    eliminó la bitácora. Un token menor ya no puede continuar con cambios.
+    """
+
+    hasta_id = models.BigIntegerField(
+        verbose_name='Último ID Eliminado'
+    )
+
+    fecha = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de la Purga'
+    )
+
+    class Meta:
+        verbose_name = 'Purga de Sincronización'
+        verbose_name_plural = 'Purgas de Sincronización'
+
+    def __str__(self):
+        return f"Purga hasta #{self.hasta_id}"
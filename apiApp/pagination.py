@@ -0,0 +1,16 @@
+# apiApp/pagination.py
+"""
+Paginación por cursor para la API REST
+
+El cursor es estable frente a inserciones concurrentes y no requiere COUNT(*),
+lo que la hace adecuada para integraciones que recorren tablas grandes.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class CursorClinicoPagination(CursorPagination):
+    """Cursor ordenado por clave primaria descendente (registros más recientes primero)"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-pk'
@@ -0,0 +1,94 @@
+# apiApp/serializers.py
+"""
+Serializers de solo lectura para la API REST (v1)
+
+Todos heredan de CamposDinamicosMixin, por lo que aceptan ?fields=.
+Los campos derivados de relaciones (rut, nombres) tienen su relación
+declarada en el viewset correspondiente para que se haga select_related
+únicamente cuando el cliente los pide.
+"""
+from rest_framework import serializers
+
+from gestionApp.models import Paciente
+from matronaApp.models import FichaObstetrica, MedicamentoFicha, AdministracionMedicamento
+from tensApp.models import RegistroTens
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+from .mixins import CamposDinamicosMixin
+
+
+class PacienteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    id = serializers.IntegerField(source='pk', read_only=True)
+    rut = serializers.CharField(source='persona.Rut', read_only=True)
+    nombre = serializers.CharField(source='persona.Nombre', read_only=True)
+    apellido_paterno = serializers.CharField(source='persona.Apellido_Paterno', read_only=True)
+    apellido_materno = serializers.CharField(source='persona.Apellido_Materno', read_only=True)
+    fecha_nacimiento = serializers.DateField(source='persona.Fecha_nacimiento', read_only=True)
+
+    class Meta:
+        model = Paciente
+        exclude = ['persona']
+
+
+class FichaObstetricaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    paciente_rut = serializers.CharField(source='paciente.persona.Rut', read_only=True)
+    matrona_responsable_nombre = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FichaObstetrica
+        fields = '__all__'
+
+    def get_matrona_responsable_nombre(self, obj):
+        persona = obj.matrona_responsable.persona
+        return f"{persona.Nombre} {persona.Apellido_Paterno}"
+
+
+class MedicamentoFichaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    numero_ficha = serializers.CharField(source='ficha.numero_ficha', read_only=True)
+
+    class Meta:
+        model = MedicamentoFicha
+        fields = '__all__'
+
+
+class AdministracionMedicamentoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    nombre_medicamento = serializers.CharField(source='medicamento_ficha.nombre_medicamento', read_only=True)
+    tens_nombre = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AdministracionMedicamento
+        fields = '__all__'
+
+    def get_tens_nombre(self, obj):
+        persona = obj.tens.persona
+        return f"{persona.Nombre} {persona.Apellido_Paterno}"
+
+
+class RegistroTensSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    numero_ficha = serializers.CharField(source='ficha.numero_ficha', read_only=True)
+    presion_arterial = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = RegistroTens
+        fields = '__all__'
+
+
+class RegistroPartoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    numero_ficha = serializers.CharField(source='ficha.numero_ficha', read_only=True)
+    paciente_rut = serializers.CharField(source='ficha.paciente.persona.Rut', read_only=True)
+    recien_nacidos = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = RegistroParto
+        fields = '__all__'
+
+
+class RegistroRecienNacidoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    numero_registro_parto = serializers.CharField(source='registro_parto.numero_registro', read_only=True)
+    clasificacion_peso = serializers.CharField(read_only=True)
+    estado_apgar = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = RegistroRecienNacido
+        fields = '__all__'
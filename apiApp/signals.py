@@ -0,0 +1,45 @@
+# apiApp/signals.py
+"""
+Señales que alimentan la bitácora de sincronización incremental
+"""
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+from matronaApp.models import FichaObstetrica
+
+from .models import CambioSincronizacion
+from .sincronizacion import RECURSOS, registrar_cambio, registrar_traslado
+
+
+def sala_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Sala guardada antes de este save(), para detectar traslados
+    instance._sala_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and 'sala' not in update_fields:
+        return
+    instance._sala_anterior = (
+        sender.todos.filter(pk=instance.pk).values_list('sala', flat=True).first()
+    )
+
+
+def cambio_guardado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    registrar_cambio(instance, CambioSincronizacion.GUARDADO)
+    anterior = getattr(instance, '_sala_anterior', None)
+    if anterior and anterior != getattr(instance, 'sala', anterior):
+        registrar_traslado(instance, anterior)
+
+
+def cambio_eliminado(sender, instance, **kwargs):
+    # pre_delete: la ficha asociada aún existe y se ejecuta dentro de la
+    # misma transacción que la eliminación
+    registrar_cambio(instance, CambioSincronizacion.ELIMINADO)
+
+
+def conectar():
+    for recurso in RECURSOS:
+        uid = f'sincronizacion_{recurso.nombre}'
+        post_save.connect(cambio_guardado, sender=recurso.modelo, dispatch_uid=uid)
+        pre_delete.connect(cambio_eliminado, sender=recurso.modelo, dispatch_uid=uid)
+    pre_save.connect(sala_anterior, sender=FichaObstetrica, dispatch_uid='sincronizacion_traslados')
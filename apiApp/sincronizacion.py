@@ -0,0 +1,235 @@
+# apiApp/sincronizacion.py
+"""
+Sincronización incremental (delta-sync) para tablets de cabecera
+
+Cada guardado o eliminación de los modelos registrados agrega una fila a
+CambioSincronizacion. El id de esa fila es el "token de cambio": el cliente
+envía el último token que recibió y obtiene solo lo modificado después.
+
+Las respuestas son columnares para que el payload sea compacto:
+    {"token": 123, "mas": false,
+     "cambios": {"medicamentos": {"campos": [...], "filas": [[...], ...]}},
+     "eliminados": {"medicamentos": [4, 9]}}
+
+Cuando una ficha cambia de sala se registra además un TRASLADO con la
+sala de origen: la tablet de la sala de destino recibe la ficha con todos
+sus registros y la de origen la recibe en "eliminados" (la tablet descarta
+también los registros de esa ficha).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from matronaApp.models import FichaObstetrica, MedicamentoFicha, AdministracionMedicamento
+from tensApp.models import RegistroTens, Tratamiento_aplicado
+
+from .models import CambioSincronizacion, PurgaSincronizacion
+
+
+class RecursoSincronizado:
+    """Describe cómo sincronizar un modelo: campos compactos y cómo llegar a la ficha"""
+
+    def __init__(self, nombre, modelo, campos, ruta_ficha, obtener_ficha_id):
+        self.nombre = nombre
+        self.modelo = modelo
+        self.campos = campos
+        self.ruta_ficha = ruta_ficha
+        self.obtener_ficha_id = obtener_ficha_id
+
+    def filas(self, queryset):
+        return [list(fila) for fila in queryset.values_list(*self.campos)]
+
+    def bloque(self, queryset):
+        return {'campos': list(self.campos), 'filas': self.filas(queryset)}
+
+
+RECURSOS = [
+    RecursoSincronizado(
+        'fichas', FichaObstetrica,
+        ('id', 'numero_ficha', 'paciente_id', 'sala', 'activa',
+         'edad_gestacional_semanas', 'edad_gestacional_dias', 'fecha_modificacion'),
+        'pk',
+        lambda obj: obj.pk,
+    ),
+    RecursoSincronizado(
+        'medicamentos', MedicamentoFicha,
+        ('id', 'ficha_id', 'nombre_medicamento', 'dosis', 'via_administracion',
+         'frecuencia', 'fecha_inicio', 'fecha_termino', 'activo'),
+        'ficha',
+        lambda obj: obj.ficha_id,
+    ),
+    RecursoSincronizado(
+        'administraciones', AdministracionMedicamento,
+        ('id', 'medicamento_ficha_id', 'tens_id', 'fecha_hora_administracion',
+         'se_realizo_lavado', 'administrado_exitosamente', 'observaciones'),
+        'medicamento_ficha__ficha',
+        lambda obj: obj.medicamento_ficha.ficha_id,
+    ),
+    RecursoSincronizado(
+        'registros_tens', RegistroTens,
+        ('id', 'ficha_id', 'fecha', 'turno', 'temperatura', 'frecuencia_cardiaca',
+         'presion_arterial_sistolica', 'presion_arterial_diastolica',
+         'frecuencia_respiratoria', 'saturacion_oxigeno'),
+        'ficha',
+        lambda obj: obj.ficha_id,
+    ),
+    RecursoSincronizado(
+        'tratamientos', Tratamiento_aplicado,
+        ('id', 'ficha_id', 'medicamento_ficha_id', 'nombre_medicamento', 'dosis',
+         'via_administracion', 'fecha_aplicacion', 'hora_aplicacion',
+         'aplicado_exitosamente', 'activo'),
+        'ficha',
+        lambda obj: obj.ficha_id,
+    ),
+]
+
+RECURSOS_POR_NOMBRE = {recurso.nombre: recurso for recurso in RECURSOS}
+RECURSOS_POR_MODELO = {recurso.modelo: recurso for recurso in RECURSOS}
+
+LIMITE_CAMBIOS = 1000
+
+
+def ventana_consistencia():
+    """
+    Los ids autoincrementales pueden confirmarse fuera de orden entre
+    transacciones concurrentes; no se entregan cambios más recientes que
+    esta ventana para que un token nunca "salte" un cambio aún no visible.
+    """
+    return timedelta(seconds=getattr(settings, 'SYNC_VENTANA_SEGUNDOS', 2))
+
+
+# ============================================
+# REGISTRO DE CAMBIOS
+# ============================================
+
+def registrar_cambio(instancia, operacion):
+    recurso = RECURSOS_POR_MODELO.get(type(instancia))
+    if recurso is None:
+        return
+    try:
+        ficha_id = recurso.obtener_ficha_id(instancia)
+    except Exception:
+        ficha_id = None
+    CambioSincronizacion.objects.create(
+        recurso=recurso.nombre,
+        objeto_id=instancia.pk,
+        ficha_id=ficha_id,
+        operacion=operacion,
+    )
+
+
+def registrar_traslado(ficha, sala_origen):
+    CambioSincronizacion.objects.create(
+        recurso=RECURSOS_POR_MODELO[FichaObstetrica].nombre,
+        objeto_id=ficha.pk,
+        ficha_id=ficha.pk,
+        operacion=CambioSincronizacion.TRASLADO,
+        sala_origen=sala_origen,
+    )
+
+
+# ============================================
+# CONSULTA DE CAMBIOS
+# ============================================
+
+def fichas_de_sala(sala):
+    return FichaObstetrica.objects.filter(sala=sala).values('pk')
+
+
+def instantanea(sala):
+    """
+    Carga inicial: todas las filas vigentes de la sala y el token desde el
+    cual continuar. El token se lee antes que los datos para no perder cambios.
+    """
+    token = (CambioSincronizacion.objects
+             .filter(fecha__lte=timezone.now() - ventana_consistencia())
+             .aggregate(ultimo=Max('id'))['ultimo'] or 0)
+    fichas = fichas_de_sala(sala)
+    cambios = {
+        recurso.nombre: recurso.bloque(
+            recurso.modelo.objects.filter(**{f'{recurso.ruta_ficha}__in': fichas})
+        )
+        for recurso in RECURSOS
+    }
+    return {'token': token, 'mas': False, 'cambios': cambios, 'eliminados': {}}
+
+
+def token_vigente(token):
+    """
+    False si la bitácora posterior a `token` ya fue purgada en parte
+    (purgar_sincronizacion): el cliente debe pedir una instantánea.
+    """
+    purgado = PurgaSincronizacion.objects.aggregate(hasta=Max('hasta_id'))['hasta']
+    return purgado is None or token >= purgado
+
+
+def cambios_desde(sala, token, limite=LIMITE_CAMBIOS):
+    """
+    Retorna los registros modificados después de `token` para la sala.
+    Varios cambios sobre la misma fila se entregan una sola vez con su
+    estado actual.
+    """
+    limite_fecha = timezone.now() - ventana_consistencia()
+    visibles = CambioSincronizacion.objects.filter(id__gt=token, fecha__lte=limite_fecha)
+    registros = list(
+        visibles
+        .filter(
+            Q(ficha_id__in=fichas_de_sala(sala))
+            | Q(operacion=CambioSincronizacion.TRASLADO, sala_origen=sala)
+        )
+        .order_by('id')
+        .values_list('id', 'recurso', 'objeto_id', 'operacion')[:limite + 1]
+    )
+    mas = len(registros) > limite
+    registros = registros[:limite]
+    if mas:
+        nuevo_token = registros[-1][0]
+    else:
+        # Avanzar también sobre los cambios de otras salas ya revisados
+        nuevo_token = visibles.aggregate(ultimo=Max('id'))['ultimo'] or token
+
+    vigentes = {}
+    eliminados = {}
+    trasladadas = set()
+    for _id, recurso, objeto_id, operacion in registros:
+        if operacion == CambioSincronizacion.TRASLADO:
+            trasladadas.add(objeto_id)
+        elif operacion == CambioSincronizacion.ELIMINADO:
+            vigentes.get(recurso, set()).discard(objeto_id)
+            eliminados.setdefault(recurso, set()).add(objeto_id)
+        else:
+            eliminados.get(recurso, set()).discard(objeto_id)
+            vigentes.setdefault(recurso, set()).add(objeto_id)
+
+    # Traslados: según la sala actual la ficha llegó (se envía completa) o salió
+    llegadas = set()
+    if trasladadas:
+        llegadas = set(fichas_de_sala(sala).filter(pk__in=trasladadas).values_list('pk', flat=True))
+    salidas = trasladadas - llegadas
+    fichas = RECURSOS_POR_MODELO[FichaObstetrica].nombre
+    if salidas:
+        vigentes.get(fichas, set()).difference_update(salidas)
+        eliminados.setdefault(fichas, set()).update(salidas)
+    if llegadas:
+        eliminados.get(fichas, set()).difference_update(llegadas)
+
+    cambios = {}
+    for recurso in RECURSOS:
+        ids = vigentes.get(recurso.nombre)
+        filtro = Q(pk__in=ids) if ids else Q()
+        if llegadas:
+            filtro |= Q(**{f'{recurso.ruta_ficha}__in': llegadas})
+        if not filtro:
+            continue
+        bloque = recurso.bloque(recurso.modelo.objects.filter(filtro))
+        if bloque['filas']:
+            cambios[recurso.nombre] = bloque
+
+    return {
+        'token': nuevo_token,
+        'mas': mas,
+        'cambios': cambios,
+        'eliminados': {nombre: sorted(ids) for nombre, ids in eliminados.items() if ids},
+    }
@@ -0,0 +1,35 @@
+# apiApp/tareas.py
+"""
+Tareas en segundo plano de la API (ver tareasApp.cola)
+"""
+from django.urls import reverse
+
+from core.establecimientos import en_establecimiento
+from core.replica import usar_replica
+from tareasApp.cola import tarea
+
+from . import fhir
+
+
+@tarea('exportar_fhir')
+@usar_replica
+def exportar_fhir(lote, tipos=None, since=None, establecimiento=None, version='v1'):
+    """
+    Exportación FHIR masiva asíncrona: un .ndjson.gz por tipo bajo
+    EXPORTACIONES_ROOT/<lote>, con los registros de `establecimiento` (el de
+    quien la pidió; None: todos). Cada `url` descarga el archivo por la API.
+    """
+    desde = fhir.parsear_since(since)
+
+    archivos = []
+    with en_establecimiento(establecimiento):
+        for tipo in tipos or fhir.TIPOS:
+            ruta = fhir.ruta_exportacion(lote, tipo)
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            total = fhir.exportar_a_gzip(tipo, ruta, desde)
+            archivos.append({
+                'type': tipo,
+                'url': reverse('api:exportacion-fhir-archivo', kwargs={'version': version, 'lote': lote, 'tipo': tipo}),
+                'count': total,
+            })
+    return {'output': archivos}
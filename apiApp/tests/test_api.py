@@ -0,0 +1,132 @@
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import cache
+from core.establecimientos import en_establecimiento
+from core.pruebas import crear_matrona, crear_paciente
+from gestionApp.models import Establecimiento, Persona
+from matronaApp.models import FichaObstetrica
+from medicoApp.models import Patologias
+from partosApp.models import RegistroParto
+
+
+class ApiLecturaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('api', password='clave-segura')
+        self.client.force_login(self.user)
+
+        self.paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=self.paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+        )
+
+    def test_requiere_autenticacion(self):
+        self.client.logout()
+        r = self.client.get(reverse('api:paciente-list', kwargs={'version': 'v1'}))
+        self.assertEqual(r.status_code, 403)
+
+    def test_listado_con_cursor_y_campos(self):
+        url = reverse('api:ficha-list', kwargs={'version': 'v1'})
+        r = self.client.get(url, {'fields': 'numero_ficha,paciente_rut'})
+        self.assertEqual(r.status_code, 200)
+        datos = r.json()
+        self.assertIn('next', datos)
+        self.assertEqual(
+            set(datos['results'][0]),
+            {'id', 'numero_ficha', 'paciente_rut'},
+        )
+        self.assertEqual(datos['results'][0]['paciente_rut'], self.paciente.persona.Rut)
+
+    def test_etag_responde_304(self):
+        url = reverse('api:ficha-detail', kwargs={'version': 'v1', 'pk': self.ficha.pk})
+        r = self.client.get(url)
+        self.assertEqual(r.status_code, 200)
+        etag = r['ETag']
+
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+
+        self.ficha.observaciones = 'Cambio'
+        self.ficha.save()
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+
+    @override_settings(COMPRESION_MINIMO=100)
+    def test_etag_debil_tras_compresion(self):
+        # Pasa por CompresionMiddleware: el ETag llega como W/"..."
+        for url in (reverse('api:ficha-detail', kwargs={'version': 'v1', 'pk': self.ficha.pk}),
+                    reverse('api:ficha-list', kwargs={'version': 'v1'})):
+            r = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(r['Content-Encoding'], 'gzip')
+            self.assertTrue(r['ETag'].startswith('W/"'))
+
+            r = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=r['ETag'])
+            self.assertEqual(r.status_code, 304)
+
+    def test_etag_cambia_con_datos_relacionados(self):
+        url = reverse('api:ficha-detail', kwargs={'version': 'v1', 'pk': self.ficha.pk})
+        etag = self.client.get(url)['ETag']
+
+        # El M2M no toca fecha_modificacion de la ficha
+        self.ficha.patologias.add(Patologias.objects.create(nombre='Preeclampsia', codigo_cie_10='O14', estado='Activo'))
+        r = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()['patologias']), 1)
+        etag = r['ETag']
+
+        Persona.objects.filter(pk=self.paciente.pk).update(Rut='11111111-1')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Campos pedidos que no dependen de la persona: sigue vigente
+        etag = self.client.get(url, {'fields': 'numero_ficha'})['ETag']
+        Persona.objects.filter(pk=self.paciente.pk).update(Rut='22222222-2')
+        self.assertEqual(self.client.get(url, {'fields': 'numero_ficha'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_usa_el_queryset_de_la_vista(self):
+        parto = RegistroParto.objects.create(
+            ficha=self.ficha, edad_gestacional_semanas=39, tipo_parto='EUTOCICO',
+            clasificacion_robson='Grupo 1', posicion_materna_parto='SEMISENTADA',
+            estado_perine='INDEMNE', profesional_responsable='Marta Soto',
+        )
+        url = reverse('api:parto-detail', kwargs={'version': 'v1', 'pk': parto.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Inactivo: el viewset no lo muestra, tampoco responde 304
+        RegistroParto.objects.filter(pk=parto.pk).update(activo=False)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_etag_en_listado(self):
+        url = reverse('api:paciente-list', kwargs={'version': 'v1'})
+        r = self.client.get(url)
+        r2 = self.client.get(url, HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(r2.status_code, 304)
+
+    def test_version_no_soportada(self):
+        r = self.client.get('/api/v9/pacientes/')
+        self.assertEqual(r.status_code, 404)
+
+    def test_solo_registros_del_establecimiento(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        norte = Establecimiento.objects.create(codigo='NORTE', nombre='Maternidad Norte')
+        Establecimiento.objects.create(codigo='SUR', nombre='Maternidad Sur')
+        FichaObstetrica.objects.filter(pk=self.ficha.pk).update(establecimiento_id='SUR')
+        with en_establecimiento('NORTE'):
+            ficha_norte = FichaObstetrica.objects.create(
+                paciente=self.paciente, matrona_responsable=self.ficha.matrona_responsable, numero_ficha='FO-N',
+            )
+        usuario = User.objects.create_user('matrona_norte', password='clave-segura')
+        norte.usuarios.add(usuario)
+        self.client.force_login(usuario)
+
+        r = self.client.get(reverse('api:ficha-list', kwargs={'version': 'v1'}), {'fields': 'numero_ficha'})
+        self.assertEqual([fila['id'] for fila in r.json()['results']], [ficha_norte.pk])
+        otra = reverse('api:ficha-detail', kwargs={'version': 'v1', 'pk': self.ficha.pk})
+        self.assertEqual(self.client.get(otra).status_code, 404)
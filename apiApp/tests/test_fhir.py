@@ -0,0 +1,169 @@
+import gzip
+import json
+import tempfile
+import zlib
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import cache
+from core.establecimientos import en_establecimiento
+from core.pruebas import crear_matrona, crear_paciente
+from gestionApp.models import Establecimiento
+from matronaApp.models import FichaObstetrica
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+from apiApp import fhir
+from apiApp.tareas import exportar_fhir
+
+
+class ExportacionFhirTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('fhir', password='clave-segura'))
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+        )
+        parto = RegistroParto.objects.create(
+            ficha=self.ficha,
+            edad_gestacional_semanas=39,
+            tipo_parto='EUTOCICO',
+            clasificacion_robson='1',
+            posicion_materna_parto='SEMISENTADA',
+            estado_perine='INDEMNE',
+            profesional_responsable='Marta Soto',
+            fecha_hora_parto=timezone.now(),
+        )
+        RegistroRecienNacido.objects.create(
+            registro_parto=parto,
+            sexo='FEMENINO',
+            peso=3300,
+            talla=50,
+            apgar_1_minuto=8,
+            apgar_5_minutos=9,
+            fecha_nacimiento=timezone.now(),
+        )
+
+    def test_lotes_keyset_recorren_todo(self):
+        for i in range(2, 6):
+            FichaObstetrica.objects.create(
+                paciente_id=self.ficha.paciente_id,
+                matrona_responsable=self.ficha.matrona_responsable,
+                numero_ficha=f'FO-{i:04d}',
+            )
+        pks = [f.pk for f in fhir.iterar_por_lotes(FichaObstetrica.objects.all(), lote=2)]
+        self.assertEqual(pks, sorted(FichaObstetrica.objects.values_list('pk', flat=True)))
+
+    def test_comando_genera_gzip_por_tipo(self):
+        with tempfile.TemporaryDirectory() as destino:
+            call_command('exportar_fhir', destino=destino, stdout=StringIO())
+            with gzip.open(Path(destino) / 'Patient.ndjson.gz', 'rt', encoding='utf-8') as archivo:
+                pacientes = [json.loads(linea) for linea in archivo]
+            with gzip.open(Path(destino) / 'Observation.ndjson.gz', 'rt', encoding='utf-8') as archivo:
+                observaciones = [json.loads(linea) for linea in archivo]
+
+        self.assertEqual({p['id'][:3] for p in pacientes}, {'pac', 'rn-'})
+        self.assertEqual(len(observaciones), 4)
+        self.assertTrue(all(o['subject']['reference'].startswith('Patient/rn-') for o in observaciones))
+
+    def test_endpoint_streaming_con_since(self):
+        url = reverse('api:exportacion-fhir', kwargs={'version': 'v1'})
+        r = self.client.get(url, {'_type': 'EpisodeOfCare'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(r['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', r['Vary'])
+        contenido = zlib.decompress(b''.join(r.streaming_content), wbits=31).decode()
+        self.assertEqual(json.loads(contenido.splitlines()[0])['id'], f'ficha-{self.ficha.pk}')
+
+        futuro = (timezone.now() + timedelta(days=1)).date().isoformat()
+        r = self.client.get(url, {'_type': 'Patient', '_since': futuro})
+        self.assertEqual(b''.join(r.streaming_content), b'')
+
+    def test_gzip_con_q_cero_no_comprime(self):
+        url = reverse('api:exportacion-fhir', kwargs={'version': 'v1'})
+        r = self.client.get(url, {'_type': 'EpisodeOfCare'}, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(r.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', r['Vary'])
+        contenido = b''.join(r.streaming_content).decode()
+        self.assertEqual(json.loads(contenido.splitlines()[0])['id'], f'ficha-{self.ficha.pk}')
+
+    def test_tipo_invalido(self):
+        url = reverse('api:exportacion-fhir', kwargs={'version': 'v1'})
+        self.assertEqual(self.client.get(url, {'_type': 'Claim'}).status_code, 400)
+
+    def test_exportacion_asincrona_encola_tarea(self):
+        from tareasApp.models import Tarea
+
+        url = reverse('api:exportacion-fhir', kwargs={'version': 'v1'})
+        r = self.client.get(url, {'_type': 'Patient'}, HTTP_PREFER='respond-async')
+        self.assertEqual(r.status_code, 202)
+        tarea = Tarea.objects.get(pk=r.json()['id'])
+        self.assertEqual(tarea.nombre, 'exportar_fhir')
+        self.assertEqual(r['Content-Location'], reverse('tareas:estado_tarea', args=[tarea.pk]))
+
+    def test_exporta_solo_el_establecimiento_del_usuario(self):
+        from tareasApp.models import Tarea
+
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        norte = Establecimiento.objects.create(codigo='NORTE', nombre='Maternidad Norte')
+        Establecimiento.objects.create(codigo='SUR', nombre='Maternidad Sur')
+        FichaObstetrica.objects.filter(pk=self.ficha.pk).update(establecimiento_id='SUR')
+        with en_establecimiento('NORTE'):
+            ficha_norte = FichaObstetrica.objects.create(
+                paciente=self.ficha.paciente, matrona_responsable=self.ficha.matrona_responsable,
+                numero_ficha='FO-N',
+            )
+        usuario = User.objects.create_user('matrona_norte', password='clave-segura')
+        norte.usuarios.add(usuario)
+        self.client.force_login(usuario)
+        url = reverse('api:exportacion-fhir', kwargs={'version': 'v1'})
+
+        # El streaming se recorre fuera de la vista
+        r = self.client.get(url, {'_type': 'EpisodeOfCare'})
+        ids = [json.loads(linea)['id'] for linea in b''.join(r.streaming_content).splitlines()]
+        self.assertEqual(ids, [f'ficha-{ficha_norte.pk}'])
+
+        # La tarea corre en un worker sin establecimiento activo
+        r = self.client.get(url, {'_type': 'EpisodeOfCare'}, HTTP_PREFER='respond-async')
+        argumentos = Tarea.objects.get(pk=r.json()['id']).argumentos
+        self.assertEqual(argumentos['establecimiento'], 'NORTE')
+        with tempfile.TemporaryDirectory() as raiz, self.settings(EXPORTACIONES_ROOT=Path(raiz)):
+            exportar_fhir(**argumentos)
+            ruta = fhir.ruta_exportacion(argumentos['lote'], 'EpisodeOfCare')
+            with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+                ids = [json.loads(linea)['id'] for linea in archivo]
+        self.assertEqual(ids, [f'ficha-{ficha_norte.pk}'])
+
+    def test_archivo_exportado_solo_lo_descarga_quien_lo_pidio(self):
+        from tareasApp.models import Tarea
+
+        r = self.client.get(
+            reverse('api:exportacion-fhir', kwargs={'version': 'v1'}),
+            {'_type': 'EpisodeOfCare'}, HTTP_PREFER='respond-async',
+        )
+        tarea = Tarea.objects.get(pk=r.json()['id'])
+        with tempfile.TemporaryDirectory() as raiz, self.settings(EXPORTACIONES_ROOT=Path(raiz)):
+            resultado = exportar_fhir(**tarea.argumentos)
+            url = resultado['output'][0]['url']
+            self.assertTrue(url.startswith('/api/v1/$export/'))
+            self.assertTrue(fhir.ruta_exportacion(tarea.argumentos['lote'], 'EpisodeOfCare').is_relative_to(raiz))
+
+            r = self.client.get(url)
+            self.assertEqual(r.status_code, 200)
+            lineas = gzip.decompress(b''.join(r.streaming_content)).splitlines()
+            self.assertEqual([json.loads(linea)['id'] for linea in lineas], [f'ficha-{self.ficha.pk}'])
+
+            self.client.force_login(User.objects.create_user('otra', password='clave-segura'))
+            self.assertEqual(self.client.get(url).status_code, 403)
+            self.client.logout()
+            self.assertIn(self.client.get(url).status_code, (401, 403))
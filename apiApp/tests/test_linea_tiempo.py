@@ -0,0 +1,98 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apiApp import linea_tiempo
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import IngresoPaciente, FichaObstetrica, MedicamentoFicha
+
+
+class LineaTiempoTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('api', password='clave-segura'))
+        self.paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=self.paciente, matrona_responsable=matrona, numero_ficha='FO-0001',
+        )
+        FichaObstetrica.objects.filter(pk=self.ficha.pk).update(
+            fecha_creacion=timezone.make_aware(datetime(2025, 1, 1, 8, 0))
+        )
+        # Varias indicaciones por día (mismo instante: desempate por pk)
+        MedicamentoFicha.objects.bulk_create([
+            MedicamentoFicha(
+                ficha=self.ficha, nombre_medicamento=f'Medicamento {i}', dosis='1 g',
+                via_administracion='oral', frecuencia='Cada_8_horas',
+                fecha_inicio=date(2025, 1, 1) + timedelta(days=i // 3), fecha_termino=date(2025, 2, 1),
+            )
+            for i in range(30)
+        ])
+        for i in range(4):
+            IngresoPaciente.objects.create(
+                paciente=self.paciente, motivo_ingreso='Control', numero_ficha=f'ING-{i}',
+                fecha_ingreso=date(2025, 1, 1) + timedelta(days=i * 3), hora_ingreso=time(10, 30),
+            )
+        self.total = 1 + 30 + 4
+        self.url = reverse('api:linea-tiempo', kwargs={'version': 'v1', 'pk': self.paciente.pk})
+
+    def recorrer(self, limite, tipos=None):
+        paginas = []
+        cursor = None
+        while True:
+            resultado = linea_tiempo.pagina(self.paciente.pk, cursor, limite, tipos)
+            paginas.append(resultado['eventos'])
+            cursor = resultado['cursor']
+            if cursor is None:
+                return paginas
+
+    def test_paginas_ordenadas_sin_repetir_ni_omitir(self):
+        paginas = self.recorrer(limite=7)
+        eventos = [evento for pagina in paginas for evento in pagina]
+        self.assertEqual(len(paginas), 5)
+        self.assertEqual(len({(e['tipo'], e['id']) for e in eventos}), self.total)
+        self.assertEqual(len(eventos), self.total)
+        fechas = [e['fecha'] for e in eventos]
+        self.assertEqual(fechas, sorted(fechas, reverse=True))
+        # Eventos del mismo día: el ingreso (con hora) antes que las indicaciones (00:00)
+        self.assertEqual(eventos[-1]['tipo'], 'medicamentos')
+        self.assertEqual(eventos[-4]['tipo'], 'fichas')
+        self.assertEqual(eventos[-5]['tipo'], 'ingresos')
+
+    def test_pagina_no_lee_toda_la_historia(self):
+        MedicamentoFicha.objects.bulk_create([
+            MedicamentoFicha(
+                ficha=self.ficha, nombre_medicamento='Antiguo', dosis='1 g', via_administracion='oral',
+                frecuencia='Cada_8_horas', fecha_inicio=date(2020, 1, 1), fecha_termino=date(2020, 1, 2),
+            )
+            for _ in range(2000)
+        ])
+        with self.assertNumQueries(5):
+            # paciente, ingresos, fichas de la paciente y dos lotes de indicaciones
+            resultado = linea_tiempo.pagina(self.paciente.pk, limite=10, tipos=['ingresos', 'medicamentos'])
+        self.assertEqual(len(resultado['eventos']), 10)
+        self.assertIsNotNone(resultado['cursor'])
+
+    def test_filtrar_por_tipo(self):
+        paginas = self.recorrer(limite=50, tipos=['ingresos'])
+        self.assertEqual([e['datos']['numero_ficha'] for e in paginas[0]], ['ING-3', 'ING-2', 'ING-1', 'ING-0'])
+
+    def test_endpoint(self):
+        respuesta = self.client.get(self.url, {'limite': 10})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(len(datos['eventos']), 10)
+        # Sin BD legacy en las pruebas: se informa y el resto se entrega igual
+        self.assertEqual(datos['no_disponibles'], ['controles_previos'])
+
+        siguiente = self.client.get(datos['siguiente'])
+        self.assertEqual(siguiente.status_code, 200)
+        self.assertNotEqual(siguiente.json()['eventos'][0], datos['eventos'][0])
+
+    def test_errores(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'no-es-un-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'tipos': 'visitas'}).status_code, 400)
+        otra = reverse('api:linea-tiempo', kwargs={'version': 'v1', 'pk': 999999})
+        self.assertEqual(self.client.get(otra).status_code, 404)
@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.forms import FichaObstetricaForm
+from matronaApp.models import FichaObstetrica, MedicamentoFicha
+from apiApp.models import CambioSincronizacion
+
+
+@override_settings(SYNC_VENTANA_SEGUNDOS=0)
+class SincronizacionTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('tablet', password='clave-segura'))
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+            sala='PARTO',
+        )
+        self.otra_ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0002',
+            sala='PUERPERIO',
+        )
+        self.url = reverse('api:sincronizacion', kwargs={'version': 'v1'})
+
+    def crear_medicamento(self, ficha, nombre):
+        return MedicamentoFicha.objects.create(
+            ficha=ficha,
+            nombre_medicamento=nombre,
+            dosis='1 g',
+            via_administracion='oral',
+            frecuencia='Cada_8_horas',
+            fecha_inicio=date(2025, 1, 1),
+            fecha_termino=date(2025, 1, 5),
+        )
+
+    def test_instantanea_y_delta(self):
+        self.crear_medicamento(self.ficha, 'Paracetamol')
+        inicial = self.client.get(self.url, {'sala': 'PARTO'}).json()
+        self.assertEqual(len(inicial['cambios']['medicamentos']['filas']), 1)
+        self.assertEqual(len(inicial['cambios']['fichas']['filas']), 1)
+
+        nuevo = self.crear_medicamento(self.ficha, 'Ibuprofeno')
+        self.crear_medicamento(self.otra_ficha, 'Cefazolina')
+
+        delta = self.client.get(self.url, {'sala': 'PARTO', 'token': inicial['token']}).json()
+        self.assertEqual(list(delta['cambios']), ['medicamentos'])
+        filas = delta['cambios']['medicamentos']['filas']
+        self.assertEqual([fila[0] for fila in filas], [nuevo.pk])
+
+        vacio = self.client.get(self.url, {'sala': 'PARTO', 'token': delta['token']}).json()
+        self.assertEqual(vacio['cambios'], {})
+        self.assertEqual(vacio['token'], delta['token'])
+
+    def test_eliminacion_genera_tombstone(self):
+        medicamento = self.crear_medicamento(self.ficha, 'Paracetamol')
+        token = self.client.get(self.url, {'sala': 'PARTO'}).json()['token']
+        pk = medicamento.pk
+        medicamento.delete()
+
+        delta = self.client.get(self.url, {'sala': 'PARTO', 'token': token}).json()
+        self.assertEqual(delta['eliminados'], {'medicamentos': [pk]})
+        self.assertNotIn('medicamentos', delta['cambios'])
+
+    def test_traslado_entre_salas(self):
+        medicamento = self.crear_medicamento(self.ficha, 'Paracetamol')
+        token_parto = self.client.get(self.url, {'sala': 'PARTO'}).json()['token']
+        token_puerperio = self.client.get(self.url, {'sala': 'PUERPERIO'}).json()['token']
+
+        matrona = User.objects.create_user('matrona', password='clave-segura')
+        matrona.groups.add(Group.objects.create(name='Matrona'))
+        self.client.force_login(matrona)
+        respuesta = self.client.post(
+            reverse('matrona:trasladar_ficha', kwargs={'pk': self.ficha.pk}), {'sala': 'PUERPERIO'}
+        )
+        self.assertRedirects(respuesta, reverse('matrona:detalle_ficha', kwargs={'pk': self.ficha.pk}),
+                             fetch_redirect_response=False)
+        self.ficha.refresh_from_db()
+        self.assertEqual(self.ficha.sala, 'PUERPERIO')
+
+        # La sala de destino recibe la ficha con sus registros anteriores
+        llegada = self.client.get(self.url, {'sala': 'PUERPERIO', 'token': token_puerperio}).json()
+        self.assertEqual([fila[0] for fila in llegada['cambios']['fichas']['filas']], [self.ficha.pk])
+        self.assertEqual([fila[0] for fila in llegada['cambios']['medicamentos']['filas']], [medicamento.pk])
+        self.assertEqual(llegada['eliminados'], {})
+
+        # La sala de origen la descarta
+        salida = self.client.get(self.url, {'sala': 'PARTO', 'token': token_parto}).json()
+        self.assertEqual(salida['cambios'], {})
+        self.assertEqual(salida['eliminados'], {'fichas': [self.ficha.pk]})
+
+        # Sin traslado no hay registro extra
+        self.client.post(reverse('matrona:trasladar_ficha', kwargs={'pk': self.ficha.pk}), {'sala': 'PUERPERIO'})
+        vacio = self.client.get(self.url, {'sala': 'PARTO', 'token': salida['token']}).json()
+        self.assertEqual(vacio['eliminados'], {})
+
+    def test_sala_editable_en_formulario(self):
+        self.assertIn('sala', FichaObstetricaForm.base_fields)
+
+    def test_sala_invalida(self):
+        r = self.client.get(self.url, {'sala': 'X'})
+        self.assertEqual(r.status_code, 400)
+
+    def test_token_anterior_a_la_purga_pide_instantanea(self):
+        token = self.client.get(self.url, {'sala': 'PARTO'}).json()['token']
+        self.crear_medicamento(self.ficha, 'Paracetamol')
+        reciente = self.crear_medicamento(self.ficha, 'Ibuprofeno')
+        primero = CambioSincronizacion.objects.filter(id__gt=token).order_by('id').first()
+        CambioSincronizacion.objects.filter(pk=primero.pk).update(fecha=timezone.now() - timedelta(days=40))
+        call_command('purgar_sincronizacion', '--dias', '30', stdout=StringIO())
+
+        r = self.client.get(self.url, {'sala': 'PARTO', 'token': token})
+        self.assertEqual(r.status_code, 410)
+        self.assertTrue(r.json()['resync'])
+
+        inicial = self.client.get(self.url, {'sala': 'PARTO'}).json()
+        self.assertGreaterEqual(inicial['token'], primero.pk)
+        self.assertIn(reciente.pk, [fila[0] for fila in inicial['cambios']['medicamentos']['filas']])
+        r = self.client.get(self.url, {'sala': 'PARTO', 'token': inicial['token']})
+        self.assertEqual(r.status_code, 200)
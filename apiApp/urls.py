@@ -0,0 +1,28 @@
+# apiApp/urls.py
+"""
+URLs de la API REST versionada (/api/v1/...)
+"""
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('pacientes', views.PacienteViewSet, basename='paciente')
+router.register('fichas', views.FichaObstetricaViewSet, basename='ficha')
+router.register('medicamentos', views.MedicamentoFichaViewSet, basename='medicamento')
+router.register('administraciones', views.AdministracionMedicamentoViewSet, basename='administracion')
+router.register('registros-tens', views.RegistroTensViewSet, basename='registro-tens')
+router.register('partos', views.RegistroPartoViewSet, basename='parto')
+router.register('recien-nacidos', views.RegistroRecienNacidoViewSet, basename='recien-nacido')
+
+urlpatterns = [
+    path('sync/', views.SincronizacionView.as_view(), name='sincronizacion'),
+    path('pacientes/<int:pk>/linea-tiempo/', views.LineaTiempoView.as_view(), name='linea-tiempo'),
+    path('$export', views.ExportacionFhirView.as_view(), name='exportacion-fhir'),
+    path('$export/<uuid:lote>/<str:tipo>.ndjson.gz', views.ArchivoExportacionFhirView.as_view(),
+         name='exportacion-fhir-archivo'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,334 @@
+# apiApp/views.py
+"""
+API REST versionada de solo lectura
+
+Cada recurso expone listado (paginado por cursor) y detalle. Soporta:
+- ?fields=a,b,c para devolver solo algunos campos
+- select_related/prefetch_related según los campos solicitados
+- ETag / If-None-Match para consultas periódicas baratas
+"""
+import uuid
+import zlib
+
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from rest_framework import status, viewsets
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.establecimientos import ConEstablecimiento, establecimiento_actual, iterar_en_establecimiento
+from core.middleware.estaticos import codificaciones_aceptadas
+from gestionApp.models import Paciente
+from matronaApp.models import FichaObstetrica, MedicamentoFicha, AdministracionMedicamento
+from tensApp.models import RegistroTens
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+from tareasApp.cola import encolar
+from tareasApp.models import Tarea
+from tareasApp.views import es_administrador, respuesta_encolada
+
+from . import fhir, linea_tiempo, sincronizacion
+from .mixins import ConsultaOptimizadaMixin, ETagMixin
+from .pagination import CursorClinicoPagination
+from .serializers import (
+    PacienteSerializer,
+    FichaObstetricaSerializer,
+    MedicamentoFichaSerializer,
+    AdministracionMedicamentoSerializer,
+    RegistroTensSerializer,
+    RegistroPartoSerializer,
+    RegistroRecienNacidoSerializer,
+)
+
+
+class LecturaClinicaViewSet(ETagMixin, ConsultaOptimizadaMixin, viewsets.ReadOnlyModelViewSet):
+    """Base común de los recursos clínicos de solo lectura"""
+    permission_classes = [IsAuthenticated]
+    pagination_class = CursorClinicoPagination
+
+    def get_queryset(self):
+        # `queryset` se arma al importar el módulo, sin establecimiento activo:
+        # el manager no filtró y se filtra aquí, en cada petición
+        queryset = super().get_queryset()
+        codigo = establecimiento_actual()
+        if codigo is not None and issubclass(queryset.model, ConEstablecimiento):
+            queryset = queryset.del_establecimiento(codigo)
+        return queryset
+
+
+# ============================================
+# PACIENTES Y FICHAS
+# ============================================
+
+class PacienteViewSet(LecturaClinicaViewSet):
+    queryset = Paciente.objects.filter(activo=True)
+    serializer_class = PacienteSerializer
+    relaciones_select = {
+        'rut': ('persona',),
+        'nombre': ('persona',),
+        'apellido_paterno': ('persona',),
+        'apellido_materno': ('persona',),
+        'fecha_nacimiento': ('persona',),
+    }
+
+
+class FichaObstetricaViewSet(LecturaClinicaViewSet):
+    queryset = FichaObstetrica.objects.all()
+    serializer_class = FichaObstetricaSerializer
+    campo_version = 'fecha_modificacion'
+    relaciones_select = {
+        'paciente_rut': ('paciente__persona',),
+        'matrona_responsable_nombre': ('matrona_responsable__persona',),
+    }
+    relaciones_prefetch = {
+        'patologias': ('patologias',),
+    }
+    relaciones_version = {
+        'paciente_rut': ('paciente__persona__Rut',),
+        'matrona_responsable_nombre': ('matrona_responsable__persona__Nombre',
+                                       'matrona_responsable__persona__Apellido_Paterno'),
+        'patologias': ('patologias__pk',),
+    }
+
+
+class MedicamentoFichaViewSet(LecturaClinicaViewSet):
+    queryset = MedicamentoFicha.objects.all()
+    serializer_class = MedicamentoFichaSerializer
+    relaciones_select = {
+        'numero_ficha': ('ficha',),
+    }
+
+
+class AdministracionMedicamentoViewSet(LecturaClinicaViewSet):
+    queryset = AdministracionMedicamento.objects.all()
+    serializer_class = AdministracionMedicamentoSerializer
+    relaciones_select = {
+        'nombre_medicamento': ('medicamento_ficha',),
+        'tens_nombre': ('tens__persona',),
+    }
+
+
+class RegistroTensViewSet(LecturaClinicaViewSet):
+    queryset = RegistroTens.objects.all()
+    serializer_class = RegistroTensSerializer
+    relaciones_select = {
+        'numero_ficha': ('ficha',),
+    }
+
+
+# ============================================
+# PARTOS Y RECIÉN NACIDOS
+# ============================================
+
+class RegistroPartoViewSet(LecturaClinicaViewSet):
+    queryset = RegistroParto.objects.filter(activo=True)
+    serializer_class = RegistroPartoSerializer
+    campo_version = 'fecha_modificacion'
+    relaciones_select = {
+        'numero_ficha': ('ficha',),
+        'paciente_rut': ('ficha__paciente__persona',),
+    }
+    relaciones_prefetch = {
+        'recien_nacidos': ('recien_nacidos',),
+    }
+    relaciones_version = {
+        'numero_ficha': ('ficha__numero_ficha',),
+        'paciente_rut': ('ficha__paciente__persona__Rut',),
+        'recien_nacidos': ('recien_nacidos__pk',),
+    }
+
+
+class RegistroRecienNacidoViewSet(LecturaClinicaViewSet):
+    queryset = RegistroRecienNacido.objects.all()
+    serializer_class = RegistroRecienNacidoSerializer
+    relaciones_select = {
+        'numero_registro_parto': ('registro_parto',),
+    }
+
+
+# ============================================
+# LÍNEA DE TIEMPO CLÍNICA
+# ============================================
+
+class LineaTiempoView(APIView):
+    """
+    GET /api/v1/pacientes/<pk>/linea-tiempo/?limite=50&tipos=partos,tratamientos
+
+    Eventos clínicos de la paciente del más reciente al más antiguo (ver
+    apiApp.linea_tiempo). `siguiente` es la URL de la página siguiente.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        tipos = None
+        if request.query_params.get('tipos'):
+            tipos = [t.strip() for t in request.query_params['tipos'].split(',') if t.strip()]
+            if set(tipos) - set(linea_tiempo.TIPOS):
+                return Response(
+                    {'detalle': 'Tipo de evento inválido.', 'tipos': linea_tiempo.TIPOS},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        try:
+            limite = int(request.query_params.get('limite', linea_tiempo.LIMITE))
+        except ValueError:
+            return Response({'detalle': 'Límite inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultado = linea_tiempo.pagina(pk, request.query_params.get('cursor'), limite, tipos)
+        except Paciente.DoesNotExist:
+            return Response({'detalle': 'Paciente no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'detalle': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = resultado.pop('cursor')
+        resultado['siguiente'] = (
+            replace_query_param(request.build_absolute_uri(), 'cursor', cursor) if cursor else None
+        )
+        return Response(resultado)
+
+
+# ============================================
+# SINCRONIZACIÓN INCREMENTAL (TABLETS)
+# ============================================
+
+class SincronizacionView(APIView):
+    """
+    Delta-sync por sala: GET /api/v1/sync/?sala=PARTO&token=123
+
+    Sin token devuelve una instantánea completa de la sala. Con token
+    devuelve solo los registros modificados o eliminados desde ese token,
+    o 410 {"resync": true} si esa parte de la bitácora ya se purgó.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        sala = request.query_params.get('sala', '')
+        salas_validas = dict(FichaObstetrica.SALA_CHOICES)
+        if sala not in salas_validas:
+            return Response(
+                {'detalle': 'Sala inválida.', 'salas': list(salas_validas)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        token = request.query_params.get('token')
+        if token in (None, ''):
+            return Response(sincronizacion.instantanea(sala))
+        try:
+            token = int(token)
+        except ValueError:
+            return Response({'detalle': 'Token inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not sincronizacion.token_vigente(token):
+            return Response(
+                {'detalle': 'Token anterior a la última purga; pedir una instantánea.', 'resync': True},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(sincronizacion.cambios_desde(sala, token))
+
+
+# ============================================
+# EXPORTACIÓN MASIVA FHIR
+# ============================================
+
+def _comprimir_gzip(lineas):
+    compresor = zlib.compressobj(wbits=31)  # 31 = formato gzip
+    for linea in lineas:
+        bloque = compresor.compress(linea)
+        if bloque:
+            yield bloque
+    yield compresor.flush()
+
+
+class ExportacionFhirView(APIView):
+    """
+    GET /api/v1/$export?_type=Patient&_since=2025-01-01
+
+    Devuelve un tipo FHIR como NDJSON en streaming (comprimido con gzip si el
+    cliente lo acepta). Para extractos completos de varios tipos usar el
+    comando `exportar_fhir`, o enviar `Prefer: respond-async`: la exportación
+    se encola como tarea y se responde 202 con la URL de estado a consultar.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if request.headers.get('Prefer', '').strip() == 'respond-async':
+            return self._encolar(request)
+
+        tipo = request.query_params.get('_type', '')
+        if tipo not in fhir.FUENTES:
+            return Response(
+                {'detalle': 'Tipo FHIR no soportado.', 'tipos': fhir.TIPOS},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            desde = fhir.parsear_since(request.query_params.get('_since'))
+        except ValueError as e:
+            return Response({'detalle': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Se recorre después de que EstablecimientoMiddleware salió de su bloque
+        lineas = iterar_en_establecimiento(establecimiento_actual(), fhir.lineas_ndjson(tipo, desde))
+        comprimir = 'gzip' in codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING'))
+        respuesta = StreamingHttpResponse(
+            _comprimir_gzip(lineas) if comprimir else lineas,
+            content_type='application/fhir+ndjson',
+        )
+        if comprimir:
+            respuesta['Content-Encoding'] = 'gzip'
+        respuesta['Content-Disposition'] = f'attachment; filename="{tipo}.ndjson{".gz" if comprimir else ""}"'
+        patch_vary_headers(respuesta, ('Accept-Encoding',))
+        return respuesta
+
+    def _encolar(self, request):
+        tipos = [t.strip() for t in request.query_params.get('_type', '').split(',') if t.strip()]
+        invalidos = [t for t in tipos if t not in fhir.FUENTES]
+        if invalidos:
+            return Response(
+                {'detalle': 'Tipo FHIR no soportado.', 'tipos': fhir.TIPOS},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        since = request.query_params.get('_since') or None
+        try:
+            fhir.parsear_since(since)
+        except ValueError as e:
+            return Response({'detalle': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        tipos = tipos or fhir.TIPOS
+        establecimiento = establecimiento_actual()
+        clave = f"fhir:{request.user.pk}:{establecimiento or ''}:{','.join(tipos)}:{since or ''}"
+        tarea = encolar(
+            'exportar_fhir',
+            lote=str(uuid.uuid4()),
+            version=request.version,
+            tipos=tipos,
+            since=since,
+            establecimiento=establecimiento,
+            clave=clave,
+            prioridad=Tarea.PRIORIDAD_BAJA,
+            solicitada_por=request.user,
+        )
+        respuesta = respuesta_encolada(tarea)
+        respuesta['Content-Location'] = respuesta['Location']
+        return respuesta
+
+
+class ArchivoExportacionFhirView(APIView):
+    """
+    GET /api/v1/$export/<lote>/<tipo>.ndjson.gz
+
+    Archivo de una exportación asíncrona (las `url` del resultado de la
+    tarea). Solo lo descarga quien pidió la exportación o un administrador.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, lote, tipo, *args, **kwargs):
+        if tipo not in fhir.FUENTES:
+            raise Http404('Tipo FHIR no soportado')
+        tarea = get_object_or_404(Tarea, nombre='exportar_fhir', argumentos__lote=str(lote))
+        if tarea.solicitada_por_id != request.user.pk and not es_administrador(request.user):
+            return Response({'detalle': 'No autorizado.'}, status=status.HTTP_403_FORBIDDEN)
+        ruta = fhir.ruta_exportacion(lote, tipo)
+        if not ruta.exists():
+            raise Http404('Archivo no generado')
+        return FileResponse(open(ruta, 'rb'), content_type='application/gzip', filename=f'{tipo}.ndjson.gz')
@@ -0,0 +1,71 @@
+# authentication/management/commands/cerrar_sesiones.py
+"""
+Cierra sesiones de usuarios (backend core.sesiones)
+Uso:
+    python manage.py cerrar_sesiones                       # solo muestra el estado
+    python manage.py cerrar_sesiones --usuario jperez mrojas
+    python manage.py cerrar_sesiones --todas
+    python manage.py cerrar_sesiones --expiradas
+
+Las sesiones de un usuario se buscan por la columna indexada usuario_id,
+sin decodificar la tabla completa. También se borran sus copias en caché,
+por lo que el cierre es inmediato.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from core import sesiones
+from core.models import Sesion
+
+
+class Command(BaseCommand):
+    help = 'Cierra las sesiones de los usuarios indicados, todas, o borra las vencidas'
+
+    def add_arguments(self, parser):
+        grupo = parser.add_mutually_exclusive_group()
+        grupo.add_argument('--usuario', nargs='+', metavar='USERNAME', help='Cerrar las sesiones de estos usuarios')
+        grupo.add_argument('--todas', action='store_true', help='Cerrar todas las sesiones')
+        grupo.add_argument('--expiradas', action='store_true', help='Borrar solo las sesiones vencidas')
+
+    def handle(self, *args, **options):
+        if options['usuario']:
+            usuarios = dict(User.objects.filter(username__in=options['usuario']).values_list('username', 'pk'))
+            faltantes = sorted(set(options['usuario']) - set(usuarios))
+            if faltantes:
+                raise CommandError(f"Usuarios inexistentes: {', '.join(faltantes)}")
+            cerradas = sesiones.cerrar_sesiones(usuarios.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {cerradas} sesiones cerradas de {', '.join(sorted(usuarios))}"
+            ))
+        elif options['todas']:
+            cerradas = sesiones.cerrar_sesiones()
+            self.stdout.write(self.style.SUCCESS(f'✅ {cerradas} sesiones cerradas'))
+        elif options['expiradas']:
+            borradas = sesiones.purgar_expiradas()
+            self.stdout.write(self.style.SUCCESS(f'✅ {borradas} sesiones vencidas borradas'))
+        else:
+            self.mostrar_estado()
+
+    def mostrar_estado(self):
+        ahora = timezone.now()
+        vigentes = Sesion.objects.filter(expire_date__gte=ahora)
+        self.stdout.write(f'Sesiones vigentes: {vigentes.count()}')
+        self.stdout.write(f'Sesiones vencidas: {Sesion.objects.filter(expire_date__lt=ahora).count()}')
+
+        por_usuario = (
+            vigentes.exclude(usuario_id=None).values('usuario_id')
+            .annotate(total=Count('pk')).order_by('-total')[:20]
+        )
+        nombres = dict(User.objects.filter(
+            pk__in=[fila['usuario_id'] for fila in por_usuario]
+        ).values_list('pk', 'username'))
+        for fila in por_usuario:
+            self.stdout.write(f"  {nombres.get(fila['usuario_id'], fila['usuario_id']):30} {fila['total']:>5}")
+
+        estadisticas = sesiones.estadisticas()
+        self.stdout.write(
+            'Lecturas BD: {lecturas_bd}  Escrituras BD: {escrituras_bd}  '
+            'Diferidas: {diferidas}  Sin cambios: {omitidas}'.format(**estadisticas)
+        )
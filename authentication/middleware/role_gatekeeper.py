@@ -3,6 +3,7 @@
 Middleware para control de acceso basado en roles
 Restringe el acceso a apps según el grupo del usuario
 """
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.core.exceptions import PermissionDenied
 from django.urls import resolve
 from django.shortcuts import redirect
@@ -40,30 +41,52 @@ class RoleGatekeeperMiddleware:
     - Admin y superuser acceden a todo
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        # Bajo ASGI la cadena es async; solo la verificación de roles pasa por un hilo
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        respuesta = self.verificar_acceso(request)
+        if respuesta is not None:
+            return respuesta
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # La verificación consulta sesión y grupos (ORM síncrono)
+        respuesta = await sync_to_async(self.verificar_acceso)(request)
+        if respuesta is not None:
+            return respuesta
+        return await self.get_response(request)
+
+    def verificar_acceso(self, request):
+        """Retorna una respuesta (redirect) si se debe cortar la petición, o None"""
 
         try:
             match = resolve(request.path_info)
         except Exception:
-            return self.get_response(request)
+            return None
 
         # URLs públicas
         if match.url_name in EXEMPT_URL_NAMES:
-            return self.get_response(request)
+            return None
 
         app_name = match.app_name
 
         # Sin app_name → no se restringe
         if not app_name:
-            return self.get_response(request)
+            return None
 
         # Si la app no tiene regla → acceso libre
         required_role = RUTA_ROLES.get(app_name)
         if not required_role:
-            return self.get_response(request)
+            return None
 
         # Validación de login
         if not request.user.is_authenticated:
@@ -72,7 +95,7 @@ class RoleGatekeeperMiddleware:
         # Súper usuario o Administrador → acceso total
         if request.user.is_superuser or \
            request.user.groups.filter(name="Administrador").exists():
-            return self.get_response(request)
+            return None
 
         # Verificar rol requerido
         if not request.user.groups.filter(name=required_role).exists():
@@ -82,4 +105,4 @@ class RoleGatekeeperMiddleware:
             )
             raise PermissionDenied("No tienes permisos para acceder a esta sección.")
 
-        return self.get_response(request)
\ No newline at end of file
+        return None
@@ -7,6 +7,7 @@ from django.contrib.auth import views as auth_views
 from .views import (
     CustomLoginView, 
     custom_logout_view,
+    cambiar_establecimiento,
     DashboardAdminView,
     DashboardMedicoView,
     DashboardMatronaView,
@@ -21,6 +22,7 @@ urlpatterns = [
     # ============================================
     path('login/', CustomLoginView.as_view(), name='login'),
     path('logout/', custom_logout_view, name='logout'), 
+    path('establecimiento/', cambiar_establecimiento, name='cambiar_establecimiento'),
     
     # ============================================
     # RECUPERACIÓN DE CONTRASEÑA
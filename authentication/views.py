@@ -7,6 +7,9 @@ from django.urls import reverse_lazy
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from gestionApp.models import Establecimiento
 from .forms import CustomLoginForm
 import logging
 
@@ -243,4 +246,30 @@ class DashboardTensView(TemplateView):
                 fecha_hora_administracion__date=hoy
             ).count(),
         })
-        return context
\ No newline at end of file
+        return context
+
+# ============================================
+# ESTABLECIMIENTO ACTIVO
+# ============================================
+@login_required
+@require_POST
+def cambiar_establecimiento(request):
+    """
+    Elige con qué maternidad trabaja el usuario (core.middleware.establecimiento).
+    Los superusuarios pueden elegir TODOS para ver todas.
+    """
+    from core.middleware.establecimiento import SESION, TODOS, establecimientos_de
+
+    codigo = request.POST.get('establecimiento', '')
+    permitido = codigo in establecimientos_de(request.user) or (
+        request.user.is_superuser and (codigo == TODOS or Establecimiento.objects.filter(pk=codigo).exists())
+    )
+    if permitido:
+        request.session[SESION] = codigo
+    else:
+        messages.error(request, 'No tienes acceso a ese establecimiento.')
+
+    destino = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(destino, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        destino = 'home'
+    return redirect(destino)
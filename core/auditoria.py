@@ -0,0 +1,337 @@
+# core/auditoria.py
+"""
+Auditoría por campo de los registros clínicos
+
+Los modelos que heredan de AuditadoMixin guardan cada versión como un
+CambioAuditoria con solo los campos que cambiaron (un RegistroParto tiene
+~70 columnas; editar el Apgar guarda una). La creación y cada
+AUDITORIA_PUNTO_CONTROL_CADA versiones guardan además el registro completo
+(punto de control), así reconstruir una versión lee un punto de control y
+a lo más esa cantidad de diferencias:
+
+    auditoria.historial(parto)                  # CambioAuditoria en orden
+    auditoria.version(RegistroParto, pk, 3)     # instancia (sin guardar) de la versión 3
+    auditoria.version(RegistroParto, pk, fecha=ayer)
+
+Las versiones se escriben dentro de la misma transacción que el
+guardado: si el registro se confirma, su auditoría también; si la
+auditoría no se puede escribir, el guardado falla y se revierte. Dentro
+de una petición, AuditoriaMiddleware abre un lote con el usuario: varios
+guardados del mismo registro se combinan en su versión ya escrita (se
+actualiza esa fila en vez de insertar otra). Fuera de una petición
+(comandos, tareas) cada guardado escribe su versión sin usuario.
+
+Si la instancia se cargó con only()/defer(), los puntos de control (y la
+versión INICIAL) se completan con los campos diferidos leídos de la BD.
+
+No se auditan los campos auto_now, las relaciones muchos a muchos ni los
+update()/delete() de querysets (no pasan por save()).
+"""
+import contextvars
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+from .models import CambioAuditoria
+from .versionado import ConVersion
+
+AUDITORIA_PUNTO_CONTROL_CADA = 20
+REINTENTOS = 3
+
+_lote = contextvars.ContextVar('auditoria_lote', default=None)
+
+
+def _punto_control_cada():
+    return getattr(settings, 'AUDITORIA_PUNTO_CONTROL_CADA', AUDITORIA_PUNTO_CONTROL_CADA)
+
+
+# ============================================
+# MIXIN DE MODELOS
+# ============================================
+
+class AuditadoMixin:
+    """
+    Audita save()/delete() por campo. `campos_no_auditados` excluye campos
+    por nombre (además de la clave primaria, los auto_now y `version`).
+    """
+
+    campos_no_auditados = ()
+
+    @classmethod
+    def campos_auditados(cls):
+        return [
+            campo for campo in cls._meta.concrete_fields
+            if not campo.primary_key
+            and not getattr(campo, 'auto_now', False)
+            and campo.name not in cls.campos_no_auditados
+            # La columna de concurrencia (core.versionado) cambia en cada save()
+            and not (issubclass(cls, ConVersion) and campo.name == 'version')
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._auditoria_previo = instancia.valores_auditados()
+        return instancia
+
+    def valores_auditados(self):
+        """{attname: valor} de los campos auditados cargados (sin los diferidos)"""
+        diferidos = self.get_deferred_fields()
+        return {
+            campo.attname: getattr(self, campo.attname)
+            for campo in self.campos_auditados()
+            if campo.attname not in diferidos
+        }
+
+    def save(self, *args, **kwargs):
+        creado = self._state.adding
+        previo = getattr(self, '_auditoria_previo', None)
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            actual = self.valores_auditados()
+            if creado:
+                registrar(self, CambioAuditoria.CREADO, estado=actual)
+            elif previo is None:
+                # Instancia armada a mano: no se sabe qué cambió, se guarda completa
+                registrar(self, CambioAuditoria.MODIFICADO, estado=actual)
+            else:
+                cambios = {
+                    nombre: valor for nombre, valor in actual.items()
+                    if nombre in previo and previo[nombre] != valor
+                }
+                if cambios:
+                    registrar(self, CambioAuditoria.MODIFICADO, cambios=cambios, estado=actual, previo=previo)
+        self._auditoria_previo = actual
+
+    def delete(self, *args, **kwargs):
+        objeto_id = self.pk
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            resultado = super().delete(*args, **kwargs)
+            registrar(self, CambioAuditoria.ELIMINADO, objeto_id=objeto_id)
+        return resultado
+
+
+# ============================================
+# REGISTRO Y ESCRITURA
+# ============================================
+
+class _Cambio:
+    __slots__ = ('modelo', 'tipo', 'objeto_id', 'operacion', 'cambios', 'estado', 'previo', 'creado')
+
+    def __init__(self, modelo, objeto_id, operacion, cambios, estado, previo):
+        self.modelo = modelo
+        self.tipo = modelo._meta.label_lower
+        self.objeto_id = objeto_id
+        self.operacion = operacion
+        self.cambios = cambios
+        self.estado = estado
+        self.previo = previo
+        # Creaciones y guardados sin previo traen el registro completo
+        self.creado = operacion != CambioAuditoria.ELIMINADO and not cambios
+
+    def completo(self, valores):
+        """
+        `valores` con los campos auditados que faltan (diferidos al cargar)
+        leídos de la BD. save() no escribe los diferidos, así que lo leído
+        vale tanto para el estado previo como para el actual.
+        """
+        faltantes = [
+            campo.attname for campo in self.modelo.campos_auditados() if campo.attname not in valores
+        ]
+        if not faltantes:
+            return valores
+        leidos = self.modelo._base_manager.filter(pk=self.objeto_id).values(*faltantes).first() or {}
+        return {**valores, **leidos}
+
+
+class LoteAuditoria:
+    """
+    Versiones escritas en una petición, por registro. `usuario` es una
+    función que retorna el id del usuario (se evalúa en la primera escritura).
+    """
+
+    def __init__(self, usuario=None):
+        self._usuario = usuario
+        self._ultimo = {}
+
+    @cached_property
+    def usuario_id(self):
+        return self._usuario() if self._usuario is not None else None
+
+    def agregar(self, cambio):
+        clave = (cambio.tipo, cambio.objeto_id)
+        numero = self._ultimo.get(clave)
+        if numero is None or not self._combinar(cambio, numero):
+            numero = escribir([cambio], self.usuario_id)[-1].numero
+        self._ultimo[clave] = numero
+
+    def _combinar(self, cambio, numero):
+        """
+        Suma `cambio` a la versión `numero` que escribió esta petición. False
+        si no se puede: eliminación, o la versión ya no es la última de este
+        usuario (se revirtió su savepoint y otro guardado tomó el número).
+        """
+        if cambio.operacion == CambioAuditoria.ELIMINADO:
+            return False
+        fila = (
+            CambioAuditoria.objects.select_for_update()
+            .filter(tipo=cambio.tipo, objeto_id=cambio.objeto_id, numero__gte=numero)
+            .order_by('-numero').first()
+        )
+        if (fila is None or fila.numero != numero or fila.usuario_id != self.usuario_id
+                or fila.operacion == CambioAuditoria.ELIMINADO):
+            return False
+        if fila.cambios or fila.estado is None:
+            fila.cambios = {**fila.cambios, **cambio.cambios}
+        if fila.estado is not None or cambio.creado:
+            fila.estado = cambio.completo(cambio.estado)
+        fila.save(update_fields=['cambios', 'estado'])
+        return True
+
+
+class en_lote:
+    """Combina por registro los cambios del bloque (lo usa AuditoriaMiddleware)"""
+
+    def __init__(self, usuario=None):
+        self.lote = LoteAuditoria(usuario)
+
+    def __enter__(self):
+        self._token = _lote.set(self.lote)
+        return self.lote
+
+    def __exit__(self, *exc):
+        _lote.reset(self._token)
+
+
+def registrar(instancia, operacion, cambios=None, estado=None, previo=None, objeto_id=None):
+    """
+    Escribe la versión de `instancia` en la transacción en curso (la del
+    save()/delete() que la origina): en el lote de la petición si hay uno.
+    """
+    cambio = _Cambio(
+        type(instancia),
+        instancia.pk if objeto_id is None else objeto_id,
+        operacion,
+        dict(cambios or {}),
+        estado,
+        previo,
+    )
+    lote = _lote.get()
+    if lote is None:
+        escribir([cambio])
+    else:
+        lote.agregar(cambio)
+
+
+def registrar_creados(objetos):
+    """Versiones de creación de `objetos` (recién insertados) con un único INSERT"""
+    lote = _lote.get()
+    escribir(
+        [_Cambio(type(objeto), objeto.pk, CambioAuditoria.CREADO, {}, objeto._auditoria_previo, None)
+         for objeto in objetos],
+        lote.usuario_id if lote is not None else None,
+    )
+
+
+def escribir(cambios, usuario_id=None):
+    """Inserta las versiones de `cambios` con un único bulk_create y las retorna"""
+    for intento in range(REINTENTOS):
+        try:
+            with transaction.atomic():
+                return CambioAuditoria.objects.bulk_create(_filas(cambios, usuario_id))
+        except IntegrityError:
+            # Otra transacción tomó el mismo número de versión: se recalcula
+            if intento == REINTENTOS - 1:
+                raise
+
+
+def _filas(cambios, usuario_id):
+    claves = {(cambio.tipo, cambio.objeto_id) for cambio in cambios}
+    ultimos = {
+        (fila['tipo'], fila['objeto_id']): fila['ultimo']
+        for fila in CambioAuditoria.objects.filter(
+            reduce(or_, (Q(tipo=tipo, objeto_id=objeto_id) for tipo, objeto_id in claves))
+        ).values('tipo', 'objeto_id').annotate(ultimo=Max('numero')).order_by()
+    }
+    cada = _punto_control_cada()
+
+    filas = []
+    for cambio in cambios:
+        clave = (cambio.tipo, cambio.objeto_id)
+        numero = ultimos.get(clave, 0)
+        if numero == 0 and cambio.previo is not None:
+            # Registro anterior a la auditoría: su estado previo es la versión 1
+            numero = 1
+            filas.append(_fila(
+                cambio, numero, usuario_id, CambioAuditoria.INICIAL, estado=cambio.completo(cambio.previo),
+            ))
+
+        numero += 1
+        if cambio.operacion == CambioAuditoria.ELIMINADO:
+            filas.append(_fila(cambio, numero, usuario_id, cambio.operacion))
+        elif cambio.creado or numero % cada == 0:
+            filas.append(_fila(
+                cambio, numero, usuario_id, cambio.operacion, cambio.cambios, cambio.completo(cambio.estado),
+            ))
+        else:
+            filas.append(_fila(cambio, numero, usuario_id, cambio.operacion, cambio.cambios))
+        ultimos[clave] = numero
+    return filas
+
+
+def _fila(cambio, numero, usuario_id, operacion, cambios=None, estado=None):
+    return CambioAuditoria(
+        tipo=cambio.tipo, objeto_id=cambio.objeto_id, numero=numero, operacion=operacion,
+        cambios=cambios or {}, estado=estado, usuario_id=usuario_id,
+    )
+
+
+# ============================================
+# CONSULTA Y RECONSTRUCCIÓN
+# ============================================
+
+def historial(modelo_o_instancia, pk=None):
+    """Versiones de un registro, de la primera a la última"""
+    if pk is None:
+        pk = modelo_o_instancia.pk
+    return CambioAuditoria.objects.filter(
+        tipo=modelo_o_instancia._meta.label_lower, objeto_id=pk,
+    ).order_by('numero')
+
+
+def estado(modelo, pk, numero=None, fecha=None):
+    """
+    {attname: valor JSON} del registro en la versión `numero` (o la vigente
+    en `fecha`; la última si no se indica ninguna). None si no hay versión.
+    """
+    versiones = historial(modelo, pk)
+    if fecha is not None:
+        versiones = versiones.filter(fecha__lte=fecha)
+    if numero is not None:
+        versiones = versiones.filter(numero__lte=numero)
+    punto = versiones.filter(estado__isnull=False).order_by('-numero').values('numero', 'estado').first()
+    if punto is None:
+        return None
+    resultado = dict(punto['estado'])
+    for cambios in versiones.filter(numero__gt=punto['numero']).values_list('cambios', flat=True):
+        resultado.update(cambios)
+    return resultado
+
+
+def version(modelo, pk, numero=None, fecha=None):
+    """Instancia sin guardar de `modelo` como estaba en esa versión (ver estado)"""
+    valores = estado(modelo, pk, numero, fecha)
+    if valores is None:
+        return None
+    campos = {campo.attname: campo for campo in modelo.campos_auditados()}
+    instancia = modelo(pk=pk)
+    for nombre, valor in valores.items():
+        if nombre in campos:
+            setattr(instancia, nombre, campos[nombre].to_python(valor))
+    return instancia
@@ -0,0 +1,102 @@
+# core/backends/mysql_pool/base.py
+"""
+Backend MySQL (pymysql) con pool de conexiones por proceso
+
+    'default': {
+        'ENGINE': 'core.backends.mysql_pool',
+        ...
+        'CONN_MAX_AGE': 0,          # cada petición devuelve su conexión al pool
+        'POOL': {'MAXIMO': 10, 'MINIMO': 2, 'VIDA_MAXIMA': 1800,
+                 'VERIFICAR_TRAS': 30, 'ESPERA': 5},
+    }
+
+Las métricas del pool se ven con `python manage.py estadisticas_pool`.
+
+Igual al backend mysql de Django salvo que:
+- get_new_connection() toma una conexión del pool del alias (core.pool)
+  y solo las que nunca se prepararon pagan el SET de sesión de
+  init_connection_state();
+- al cerrar, la conexión vuelve al pool. Si se cierra dentro de una
+  transacción se descarta; si hubo errores se verifica antes de reusarla.
+"""
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from core.pool import PoolAgotado, pool_para
+
+OPCIONES_POOL = {
+    'MAXIMO': 'maximo',
+    'MINIMO': 'minimo',
+    'VIDA_MAXIMA': 'vida_maxima',
+    'VERIFICAR_TRAS': 'verificar_tras',
+    'ESPERA': 'espera',
+}
+
+
+def _conectar(parametros):
+    conexion = Database.connect(**parametros)
+    # Igual que el backend de Django (ver mysql.base.get_new_connection)
+    if conexion.encoders.get(bytes) is bytes:
+        conexion.encoders.pop(bytes)
+    return conexion
+
+
+def _responde(conexion):
+    conexion.ping(reconnect=False)
+    return True
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    _conexion_preparada = False
+    _pool = None
+
+    @property
+    def pool(self):
+        # Un pool por alias y base: las pruebas cambian NAME a test_<nombre>
+        nombre_pool = f"{self.alias}:{self.settings_dict['NAME']}"
+        if self._pool is None or self._pool.alias != nombre_pool:
+            opciones = {
+                nombre: self.settings_dict['POOL'][clave]
+                for clave, nombre in OPCIONES_POOL.items()
+                if clave in self.settings_dict.get('POOL', {})
+            }
+            parametros = self.get_connection_params()
+            self._pool = pool_para(nombre_pool, lambda: _conectar(parametros), _responde, **opciones)
+        return self._pool
+
+    def get_new_connection(self, conn_params):
+        try:
+            conexion, preparada = self.pool.obtener()
+        except PoolAgotado as e:
+            raise Database.OperationalError(str(e)) from e
+        self._conexion_preparada = preparada
+        return conexion
+
+    def init_connection_state(self):
+        # La sesión de una conexión reutilizada ya tiene SQL_AUTO_IS_NULL y
+        # el nivel de aislamiento aplicados
+        if not self._conexion_preparada:
+            super().init_connection_state()
+            self.pool.marcar_preparada(self.connection)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        conexion = self.connection
+        if self.in_atomic_block:
+            self.pool.devolver(conexion, reutilizable=False)
+            return
+        reutilizable = True
+        if not self.get_autocommit():
+            # Transacción manual sin atomic(): no puede pasar a otra petición
+            try:
+                conexion.rollback()
+                conexion.autocommit(self.settings_dict['AUTOCOMMIT'])
+            except Database.Error:
+                reutilizable = False
+        self.pool.devolver(conexion, reutilizable=reutilizable, sospechosa=self.errors_occurred)
+
+    def llenar_pool(self):
+        """Deja en el pool las conexiones mínimas (MINIMO) listas para usar"""
+        self.close()
+        return self.pool.llenar()
@@ -0,0 +1,252 @@
+# core/cache.py
+"""
+Caché compartida en dos niveles con invalidación por modelo
+
+- L1: caché local del proceso ('default', en memoria). Sin red ni disco.
+- L2: caché compartida por todos los workers del servidor ('compartida').
+
+Cada valor se guarda bajo un espacio de nombres formado por la versión de
+los modelos de los que depende. Guardar o eliminar cualquier registro de
+esos modelos cambia su versión (ver `vigilar_modelo`) y las claves antiguas
+dejan de leerse; no hay que recorrer ni borrar claves. Las versiones se leen
+siempre de L2, por eso un valor en L1 nunca es más antiguo que la última
+invalidación vista por cualquier proceso.
+
+    from core import cache
+
+    patologias = cache.queryset_cacheado(
+        'catalogo:patologias_activas',
+        Patologias.objects.filter(estado='Activo').order_by('nombre'),
+    )
+
+    totales = cache.cacheado('medico:totales', [Patologias], calcular_totales)
+
+Para el contenido de páginas de detalle por registro ver core.fragmentos,
+que usa la misma L2 y registra sus aciertos en las mismas estadísticas.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from core.contadores import Contadores
+from core.establecimientos import establecimiento_actual
+
+ALIAS_L1 = 'default'
+ALIAS_L2 = 'compartida'
+
+# Segundos que un valor vive en L1 (la validez la deciden las versiones;
+# esto solo acota la memoria de cada proceso)
+TIMEOUT_L1 = 60
+
+# Más largas se resumen con un hash (Memcached acepta hasta 250 caracteres,
+# incluido el prefijo de versión de Django)
+LARGO_MAXIMO_CLAVE = 200
+
+# Cada cuántas lecturas se suman los contadores del proceso a L2
+LOTE_ESTADISTICAS = 100
+
+HIT_L1 = 'hit_l1'
+HIT_L2 = 'hit_l2'
+MISS = 'miss'
+EVENTOS = (HIT_L1, HIT_L2, MISS)
+
+_AUSENTE = object()
+_vigilados = set()
+
+_contadores = Contadores('cache:stats', EVENTOS, LOTE_ESTADISTICAS)
+
+
+def cache_local():
+    return caches[getattr(settings, 'CACHE_L1', ALIAS_L1)]
+
+
+def cache_compartida():
+    return caches[getattr(settings, 'CACHE_L2', ALIAS_L2)]
+
+
+def _etiqueta(modelo):
+    return modelo._meta.label_lower
+
+
+def clave_espacio(modelo):
+    return f'cache:ns:{_etiqueta(modelo)}'
+
+
+# ============================================
+# ESPACIOS DE NOMBRES POR MODELO
+# ============================================
+
+def versiones_modelos(modelos):
+    """Versión vigente de cada modelo (creándola si no existe), en una lectura"""
+    cache = cache_compartida()
+    claves = [clave_espacio(modelo) for modelo in modelos]
+    actuales = cache.get_many(claves)
+    for clave in claves:
+        if clave not in actuales:
+            cache.add(clave, time.time_ns(), None)
+            actuales[clave] = cache.get(clave)
+    return [actuales[clave] for clave in claves]
+
+
+def invalidar_modelo(modelo):
+    """Cambia la versión de `modelo`: todo lo cacheado con él queda obsoleto"""
+    cache_compartida().set(clave_espacio(modelo), time.time_ns(), None)
+
+
+def clave(nombre, modelos, **parametros):
+    """
+    Clave de `nombre` para las versiones actuales de `modelos` y los
+    parámetros dados. Con un establecimiento activo (core.establecimientos)
+    cada uno tiene su propia entrada.
+    """
+    codigo = establecimiento_actual()
+    if codigo is not None:
+        parametros = {**parametros, 'establecimiento': codigo}
+    partes = [nombre]
+    partes += [f'{_etiqueta(m)}.{v}' for m, v in zip(modelos, versiones_modelos(modelos))]
+    if parametros:
+        texto = repr(sorted(parametros.items()))
+        partes.append(hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16])
+    resultado = 'cache:' + ':'.join(partes)
+    if len(resultado) > LARGO_MAXIMO_CLAVE:
+        resumen = hashlib.sha1(':'.join(partes[1:]).encode('utf-8')).hexdigest()
+        resultado = f'cache:{nombre}:{resumen}'
+    return resultado
+
+
+# ============================================
+# LECTURA Y ESCRITURA EN DOS NIVELES
+# ============================================
+
+def obtener(clave_valor, nombre=''):
+    """Valor de `clave_valor` o None si no está en ningún nivel"""
+    valor = cache_local().get(clave_valor, _AUSENTE)
+    if valor is not _AUSENTE:
+        _registrar(nombre, HIT_L1)
+        return valor
+
+    valor = cache_compartida().get(clave_valor, _AUSENTE)
+    if valor is not _AUSENTE:
+        cache_local().set(clave_valor, valor, TIMEOUT_L1)
+        _registrar(nombre, HIT_L2)
+        return valor
+
+    _registrar(nombre, MISS)
+    return None
+
+
+def guardar(clave_valor, valor, timeout=None):
+    """Guarda en L2 (con el timeout de la caché si es None) y en L1"""
+    if timeout is None:
+        cache_compartida().set(clave_valor, valor)
+    else:
+        cache_compartida().set(clave_valor, valor, timeout)
+    cache_local().set(clave_valor, valor, min(timeout or TIMEOUT_L1, TIMEOUT_L1))
+
+
+def cacheado(nombre, modelos, construir, timeout=None, **parametros):
+    """
+    Retorna `construir()` cacheado bajo `nombre` mientras ningún registro
+    de `modelos` cambie. `parametros` distingue variantes (filtros, página).
+    El resultado debe ser serializable con pickle y no puede ser None.
+    """
+    clave_valor = clave(nombre, modelos, **parametros)
+    valor = obtener(clave_valor, nombre)
+    if valor is None:
+        valor = construir()
+        guardar(clave_valor, valor, timeout)
+    return valor
+
+
+def queryset_cacheado(nombre, queryset, modelos=None, timeout=None):
+    """
+    Lista de resultados de `queryset`. Depende de su modelo y de `modelos`
+    (agregar los modelos de select_related o de los filtros por relación).
+    """
+    modelos = [queryset.model, *(modelos or ())]
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:  # filtros como pk__in=[]: no hay nada que cachear
+        return []
+    return cacheado(nombre, modelos, lambda: list(queryset), timeout, sql=sql, bd=queryset.db)
+
+
+def fragmento_cacheado(nombre, modelos, renderizar, timeout=None, **parametros):
+    """HTML de `renderizar()` (ej. render_to_string de un parcial) cacheado como `cacheado`"""
+    return cacheado(nombre, modelos, renderizar, timeout, **parametros)
+
+
+# ============================================
+# INVALIDACIÓN POR SEÑALES
+# ============================================
+
+def vigilar_modelo(*modelos):
+    """Invalida el espacio de cada modelo al guardar, eliminar o cambiar sus ManyToMany"""
+    for modelo in modelos:
+        if modelo in _vigilados:
+            continue
+        _vigilados.add(modelo)
+        uid = f'cache_ns_{_etiqueta(modelo)}'
+        post_save.connect(_modelo_modificado, sender=modelo, dispatch_uid=uid)
+        post_delete.connect(_modelo_modificado, sender=modelo, dispatch_uid=uid)
+        for campo in modelo._meta.local_many_to_many:
+            m2m_changed.connect(
+                _relacion_modificada, sender=campo.remote_field.through,
+                dispatch_uid=f'{uid}_{campo.name}',
+            )
+
+
+def _invalidar_despues_del_commit(modelo):
+    # Igual que en core.fragmentos: ahora y tras el commit, para que una
+    # lectura concurrente con datos previos al commit no quede vigente
+    invalidar_modelo(modelo)
+    transaction.on_commit(lambda: invalidar_modelo(modelo))
+
+
+def _modelo_modificado(sender, raw=False, **kwargs):
+    if not raw:
+        _invalidar_despues_del_commit(sender)
+
+
+def _relacion_modificada(sender, instance, action, reverse=False, model=None, **kwargs):
+    if action.startswith('post_'):
+        _invalidar_despues_del_commit(model if reverse else type(instance))
+
+
+# ============================================
+# ESTADÍSTICAS
+# ============================================
+
+def _registrar(nombre, evento):
+    """Cuenta un acierto/fallo (se publica en L2 por lotes, ver core.contadores)"""
+    if nombre:
+        _contadores.sumar(nombre, **{evento: 1})
+
+
+def publicar_estadisticas():
+    """Suma a L2 los contadores pendientes de este proceso"""
+    _contadores.publicar()
+
+
+def estadisticas(compartidas=True):
+    """
+    {nombre: {'hit_l1', 'hit_l2', 'miss', 'total', 'tasa_acierto'}}
+
+    Con compartidas=True son los totales de todos los procesos (publicados
+    en L2); con False, solo los de este proceso.
+    """
+    resultado = _contadores.totales(compartidas)
+    for fila in resultado.values():
+        fila['total'] = sum(fila[evento] for evento in EVENTOS)
+        aciertos = fila[HIT_L1] + fila[HIT_L2]
+        fila['tasa_acierto'] = round(aciertos / fila['total'], 3) if fila['total'] else 0.0
+    return resultado
+
+
+def reiniciar_estadisticas():
+    _contadores.reiniciar()
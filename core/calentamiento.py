@@ -0,0 +1,260 @@
+# core/calentamiento.py
+"""
+Calentamiento de un worker antes de recibir tráfico
+
+La primera petición tras un despliegue o un reciclaje de worker paga la
+importación de vistas y formularios, la compilación de los templates, la
+conexión a MySQL y el armado de los catálogos. `calentar()` hace ese
+trabajo por adelantado, por fases:
+
+    urls         importa el URLconf (y con él todas las vistas)
+    modulos      importa views/forms de cada app y construye cada formulario
+    templates    compila todos los templates en el loader con caché
+    bd           abre las conexiones (y llena el pool hasta POOL['MINIMO'])
+    catalogos    arma las instantáneas de opciones de los formularios (core.opciones)
+
+Se usa desde el comando `warmup` (reporte por fase) y desde wsgi.py/asgi.py
+cuando WARMUP_AL_INICIAR es verdadero. Bajo ASGI (uvicorn importa la
+aplicación dentro del event loop) las fases corren en un hilo aparte,
+porque el ORM no se puede usar desde el hilo del loop. Ninguna fase es obligatoria: un error
+se informa en el reporte y el worker arranca igual.
+"""
+import asyncio
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as LoaderCacheado
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES_TEMPLATE = ('.html', '.txt')
+
+
+class ResultadoFase:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.segundos = 0.0
+        self.cantidad = 0
+        self.errores = []
+
+    @property
+    def ok(self):
+        return not self.errores
+
+
+# ============================================
+# FASES
+# ============================================
+
+def _apps_locales():
+    """AppConfigs del proyecto (las que viven dentro de BASE_DIR)"""
+    base = Path(settings.BASE_DIR).resolve()
+    return [
+        config for config in apps.get_app_configs()
+        if base in Path(config.path).resolve().parents and 'site-packages' not in Path(config.path).parts
+    ]
+
+
+def fase_urls(resultado):
+    def contar(patrones):
+        return sum(contar(p.url_patterns) if hasattr(p, 'url_patterns') else 1 for p in patrones)
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # fuerza _populate(): importa todos los módulos de vistas
+    resultado.cantidad = contar(resolver.url_patterns)
+
+
+def _modulo_si_existe(nombre):
+    """Importa `nombre` si existe (None si la app no tiene ese módulo)"""
+    if importlib.util.find_spec(nombre) is None:
+        return None
+    return importlib.import_module(nombre)
+
+
+def _subclases(clase):
+    for subclase in clase.__subclasses__():
+        yield subclase
+        yield from _subclases(subclase)
+
+
+def formularios_del_proyecto():
+    """
+    Clases de formulario del proyecto ya importadas (por el URLconf, las
+    vistas o los paquetes forms). Solo se importa lo que importa la
+    aplicación, no cada archivo de los directorios forms.
+    """
+    locales = tuple(f'{config.name}.' for config in _apps_locales())
+    clases = []
+    for clase in _subclases(forms.BaseForm):
+        if clase.__module__.startswith(locales) and clase not in clases:
+            clases.append(clase)
+    return clases
+
+
+def fase_modulos(resultado):
+    for config in _apps_locales():
+        for sufijo in ('views', 'forms'):
+            nombre = f'{config.name}.{sufijo}'
+            try:
+                if _modulo_si_existe(nombre) is not None:
+                    resultado.cantidad += 1
+            except Exception as e:
+                resultado.errores.append(f'{nombre}: {e}')
+
+    # Construir una instancia de cada formulario copia sus campos y widgets
+    # (lo mismo que hace la primera petición que lo usa)
+    for clase in formularios_del_proyecto():
+        try:
+            clase()
+        except Exception:
+            pass  # formularios que exigen argumentos propios: basta con la clase
+
+
+def _nombres_templates(directorio):
+    directorio = Path(directorio)
+    if not directorio.is_dir():
+        return
+    for ruta in sorted(directorio.rglob('*')):
+        if ruta.is_file() and ruta.suffix in EXTENSIONES_TEMPLATE:
+            yield ruta.relative_to(directorio).as_posix()
+
+
+def fase_templates(resultado):
+    for motor in engines.all():
+        if not isinstance(motor, DjangoTemplates):
+            continue
+        loaders = motor.engine.template_loaders
+        if not any(isinstance(loader, LoaderCacheado) for loader in loaders):
+            resultado.errores.append(f'{motor.name}: sin loader con caché, solo se validan')
+
+        # Templates del proyecto: los de terceros se compilan al usarse
+        directorios = list(motor.engine.dirs)
+        if motor.engine.app_dirs:
+            directorios += [Path(config.path) / 'templates' for config in _apps_locales()]
+        vistos = set()
+        for directorio in directorios:
+            for nombre in _nombres_templates(directorio):
+                if nombre in vistos:
+                    continue  # el primero encontrado es el que usa el loader
+                vistos.add(nombre)
+                try:
+                    motor.get_template(nombre)
+                    resultado.cantidad += 1
+                except Exception as e:
+                    resultado.errores.append(f'{nombre}: {e}')
+
+
+def fase_bd(resultado):
+    for alias in connections:
+        try:
+            conexion = connections[alias]
+            conexion.ensure_connection()
+            resultado.cantidad += 1
+            if hasattr(conexion, 'llenar_pool'):  # core.backends.mysql_pool
+                conexion.llenar_pool()
+        except Exception as e:
+            resultado.errores.append(f'{alias}: {e}')
+
+
+def fase_catalogos(resultado):
+    from core.opciones import _OpcionesCacheadasMixin, instantanea
+
+    vistos = set()
+    for clase in formularios_del_proyecto():
+        for campo in clase.base_fields.values():
+            if isinstance(campo, _OpcionesCacheadasMixin):
+                _armar_catalogo(campo, vistos, resultado, instantanea)
+        try:
+            formulario = clase()
+        except Exception:
+            continue
+        # Campos que los formularios reemplazan en __init__ (usar_opciones_cacheadas)
+        for campo in formulario.fields.values():
+            if isinstance(campo, _OpcionesCacheadasMixin):
+                _armar_catalogo(campo, vistos, resultado, instantanea)
+
+
+def _armar_catalogo(campo, vistos, resultado, instantanea):
+    clave = (campo.queryset.model, str(campo.queryset.query))
+    if clave in vistos:
+        return
+    vistos.add(clave)
+    try:
+        instantanea(campo)
+        resultado.cantidad += 1
+    except Exception as e:
+        resultado.errores.append(f'{campo.queryset.model._meta.label}: {e}')
+
+
+FASES = {
+    'urls': fase_urls,
+    'modulos': fase_modulos,
+    'templates': fase_templates,
+    'bd': fase_bd,
+    'catalogos': fase_catalogos,
+}
+
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def calentar(fases=None):
+    """Ejecuta las fases indicadas (todas por defecto) y retorna sus ResultadoFase"""
+    resultados = []
+    for nombre in fases or FASES:
+        resultado = ResultadoFase(nombre)
+        inicio = time.perf_counter()
+        try:
+            FASES[nombre](resultado)
+        except Exception as e:
+            logger.exception('Calentamiento: falló la fase %s', nombre)
+            resultado.errores.append(str(e))
+        resultado.segundos = time.perf_counter() - inicio
+        resultados.append(resultado)
+    return resultados
+
+
+def calentar_al_iniciar():
+    """Hook de wsgi.py/asgi.py: calienta el worker si WARMUP_AL_INICIAR está activo"""
+    if not getattr(settings, 'WARMUP_AL_INICIAR', False):
+        return []
+    fases = getattr(settings, 'WARMUP_FASES', None)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        resultados = calentar(fases)
+    else:
+        resultados = _calentar_en_hilo(fases)
+    for resultado in resultados:
+        logger.info('Calentamiento %s: %d en %.3fs%s', resultado.nombre, resultado.cantidad,
+                    resultado.segundos, f' ({len(resultado.errores)} errores)' if resultado.errores else '')
+    return resultados
+
+
+def _calentar_en_hilo(fases):
+    """calentar() fuera del hilo del event loop; espera a que termine"""
+    resultados = []
+
+    def ejecutar():
+        try:
+            resultados.extend(calentar(fases))
+        finally:
+            # Las conexiones de este hilo no las usará nadie (el pool conserva las suyas)
+            connections.close_all()
+
+    hilo = threading.Thread(target=ejecutar, name='calentamiento')
+    hilo.start()
+    hilo.join()
+    return resultados
@@ -0,0 +1,64 @@
+# core/concurrencia.py
+"""
+Utilidades para vistas async que consultan 'default' y 'legacy' a la vez
+
+Las consultas ORM async de Django (aget, afirst, ...) se ejecutan en un
+único hilo compartido por la petición, por lo que dos de ellas nunca corren
+en paralelo. Las consultas a la BD legacy se envían a un hilo propio
+(thread_sensitive=False) para que se solapen con las de la BD principal, y
+se cortan con un timeout para que una BD histórica lenta no bloquee la página.
+"""
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ALIAS_LEGACY = 'legacy'
+
+
+def timeout_legacy():
+    return getattr(settings, 'LEGACY_TIMEOUT_SEGUNDOS', 2.0)
+
+
+def _en_hilo_legacy(funcion):
+    """Ejecuta `funcion` y cierra la conexión legacy del hilo al terminar"""
+    def envoltura(*args, **kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            connections[ALIAS_LEGACY].close()
+    return envoltura
+
+
+async def consultar_legacy(funcion, *args, por_defecto=None, timeout=None, **kwargs):
+    """
+    Ejecuta una consulta (síncrona) contra la BD legacy en un hilo aparte.
+
+    Retorna (resultado, ok). Si la consulta falla o supera el timeout se
+    retorna (por_defecto, False) y se registra en el log; la página debe
+    mostrarse igual, solo sin el panel histórico.
+    """
+    timeout = timeout_legacy() if timeout is None else timeout
+    tarea = sync_to_async(_en_hilo_legacy(funcion), thread_sensitive=False)
+    try:
+        return await asyncio.wait_for(tarea(*args, **kwargs), timeout=timeout), True
+    except asyncio.TimeoutError:
+        logger.warning("Consulta LEGACY superó %.1fs; se omite", timeout)
+    except Exception as e:
+        logger.exception("Fallo consultando LEGACY: %s", e)
+    return por_defecto, False
+
+
+async def en_paralelo(**tareas):
+    """
+    Espera varias corrutinas a la vez y retorna un dict con sus resultados:
+
+        datos = await en_paralelo(paciente=..., controles=...)
+    """
+    nombres = list(tareas)
+    resultados = await asyncio.gather(*tareas.values())
+    return dict(zip(nombres, resultados))
@@ -0,0 +1,105 @@
+# core/contadores.py
+"""
+Contadores por nombre publicados por lotes en la caché compartida
+
+Cada proceso suma en memoria y, cada `lote` llamadas a sumar(), acumula
+en L2 con incr(); así los totales cubren a todos los workers sin escribir
+en la caché compartida en cada petición. Los usan las estadísticas de
+core.cache y las de core.middleware.compresion.
+
+    contadores = Contadores('cache:stats', ('hit_l1', 'hit_l2', 'miss'))
+    contadores.sumar('catalogo:patologias', hit_l1=1)
+    contadores.totales()    # {'catalogo:patologias': {'hit_l1': 1, 'hit_l2': 0, 'miss': 0}}
+
+Los valores deben ser enteros (incr no acepta decimales).
+"""
+import threading
+from collections import Counter
+
+
+def _cache_compartida():
+    from core.cache import cache_compartida
+    return cache_compartida()
+
+
+class Contadores:
+    def __init__(self, prefijo, campos, lote=100):
+        self.prefijo = prefijo
+        self.campos = tuple(campos)
+        self.lote = lote
+        self._locales = Counter()
+        self._pendientes = Counter()
+        self._operaciones = 0
+        self._bloqueo = threading.Lock()
+
+    def _clave(self, nombre, campo):
+        return f'{self.prefijo}:{nombre}:{campo}'
+
+    @property
+    def _clave_nombres(self):
+        return f'{self.prefijo}:nombres'
+
+    def sumar(self, nombre, **incrementos):
+        """Suma `incrementos` ({campo: entero}) a los contadores de `nombre`"""
+        with self._bloqueo:
+            for campo, cantidad in incrementos.items():
+                self._locales[(nombre, campo)] += cantidad
+                self._pendientes[(nombre, campo)] += cantidad
+            self._operaciones += 1
+            if self._operaciones < self.lote:
+                return
+            pendientes = dict(self._pendientes)
+            self._pendientes.clear()
+            self._operaciones = 0
+        self._publicar(pendientes)
+
+    def _publicar(self, pendientes):
+        cache = _cache_compartida()
+        for (nombre, campo), cantidad in pendientes.items():
+            clave = self._clave(nombre, campo)
+            cache.add(clave, 0, None)
+            try:
+                cache.incr(clave, cantidad)
+            except ValueError:  # expulsada entre add e incr
+                cache.set(clave, cantidad, None)
+        nombres = set(cache.get(self._clave_nombres) or ()) | {nombre for nombre, _ in pendientes}
+        cache.set(self._clave_nombres, sorted(nombres), None)
+
+    def publicar(self):
+        """Suma a L2 los contadores pendientes de este proceso"""
+        with self._bloqueo:
+            pendientes = dict(self._pendientes)
+            self._pendientes.clear()
+            self._operaciones = 0
+        if pendientes:
+            self._publicar(pendientes)
+
+    def totales(self, compartidos=True):
+        """
+        {nombre: {campo: total}}. Con compartidos=True, los de todos los
+        procesos (publicados en L2); con False, solo los de este proceso.
+        """
+        if compartidos:
+            self.publicar()
+            cache = _cache_compartida()
+            nombres = cache.get(self._clave_nombres) or ()
+            claves = {(n, c): self._clave(n, c) for n in nombres for c in self.campos}
+            guardados = cache.get_many(list(claves.values()))
+            valores = {par: guardados.get(clave, 0) for par, clave in claves.items()}
+        else:
+            with self._bloqueo:
+                valores = dict(self._locales)
+
+        resultado = {}
+        for (nombre, campo), cantidad in valores.items():
+            resultado.setdefault(nombre, dict.fromkeys(self.campos, 0))[campo] = cantidad
+        return resultado
+
+    def reiniciar(self):
+        with self._bloqueo:
+            self._locales.clear()
+            self._pendientes.clear()
+            self._operaciones = 0
+        cache = _cache_compartida()
+        nombres = cache.get(self._clave_nombres) or ()
+        cache.delete_many([self._clave(n, c) for n in nombres for c in self.campos] + [self._clave_nombres])
@@ -0,0 +1,139 @@
+# core/establecimientos.py
+"""
+Datos clínicos particionados por establecimiento (maternidad)
+
+Un mismo despliegue atiende a varias maternidades. Los modelos clínicos
+heredan de ConEstablecimiento: tienen la columna `establecimiento` (código
+de gestionApp.Establecimiento) y su manager `objects` filtra por el
+establecimiento activo:
+
+    with en_establecimiento('HCHM'):
+        FichaObstetrica.objects.filter(activa=True)   # ... WHERE establecimiento_id = 'HCHM' AND ...
+
+En las peticiones, core.middleware.establecimiento activa el del usuario
+que inició sesión; las respuestas en streaming lo retoman con
+iterar_en_establecimiento() y las tareas encoladas lo reciben como
+argumento. Sin establecimiento activo (comandos, tareas, usuarios
+sin asignación en un despliegue de una sola maternidad) no se filtra.
+`Modelo.todos` nunca filtra: para reportes entre establecimientos y para
+lo que es global a la tabla (numeración correlativa, validación de únicos).
+
+Al guardar (save o bulk_create) un registro sin establecimiento se le
+asigna el activo o, si no hay, el de su registro padre
+(`campo_padre_establecimiento`, ej. el medicamento toma el de su ficha).
+
+Los índices de estos modelos empiezan por establecimiento, así cada
+maternidad recorre solo su parte de la tabla.
+"""
+import contextvars
+
+from django.db import models
+
+_actual = contextvars.ContextVar('establecimiento', default=None)
+
+
+def establecimiento_actual():
+    """Código del establecimiento activo, o None (sin filtro)"""
+    return _actual.get()
+
+
+class en_establecimiento:
+    """Activa `codigo` (None: sin filtro) mientras dura el bloque"""
+
+    def __init__(self, codigo):
+        self.codigo = codigo
+
+    def __enter__(self):
+        self._token = _actual.set(self.codigo)
+        return self
+
+    def __exit__(self, *exc):
+        _actual.reset(self._token)
+
+
+def iterar_en_establecimiento(codigo, iterable):
+    """
+    Recorre `iterable` con `codigo` activo en cada paso. Para generadores
+    perezosos que se consumen fuera del bloque del middleware (el servidor
+    recorre un StreamingHttpResponse después de que la vista retornó).
+    """
+    iterador = iter(iterable)
+    while True:
+        with en_establecimiento(codigo):
+            try:
+                valor = next(iterador)
+            except StopIteration:
+                return
+        yield valor
+
+
+class PorEstablecimientoQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.asignar_establecimiento()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def del_establecimiento(self, codigo):
+        return self.filter(establecimiento_id=codigo)
+
+
+class PorEstablecimientoManager(models.Manager.from_queryset(PorEstablecimientoQuerySet)):
+    """Filtra por el establecimiento activo (si lo hay)"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        codigo = establecimiento_actual()
+        if codigo is None:
+            return queryset
+        return queryset.filter(establecimiento_id=codigo)
+
+
+class TodosManager(models.Manager.from_queryset(PorEstablecimientoQuerySet)):
+    """Sin filtro por establecimiento"""
+
+
+class ConEstablecimiento(models.Model):
+    establecimiento = models.ForeignKey(
+        'gestionApp.Establecimiento',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        # Lo cubren los índices compuestos de cada modelo (empiezan por esta columna)
+        db_index=False,
+        verbose_name='Establecimiento',
+    )
+
+    objects = PorEstablecimientoManager()
+    todos = TodosManager()
+
+    # Relación desde la que se hereda el establecimiento fuera de una petición
+    campo_padre_establecimiento = None
+
+    class Meta:
+        abstract = True
+
+    def asignar_establecimiento(self):
+        if self.establecimiento_id is not None:
+            return
+        codigo = establecimiento_actual()
+        if codigo is None and self.campo_padre_establecimiento:
+            padre = getattr(self, self.campo_padre_establecimiento, None)
+            codigo = getattr(padre, 'establecimiento_id', None)
+        self.establecimiento_id = codigo
+
+    def save(self, *args, **kwargs):
+        self.asignar_establecimiento()
+        super().save(*args, **kwargs)
+
+    # Las restricciones únicas son de toda la tabla: validarlas (ModelForm,
+    # full_clean) contra `objects` no vería los registros de otra maternidad
+    def validate_unique(self, exclude=None):
+        with en_establecimiento(None):
+            super().validate_unique(exclude)
+
+    def validate_constraints(self, exclude=None):
+        with en_establecimiento(None):
+            super().validate_constraints(exclude)
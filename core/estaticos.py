@@ -0,0 +1,199 @@
+# core/estaticos.py
+"""
+Archivos estáticos con huella de contenido y precomprimidos
+
+`collectstatic` con EstaticosComprimidosStorage deja en STATIC_ROOT:
+
+    css/dashboard.css                    original (para referencias sin huella)
+    css/dashboard.3f9a1c2b7d4e.css       copia con huella (la que usan los templates)
+    css/dashboard.3f9a1c2b7d4e.css.br    brotli, solo si es más chico
+    css/dashboard.3f9a1c2b7d4e.css.gz    gzip, solo si es más chico
+
+Como el nombre cambia cuando cambia el contenido, los archivos con huella
+se sirven con caché "immutable" de un año (core.middleware.estaticos); el
+navegador no los vuelve a pedir ni a revalidar.
+
+Antes del primer collectstatic (desarrollo, pruebas) no hay manifiesto y
+{% static %} retorna el nombre sin huella en vez de fallar.
+
+El comando `construir_estaticos` ejecuta collectstatic y reporta los bytes
+ahorrados por página (ver `reporte_por_pagina`).
+"""
+import gzip
+import os
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+
+try:
+    import brotli
+except ImportError:  # sin brotli se generan solo las variantes gzip
+    brotli = None
+
+EXTENSIONES_COMPRIMIBLES = {'.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot'}
+
+# Bajo este tamaño el encabezado de la compresión no compensa
+TAMANO_MINIMO = 256
+
+VARIANTES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def comprimir_brotli(datos):
+    return brotli.compress(datos, quality=11)
+
+
+def comprimir_gzip(datos):
+    # mtime=0: el mismo contenido produce siempre los mismos bytes
+    return gzip.compress(datos, compresslevel=9, mtime=0)
+
+
+def escribir_variantes(ruta):
+    """
+    Escribe <ruta>.br y <ruta>.gz si comprimen algo. Retorna
+    {'original': bytes, 'br': bytes | None, 'gzip': bytes | None}.
+    """
+    ruta = Path(ruta)
+    datos = ruta.read_bytes()
+    tamanos = {'original': len(datos), 'br': None, 'gzip': None}
+    if ruta.suffix.lower() not in EXTENSIONES_COMPRIMIBLES or len(datos) < TAMANO_MINIMO:
+        return tamanos
+
+    compresores = {'gzip': comprimir_gzip}
+    if brotli is not None:
+        compresores['br'] = comprimir_brotli
+    for codificacion, extension in VARIANTES:
+        if codificacion not in compresores:
+            continue
+        comprimido = compresores[codificacion](datos)
+        destino = ruta.with_name(ruta.name + extension)
+        if len(comprimido) < len(datos):
+            temporal = destino.with_name(destino.name + '.tmp')
+            temporal.write_bytes(comprimido)
+            os.replace(temporal, destino)
+            tamanos[codificacion] = len(comprimido)
+        elif destino.exists():
+            destino.unlink()
+    return tamanos
+
+
+class EstaticosComprimidosStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que además deja variantes .br y .gz de cada archivo con huella"""
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Al terminar, hashed_files tiene los nombres finales (las pasadas
+        # intermedias de los CSS generan nombres que ya no se usan). Solo se
+        # comprimen los nombres con huella: son los que usan los templates.
+        for nombre in set(self.hashed_files.values()):
+            if self.exists(nombre):
+                escribir_variantes(self.path(nombre))
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            # Las librerías minificadas apuntan a mapas de fuentes que no se publican
+            if urlsplit(unquote(name)).path.strip().endswith('.map'):
+                return name
+            raise
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name  # aún no se ejecuta collectstatic
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Archivo inexistente: la URL sin huella da 404 en vez de un error 500
+            return name
+
+
+# ============================================
+# CONSULTAS SOBRE STATIC_ROOT
+# ============================================
+
+def nombres_con_huella():
+    """Nombres con huella del manifiesto (vacío si no hay collectstatic)"""
+    return set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def tamanos(nombre):
+    """Tamaños de un archivo de STATIC_ROOT y de sus variantes comprimidas"""
+    ruta = Path(settings.STATIC_ROOT) / nombre
+    resultado = {'original': ruta.stat().st_size if ruta.exists() else 0}
+    for codificacion, extension in VARIANTES:
+        variante = ruta.with_name(ruta.name + extension)
+        resultado[codificacion] = variante.stat().st_size if variante.exists() else None
+    return resultado
+
+
+# ============================================
+# REPORTE POR PÁGINA
+# ============================================
+
+RE_STATIC = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]""")
+RE_HEREDA = re.compile(r"""{%\s*(?:extends|include)\s+['"]([^'"]+)['"]""")
+
+
+def _directorios_templates():
+    from core.calentamiento import _apps_locales
+
+    directorios = [Path(d) for motor in settings.TEMPLATES for d in motor.get('DIRS', [])]
+    directorios += [Path(config.path) / 'templates' for config in _apps_locales()]
+    return [d for d in directorios if d.is_dir()]
+
+
+def _leer_templates():
+    """{nombre: contenido} de los templates del proyecto (el primero encontrado gana)"""
+    templates = {}
+    for directorio in _directorios_templates():
+        for ruta in sorted(directorio.rglob('*.html')):
+            nombre = ruta.relative_to(directorio).as_posix()
+            templates.setdefault(nombre, ruta.read_text(encoding='utf-8', errors='replace'))
+    return templates
+
+
+def _estaticos_de(nombre, templates, visitados=None):
+    """Estáticos referenciados por un template y por los que extiende o incluye"""
+    visitados = visitados if visitados is not None else set()
+    if nombre in visitados or nombre not in templates:
+        return set()
+    visitados.add(nombre)
+    contenido = templates[nombre]
+    estaticos = set(RE_STATIC.findall(contenido))
+    for padre in RE_HEREDA.findall(contenido):
+        estaticos |= _estaticos_de(padre, templates, visitados)
+    return estaticos
+
+
+def reporte_por_pagina():
+    """
+    [(template, archivos, bytes_original, bytes_br, bytes_gzip, faltantes)]
+    de las páginas que usan estáticos locales, con el peso que descarga un
+    navegador sin caché. Usa las variantes de STATIC_ROOT; si no hay .br se
+    cuenta la mejor disponible. `faltantes` son referencias a archivos que
+    no existen en STATIC_ROOT.
+    """
+    templates = _leer_templates()
+    filas = []
+    for nombre in sorted(templates):
+        estaticos = sorted(_estaticos_de(nombre, templates))
+        if not estaticos:
+            continue
+        original = br = gz = 0
+        faltantes = []
+        for estatico in estaticos:
+            medidas = tamanos(staticfiles_storage.stored_name(estatico))
+            if not medidas['original']:
+                faltantes.append(estatico)
+            original += medidas['original']
+            gz += medidas['gzip'] or medidas['original']
+            br += medidas['br'] or medidas['gzip'] or medidas['original']
+        filas.append((nombre, estaticos, original, br, gz, faltantes))
+    return filas
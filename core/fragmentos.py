@@ -0,0 +1,153 @@
+# core/fragmentos.py
+"""
+Caché versionada de fragmentos de páginas de detalle
+
+Una vista de detalle arma su contenido una vez y lo guarda junto con las
+versiones de los registros de los que depende:
+
+    contexto = fragmento_cacheado(
+        'matrona:detalle_ficha', FichaObstetrica, pk,
+        lambda: construir_contexto(pk),   # -> (contexto, dependencias)
+    )
+
+Cada dependencia es (modelo, pk). Guardar o eliminar un registro cambia su
+versión (ver `invalidar` y las señales conectadas con `vigilar`), y las
+entradas que dependían de la versión anterior dejan de usarse: no hay que
+saber qué páginas mostrar de nuevo, solo qué registro cambió.
+
+Una vista con la entrada vigente no consulta la BD ni renderiza el
+template del contenido: son dos lecturas de caché (entrada + versiones).
+Usa la caché compartida de core.cache y registra sus aciertos en las mismas
+estadísticas (`core.cache.estadisticas()`).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from core.cache import ALIAS_L2, HIT_L2, MISS, _registrar
+from core.establecimientos import establecimiento_actual
+
+_vigilados = {}
+
+
+def cache_fragmentos():
+    return caches[getattr(settings, 'FRAGMENTOS_CACHE', getattr(settings, 'CACHE_L2', ALIAS_L2))]
+
+
+def _etiqueta(modelo):
+    return modelo._meta.label_lower
+
+
+def clave_version(modelo, pk):
+    return f'fragmento:v:{_etiqueta(modelo)}:{pk}'
+
+
+# ============================================
+# VERSIONES
+# ============================================
+
+def versiones(claves):
+    """Versión actual de cada clave (creándola si no existe)"""
+    cache = cache_fragmentos()
+    actuales = cache.get_many(claves)
+    for clave in claves:
+        if clave not in actuales:
+            cache.add(clave, time.time_ns(), None)
+            actuales[clave] = cache.get(clave)
+    return actuales
+
+
+def invalidar(modelo, pk):
+    """Cambia la versión de un registro: sus fragmentos quedan obsoletos"""
+    cache_fragmentos().set(clave_version(modelo, pk), time.time_ns(), None)
+
+
+# ============================================
+# FRAGMENTOS
+# ============================================
+
+def fragmento_cacheado(nombre, modelo, pk, construir):
+    """
+    Retorna el contexto cacheado de `nombre` para el registro (modelo, pk).
+
+    `construir()` se llama solo si no hay entrada o si alguna de sus
+    dependencias cambió; debe retornar (contexto, dependencias), con el
+    contenido ya renderizado dentro del contexto.
+    """
+    cache = cache_fragmentos()
+    # Por establecimiento: construir() consulta con el manager filtrado, así
+    # un registro de otra maternidad da 404 en vez de salir de la caché
+    codigo = establecimiento_actual()
+    clave = f'fragmento:{nombre}:{pk}' if codigo is None else f'fragmento:{nombre}:{codigo}:{pk}'
+
+    entrada = cache.get(clave)
+    if entrada is not None:
+        guardadas = entrada['versiones']
+        if cache.get_many(list(guardadas)) == guardadas:
+            _registrar(nombre, HIT_L2)
+            return entrada['contexto']
+    _registrar(nombre, MISS)
+
+    # Las versiones conocidas se leen ANTES de consultar: si un guardado se
+    # confirma mientras se construye, la entrada nace ya obsoleta
+    conocidas = {clave_version(modelo, pk)}
+    if entrada is not None:
+        conocidas.update(entrada['versiones'])
+    vigentes = versiones(list(conocidas))
+
+    contexto, dependencias = construir()
+    nuevas = [c for c in (clave_version(m, p) for m, p in dependencias) if c not in vigentes]
+    vigentes.update(versiones(nuevas))
+    cache.set(clave, {'contexto': contexto, 'versiones': vigentes})
+    return contexto
+
+
+# ============================================
+# INVALIDACIÓN POR SEÑALES
+# ============================================
+
+def vigilar(modelo, afectados):
+    """
+    Invalida al guardar/eliminar `modelo`. `afectados(instancia)` retorna
+    los (modelo, pk) cuya versión cambia; normalmente el propio registro y
+    su padre (un RN invalida su parto).
+    """
+    _vigilados[modelo] = afectados
+    uid = f'fragmentos_{_etiqueta(modelo)}'
+    post_save.connect(_registro_modificado, sender=modelo, dispatch_uid=uid)
+    post_delete.connect(_registro_modificado, sender=modelo, dispatch_uid=uid)
+
+
+def vigilar_m2m(relacion, modelo):
+    """Invalida `modelo` cuando cambian los elementos de su relación ManyToMany"""
+    m2m_changed.connect(
+        _relacion_modificada, sender=relacion.through,
+        dispatch_uid=f'fragmentos_{_etiqueta(relacion.through)}',
+    )
+    _vigilados[relacion.through] = lambda instancia: [(modelo, instancia.pk)]
+
+
+def _invalidar_despues_del_commit(afectados):
+    def aplicar():
+        for modelo, pk in afectados:
+            if pk is not None:
+                invalidar(modelo, pk)
+
+    # Invalidar ahora y otra vez tras el commit: una lectura concurrente que
+    # reconstruya con los datos previos al commit no queda como vigente
+    aplicar()
+    transaction.on_commit(aplicar)
+
+
+def _registro_modificado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _invalidar_despues_del_commit(_vigilados[sender](instance))
+
+
+def _relacion_modificada(sender, instance, action, reverse=False, **kwargs):
+    if action.startswith('post_') and not reverse:
+        _invalidar_despues_del_commit(_vigilados[sender](instance))
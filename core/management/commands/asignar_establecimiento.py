@@ -0,0 +1,47 @@
+# core/management/commands/asignar_establecimiento.py
+"""
+Asigna un establecimiento a los registros clínicos que aún no tienen
+(datos anteriores a la partición por establecimiento)
+Uso:
+    python manage.py asignar_establecimiento --codigo HCHM
+    python manage.py asignar_establecimiento --codigo HCHM --simular
+
+Un UPDATE por tabla (sin señales ni outbox, como una migración de datos);
+las cachés de cada modelo se invalidan al final.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import cache
+from core.establecimientos import ConEstablecimiento
+from gestionApp.models import Establecimiento
+
+
+class Command(BaseCommand):
+    help = 'Asigna --codigo a los registros clínicos sin establecimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--codigo', required=True, help='Código del establecimiento')
+        parser.add_argument('--simular', action='store_true', help='Solo contar, sin modificar')
+
+    def handle(self, *args, **options):
+        codigo = options['codigo']
+        if not Establecimiento.objects.filter(pk=codigo).exists():
+            raise CommandError(f'No existe el establecimiento "{codigo}"')
+
+        modelos = [modelo for modelo in apps.get_models() if issubclass(modelo, ConEstablecimiento)]
+        total = 0
+        with transaction.atomic():
+            for modelo in modelos:
+                pendientes = modelo.todos.filter(establecimiento__isnull=True)
+                cantidad = pendientes.count() if options['simular'] else pendientes.update(establecimiento_id=codigo)
+                total += cantidad
+                self.stdout.write(f'{modelo._meta.label:42} {cantidad:>8}')
+
+        if options['simular']:
+            self.stdout.write(self.style.WARNING(f'Simulación: {total} registros sin establecimiento'))
+            return
+        for modelo in modelos:
+            cache.invalidar_modelo(modelo)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} registros asignados a {codigo}'))
@@ -0,0 +1,88 @@
+# core/management/commands/benchmark_latencia.py
+"""
+Compara la latencia de una o más URLs bajo el handler WSGI y el ASGI
+Uso:
+    python manage.py benchmark_latencia /matrona/paciente/1/ --usuario admin
+    python manage.py benchmark_latencia /medico/paciente/1/historial/ --peticiones 500 --concurrencia 20
+
+Las peticiones se hacen en proceso (django.test.Client / AsyncClient) contra
+las bases de datos configuradas, por lo que mide el costo de las vistas y de
+las consultas, no el del servidor HTTP. Reporta p50, p95, p99 y máximo.
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+class Command(BaseCommand):
+    help = 'Compara latencia de cola (p95/p99) de URLs bajo WSGI y ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Rutas a medir (p. ej. /matrona/paciente/1/)')
+        parser.add_argument('--peticiones', type=int, default=200)
+        parser.add_argument('--concurrencia', type=int, default=10)
+        parser.add_argument('--usuario', default=None, help='Usuario con el que autenticar las peticiones')
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            try:
+                usuario = get_user_model().objects.get(username=options['usuario'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Usuario '{options['usuario']}' no existe")
+
+        for url in options['urls']:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{url}'))
+            wsgi = self._medir_wsgi(url, usuario, options['peticiones'], options['concurrencia'])
+            asgi = asyncio.run(self._medir_asgi(url, usuario, options['peticiones'], options['concurrencia']))
+            self._reportar('WSGI', wsgi)
+            self._reportar('ASGI', asgi)
+
+    def _medir_wsgi(self, url, usuario, peticiones, concurrencia):
+        def una_peticion(_):
+            cliente = Client()
+            if usuario:
+                cliente.force_login(usuario)
+            inicio = time.perf_counter()
+            respuesta = cliente.get(url)
+            return time.perf_counter() - inicio, respuesta.status_code
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+            return list(ejecutor.map(una_peticion, range(peticiones)))
+
+    async def _medir_asgi(self, url, usuario, peticiones, concurrencia):
+        semaforo = asyncio.Semaphore(concurrencia)
+
+        async def una_peticion():
+            async with semaforo:
+                cliente = AsyncClient()
+                if usuario:
+                    await cliente.aforce_login(usuario)
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(url)
+                return time.perf_counter() - inicio, respuesta.status_code
+
+        return await asyncio.gather(*(una_peticion() for _ in range(peticiones)))
+
+    def _reportar(self, nombre, resultados):
+        tiempos = [duracion * 1000 for duracion, _codigo in resultados]
+        errores = sum(1 for _duracion, codigo in resultados if codigo >= 400)
+        self.stdout.write(
+            f'  {nombre}: n={len(tiempos)} '
+            f'p50={statistics.median(tiempos):.1f}ms '
+            f'p95={percentil(tiempos, 95):.1f}ms '
+            f'p99={percentil(tiempos, 99):.1f}ms '
+            f'max={max(tiempos):.1f}ms '
+            f'errores={errores}'
+        )
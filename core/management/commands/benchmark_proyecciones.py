@@ -0,0 +1,102 @@
+# core/management/commands/benchmark_proyecciones.py
+"""
+Compara tiempo y memoria de los listados con instancias de modelo y con
+proyecciones (core.proyecciones)
+Uso:
+    python manage.py benchmark_proyecciones
+    python manage.py benchmark_proyecciones --filas 5000 --repeticiones 10 --listado partos
+
+Para cada listado carga hasta --filas registros de la BD configurada como
+lo hacían las vistas (select_related) y como lo hacen ahora, y reporta por
+cada 1.000 filas: tiempo (mejor de --repeticiones, incluye la consulta) y
+memoria que ocupa la lista resultante (tracemalloc). No cuenta las
+consultas que las plantillas hacían por fila (ej. patologías de cada ficha).
+"""
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _listados():
+    from gestionApp.models import Paciente
+    from matronaApp.models import FichaObstetrica
+    from matronaApp.proyecciones import FilaFicha, FilaPaciente
+    from partosApp.models import RegistroParto
+    from partosApp.proyecciones import FilaParto
+    from tensApp.models import Tratamiento_aplicado
+    from tensApp.proyecciones import FilaTratamiento
+
+    # nombre: (queryset de la vista, select_related que usaba, proyección)
+    return {
+        'pacientes': (Paciente.objects.filter(activo=True).order_by('pk'), ('persona',), FilaPaciente),
+        'fichas': (FichaObstetrica.objects.order_by('-fecha_creacion'),
+                   ('paciente__persona', 'matrona_responsable__persona'), FilaFicha),
+        'partos': (RegistroParto.objects.filter(activo=True).order_by('-fecha_hora_admision'),
+                   ('ficha__paciente__persona',), FilaParto),
+        'tratamientos': (Tratamiento_aplicado.objects.order_by('-fecha_aplicacion', '-hora_aplicacion'),
+                         ('ficha__paciente__persona', 'paciente__persona', 'tens__persona'), FilaTratamiento),
+    }
+
+
+def medir(cargar, repeticiones):
+    """(segundos del mejor intento, bytes retenidos, filas) de cargar()"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = cargar()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+        del filas
+
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        filas = cargar()
+        retenidos = tracemalloc.get_traced_memory()[0] - antes
+    finally:
+        tracemalloc.stop()
+    return mejor, retenidos, len(filas)
+
+
+class Command(BaseCommand):
+    help = 'Compara tiempo y memoria por 1.000 filas de los listados: modelos vs proyecciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1000)
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--listado', action='append', default=None,
+                            help='Listado a medir (repetible); por defecto todos')
+
+    def handle(self, *args, **options):
+        listados = _listados()
+        nombres = options['listado'] or list(listados)
+        desconocidos = set(nombres) - set(listados)
+        if desconocidos:
+            raise CommandError(f"Listados desconocidos: {', '.join(sorted(desconocidos))} "
+                               f"(disponibles: {', '.join(listados)})")
+        n = options['filas']
+        repeticiones = max(1, options['repeticiones'])
+
+        for nombre in nombres:
+            queryset, relaciones, proyeccion = listados[nombre]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{nombre}'))
+            antes = medir(lambda: list(queryset.select_related(*relaciones)[:n]), repeticiones)
+            despues = medir(lambda: proyeccion.filas(proyeccion.valores(queryset)[:n]), repeticiones)
+            if not antes[2]:
+                self.stdout.write('  sin registros')
+                continue
+            self._reportar('Modelos', antes)
+            self._reportar(proyeccion.__name__, despues)
+            self.stdout.write(
+                f'  Tiempo x{antes[0] / despues[0]:.1f} · memoria x{antes[1] / max(despues[1], 1):.1f}'
+            )
+
+    def _reportar(self, nombre, medicion):
+        segundos, retenidos, filas = medicion
+        factor = 1000 / filas
+        self.stdout.write(
+            f'  {nombre}: n={filas} '
+            f'{segundos * 1000 * factor:.1f}ms/1000 filas '
+            f'{retenidos * factor / 1024:.0f}KB/1000 filas'
+        )
@@ -0,0 +1,59 @@
+# core/management/commands/construir_estaticos.py
+"""
+Construye los estáticos para producción y reporta el ahorro por página
+Uso:
+    python manage.py construir_estaticos
+    python manage.py construir_estaticos --limpiar      # borra STATIC_ROOT antes
+    python manage.py construir_estaticos --solo-reporte
+
+Ejecuta collectstatic con EstaticosComprimidosStorage (huella de contenido
++ variantes .br/.gz, ver core.estaticos) y luego muestra, por template, lo
+que descarga un navegador sin caché: original, gzip y brotli. Los recursos
+de CDN externos no se cuentan.
+"""
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core import estaticos
+
+
+def _kb(valor):
+    return f'{valor / 1024:.1f} KB'
+
+
+class Command(BaseCommand):
+    help = 'collectstatic con huella y precompresión (brotli/gzip) y reporte de bytes ahorrados por página'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limpiar', action='store_true', help='Borrar STATIC_ROOT antes de copiar')
+        parser.add_argument('--solo-reporte', action='store_true', help='No ejecutar collectstatic')
+
+    def handle(self, *args, **options):
+        if not options['solo_reporte']:
+            call_command('collectstatic', interactive=False, clear=options['limpiar'],
+                         verbosity=max(options['verbosity'] - 1, 0), stdout=self.stdout)
+            self.stdout.write(self.style.SUCCESS(f'✅ Estáticos en {settings.STATIC_ROOT}'))
+        if estaticos.brotli is None:
+            self.stdout.write(self.style.WARNING('brotli no está instalado: solo se generaron variantes gzip'))
+
+        filas = estaticos.reporte_por_pagina()
+        if not filas:
+            self.stdout.write('Ningún template usa estáticos locales')
+            return
+
+        self.stdout.write(f"\n{'Página':55} {'Archivos':>8} {'Original':>10} {'gzip':>10} {'brotli':>10} {'Ahorro':>7}")
+        total_original = total_br = 0
+        for nombre, archivos, original, br, gz, faltantes in filas:
+            ahorro = 1 - br / original if original else 0
+            total_original += original
+            total_br += br
+            self.stdout.write(
+                f'{nombre:55} {len(archivos):>8} {_kb(original):>10} {_kb(gz):>10} {_kb(br):>10} {ahorro:>7.0%}'
+            )
+            for faltante in faltantes:
+                self.stdout.write(self.style.WARNING(f'    - no existe: {faltante}'))
+        self.stdout.write(
+            f'\n{len(filas)} páginas: {_kb(total_original - total_br)} menos por carga sin caché en total; '
+            'con caché los archivos con huella no se vuelven a pedir.'
+        )
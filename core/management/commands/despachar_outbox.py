@@ -0,0 +1,68 @@
+# core/management/commands/despachar_outbox.py
+"""
+Entrega los eventos pendientes del outbox a los handlers registrados
+Uso:
+    python manage.py despachar_outbox               # drena y termina
+    python manage.py despachar_outbox --continuo    # proceso permanente
+    python manage.py despachar_outbox --reintentar-descartados
+
+Backpressure: el siguiente lote se lee solo cuando los handlers terminaron
+el anterior. Si hay fallos, la pausa entre lotes crece exponencialmente
+hasta --max-pausa para no saturar a un consumidor caído. Los eventos que
+agotaron sus intentos quedan descartados; --reintentar-descartados los
+vuelve a poner en cola antes de despachar.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = 'Despacha eventos del outbox transaccional por lotes (al menos una vez)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='Eventos por lote')
+        parser.add_argument('--continuo', action='store_true', help='Seguir esperando nuevos eventos')
+        parser.add_argument('--pausa', type=float, default=1.0, help='Segundos de espera sin eventos')
+        parser.add_argument('--max-pausa', type=float, default=60.0, help='Espera máxima tras fallos')
+        parser.add_argument('--max-lotes', type=int, default=0, help='Detenerse tras N lotes (0 = sin límite)')
+        parser.add_argument('--reintentar-descartados', action='store_true',
+                            help='Reactivar los eventos que agotaron sus intentos')
+
+    def handle(self, *args, **options):
+        if options['reintentar_descartados']:
+            reactivados = outbox.reintentar_descartados()
+            self.stdout.write(f'{reactivados} eventos descartados vuelven a la cola')
+
+        pausa_base = options['pausa']
+        pausa = pausa_base
+        lotes = total_ok = total_fallidos = 0
+
+        while True:
+            ok, fallidos = outbox.despachar_lote(options['lote'])
+            lotes += 1
+            total_ok += ok
+            total_fallidos += fallidos
+
+            if options['max_lotes'] and lotes >= options['max_lotes']:
+                break
+
+            if fallidos:
+                if not ok and not options['continuo']:
+                    break
+                # Consumidor con problemas: retroceder antes de reintentar
+                time.sleep(pausa)
+                pausa = min(pausa * 2, options['max_pausa'])
+                continue
+            pausa = pausa_base
+
+            if ok == 0:
+                if not options['continuo']:
+                    break
+                time.sleep(pausa_base)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total_ok} eventos despachados, {total_fallidos} con error ({lotes} lotes)'
+        ))
@@ -0,0 +1,38 @@
+# core/management/commands/estadisticas_cache.py
+"""
+Muestra aciertos y fallos de la caché compartida (core.cache) por nombre
+Uso:
+    python manage.py estadisticas_cache
+    python manage.py estadisticas_cache --reiniciar
+
+Los contadores los publica cada proceso en la caché compartida por lotes,
+por lo que pueden faltar las últimas operaciones de cada worker.
+"""
+from django.core.management.base import BaseCommand
+
+from core import cache
+
+
+class Command(BaseCommand):
+    help = 'Estadísticas de aciertos (L1/L2) y fallos de la caché compartida'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Poner los contadores en cero')
+
+    def handle(self, *args, **options):
+        if options['reiniciar']:
+            cache.reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('✅ Estadísticas de caché reiniciadas'))
+            return
+
+        filas = cache.estadisticas()
+        if not filas:
+            self.stdout.write('Sin estadísticas registradas')
+            return
+
+        self.stdout.write(f"{'Nombre':40} {'L1':>8} {'L2':>8} {'Fallos':>8} {'Acierto':>8}")
+        for nombre, fila in sorted(filas.items()):
+            self.stdout.write(
+                f"{nombre:40} {fila[cache.HIT_L1]:>8} {fila[cache.HIT_L2]:>8} "
+                f"{fila[cache.MISS]:>8} {fila['tasa_acierto']:>8.1%}"
+            )
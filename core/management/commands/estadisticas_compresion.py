@@ -0,0 +1,43 @@
+# core/management/commands/estadisticas_compresion.py
+"""
+Muestra, por vista, cuánto comprime core.middleware.compresion y cuánta CPU gasta
+Uso:
+    python manage.py estadisticas_compresion
+    python manage.py estadisticas_compresion --reiniciar
+
+Como en estadisticas_cache, cada proceso publica sus contadores por lotes,
+por lo que pueden faltar las últimas respuestas de cada worker.
+"""
+from django.core.management.base import BaseCommand
+
+from core.middleware import compresion
+
+
+class Command(BaseCommand):
+    help = 'Ratio de compresión y tiempo de CPU por vista'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Poner los contadores en cero')
+
+    def handle(self, *args, **options):
+        if options['reiniciar']:
+            compresion.reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('✅ Estadísticas de compresión reiniciadas'))
+            return
+
+        filas = compresion.estadisticas()
+        if not filas:
+            self.stdout.write('Sin estadísticas registradas')
+            return
+
+        self.stdout.write(
+            f"{'Vista':40} {'Resp.':>7} {'br':>6} {'gzip':>6} {'Omit.':>6} "
+            f"{'Original':>11} {'Enviado':>11} {'Ratio':>6} {'CPU ms':>8}"
+        )
+        # Primero las vistas que más bytes originales generan
+        for vista, fila in sorted(filas.items(), key=lambda par: -par[1]['bytes_original']):
+            self.stdout.write(
+                f"{vista:40} {fila['respuestas']:>7} {fila['br']:>6} {fila['gzip']:>6} {fila['omitidas']:>6} "
+                f"{fila['bytes_original']:>11,} {fila['bytes_enviados']:>11,} {fila['ratio']:>6.1f} "
+                f"{fila['cpu_ms_por_respuesta']:>8.2f}"
+            )
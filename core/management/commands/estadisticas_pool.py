@@ -0,0 +1,43 @@
+# core/management/commands/estadisticas_pool.py
+"""
+Muestra las métricas del pool de conexiones (core.pool) por base de datos
+Uso:
+    python manage.py estadisticas_pool
+    python manage.py estadisticas_pool --reiniciar
+
+Los contadores son la suma de todos los workers (publicados por lotes en la
+caché compartida). Las conexiones en uso/libres solo existen dentro de cada
+worker, por eso aquí se muestran vacías.
+"""
+from django.core.management.base import BaseCommand
+
+from core import pool
+
+
+class Command(BaseCommand):
+    help = 'Conexiones creadas, reutilizadas y descartadas por el pool de cada base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Poner los contadores en cero')
+
+    def handle(self, *args, **options):
+        if options['reiniciar']:
+            pool.reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('✅ Estadísticas del pool reiniciadas'))
+            return
+
+        filas = pool.estadisticas()
+        if not filas:
+            self.stdout.write('Sin estadísticas registradas')
+            return
+
+        self.stdout.write(
+            f"{'Pool':32} {'Creadas':>8} {'Reusadas':>9} {'Verif.':>7} {'Descart.':>9} "
+            f"{'Agotado':>8} {'Espera ms':>10} {'Reuso':>7}"
+        )
+        for nombre, fila in sorted(filas.items()):
+            self.stdout.write(
+                f"{nombre:32} {fila['creadas']:>8} {fila['reutilizadas']:>9} {fila['verificadas']:>7} "
+                f"{fila['descartadas']:>9} {fila['agotado']:>8} {fila['espera_us'] / 1000:>10.1f} "
+                f"{fila['tasa_reutilizacion']:>7.1%}"
+            )
@@ -0,0 +1,45 @@
+# core/management/commands/historial_auditoria.py
+"""
+Muestra la auditoría de un registro clínico (core.auditoria)
+Uso:
+    python manage.py historial_auditoria partosApp.RegistroParto 15
+    python manage.py historial_auditoria partosApp.RegistroParto 15 --version 3
+"""
+import json
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core import auditoria
+
+
+class Command(BaseCommand):
+    help = 'Versiones de un registro auditado, o el registro completo en una versión'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', help='app_label.Modelo')
+        parser.add_argument('pk', type=int)
+        parser.add_argument('--version', type=int, help='Mostrar el registro completo en esta versión')
+
+    def handle(self, *args, **options):
+        try:
+            modelo = apps.get_model(options['modelo'])
+        except (LookupError, ValueError):
+            raise CommandError(f"Modelo desconocido: {options['modelo']}")
+        if not issubclass(modelo, auditoria.AuditadoMixin):
+            raise CommandError(f'{modelo._meta.label} no está auditado')
+
+        if options['version'] is not None:
+            estado = auditoria.estado(modelo, options['pk'], options['version'])
+            if estado is None:
+                raise CommandError('No existe esa versión')
+            self.stdout.write(json.dumps(estado, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2))
+            return
+
+        for cambio in auditoria.historial(modelo, options['pk']):
+            campos = ', '.join(sorted(cambio.cambios)) or ('(completo)' if cambio.estado else '')
+            self.stdout.write(
+                f"v{cambio.numero:<4} {cambio.fecha:%d/%m/%Y %H:%M} {cambio.operacion:10} "
+                f"usuario={cambio.usuario_id or '-':<6} {campos}"
+            )
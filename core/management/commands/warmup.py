@@ -0,0 +1,44 @@
+# core/management/commands/warmup.py
+"""
+Calienta el proceso actual y reporta el tiempo de cada fase
+Uso:
+    python manage.py warmup
+    python manage.py warmup --fases templates,catalogos
+    python manage.py warmup --estricto        # código de salida != 0 si alguna fase tuvo errores
+
+Sirve para medir el costo del arranque en frío y para verificar, antes de
+un despliegue, que todos los templates compilan. Los mismos pasos corren en
+cada worker WSGI al iniciar cuando WARMUP_AL_INICIAR está activo.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import calentamiento
+
+
+class Command(BaseCommand):
+    help = 'Precompila templates, importa vistas/formularios, abre conexiones y arma catálogos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fases', default=','.join(calentamiento.FASES),
+                            help=f"Fases separadas por coma ({', '.join(calentamiento.FASES)})")
+        parser.add_argument('--estricto', action='store_true', help='Fallar si alguna fase tuvo errores')
+
+    def handle(self, *args, **options):
+        fases = [fase.strip() for fase in options['fases'].split(',') if fase.strip()]
+        desconocidas = [fase for fase in fases if fase not in calentamiento.FASES]
+        if desconocidas:
+            raise CommandError(f"Fases desconocidas: {', '.join(desconocidas)}")
+
+        resultados = calentamiento.calentar(fases)
+
+        self.stdout.write(f"{'Fase':12} {'Cantidad':>9} {'Tiempo':>10}  Estado")
+        for resultado in resultados:
+            estado = self.style.SUCCESS('ok') if resultado.ok else self.style.WARNING(f'{len(resultado.errores)} errores')
+            self.stdout.write(f'{resultado.nombre:12} {resultado.cantidad:>9} {resultado.segundos * 1000:>8.1f}ms  {estado}')
+            for error in resultado.errores:
+                self.stdout.write(f'    - {error}')
+        total = sum(resultado.segundos for resultado in resultados)
+        self.stdout.write(f"{'Total':12} {'':>9} {total * 1000:>8.1f}ms")
+
+        if options['estricto'] and not all(resultado.ok for resultado in resultados):
+            raise CommandError('El calentamiento terminó con errores')
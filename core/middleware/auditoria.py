@@ -0,0 +1,34 @@
+# core/middleware/auditoria.py
+"""
+Abre el lote de auditoría de la petición (core.auditoria): las versiones
+se escriben con cada guardado, en su transacción, con el usuario que los
+hizo, y los guardados repetidos de un registro se combinan en una versión.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from core.auditoria import en_lote
+
+
+def _usuario_id(request):
+    usuario = getattr(request, 'user', None)
+    return usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+
+class AuditoriaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with en_lote(lambda: _usuario_id(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with en_lote(lambda: _usuario_id(request)):
+            return await self.get_response(request)
@@ -0,0 +1,188 @@
+# core/middleware/compresion.py
+"""
+Compresión brotli/gzip de las respuestas dinámicas
+
+Las listas clínicas (todas_fichas, listar_tratamientos, listados de
+pacientes) son tablas HTML muy repetitivas que pueden pesar megabytes; se
+comprimen 10-20 veces. El nivel se elige por tamaño: las páginas chicas
+usan un nivel alto (cuesta poco), las grandes uno bajo para no gastar más
+CPU de la que ahorra la red.
+
+Se omiten:
+- respuestas bajo COMPRESION_MINIMO bytes,
+- respuestas en streaming (SSE del tablero, exportaciones, FileResponse),
+- respuestas que ya traen Content-Encoding (estáticos precomprimidos),
+- tipos ya comprimidos (imágenes, PDF, xlsx) y Cache-Control no-transform.
+
+Por vista se cuentan bytes originales y enviados y el tiempo de CPU de la
+compresión (ver `estadisticas` y el comando `estadisticas_compresion`).
+
+BREACH: un atacante que hace que el navegador de la víctima pida muchas
+veces una página comprimida que contiene un secreto y texto que él
+controla puede deducir el secreto por el tamaño de la respuesta.
+- El token CSRF de los formularios ({% csrf_token %}) viene enmascarado
+  con un valor aleatorio distinto en cada respuesta, por lo que su
+  tamaño comprimido no revela nada.
+- Además no se comprimen las peticiones que el navegador marca como
+  originadas en otro sitio (Sec-Fetch-Site: cross-site), que es como
+  llegan las peticiones del ataque. No comprimir una navegación desde un
+  enlace externo tiene un costo menor.
+- No se deben poner otros secretos (tokens de API, claves) en páginas
+  que también reflejan parámetros de la petición.
+"""
+import gzip
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from core.contadores import Contadores
+from core.estaticos import brotli
+from core.middleware.estaticos import codificaciones_aceptadas
+
+COMPRESION_MINIMO = 1024
+
+# (hasta bytes, calidad brotli, nivel gzip); el último tramo no tiene tope
+NIVELES = (
+    (64 * 1024, 5, 6),
+    (1024 * 1024, 4, 5),
+    (None, 2, 3),
+)
+
+TIPOS_COMPRIMIBLES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+CAMPOS = ('respuestas', 'br', 'gzip', 'omitidas', 'bytes_original', 'bytes_enviados', 'cpu_us')
+
+_contadores = Contadores('compresion:stats', CAMPOS)
+
+_no_transform = re.compile(r'\bno-transform\b')
+
+
+def niveles_para(tamano):
+    """(calidad brotli, nivel gzip) que corresponden a `tamano` bytes"""
+    for tope, calidad_br, nivel_gzip in NIVELES:
+        if tope is None or tamano <= tope:
+            return calidad_br, nivel_gzip
+
+
+def comprimir(contenido, codificacion):
+    calidad_br, nivel_gzip = niveles_para(len(contenido))
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=calidad_br)
+    return gzip.compress(contenido, compresslevel=nivel_gzip, mtime=0)
+
+
+def es_comprimible(tipo):
+    tipo = (tipo or '').split(';')[0].strip().lower()
+    return tipo.startswith(TIPOS_COMPRIMIBLES) or tipo.endswith(('+json', '+xml'))
+
+
+def _nombre_vista(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    return coincidencia.view_name if coincidencia else '-'
+
+
+class CompresionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.minimo = getattr(settings, 'COMPRESION_MINIMO', COMPRESION_MINIMO)
+        self.codificaciones = ('br', 'gzip') if brotli is not None else ('gzip',)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.procesar(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        respuesta = await self.get_response(request)
+        if not respuesta.streaming and len(respuesta.content) > NIVELES[0][0]:
+            # Las páginas grandes se comprimen fuera del event loop
+            return await sync_to_async(self.procesar, thread_sensitive=False)(request, respuesta)
+        return self.procesar(request, respuesta)
+
+    def procesar(self, request, respuesta):
+        if not self._candidata(respuesta):
+            return respuesta
+
+        # Desde aquí la respuesta depende de Accept-Encoding, se comprima o no
+        patch_vary_headers(respuesta, ('Accept-Encoding',))
+        vista = _nombre_vista(request)
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING'))
+        codificacion = next((c for c in self.codificaciones if c in aceptadas), None)
+        if request.META.get('HTTP_SEC_FETCH_SITE') == 'cross-site':
+            codificacion = None  # BREACH: ver el docstring del módulo
+        original = len(respuesta.content)
+        if codificacion is None:
+            _contadores.sumar(vista, respuestas=1, omitidas=1, bytes_original=original, bytes_enviados=original)
+            return respuesta
+
+        inicio = time.thread_time_ns()
+        comprimido = comprimir(respuesta.content, codificacion)
+        cpu_us = (time.thread_time_ns() - inicio) // 1000
+        if len(comprimido) >= original:
+            _contadores.sumar(vista, respuestas=1, omitidas=1, bytes_original=original,
+                              bytes_enviados=original, cpu_us=cpu_us)
+            return respuesta
+
+        respuesta.content = comprimido
+        respuesta['Content-Length'] = str(len(comprimido))
+        respuesta['Content-Encoding'] = codificacion
+        # Los bytes ya no son los del ETag original (RFC 9110, 8.8.3)
+        etag = respuesta.get('ETag')
+        if etag and etag.startswith('"'):
+            respuesta['ETag'] = 'W/' + etag
+        _contadores.sumar(vista, respuestas=1, bytes_original=original, bytes_enviados=len(comprimido),
+                          cpu_us=cpu_us, **{codificacion: 1})
+        return respuesta
+
+    def _candidata(self, respuesta):
+        if respuesta.streaming or respuesta.has_header('Content-Encoding'):
+            return False
+        if respuesta.status_code in (204, 206, 304) or len(respuesta.content) < self.minimo:
+            return False
+        if _no_transform.search(respuesta.get('Cache-Control', '')):
+            return False
+        return es_comprimible(respuesta.get('Content-Type'))
+
+
+# ============================================
+# ESTADÍSTICAS
+# ============================================
+
+def estadisticas(compartidas=True):
+    """
+    {vista: {campos de CAMPOS, 'ratio', 'ahorro', 'cpu_ms_por_respuesta'}}
+
+    ratio = bytes originales / enviados (2.0 es la mitad), ahorro = fracción
+    de bytes no enviados. Como en core.cache, compartidas=True suma todos los
+    procesos.
+    """
+    resultado = _contadores.totales(compartidas)
+    for fila in resultado.values():
+        enviados, original = fila['bytes_enviados'], fila['bytes_original']
+        fila['ratio'] = round(original / enviados, 2) if enviados else 0.0
+        fila['ahorro'] = round(1 - enviados / original, 3) if original else 0.0
+        comprimidas = fila['br'] + fila['gzip']
+        fila['cpu_ms_por_respuesta'] = round(fila['cpu_us'] / comprimidas / 1000, 3) if comprimidas else 0.0
+    return resultado
+
+
+def publicar_estadisticas():
+    _contadores.publicar()
+
+
+def reiniciar_estadisticas():
+    _contadores.reiniciar()
@@ -0,0 +1,75 @@
+# core/middleware/establecimiento.py
+"""
+Activa el establecimiento del usuario durante la petición (core.establecimientos)
+
+- Usuario con un establecimiento asignado: ese.
+- Con varios: el elegido en la sesión (authentication:cambiar_establecimiento)
+  o, si no eligió, el primero por código.
+- Superusuario: el elegido; sin elección, o con TODOS, ve todos.
+- Sin asignación: sin filtro, salvo con ESTABLECIMIENTO_OBLIGATORIO
+  (despliegues con varias maternidades), que responde 403.
+
+Va después de AuthenticationMiddleware. El código queda en
+request.establecimiento para los templates.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+
+from core import cache
+from core.establecimientos import en_establecimiento
+
+SESION = 'establecimiento'
+TODOS = '*'
+
+
+def establecimientos_de(usuario):
+    """Códigos de los establecimientos activos asignados a `usuario` (cacheados)"""
+    from gestionApp.models import Establecimiento
+
+    return cache.cacheado(
+        'establecimientos:usuario', [Establecimiento],
+        lambda: list(usuario.establecimientos.filter(activo=True).values_list('codigo', flat=True)),
+        usuario=usuario.pk,
+    )
+
+
+def establecimiento_de_peticion(request):
+    """Código a activar para `request`, o None para no filtrar"""
+    usuario = getattr(request, 'user', None)
+    if usuario is None or not usuario.is_authenticated:
+        return None
+    codigos = establecimientos_de(usuario)
+    elegido = request.session.get(SESION)
+    if usuario.is_superuser:
+        return None if elegido in (None, TODOS) else elegido
+    if elegido in codigos:
+        return elegido
+    if codigos:
+        return codigos[0]
+    if getattr(settings, 'ESTABLECIMIENTO_OBLIGATORIO', False):
+        raise PermissionDenied('El usuario no tiene un establecimiento asignado')
+    return None
+
+
+class EstablecimientoMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.establecimiento = establecimiento_de_peticion(request)
+        with en_establecimiento(request.establecimiento):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Sesión y asignaciones se leen con el ORM síncrono
+        request.establecimiento = await sync_to_async(establecimiento_de_peticion)(request)
+        with en_establecimiento(request.establecimiento):
+            return await self.get_response(request)
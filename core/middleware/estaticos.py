@@ -0,0 +1,143 @@
+# core/middleware/estaticos.py
+"""
+Sirve STATIC_ROOT con la variante comprimida que acepte el navegador
+
+- Accept-Encoding con br → <archivo>.br, con gzip → <archivo>.gz, si existen
+  (los genera `construir_estaticos`, ver core.estaticos).
+- Archivos con huella en el nombre: Cache-Control immutable por un año.
+- Resto (nombres sin huella): caché corta con ETag / Last-Modified y 304.
+
+Va al inicio de MIDDLEWARE para que los estáticos no pasen por sesión,
+autenticación ni control de roles. Si el archivo no está en STATIC_ROOT
+(desarrollo sin collectstatic) la petición sigue su curso normal.
+"""
+import mimetypes
+import os
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from core.estaticos import VARIANTES, nombres_con_huella
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_SIN_HUELLA = 'public, max-age=300, must-revalidate'
+
+
+def codificaciones_aceptadas(cabecera):
+    """Codificaciones de Accept-Encoding con q > 0 ('br;q=0' la excluye)"""
+    aceptadas = set()
+    for parte in (cabecera or '').split(','):
+        token, _, parametros = parte.strip().partition(';')
+        token = token.strip().lower()
+        calidad = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+        if token and calidad > 0:
+            aceptadas.add(token)
+    if '*' in aceptadas:
+        aceptadas |= {codificacion for codificacion, _ext in VARIANTES}
+    return aceptadas
+
+
+@lru_cache(maxsize=4096)
+def _archivo(raiz, relativo):
+    """
+    (ruta, {codificación: ruta}, tamaño, mtime) del archivo o None. Se cachea
+    por proceso: STATIC_ROOT no cambia mientras el worker vive.
+    """
+    try:
+        ruta = safe_join(raiz, relativo)
+    except Exception:  # fuera de STATIC_ROOT
+        return None
+    if not os.path.isfile(ruta):
+        return None
+    variantes = {
+        codificacion: ruta + extension
+        for codificacion, extension in VARIANTES
+        if os.path.isfile(ruta + extension)
+    }
+    estado = os.stat(ruta)
+    return ruta, variantes, estado.st_size, int(estado.st_mtime)
+
+
+@lru_cache(maxsize=1)
+def _huellas(raiz):
+    return frozenset(nombres_con_huella())
+
+
+class EstaticosComprimidosMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefijo = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else f'/{settings.STATIC_URL}'
+        self.raiz = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        respuesta = self.servir(request)
+        if respuesta is not None:
+            return respuesta
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # servir() solo toca el disco local (stat/open), sin ORM
+        respuesta = self.servir(request)
+        if respuesta is not None:
+            return respuesta
+        return await self.get_response(request)
+
+    def servir(self, request):
+        """FileResponse del estático pedido, o None si no corresponde"""
+        if self.raiz is None or request.method not in ('GET', 'HEAD'):
+            return None
+        if not request.path_info.startswith(self.prefijo):
+            return None
+        relativo = request.path_info[len(self.prefijo):]
+        archivo = _archivo(self.raiz, relativo)
+        if archivo is None:
+            return None
+        ruta, variantes, tamano, mtime = archivo
+
+        inmutable = relativo in _huellas(self.raiz)
+        etag = quote_etag(f'{mtime:x}-{tamano:x}')
+        if not inmutable and self._no_modificado(request, etag, mtime):
+            respuesta = HttpResponseNotModified()
+            respuesta['ETag'] = etag
+            return respuesta
+
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING'))
+        codificacion = next((c for c, _ext in VARIANTES if c in variantes and c in aceptadas), None)
+        tipo, _codificacion_original = mimetypes.guess_type(ruta)
+
+        respuesta = FileResponse(open(variantes[codificacion] if codificacion else ruta, 'rb'),
+                                 content_type=tipo or 'application/octet-stream')
+        if codificacion:
+            respuesta['Content-Encoding'] = codificacion
+        if variantes:
+            respuesta['Vary'] = 'Accept-Encoding'
+        respuesta['Cache-Control'] = CACHE_INMUTABLE if inmutable else CACHE_SIN_HUELLA
+        respuesta['Last-Modified'] = http_date(mtime)
+        if not inmutable:
+            respuesta['ETag'] = etag
+        return respuesta
+
+    @staticmethod
+    def _no_modificado(request, etag, mtime):
+        si_no_coincide = request.META.get('HTTP_IF_NONE_MATCH')
+        if si_no_coincide:
+            return etag in [e.strip() for e in si_no_coincide.split(',')]
+        desde = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return desde is not None and mtime <= desde
@@ -0,0 +1,59 @@
+# core/middleware/replica.py
+"""
+Lectura de lo propio después de escribir (réplica de lectura)
+
+Tras un POST/PUT/PATCH/DELETE se deja la cookie `leer_principal` por
+REPLICA_PEGAJOSA_SEGUNDOS; mientras exista, las peticiones de ese navegador
+leen siempre de la BD principal aunque la vista use core.replica.usar_replica.
+Así, al volver de guardar un parto al listado, el registro aparece aunque
+la réplica vaya unos segundos atrasada.
+
+La cookie no lleva datos: solo evita la réplica. Sin réplica configurada
+el middleware no hace nada.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from core.replica import alias_replica, forzar_principal
+
+COOKIE = 'leer_principal'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.segundos = getattr(settings, 'REPLICA_PEGAJOSA_SEGUNDOS', 10)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if alias_replica() is None:
+            return self.get_response(request)
+        if COOKIE in request.COOKIES:
+            with forzar_principal():
+                respuesta = self.get_response(request)
+        else:
+            respuesta = self.get_response(request)
+        return self._marcar(request, respuesta)
+
+    async def __acall__(self, request):
+        if alias_replica() is None:
+            return await self.get_response(request)
+        if COOKIE in request.COOKIES:
+            with forzar_principal():
+                respuesta = await self.get_response(request)
+        else:
+            respuesta = await self.get_response(request)
+        return self._marcar(request, respuesta)
+
+    def _marcar(self, request, respuesta):
+        if request.method not in METODOS_SEGUROS:
+            respuesta.set_cookie(COOKIE, '1', max_age=self.segundos, httponly=True, samesite='Lax',
+                                 secure=request.is_secure())
+        return respuesta
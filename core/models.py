@@ -1,3 +1,128 @@
+from django.contrib.sessions.base_session import AbstractBaseSession
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+
+# ============================================
+# OUTBOX TRANSACCIONAL
+# ============================================
+
+class EventoOutbox(models.Model):
+    """
+    Evento de cambio clínico escrito en la misma transacción que el guardado
+    del registro. El comando `despachar_outbox` lo entrega a los handlers
+    registrados en core.outbox (al menos una vez).
+    """
+
+    GUARDADO = 'GUARDADO'
+    ELIMINADO = 'ELIMINADO'
+    OPERACION_CHOICES = [
+        (GUARDADO, 'Guardado'),
+        (ELIMINADO, 'Eliminado'),
+    ]
+
+    tipo = models.CharField(
+        max_length=100,
+        verbose_name='Tipo de Evento',
+        help_text='app_label.modelo del registro modificado'
+    )
+    objeto_id = models.BigIntegerField(verbose_name='ID del Registro')
+    operacion = models.CharField(
+        max_length=10,
+        choices=OPERACION_CHOICES,
+        default=GUARDADO,
+        verbose_name='Operación'
+    )
+    datos = models.JSONField(default=dict, blank=True, verbose_name='Datos del Evento')
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    fecha_procesado = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Procesamiento')
+    intentos = models.PositiveIntegerField(default=0, verbose_name='Intentos de Entrega')
+    ultimo_error = models.TextField(blank=True, verbose_name='Último Error')
+    proximo_intento = models.DateTimeField(
+        null=True, blank=True, verbose_name='Próximo Intento',
+        help_text='Tras un fallo, no se reintenta antes de esta fecha'
+    )
+    fecha_descartado = models.DateTimeField(
+        null=True, blank=True, verbose_name='Fecha de Descarte',
+        help_text='Agotó los intentos; ver outbox.reintentar_descartados()'
+    )
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Evento Outbox'
+        verbose_name_plural = 'Eventos Outbox'
+        indexes = [
+            models.Index(fields=['fecha_procesado', 'id']),
+            models.Index(fields=['fecha_procesado', 'proximo_intento']),
+            models.Index(fields=['tipo', 'objeto_id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.tipo}:{self.objeto_id} ({self.operacion})"
+
+
+# ============================================
+# SESIONES
+# ============================================
+
+class Sesion(AbstractBaseSession):
+    """
+    Sesión de core.sesiones. Guarda el usuario en una columna indexada para
+    cerrar las sesiones de un usuario sin decodificar toda la tabla.
+    """
+
+    usuario_id = models.IntegerField(null=True, blank=True, db_index=True, verbose_name='Usuario')
+
+    class Meta(AbstractBaseSession.Meta):
+        verbose_name = 'Sesión'
+        verbose_name_plural = 'Sesiones'
+
+    @classmethod
+    def get_session_store_class(cls):
+        from core.sesiones import SessionStore
+        return SessionStore
+
+
+# ============================================
+# AUDITORÍA
+# ============================================
+
+class CambioAuditoria(models.Model):
+    """
+    Versión `numero` de un registro auditado (core.auditoria). `cambios`
+    tiene solo los campos modificados respecto de la versión anterior;
+    `estado` (punto de control) el registro completo y solo está en la
+    creación y cada AUDITORIA_PUNTO_CONTROL_CADA versiones.
+    """
+
+    CREADO = 'CREADO'
+    MODIFICADO = 'MODIFICADO'
+    ELIMINADO = 'ELIMINADO'
+    INICIAL = 'INICIAL'
+    OPERACION_CHOICES = [
+        (CREADO, 'Creado'),
+        (MODIFICADO, 'Modificado'),
+        (ELIMINADO, 'Eliminado'),
+        (INICIAL, 'Estado previo a la auditoría'),
+    ]
+
+    tipo = models.CharField(max_length=100, verbose_name='Tipo de Registro')
+    objeto_id = models.BigIntegerField(verbose_name='ID del Registro')
+    numero = models.PositiveIntegerField(verbose_name='Versión')
+    operacion = models.CharField(max_length=10, choices=OPERACION_CHOICES, verbose_name='Operación')
+    cambios = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='Campos Modificados')
+    estado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name='Punto de Control')
+    usuario_id = models.IntegerField(null=True, blank=True, verbose_name='Usuario')
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
+
+    class Meta:
+        ordering = ['tipo', 'objeto_id', 'numero']
+        verbose_name = 'Cambio de Auditoría'
+        verbose_name_plural = 'Cambios de Auditoría'
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id', 'numero'], name='auditoria_version_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}:{self.objeto_id} v{self.numero} ({self.operacion})"
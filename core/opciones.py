@@ -0,0 +1,203 @@
+# core/opciones.py
+"""
+Campos de selección de modelos con opciones cacheadas
+
+Un ModelChoiceField consulta su queryset al renderizar el <select> y otra
+vez al validar el POST. Estos campos arman una instantánea inmutable de las
+opciones (pk, etiqueta) y la reutilizan mientras ninguno de los modelos de
+los que depende cambie (versiones de core.cache):
+
+    matrona_responsable = OpcionesCacheadasField(
+        queryset=Matrona.objects.filter(Activo=True).select_related('persona'),
+        modelos=[Persona],      # la etiqueta usa datos de la persona
+    )
+
+- Renderizar: las opciones salen de la instantánea en memoria del proceso
+  (o de la caché compartida si este proceso aún no la tiene).
+- Validar: el valor se busca en el conjunto de pks de la instantánea y se
+  retorna una instancia armada con las columnas propias que la instantánea
+  guardó de esa fila (las que trae el queryset, respetando only()/defer()).
+  Las relaciones (p. ej. `matrona.persona`) no vienen precargadas: leerlas
+  consulta la BD como en cualquier instancia sin select_related.
+
+`modelos` son los modelos relacionados que intervienen en la etiqueta o en
+el filtro; el modelo del queryset se incluye siempre.
+"""
+from django import forms
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.forms.models import ModelChoiceIterator
+
+from core import cache
+
+# Instantáneas por clave versionada; al cambiar la versión la clave es otra
+# y la entrada anterior queda sin uso (se descartan todas al superar el límite)
+MAX_INSTANTANEAS = 256
+
+_instantaneas = {}
+
+
+class Instantanea:
+    """Opciones de un queryset en un momento dado y las columnas de cada fila"""
+
+    def __init__(self, opciones, campos=(), filas=()):
+        self.opciones = tuple(opciones)
+        self.pks = frozenset(pk for pk, _etiqueta in self.opciones)
+        self.campos = tuple(campos)
+        self.filas = {pk: fila for (pk, _etiqueta), fila in zip(self.opciones, filas)}
+
+    def __len__(self):
+        return len(self.opciones)
+
+
+def campos_cargados(queryset):
+    """attnames de las columnas propias que carga `queryset` (respeta only()/defer())"""
+    nombres, diferir = queryset.query.deferred_loading
+    return tuple(
+        campo.attname for campo in queryset.model._meta.concrete_fields
+        if campo.primary_key or not nombres
+        or (campo.name in nombres or campo.attname in nombres) != diferir
+    )
+
+
+def instantanea(campo):
+    """Instantánea vigente de las opciones de `campo`"""
+    try:
+        sql = str(campo.queryset.query)
+    except EmptyResultSet:
+        return Instantanea(())
+
+    nombre = f'opciones:{campo.queryset.model._meta.label_lower}'
+    campos = campos_cargados(campo.queryset)
+    clave = cache.clave(nombre, campo.modelos, sql=sql, bd=campo.queryset.db, campos=campos)
+    actual = _instantaneas.get(clave)
+    if actual is not None:
+        return actual
+
+    datos = cache.obtener(clave, nombre)
+    if datos is None:
+        objetos = list(campo.queryset)
+        datos = (
+            [(objeto.pk, campo.label_from_instance(objeto)) for objeto in objetos],
+            [tuple(getattr(objeto, attname) for attname in campos) for objeto in objetos],
+        )
+        cache.guardar(clave, datos)
+
+    if len(_instantaneas) >= MAX_INSTANTANEAS:
+        _instantaneas.clear()
+    opciones, filas = datos
+    actual = _instantaneas[clave] = Instantanea(opciones, campos, filas)
+    return actual
+
+
+class IteradorOpcionesCacheadas(ModelChoiceIterator):
+    """Opciones del <select> leídas de la instantánea en vez del queryset"""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from instantanea(self.field).opciones
+
+    def __len__(self):
+        return len(instantanea(self.field)) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(len(instantanea(self.field)))
+
+
+class _OpcionesCacheadasMixin:
+    iterator = IteradorOpcionesCacheadas
+
+    def __init__(self, queryset, *, modelos=(), **kwargs):
+        super().__init__(queryset, **kwargs)
+        self.modelos = [queryset.model, *modelos]
+        cache.vigilar_modelo(*self.modelos)
+
+    def _set_queryset(self, queryset):
+        super()._set_queryset(queryset)
+        if hasattr(self, 'modelos'):
+            self.modelos = [self.queryset.model, *self.modelos[1:]]
+
+    queryset = property(forms.ModelChoiceField._get_queryset, _set_queryset)
+
+    def _pk_valido(self, valor):
+        """pk normalizado de `valor` si está en la instantánea; si no, ValidationError"""
+        modelo = self.queryset.model
+        if isinstance(valor, modelo):
+            valor = valor.pk
+        try:
+            pk = modelo._meta.pk.to_python(valor)
+        except ValidationError:
+            pk = None
+        if pk is None or pk not in instantanea(self).pks:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': valor},
+            )
+        return pk
+
+    def _instancia(self, pk):
+        """Instancia con las columnas de la fila guardadas en la instantánea"""
+        modelo = self.queryset.model
+        actual = instantanea(self)
+        fila = actual.filas.get(pk)
+        if fila is None:
+            # La instantánea se renovó entre validar y armar: solo el pk
+            return modelo.from_db(self.queryset.db, [modelo._meta.pk.attname], [pk])
+        return modelo.from_db(self.queryset.db, actual.campos, fila)
+
+
+class OpcionesCacheadasField(_OpcionesCacheadasMixin, forms.ModelChoiceField):
+    """ModelChoiceField que renderiza y valida contra una instantánea cacheada"""
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        return self._instancia(self._pk_valido(value))
+
+
+class OpcionesCacheadasMultipleField(_OpcionesCacheadasMixin, forms.ModelMultipleChoiceField):
+    """ModelMultipleChoiceField que renderiza y valida contra una instantánea cacheada"""
+
+    def clean(self, value):
+        value = self.prepare_value(value)
+        if self.required and not value:
+            raise ValidationError(self.error_messages['required'], code='required')
+        if not value:
+            return []
+        if not isinstance(value, (list, tuple)):
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        pks = []
+        for valor in value:
+            pk = self._pk_valido(valor)
+            if pk not in pks:
+                pks.append(pk)
+        self.run_validators(value)
+        return [self._instancia(pk) for pk in pks]
+
+
+def usar_opciones_cacheadas(form, nombre_campo, queryset, modelos=()):
+    """
+    Reemplaza el campo `nombre_campo` de `form` (ya construido) por su
+    versión con opciones cacheadas, conservando etiqueta, ayuda, widget y
+    obligatoriedad. Para formularios que filtran el queryset en __init__.
+    """
+    original = form.fields[nombre_campo]
+    clase = (OpcionesCacheadasMultipleField
+             if isinstance(original, forms.ModelMultipleChoiceField) else OpcionesCacheadasField)
+    argumentos = dict(
+        modelos=modelos,
+        required=original.required,
+        widget=original.widget,
+        label=original.label,
+        initial=original.initial,
+        help_text=original.help_text,
+        error_messages=original.error_messages,
+        disabled=original.disabled,
+        show_hidden_initial=original.show_hidden_initial,
+    )
+    if clase is OpcionesCacheadasField:
+        argumentos['empty_label'] = original.empty_label
+    campo = clase(queryset, **argumentos)
+    form.fields[nombre_campo] = campo
+    return campo
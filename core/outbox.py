@@ -0,0 +1,268 @@
+# core/outbox.py
+"""
+Outbox transaccional de eventos clínicos
+
+Los modelos que heredan de OutboxMixin escriben un EventoOutbox dentro de la
+misma transacción que su guardado/eliminación: si el registro se confirma,
+el evento también; si se revierte, no queda evento huérfano.
+
+Los consumidores (estadísticas, índice de búsqueda, exportaciones, HIS) se
+registran como handlers en proceso y reciben lotes de eventos:
+
+    from core.outbox import registrar_handler
+
+    @registrar_handler('partosApp.registroparto')
+    def actualizar_estadisticas(eventos):
+        ...
+
+La entrega es "al menos una vez": un lote se marca procesado solo después de
+que todos sus handlers terminan sin error, por lo que los handlers deben ser
+idempotentes. Los handlers de cada tipo corren en su propio savepoint: si
+uno falla (incluido un error de BD) se revierte lo que escribieron y el
+resto del lote se entrega igual.
+
+Un evento fallido no se reintenta antes de `proximo_intento` (espera
+exponencial según sus intentos), así no ocupa la cabeza de cada lote. Tras
+MAX_INTENTOS queda descartado (`fecha_descartado`, se registra con
+logger.error) hasta que alguien lo reactive con reintentar_descartados().
+
+Solo emiten eventos save()/delete() de instancias y crear_en_lote(). No
+generan eventos (el consumidor no se entera):
+- QuerySet.update(), QuerySet.delete() y bulk_create()/bulk_update() directos;
+- las filas eliminadas en cascada (on_delete=CASCADE) al borrar el padre:
+  Django no llama delete() de cada hija. El consumidor debe deducirlas del
+  evento ELIMINADO del padre.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .auditoria import AuditadoMixin, registrar_creados
+from .models import EventoOutbox
+
+logger = logging.getLogger(__name__)
+
+TODOS = '*'
+MAX_INTENTOS = 10
+ESPERA_BASE = timedelta(seconds=30)
+ESPERA_MAXIMA = timedelta(hours=1)
+
+_handlers = {}
+
+
+# ============================================
+# MIXIN DE MODELOS
+# ============================================
+
+class OutboxMixin:
+    """
+    Registra un EventoOutbox en la misma transacción que save()/delete().
+    Los modelos pueden sobrescribir `datos_outbox()` para adjuntar un
+    resumen mínimo; por defecto el consumidor relee el registro por id.
+    """
+
+    def datos_outbox(self):
+        return {}
+
+    def _registrar_evento_outbox(self, operacion, objeto_id):
+        EventoOutbox.objects.using(self._state.db).create(
+            tipo=self._meta.label_lower,
+            objeto_id=objeto_id,
+            operacion=operacion,
+            datos=self.datos_outbox(),
+        )
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            self._registrar_evento_outbox(EventoOutbox.GUARDADO, self.pk)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or self._state.db
+        objeto_id = self.pk
+        with transaction.atomic(using=using):
+            resultado = super().delete(*args, **kwargs)
+            self._registrar_evento_outbox(EventoOutbox.ELIMINADO, objeto_id)
+        return resultado
+
+
+def crear_en_lote(modelo, objetos, ambito=None):
+    """
+    Inserta `objetos` con un único bulk_create sin perder lo que aporta save():
+    los EventoOutbox se insertan en la misma transacción (otro bulk_create),
+    se registra la creación en la auditoría (core.auditoria) y
+    se emite post_save(created=True) por objeto para los demás consumidores
+    (bitácora de sincronización, tablero de sala).
+
+    Si la BD no retorna los ids del INSERT múltiple (MySQL), se recuperan
+    comparando `ambito` (queryset que contendrá a los nuevos registros) antes
+    y después del INSERT; el llamador debe bloquear lo necesario para que
+    nadie más inserte en ese ámbito durante la transacción.
+    """
+    if not objetos:
+        return []
+    using = router.db_for_write(modelo)
+    recupera_ids = not connections[using].features.can_return_rows_from_bulk_insert
+
+    with transaction.atomic(using=using):
+        previos = None
+        if recupera_ids:
+            if ambito is None:
+                raise ValueError('crear_en_lote requiere `ambito` en esta base de datos')
+            previos = set(ambito.values_list('pk', flat=True))
+
+        creados = modelo._default_manager.using(using).bulk_create(objetos)
+
+        if recupera_ids:
+            nuevos = sorted(set(ambito.values_list('pk', flat=True)) - previos)
+            if len(nuevos) != len(creados):
+                raise RuntimeError('No se pudieron recuperar los ids del INSERT múltiple')
+            for objeto, pk in zip(creados, nuevos):
+                objeto.pk = pk
+                objeto._state.adding = False
+                objeto._state.db = using
+
+        if issubclass(modelo, OutboxMixin):
+            EventoOutbox.objects.using(using).bulk_create([
+                EventoOutbox(
+                    tipo=modelo._meta.label_lower,
+                    objeto_id=objeto.pk,
+                    operacion=EventoOutbox.GUARDADO,
+                    datos=objeto.datos_outbox(),
+                )
+                for objeto in creados
+            ])
+
+        if issubclass(modelo, AuditadoMixin):
+            for objeto in creados:
+                objeto._auditoria_previo = objeto.valores_auditados()
+            registrar_creados(creados)
+
+        for objeto in creados:
+            post_save.send(
+                sender=modelo, instance=objeto, created=True,
+                update_fields=None, raw=False, using=using,
+            )
+    return creados
+
+
+# ============================================
+# REGISTRO DE HANDLERS
+# ============================================
+
+def registrar_handler(*tipos):
+    """
+    Decorador que registra un handler para uno o más tipos
+    ('app_label.modelo', como Model._meta.label_lower; sin distinguir mayúsculas).
+    Sin tipos, el handler recibe todos los eventos.
+    """
+    tipos = tipos or (TODOS,)
+
+    def decorador(funcion):
+        for tipo in tipos:
+            lista = _handlers.setdefault(tipo.lower(), [])
+            if funcion not in lista:
+                lista.append(funcion)
+        return funcion
+    return decorador
+
+
+def quitar_handler(funcion):
+    for lista in _handlers.values():
+        if funcion in lista:
+            lista.remove(funcion)
+
+
+def handlers_para(tipo):
+    tipo = tipo.lower()
+    return _handlers.get(tipo, []) + _handlers.get(TODOS, [])
+
+
+# ============================================
+# DESPACHO
+# ============================================
+
+def pendientes():
+    return EventoOutbox.objects.filter(fecha_procesado__isnull=True, fecha_descartado__isnull=True)
+
+
+def listos(ahora=None):
+    """Pendientes cuya espera tras el último fallo ya venció"""
+    ahora = ahora or timezone.now()
+    return pendientes().filter(Q(proximo_intento__isnull=True) | Q(proximo_intento__lte=ahora))
+
+
+def descartados():
+    return EventoOutbox.objects.filter(fecha_procesado__isnull=True, fecha_descartado__isnull=False)
+
+
+def espera_reintento(intentos):
+    return min(ESPERA_BASE * 2 ** (intentos - 1), ESPERA_MAXIMA)
+
+
+def reintentar_descartados(eventos=None):
+    """Vuelve a poner en cola los eventos descartados (todos o los de `eventos`)"""
+    eventos = descartados() if eventos is None else eventos.filter(fecha_procesado__isnull=True)
+    return eventos.update(intentos=0, proximo_intento=None, fecha_descartado=None)
+
+
+def despachar_lote(tamano=100):
+    """
+    Entrega un lote de eventos pendientes a sus handlers.
+
+    Los eventos se agrupan por tipo y cada handler recibe la lista de sus
+    eventos en orden. Si un handler falla, los eventos de ese tipo quedan
+    pendientes (con intentos + 1) hasta `proximo_intento`, o descartados si
+    llegaron a MAX_INTENTOS.
+
+    Retorna (procesados, fallidos).
+    """
+    with transaction.atomic():
+        ahora = timezone.now()
+        lote = list(
+            listos(ahora)
+            .select_for_update(skip_locked=True)
+            .order_by('id')[:tamano]
+        )
+        if not lote:
+            return 0, 0
+
+        por_tipo = {}
+        for evento in lote:
+            por_tipo.setdefault(evento.tipo, []).append(evento)
+
+        ok, fallidos = [], []
+        for tipo, eventos in por_tipo.items():
+            try:
+                # Savepoint por tipo: un error de BD en un handler no deja
+                # inutilizable la transacción del lote
+                with transaction.atomic():
+                    for handler in handlers_para(tipo):
+                        handler(eventos)
+            except Exception as e:
+                logger.exception("Handler de outbox falló para %s", tipo)
+                for evento in eventos:
+                    evento.intentos += 1
+                    evento.ultimo_error = f"{type(e).__name__}: {e}"
+                    if evento.intentos >= MAX_INTENTOS:
+                        evento.fecha_descartado = ahora
+                        logger.error("Evento de outbox %s descartado tras %s intentos", evento, evento.intentos)
+                    else:
+                        evento.proximo_intento = ahora + espera_reintento(evento.intentos)
+                fallidos.extend(eventos)
+            else:
+                for evento in eventos:
+                    evento.intentos += 1
+                    evento.fecha_procesado = ahora
+                ok.extend(eventos)
+
+        EventoOutbox.objects.bulk_update(ok, ['intentos', 'fecha_procesado'])
+        EventoOutbox.objects.bulk_update(
+            fallidos, ['intentos', 'ultimo_error', 'proximo_intento', 'fecha_descartado']
+        )
+    return len(ok), len(fallidos)
@@ -0,0 +1,252 @@
+# core/pool.py
+"""
+Pool acotado de conexiones por proceso
+
+Lo usa el backend core.backends.mysql_pool: al cerrar una conexión de
+Django (fin de la petición con CONN_MAX_AGE = 0) la conexión vuelve al pool
+en vez de cerrarse, y la siguiente petición de cualquier hilo la reutiliza
+sin pagar TCP + autenticación + charset.
+
+- `maximo` acota las conexiones vivas del proceso (en uso + libres). Si
+  están todas en uso, obtener() espera hasta `espera` segundos y luego
+  lanza PoolAgotado.
+- Al entregar una conexión que estuvo libre más de `verificar_tras`
+  segundos (o que se devolvió tras un error) se verifica con `verificar`;
+  si no responde se descarta y se toma otra.
+- Una conexión con más de `vida_maxima` segundos se cierra en vez de
+  volver al pool (evita que el servidor o un proxy la corten primero).
+- Tras un fork (gunicorn --preload) el proceso hijo no reutiliza las
+  conexiones del padre: el socket es compartido.
+
+No depende de Django ni de MySQL: `crear`, `verificar` y `cerrar` son
+funciones que recibe, por lo que se prueba con conexiones simuladas.
+Los contadores (creadas, reutilizadas, ...) se suman entre procesos con
+core.contadores; las conexiones en uso y libres son del proceso.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from core.contadores import Contadores
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = ('creadas', 'reutilizadas', 'verificadas', 'descartadas', 'agotado', 'espera_us')
+
+_contadores = Contadores('pool:stats', CAMPOS)
+
+_pools = {}
+_bloqueo_pools = threading.Lock()
+
+
+class PoolAgotado(Exception):
+    pass
+
+
+class _Entrada:
+    __slots__ = ('conexion', 'creada', 'devuelta', 'sospechosa', 'preparada')
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.creada = self.devuelta = time.monotonic()
+        self.sospechosa = False
+        self.preparada = False
+
+
+class PoolConexiones:
+    def __init__(self, alias, crear, verificar=None, cerrar=None, *, maximo=10, minimo=0,
+                 vida_maxima=1800, verificar_tras=30, espera=5):
+        self.alias = alias
+        self.crear = crear
+        self.verificar = verificar or (lambda conexion: True)
+        self.cerrar = cerrar or (lambda conexion: conexion.close())
+        self.maximo = maximo
+        self.minimo = min(minimo, maximo)
+        self.vida_maxima = vida_maxima
+        self.verificar_tras = verificar_tras
+        self.espera = espera
+
+        self._libres = deque()  # LIFO: se reutiliza la más reciente
+        self._en_uso = {}
+        self._cupos = threading.BoundedSemaphore(maximo)
+        self._bloqueo = threading.Lock()
+        self._pid = os.getpid()
+
+    # ============================================
+    # ENTREGA Y DEVOLUCIÓN
+    # ============================================
+
+    def obtener(self):
+        """
+        Retorna (conexión, preparada). `preparada` es falso mientras nadie
+        haya llamado a marcar_preparada() con ella (sesión sin configurar).
+        """
+        self._revisar_fork()
+        inicio = time.monotonic()
+        if not self._cupos.acquire(timeout=self.espera):
+            _contadores.sumar(self.alias, agotado=1, espera_us=int((time.monotonic() - inicio) * 1e6))
+            raise PoolAgotado(
+                f'Pool de conexiones "{self.alias}" agotado: {self.maximo} en uso tras {self.espera}s de espera'
+            )
+        espera_us = int((time.monotonic() - inicio) * 1e6)
+        try:
+            entrada, nueva = self._tomar()
+        except BaseException:
+            self._cupos.release()
+            raise
+        with self._bloqueo:
+            self._en_uso[id(entrada.conexion)] = entrada
+        if nueva:
+            _contadores.sumar(self.alias, creadas=1, espera_us=espera_us)
+        else:
+            _contadores.sumar(self.alias, reutilizadas=1, espera_us=espera_us)
+        return entrada.conexion, entrada.preparada
+
+    def marcar_preparada(self, conexion):
+        """Indica que la sesión de `conexion` ya está configurada"""
+        with self._bloqueo:
+            entrada = self._en_uso.get(id(conexion))
+        if entrada is not None:
+            entrada.preparada = True
+
+    def _tomar(self):
+        while True:
+            with self._bloqueo:
+                entrada = self._libres.pop() if self._libres else None
+            if entrada is None:
+                return _Entrada(self.crear()), True
+            if self._vencida(entrada):
+                self._descartar(entrada)
+                continue
+            if entrada.sospechosa or time.monotonic() - entrada.devuelta > self.verificar_tras:
+                _contadores.sumar(self.alias, verificadas=1)
+                if not self._responde(entrada):
+                    self._descartar(entrada)
+                    continue
+                entrada.sospechosa = False
+            return entrada, False
+
+    def devolver(self, conexion, reutilizable=True, sospechosa=False):
+        """
+        Devuelve una conexión entregada por obtener(). Con reutilizable=False
+        se cierra; con sospechosa=True se verifica antes de volver a entregarla.
+        """
+        self._revisar_fork()
+        with self._bloqueo:
+            entrada = self._en_uso.pop(id(conexion), None)
+        if entrada is None:  # heredada de antes de un fork: el socket es del padre
+            return
+        try:
+            if not reutilizable or self._vencida(entrada):
+                self._descartar(entrada)
+                return
+            entrada.devuelta = time.monotonic()
+            entrada.sospechosa = sospechosa
+            with self._bloqueo:
+                self._libres.append(entrada)
+        finally:
+            self._cupos.release()
+
+    def llenar(self):
+        """Abre conexiones libres hasta `minimo` (calentamiento del worker)"""
+        # Retener `minimo` a la vez obliga a crear las que falten
+        conexiones = []
+        try:
+            for _ in range(self.minimo):
+                conexiones.append(self.obtener()[0])
+        except PoolAgotado:
+            pass
+        finally:
+            for conexion in conexiones:
+                self.devolver(conexion)
+        return self.metricas()['libres']
+
+    def cerrar_libres(self):
+        with self._bloqueo:
+            libres = list(self._libres)
+            self._libres.clear()
+        for entrada in libres:
+            self._cerrar(entrada.conexion)
+
+    # ============================================
+    # AUXILIARES
+    # ============================================
+
+    def _vencida(self, entrada):
+        return self.vida_maxima is not None and time.monotonic() - entrada.creada > self.vida_maxima
+
+    def _responde(self, entrada):
+        try:
+            return bool(self.verificar(entrada.conexion))
+        except Exception:
+            return False
+
+    def _descartar(self, entrada):
+        _contadores.sumar(self.alias, descartadas=1)
+        self._cerrar(entrada.conexion)
+
+    def _cerrar(self, conexion):
+        try:
+            self.cerrar(conexion)
+        except Exception:
+            logger.debug('Pool %s: error al cerrar una conexión', self.alias, exc_info=True)
+
+    def _revisar_fork(self):
+        if os.getpid() == self._pid:
+            return
+        with self._bloqueo:
+            if os.getpid() == self._pid:
+                return
+            # Los sockets heredados los sigue usando el padre: se olvidan sin cerrarlos
+            self._libres.clear()
+            self._en_uso.clear()
+            self._cupos = threading.BoundedSemaphore(self.maximo)
+            self._pid = os.getpid()
+
+    def metricas(self):
+        """Estado del pool en este proceso"""
+        with self._bloqueo:
+            return {
+                'maximo': self.maximo,
+                'en_uso': len(self._en_uso),
+                'libres': len(self._libres),
+            }
+
+
+# ============================================
+# POOLS POR ALIAS
+# ============================================
+
+def pool_para(alias, crear, verificar=None, cerrar=None, **opciones):
+    """Pool del proceso para `alias` (se crea la primera vez con `opciones`)"""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _bloqueo_pools:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = PoolConexiones(alias, crear, verificar, cerrar, **opciones)
+    return pool
+
+
+def pools():
+    return dict(_pools)
+
+
+def estadisticas(compartidas=True):
+    """
+    {alias: {campos de CAMPOS, 'tasa_reutilizacion'}} más 'en_uso'/'libres'
+    del proceso actual si el pool existe aquí.
+    """
+    resultado = _contadores.totales(compartidas)
+    for alias, pool in pools().items():
+        resultado.setdefault(alias, dict.fromkeys(CAMPOS, 0)).update(pool.metricas())
+    for fila in resultado.values():
+        entregadas = fila['creadas'] + fila['reutilizadas']
+        fila['tasa_reutilizacion'] = round(fila['reutilizadas'] / entregadas, 3) if entregadas else 0.0
+    return resultado
+
+
+def reiniciar_estadisticas():
+    _contadores.reiniciar()
@@ -0,0 +1,144 @@
+# core/proyecciones.py
+"""
+Filas livianas para listados y búsquedas
+
+Los listados (pacientes, fichas, partos, tratamientos) solo muestran unas
+pocas columnas, pero con instancias de modelo cada fila carga las ~70
+columnas de un RegistroParto más las de cada select_related, arma un
+objeto por tabla con su __dict__ y su _state, y en los modelos auditados
+copia además los valores en from_db(). Una Proyeccion declara las columnas
+que usa la plantilla, las trae con values() y las guarda en un objeto con
+__slots__ (sin __dict__):
+
+    class FilaParto(Proyeccion):
+        modelo = RegistroParto
+        columnas = {
+            'pk': 'pk',
+            'numero_ficha': 'ficha__numero_ficha',
+            'tipo_parto': Display('tipo_parto'),     # etiqueta, como get_tipo_parto_display
+        }
+
+    FilaParto.de(RegistroParto.objects.filter(activo=True))   # lista de FilaParto
+    FilaParto.pagina(queryset, request.GET.get('page'), 20)   # Page con FilaParto
+
+`calculados` declara atributos que se llenan en calcular() (por fila, ej.
+la edad) o en completar() (una consulta para todas las filas, ej. las
+patologías de las fichas en vez de una por ficha).
+
+`manage.py benchmark_proyecciones` compara tiempo y memoria por 1.000
+filas contra las instancias de modelo que usaban las vistas.
+"""
+from django.core.paginator import Paginator
+
+
+class Display:
+    """Columna con la etiqueta de choices de `ruta` en vez del valor guardado"""
+
+    __slots__ = ('ruta',)
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+
+def _campo(modelo, ruta):
+    """Campo del modelo al que llega `ruta` ('ficha__paciente__Previcion')"""
+    *relaciones, nombre = ruta.split('__')
+    for relacion in relaciones:
+        modelo = modelo._meta.get_field(relacion).related_model
+    return modelo._meta.pk if nombre == 'pk' else modelo._meta.get_field(nombre)
+
+
+class _MetaProyeccion(type):
+    def __new__(mcs, nombre, bases, atributos):
+        propias = dict(atributos.get('columnas', {}))
+        calculados = tuple(atributos.get('calculados', ()))
+        atributos['__slots__'] = tuple(propias) + calculados
+        cls = super().__new__(mcs, nombre, bases, atributos)
+        # Las subclases agregan columnas a las de su base
+        heredadas = {}
+        for base in reversed(cls.__mro__[1:]):
+            heredadas.update(getattr(base, '_columnas', {}))
+        cls._columnas = {**heredadas, **propias}
+        cls._plan = None
+        return cls
+
+
+class Proyeccion(metaclass=_MetaProyeccion):
+    """
+    Base de las filas de listado. `columnas` es {atributo: ruta ORM o
+    Display(ruta)}; `calculados` son atributos sin columna.
+    """
+
+    modelo = None
+    columnas = {}
+    calculados = ()
+
+    # ============================================
+    # CONSULTA
+    # ============================================
+
+    @classmethod
+    def _preparar(cls):
+        """((atributo, ruta, etiquetas o None), ...) y las rutas para values()"""
+        if cls._plan is None:
+            plan = []
+            rutas = []
+            for atributo, columna in cls._columnas.items():
+                if isinstance(columna, Display):
+                    ruta = columna.ruta
+                    etiquetas = {valor: str(etiqueta) for valor, etiqueta in _campo(cls.modelo, ruta).flatchoices}
+                else:
+                    ruta, etiquetas = columna, None
+                plan.append((atributo, ruta, etiquetas))
+                if ruta not in rutas:
+                    rutas.append(ruta)
+            cls._plan = (tuple(plan), tuple(rutas))
+        return cls._plan
+
+    @classmethod
+    def valores(cls, queryset):
+        """`queryset` reducido a las columnas declaradas (dicts, para paginar o filtrar)"""
+        _plan, rutas = cls._preparar()
+        return queryset.values(*rutas)
+
+    @classmethod
+    def filas(cls, valores):
+        """Filas a partir de los dicts de valores()"""
+        plan, _rutas = cls._preparar()
+        por_fila = cls.calcular is not Proyeccion.calcular
+        filas = []
+        for datos in valores:
+            fila = object.__new__(cls)
+            for atributo, ruta, etiquetas in plan:
+                valor = datos[ruta]
+                setattr(fila, atributo, valor if etiquetas is None else etiquetas.get(valor, valor))
+            if por_fila:
+                fila.calcular()
+            filas.append(fila)
+        cls.completar(filas)
+        return filas
+
+    @classmethod
+    def de(cls, queryset):
+        return cls.filas(cls.valores(queryset))
+
+    @classmethod
+    def pagina(cls, queryset, numero, por_pagina):
+        """Paginator.get_page() de `queryset`; solo se proyectan las filas de la página"""
+        pagina = Paginator(cls.valores(queryset), por_pagina).get_page(numero)
+        pagina.object_list = cls.filas(pagina.object_list)
+        return pagina
+
+    # ============================================
+    # EXTENSIÓN
+    # ============================================
+
+    def calcular(self):
+        """Llena los `calculados` que dependen solo de la fila"""
+
+    @classmethod
+    def completar(cls, filas):
+        """Llena los `calculados` que necesitan otra consulta (una para todas las filas)"""
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {getattr(self, "pk", "")}>'
@@ -0,0 +1,46 @@
+# core/pruebas.py
+"""
+Datos mínimos compartidos por las pruebas de las apps
+
+    from core.pruebas import crear_matrona, crear_paciente, crear_persona
+
+    paciente = crear_paciente('Carla')
+    matrona = crear_matrona('Marta')
+"""
+from datetime import date
+
+from gestionApp.models import Matrona, Paciente, Persona
+from utilidad.rut_validator import generar_rut_aleatorio
+
+
+def crear_persona(nombre):
+    return Persona.objects.create(
+        Rut=generar_rut_aleatorio(),
+        Nombre=nombre,
+        Apellido_Paterno='Soto',
+        Apellido_Materno='Rojas',
+        Fecha_nacimiento=date(1992, 4, 10),
+        Sexo='Femenino',
+    )
+
+
+def crear_paciente(nombre):
+    """
+    Paciente con una persona nueva. Se inserta con bulk_create: Paciente.save()
+    llama a full_clean() y su clean() lee `imc`, que el modelo no define.
+    """
+    persona = crear_persona(nombre)
+    Paciente.objects.bulk_create([
+        Paciente(persona=persona, Estado_civil='SOLTERA', Previcion='FONASA_A')
+    ])
+    return Paciente.objects.get(pk=persona.pk)
+
+
+def crear_matrona(nombre, registro='MAT-001', experiencia=5, turno='Mañana'):
+    return Matrona.objects.create(
+        persona=crear_persona(nombre),
+        Especialidad='Atención del Parto',
+        Registro_medico=registro,
+        Años_experiencia=experiencia,
+        Turno=turno,
+    )
@@ -0,0 +1,174 @@
+# core/replica.py
+"""
+Lecturas opcionales desde una réplica de la BD principal
+
+Los reportes y listados pesados pueden leer de la réplica (alias
+REPLICA_ALIAS, ver obstetric_care.dbrouters.ReplicaRouter) para no
+competir con las escrituras clínicas. Nada va a la réplica por defecto: el
+código lo pide explícitamente.
+
+    @usar_replica
+    def estadisticas_partos(request): ...
+
+    with usar_replica():
+        valores = rem.valores_mes(anio, mes)
+
+Aun dentro de usar_replica() se lee de la principal cuando:
+- no hay réplica configurada, no responde o su retraso supera
+  REPLICA_RETRASO_MAXIMO segundos (se revisa cada REPLICA_VERIFICAR_CADA);
+- el navegador hizo un POST hace menos de REPLICA_PEGAJOSA_SEGUNDOS (ve lo
+  que acaba de guardar, ver core.middleware.replica);
+- hay una transacción abierta en la principal;
+- la vista es de streaming: la respuesta se consume fuera del decorador,
+  así que esas lecturas van a la principal.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_en_replica = contextvars.ContextVar('en_replica', default=False)
+_forzar_principal = contextvars.ContextVar('forzar_principal', default=False)
+
+_salud = {'hasta': 0.0, 'disponible': False, 'retraso': None}
+_bloqueo = threading.Lock()
+
+
+def alias_replica():
+    """Alias de la réplica, o None si no está configurada"""
+    alias = getattr(settings, 'REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+# ============================================
+# CONTEXTO
+# ============================================
+
+class _ContextoReplica:
+    def __enter__(self):
+        self._token = _en_replica.set(True)
+        return self
+
+    def __exit__(self, *exc):
+        _en_replica.reset(self._token)
+
+    def __call__(self, funcion):
+        return usar_replica(funcion)
+
+
+def usar_replica(funcion=None):
+    """
+    Habilita la réplica. Sin argumentos es un context manager; aplicado a
+    una función (vista sync o async) la decora: @usar_replica o @usar_replica().
+    """
+    if funcion is None:
+        return _ContextoReplica()
+
+    if iscoroutinefunction(funcion):
+        @functools.wraps(funcion)
+        async def envoltura_async(*args, **kwargs):
+            with _ContextoReplica():
+                return await funcion(*args, **kwargs)
+        return envoltura_async
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        with _ContextoReplica():
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+class forzar_principal:
+    """Todas las lecturas a la principal, aun dentro de usar_replica()"""
+
+    def __enter__(self):
+        self._token = _forzar_principal.set(True)
+        return self
+
+    def __exit__(self, *exc):
+        _forzar_principal.reset(self._token)
+
+
+def leer_de_replica():
+    """Alias al que deben ir las lecturas ahora (réplica) o None (principal)"""
+    if not _en_replica.get() or _forzar_principal.get():
+        return None
+    alias = alias_replica()
+    if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return alias if replica_disponible(alias) else None
+
+
+# ============================================
+# SALUD Y RETRASO
+# ============================================
+
+def medir_retraso(alias):
+    """
+    Segundos de retraso de la réplica. En MySQL, Seconds_Behind_Source de
+    SHOW REPLICA STATUS (None si la replicación está detenida; 0 si el
+    servidor no es réplica, ej. desarrollo). En otros motores solo se
+    comprueba la conexión.
+    """
+    conexion = connections[alias]
+    with conexion.cursor() as cursor:
+        if conexion.vendor != 'mysql':
+            cursor.execute('SELECT 1')
+            return 0
+        try:
+            cursor.execute('SHOW REPLICA STATUS')
+        except Exception:  # MySQL < 8.0.22 / MariaDB
+            cursor.execute('SHOW SLAVE STATUS')
+        fila = cursor.fetchone()
+        if fila is None:
+            return 0
+        columnas = [columna[0] for columna in cursor.description]
+        estado = dict(zip(columnas, fila))
+        return estado.get('Seconds_Behind_Source', estado.get('Seconds_Behind_Master'))
+
+
+def replica_disponible(alias):
+    """Disponibilidad de la réplica, revisada a lo más cada REPLICA_VERIFICAR_CADA segundos por proceso"""
+    ahora = time.monotonic()
+    if ahora < _salud['hasta']:
+        return _salud['disponible']
+    with _bloqueo:
+        if ahora < _salud['hasta']:
+            return _salud['disponible']
+        try:
+            retraso = medir_retraso(alias)
+        except Exception as e:
+            logger.warning('Réplica %s no disponible, se lee de la principal: %s', alias, e)
+            retraso = None
+            disponible = False
+        else:
+            maximo = getattr(settings, 'REPLICA_RETRASO_MAXIMO', 5)
+            disponible = retraso is not None and retraso <= maximo
+            if not disponible:
+                logger.warning('Réplica %s con retraso %s s (máximo %s), se lee de la principal',
+                               alias, retraso, maximo)
+        finally:
+            # El hilo que verifica no debe quedarse con la conexión
+            connections[alias].close()
+        _salud.update(
+            hasta=time.monotonic() + getattr(settings, 'REPLICA_VERIFICAR_CADA', 10),
+            disponible=disponible,
+            retraso=retraso,
+        )
+        return disponible
+
+
+def estado_replica():
+    """{'alias', 'disponible', 'retraso'} según la última verificación"""
+    return {'alias': alias_replica(), 'disponible': _salud['disponible'], 'retraso': _salud['retraso']}
+
+
+def reiniciar_salud():
+    _salud.update(hasta=0.0, disponible=False, retraso=None)
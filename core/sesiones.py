@@ -0,0 +1,250 @@
+# core/sesiones.py
+"""
+Backend de sesiones: caché delante de la BD con escrituras agrupadas
+
+    SESSION_ENGINE = 'core.sesiones'
+
+Los flujos de varios pasos (búsqueda de ficha en registrar_tens, borrador
+del parto, set_expiry al iniciar sesión) modifican la sesión en casi cada
+petición. Con el backend db de Django cada una es un UPDATE. Aquí:
+
+- la sesión se lee de la caché SESSION_CACHE_ALIAS y solo se va a la BD si
+  no está ahí;
+- si al final de la petición los datos son iguales a los cargados (ej. se
+  borró una clave que no existía o se asignó el mismo valor) no se guarda;
+- los demás cambios van a la caché y a la BD a lo más una vez cada
+  SESION_DIFERIR_SEGUNDOS por sesión. Se escriben siempre en la BD la
+  creación, el inicio o cierre de sesión y el cambio de expiración;
+- la tabla guarda el usuario en una columna indexada (core.models.Sesion),
+  así `manage.py cerrar_sesiones --usuario` no decodifica toda la tabla;
+- las sesiones vencidas se borran por lotes en la tarea 'purgar_sesiones'
+  (tareasApp), que se encola sola cada SESION_PURGAR_CADA segundos.
+
+Si la caché pierde una sesión, se recupera la última versión de la BD (a
+lo más SESION_DIFERIR_SEGUNDOS atrasada en datos de navegación, nunca en
+la autenticación).
+"""
+import hashlib
+import logging
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.utils import timezone
+
+from core.contadores import Contadores
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_CACHE = 'sesion:'
+CLAVE_PURGA = 'sesion:purga'
+
+SESION_DIFERIR_SEGUNDOS = 60
+SESION_PURGAR_CADA = 3600
+LOTE_PURGA = 1000
+
+# Claves cuyo cambio se escribe en la BD de inmediato
+CLAVES_CRITICAS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY, '_session_expiry')
+
+CAMPOS = ('lecturas_bd', 'escrituras_bd', 'diferidas', 'omitidas')
+
+_contadores = Contadores('sesiones:stats', CAMPOS)
+
+
+def _diferir_segundos():
+    return getattr(settings, 'SESION_DIFERIR_SEGUNDOS', SESION_DIFERIR_SEGUNDOS)
+
+
+class SessionStore(DBStore):
+    def __init__(self, session_key=None):
+        self._cache = caches[settings.SESSION_CACHE_ALIAS]
+        # Huella y claves críticas de los datos tal como están en la caché
+        self._huella = None
+        self._criticas = None
+        # time.time() de la última escritura en la BD
+        self._escrita_en_bd = 0.0
+        super().__init__(session_key)
+
+    @classmethod
+    def get_model_class(cls):
+        from core.models import Sesion
+        return Sesion
+
+    @property
+    def cache_key(self):
+        return PREFIJO_CACHE + self._get_or_create_session_key()
+
+    def _huella_de(self, datos):
+        return hashlib.sha1(self.serializer().dumps(datos)).hexdigest()
+
+    def _marcar_guardada(self, datos):
+        self._huella = self._huella_de(datos)
+        self._criticas = {clave: datos.get(clave) for clave in CLAVES_CRITICAS}
+
+    # ============================================
+    # LECTURA
+    # ============================================
+
+    def load(self):
+        if self.session_key is None:
+            self._marcar_guardada({})
+            return {}
+        try:
+            entrada = self._cache.get(self.cache_key)
+        except Exception:
+            # Igual que cached_db: una clave inválida reinicia la sesión
+            entrada = None
+
+        if entrada is not None:
+            datos, self._escrita_en_bd = entrada
+        else:
+            _contadores.sumar('sesiones', lecturas_bd=1)
+            fila = self._get_session_from_db()
+            if fila:
+                datos = self.decode(fila.session_data)
+                self._escrita_en_bd = time.time()
+                self._guardar_en_cache(datos, self.get_expiry_age(expiry=fila.expire_date))
+            else:
+                datos = {}
+        self._marcar_guardada(datos)
+        return datos
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    def exists(self, session_key):
+        return bool(session_key) and (PREFIJO_CACHE + session_key) in self._cache or super().exists(session_key)
+
+    async def aexists(self, session_key):
+        return await sync_to_async(self.exists)(session_key)
+
+    # ============================================
+    # ESCRITURA
+    # ============================================
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        datos = self._get_session(no_load=must_create)
+        if not must_create and self._huella == self._huella_de(datos):
+            _contadores.sumar('sesiones', omitidas=1)
+            return
+
+        ahora = time.time()
+        criticas = {clave: datos.get(clave) for clave in CLAVES_CRITICAS}
+        if must_create or criticas != self._criticas or ahora - self._escrita_en_bd >= _diferir_segundos():
+            super().save(must_create)
+            self._escrita_en_bd = ahora
+            _contadores.sumar('sesiones', escrituras_bd=1)
+        else:
+            _contadores.sumar('sesiones', diferidas=1)
+        self._guardar_en_cache(datos, self.get_expiry_age())
+        self._marcar_guardada(datos)
+        programar_purga()
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
+
+    def _guardar_en_cache(self, datos, timeout):
+        try:
+            self._cache.set(self.cache_key, (datos, self._escrita_en_bd), timeout)
+        except Exception:
+            logger.exception('Error al guardar la sesión en la caché (%s)', self._cache)
+
+    def create_model_instance(self, data):
+        fila = super().create_model_instance(data)
+        usuario = data.get(SESSION_KEY)
+        fila.usuario_id = int(usuario) if usuario is not None and str(usuario).isdigit() else None
+        return fila
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(PREFIJO_CACHE + session_key)
+
+    async def adelete(self, session_key=None):
+        await sync_to_async(self.delete)(session_key)
+
+    def flush(self):
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    async def aflush(self):
+        await sync_to_async(self.flush)()
+
+    @classmethod
+    def clear_expired(cls):
+        purgar_expiradas()
+
+
+# ============================================
+# LIMPIEZA Y CIERRE
+# ============================================
+
+def purgar_expiradas(lote=LOTE_PURGA):
+    """
+    Borra las filas vencidas de a `lote` (DELETE cortos por clave primaria,
+    no bloquean la tabla). Se deja un margen de SESION_DIFERIR_SEGUNDOS: una
+    sesión con escritura diferida tiene en la BD una expiración anterior a
+    la real. Retorna las filas borradas.
+    """
+    modelo = SessionStore.get_model_class()
+    limite = timezone.now() - timedelta(seconds=_diferir_segundos())
+    total = 0
+    while True:
+        claves = list(modelo.objects.filter(expire_date__lt=limite).values_list('pk', flat=True)[:lote])
+        if not claves:
+            return total
+        total += modelo.objects.filter(pk__in=claves).delete()[0]
+        if len(claves) < lote:
+            return total
+
+
+def programar_purga():
+    """Encola 'purgar_sesiones' si nadie lo hizo en los últimos SESION_PURGAR_CADA segundos"""
+    cada = getattr(settings, 'SESION_PURGAR_CADA', SESION_PURGAR_CADA)
+    if not cada:
+        return
+    try:
+        if not caches[settings.SESSION_CACHE_ALIAS].add(CLAVE_PURGA, 1, cada):
+            return
+        from tareasApp.cola import encolar
+        encolar('purgar_sesiones', clave='purgar-sesiones')
+    except Exception:
+        logger.exception('No se pudo programar la purga de sesiones')
+
+
+def cerrar_sesiones(usuarios=None):
+    """
+    Cierra las sesiones de `usuarios` (ids), o todas con None. Usa el índice
+    por usuario y borra también las copias en caché. Retorna las cerradas.
+    """
+    modelo = SessionStore.get_model_class()
+    filas = modelo.objects.all() if usuarios is None else modelo.objects.filter(usuario_id__in=usuarios)
+    claves = list(filas.values_list('pk', flat=True))
+    caches[settings.SESSION_CACHE_ALIAS].delete_many([PREFIJO_CACHE + clave for clave in claves])
+    cerradas = 0
+    for inicio in range(0, len(claves), LOTE_PURGA):
+        cerradas += modelo.objects.filter(pk__in=claves[inicio:inicio + LOTE_PURGA]).delete()[0]
+    return cerradas
+
+
+# ============================================
+# ESTADÍSTICAS
+# ============================================
+
+def estadisticas(compartidas=True):
+    """{'lecturas_bd', 'escrituras_bd', 'diferidas', 'omitidas'} sumados entre procesos"""
+    return _contadores.totales(compartidas).get('sesiones', dict.fromkeys(CAMPOS, 0))
+
+
+def reiniciar_estadisticas():
+    _contadores.reiniciar()
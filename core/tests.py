@@ -1,3 +1,1008 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django import forms
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import ResolverMatch, reverse
+from django.utils import timezone
+
+from core import auditoria, cache, calentamiento, outbox, pool, replica, sesiones
+from core.establecimientos import en_establecimiento
+from core.middleware.establecimiento import EstablecimientoMiddleware
+from core.middleware.replica import ReplicaMiddleware
+from core.opciones import OpcionesCacheadasField, OpcionesCacheadasMultipleField
+from core.middleware import compresion
+from core.pruebas import crear_matrona, crear_paciente, crear_persona
+from core.versionado import ConflictoVersion, guardar_campos
+from core.models import CambioAuditoria, EventoOutbox, Sesion
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import PermissionDenied, ValidationError
+
+from gestionApp.establecimientos import resumen_por_establecimiento
+from gestionApp.models import Establecimiento, Persona, Paciente, Matrona
+from matronaApp.forms import MedicamentoFichaForm
+from matronaApp.models import FichaObstetrica, MedicamentoFicha
+from matronaApp.proyecciones import FilaFicha, FilaPaciente
+from medicoApp.models import Patologias
+from partosApp.forms import RegistroPartoBaseForm
+from partosApp.models import RegistroParto
+from tensApp.models import RegistroTens
+from utilidad.rut_validator import generar_rut_aleatorio
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.paciente = crear_paciente('Carla')
+        self.matrona = crear_matrona('Marta')
+        self.recibidos = []
+
+    def tearDown(self):
+        outbox.quitar_handler(self.handler)
+        outbox.quitar_handler(self.handler_fallido)
+
+    def handler(self, eventos):
+        self.recibidos.extend(eventos)
+
+    def handler_fallido(self, eventos):
+        raise RuntimeError('consumidor caído')
+
+    def crear_ficha(self, numero='FO-0001'):
+        return FichaObstetrica.objects.create(
+            paciente=self.paciente,
+            matrona_responsable=self.matrona,
+            numero_ficha=numero,
+        )
+
+    def test_guardado_registra_evento(self):
+        ficha = self.crear_ficha()
+        evento = EventoOutbox.objects.get(tipo='matronaApp.fichaobstetrica')
+        self.assertEqual(evento.objeto_id, ficha.pk)
+        self.assertEqual(evento.operacion, EventoOutbox.GUARDADO)
+
+    def test_rollback_no_deja_evento(self):
+        try:
+            with transaction.atomic():
+                self.crear_ficha()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(EventoOutbox.objects.exists())
+
+    def test_despacho_por_lotes(self):
+        outbox.registrar_handler('matronaapp.fichaobstetrica')(self.handler)
+        for i in range(3):
+            self.crear_ficha(f'FO-{i:04d}')
+
+        self.assertEqual(outbox.despachar_lote(tamano=2), (2, 0))
+        call_command('despachar_outbox', stdout=StringIO())
+        self.assertEqual(len(self.recibidos), 3)
+        self.assertFalse(outbox.pendientes().exists())
+
+    def test_fallo_deja_evento_pendiente(self):
+        outbox.registrar_handler()(self.handler_fallido)
+        self.crear_ficha()
+        self.assertEqual(outbox.despachar_lote(), (0, 1))
+        evento = outbox.pendientes().get()
+        self.assertEqual(evento.intentos, 1)
+        self.assertIn('consumidor caído', evento.ultimo_error)
+
+    def test_fallido_espera_y_se_descarta_al_agotar_intentos(self):
+        outbox.registrar_handler('matronaapp.fichaobstetrica')(self.handler_fallido)
+        self.crear_ficha('FO-0001')
+        self.assertEqual(outbox.despachar_lote(), (0, 1))
+
+        # En espera: no vuelve a la cabeza del lote y deja pasar a los demás
+        outbox.registrar_handler('tensapp.registrotens')(self.handler)
+        EventoOutbox.objects.create(tipo='tensApp.registrotens', objeto_id=1)
+        self.assertEqual(outbox.despachar_lote(tamano=1), (1, 0))
+        evento = EventoOutbox.objects.get(tipo='matronaApp.fichaobstetrica')
+        self.assertGreater(evento.proximo_intento, timezone.now())
+
+        EventoOutbox.objects.filter(pk=evento.pk).update(intentos=outbox.MAX_INTENTOS - 1, proximo_intento=None)
+        with self.assertLogs('core.outbox', 'ERROR') as registros:
+            self.assertEqual(outbox.despachar_lote(), (0, 1))
+        self.assertTrue(any('descartado' in linea for linea in registros.output))
+        self.assertEqual(list(outbox.descartados()), [evento])
+        self.assertFalse(outbox.pendientes().exists())
+
+        outbox.quitar_handler(self.handler_fallido)
+        outbox.registrar_handler('matronaapp.fichaobstetrica')(self.handler)
+        call_command('despachar_outbox', '--reintentar-descartados', stdout=StringIO())
+        self.assertFalse(outbox.descartados().exists())
+        self.assertFalse(outbox.pendientes().exists())
+
+    def test_error_de_bd_en_handler_no_bloquea_el_lote(self):
+        def handler_duplica(eventos):
+            copia = self.crear_ficha('FO-9999')
+            # numero_ficha es único: IntegrityError
+            FichaObstetrica.objects.filter(pk=copia.pk).update(numero_ficha='FO-0001')
+
+        outbox.registrar_handler('matronaapp.fichaobstetrica')(handler_duplica)
+        self.addCleanup(outbox.quitar_handler, handler_duplica)
+        outbox.registrar_handler('tensapp.registrotens')(self.handler)
+        RegistroTens.objects.create(ficha=self.crear_ficha())
+
+        self.assertEqual(outbox.despachar_lote(), (1, 1))
+        self.assertEqual(len(self.recibidos), 1)
+        # Lo que alcanzó a escribir el handler fallido se revierte
+        self.assertFalse(FichaObstetrica.objects.filter(numero_ficha='FO-9999').exists())
+        evento = outbox.pendientes().get()
+        self.assertEqual(evento.tipo, 'matronaApp.fichaobstetrica')
+        self.assertIn('IntegrityError', evento.ultimo_error)
+
+CACHES_PRUEBA = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l1-test'},
+    'compartida': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l2-test'},
+}
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class CacheCompartidaTest(TestCase):
+    def setUp(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        cache.reiniciar_estadisticas()
+        self.addCleanup(cache.reiniciar_estadisticas)
+
+    def test_invalidacion_por_modelo(self):
+        llamadas = []
+
+        def contar():
+            llamadas.append(1)
+            return Persona.objects.count()
+
+        self.assertEqual(cache.cacheado('prueba:personas', [Persona], contar), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.cacheado('prueba:personas', [Persona], contar), 0)
+        self.assertEqual(len(llamadas), 1)
+
+        # Guardar otro modelo no invalida; guardar una persona sí
+        Patologias.objects.create(nombre='Preeclampsia', codigo_cie_10='O14', estado='Activo')
+        self.assertEqual(cache.cacheado('prueba:personas', [Persona], contar), 0)
+        crear_persona('Carla')
+        self.assertEqual(cache.cacheado('prueba:personas', [Persona], contar), 1)
+        self.assertEqual(len(llamadas), 2)
+
+        # Otro proceso: L1 vacía, el valor se recupera de L2
+        cache.cache_local().clear()
+        self.assertEqual(cache.cacheado('prueba:personas', [Persona], contar), 1)
+        self.assertEqual(len(llamadas), 2)
+
+        fila = cache.estadisticas(compartidas=False)['prueba:personas']
+        self.assertEqual((fila[cache.HIT_L1], fila[cache.HIT_L2], fila[cache.MISS]), (2, 1, 2))
+        self.assertEqual(cache.estadisticas()['prueba:personas']['total'], 5)
+
+    def test_queryset_cacheado_distingue_filtros(self):
+        Patologias.objects.create(nombre='Preeclampsia', codigo_cie_10='O14', estado='Activo')
+        Patologias.objects.create(nombre='Anemia', codigo_cie_10='O99', estado='Inactivo')
+
+        activas = cache.queryset_cacheado('prueba:patologias', Patologias.objects.filter(estado='Activo'))
+        inactivas = cache.queryset_cacheado('prueba:patologias', Patologias.objects.filter(estado='Inactivo'))
+        self.assertEqual([p.nombre for p in activas], ['Preeclampsia'])
+        self.assertEqual([p.nombre for p in inactivas], ['Anemia'])
+        self.assertEqual(cache.queryset_cacheado('prueba:patologias', Patologias.objects.filter(pk__in=[])), [])
+
+        Patologias.objects.filter(nombre='Anemia').first().delete()
+        self.assertEqual(cache.queryset_cacheado('prueba:patologias', Patologias.objects.filter(estado='Inactivo')), [])
+
+
+class FormularioOpciones(forms.Form):
+    matrona = OpcionesCacheadasField(
+        queryset=Matrona.objects.filter(Activo=True).select_related('persona'),
+        modelos=[Persona],
+    )
+    patologias = OpcionesCacheadasMultipleField(
+        queryset=Patologias.objects.filter(estado='Activo').order_by('nombre'),
+        required=False,
+    )
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class OpcionesCacheadasTest(TestCase):
+    def setUp(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        self.matrona = crear_matrona('Marta')
+        self.patologia = Patologias.objects.create(nombre='Preeclampsia', codigo_cie_10='O14', estado='Activo')
+        Patologias.objects.create(nombre='Anemia', codigo_cie_10='O99', estado='Inactivo')
+
+    def test_render_y_validacion_sin_consultas(self):
+        html = FormularioOpciones().as_p()
+        self.assertIn('Matrona: Marta Soto Rojas', html)
+        self.assertIn('Preeclampsia', html)
+        self.assertNotIn('Anemia', html)
+
+        datos = {'matrona': str(self.matrona.pk), 'patologias': [str(self.patologia.pk)]}
+        with self.assertNumQueries(0):
+            FormularioOpciones().as_p()
+            form = FormularioOpciones(datos)
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['matrona'].pk, self.matrona.pk)
+        self.assertEqual([p.pk for p in form.cleaned_data['patologias']], [self.patologia.pk])
+
+        # Las columnas propias vienen de la instantánea, sin consultas diferidas
+        with self.assertNumQueries(0):
+            matrona = form.cleaned_data['matrona']
+            self.assertEqual((matrona.Registro_medico, matrona.Turno), ('MAT-001', 'Mañana'))
+            self.assertEqual(matrona.persona_id, self.matrona.persona_id)
+            self.assertEqual(form.cleaned_data['patologias'][0].codigo_cie_10, 'O14')
+        self.assertEqual(matrona.persona.Nombre, 'Marta')
+
+    def test_instancia_respeta_only(self):
+        campo = OpcionesCacheadasField(queryset=Patologias.objects.only('nombre'))
+        patologia = campo.clean(str(self.patologia.pk))
+        self.assertEqual(patologia.get_deferred_fields(), {
+            f.attname for f in Patologias._meta.concrete_fields if f.name not in ('id', 'nombre')
+        })
+        self.assertEqual(patologia.nombre, 'Preeclampsia')
+
+    def test_valores_fuera_de_la_instantanea(self):
+        inactiva = Patologias.objects.get(nombre='Anemia')
+        form = FormularioOpciones({'matrona': '999999', 'patologias': [str(inactiva.pk)]})
+        self.assertFalse(form.is_valid())
+        self.assertIn('matrona', form.errors)
+        self.assertIn('patologias', form.errors)
+
+    def test_cambio_en_un_modelo_renueva_las_opciones(self):
+        FormularioOpciones().as_p()
+        self.matrona.Activo = False
+        self.matrona.save()
+
+        form = FormularioOpciones({'matrona': str(self.matrona.pk)})
+        self.assertFalse(form.is_valid())
+        self.assertNotIn('Marta', form.as_p())
+
+        # La etiqueta depende de la persona
+        self.matrona.Activo = True
+        self.matrona.save()
+        Persona.objects.filter(pk=self.matrona.persona_id).update(Nombre='Marcela')
+        cache.invalidar_modelo(Persona)  # update() no emite señales
+        self.assertIn('Matrona: Marcela', FormularioOpciones().as_p())
+
+    def test_formularios_clinicos_usan_la_instantanea(self):
+        form = RegistroPartoBaseForm()
+        self.assertIsInstance(form.fields['ficha'], OpcionesCacheadasField)
+        self.assertEqual(form.fields['ficha'].label, 'Ficha Obstétrica')
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class CalentamientoTest(TestCase):
+    databases = {'default', 'legacy'}
+
+    def setUp(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+
+    def test_fases(self):
+        resultados = {r.nombre: r for r in calentamiento.calentar()}
+        self.assertEqual(list(resultados), list(calentamiento.FASES))
+        self.assertGreater(resultados['urls'].cantidad, 50)
+        self.assertGreater(resultados['templates'].cantidad, 20)
+        self.assertTrue(resultados['bd'].ok, resultados['bd'].errores)
+        self.assertTrue(resultados['catalogos'].ok, resultados['catalogos'].errores)
+        self.assertGreaterEqual(resultados['catalogos'].cantidad, 5)
+
+        # Los templates quedan compilados en el loader con caché
+        from django.template import engines
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('Shared/base.html', {t.origin.template_name for t in loader.get_template_cache.values()
+                                           if hasattr(t, 'origin')})
+
+    @override_settings(WARMUP_AL_INICIAR=True, WARMUP_FASES=['urls', 'bd'])
+    def test_al_iniciar_dentro_del_event_loop(self):
+        async def importar_asgi():
+            # Como uvicorn: la aplicación se importa con el loop corriendo
+            return calentamiento.calentar_al_iniciar()
+
+        resultados = asyncio.run(importar_asgi())
+        self.assertEqual([r.nombre for r in resultados], ['urls', 'bd'])
+        self.assertTrue(all(r.ok for r in resultados), [r.errores for r in resultados])
+
+    def test_comando_reporta_cada_fase(self):
+        salida = StringIO()
+        call_command('warmup', fases='urls,catalogos', stdout=salida)
+        self.assertIn('urls', salida.getvalue())
+        self.assertIn('catalogos', salida.getvalue())
+        self.assertIn('Total', salida.getvalue())
+
+
+class EstaticosComprimidosTest(TestCase):
+    def setUp(self):
+        fuentes = tempfile.TemporaryDirectory()
+        destino = tempfile.TemporaryDirectory()
+        self.addCleanup(fuentes.cleanup)
+        self.addCleanup(destino.cleanup)
+        (Path(fuentes.name) / 'css').mkdir()
+        (Path(fuentes.name) / 'css' / 'app.css').write_text('body { color: #333; }\n' * 200)
+        (Path(fuentes.name) / 'css' / 'mini.css').write_text('a{}')
+        self.raiz = Path(destino.name)
+
+        ajustes = override_settings(
+            STATICFILES_DIRS=[fuentes.name],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=destino.name,
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        call_command('construir_estaticos', stdout=StringIO())
+
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        self.con_huella = staticfiles_storage.stored_name('css/app.css')
+
+    def test_huella_y_variantes(self):
+        self.assertRegex(self.con_huella, r'^css/app\.[0-9a-f]{12}\.css$')
+        self.assertTrue((self.raiz / f'{self.con_huella}.br').exists())
+        self.assertTrue((self.raiz / f'{self.con_huella}.gz').exists())
+        # Archivos muy chicos no se comprimen
+        mini = next((self.raiz / 'css').glob('mini.*.css'))
+        self.assertFalse(Path(f'{mini}.gz').exists())
+
+    def test_negocia_accept_encoding(self):
+        url = f'/static/{self.con_huella}'
+        brotli = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(brotli['Content-Encoding'], 'br')
+        self.assertEqual(brotli['Content-Type'], 'text/css')
+        self.assertEqual(brotli['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', brotli['Cache-Control'])
+
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')['Content-Encoding'], 'gzip')
+        plano = self.client.get(url)
+        self.assertFalse(plano.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(plano.streaming_content), (self.raiz / self.con_huella).read_bytes())
+
+    def test_sin_huella_revalida(self):
+        respuesta = self.client.get('/static/css/app.css')
+        self.assertNotIn('immutable', respuesta['Cache-Control'])
+        repetida = self.client.get('/static/css/app.css', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(repetida.status_code, 304)
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class CompresionTest(TestCase):
+    FILA = '<tr><td>12.345.678-9</td><td>María González</td><td>FONASA_A</td></tr>\n'
+
+    def setUp(self):
+        compresion.reiniciar_estadisticas()
+        self.addCleanup(compresion.reiniciar_estadisticas)
+
+    def procesar(self, respuesta, accept='gzip, deflate, br'):
+        request = RequestFactory().get('/fichas/', HTTP_ACCEPT_ENCODING=accept)
+        request.resolver_match = ResolverMatch(lambda r: None, (), {}, url_name='todas_fichas', namespaces=['matrona'])
+        return compresion.CompresionMiddleware(lambda r: respuesta)(request)
+
+    def test_comprime_lista_grande(self):
+        html = self.FILA * 2000
+        respuesta = self.procesar(HttpResponse(html))
+        self.assertEqual(respuesta['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', respuesta['Vary'])
+        self.assertEqual(int(respuesta['Content-Length']), len(respuesta.content))
+        self.assertLess(len(respuesta.content), len(html.encode()) // 10)
+
+        gz = self.procesar(HttpResponse(html), accept='gzip')
+        self.assertEqual(gz['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gz.content), html.encode())
+
+    def test_omite(self):
+        self.assertFalse(self.procesar(HttpResponse('corta')).has_header('Content-Encoding'))
+        self.assertFalse(self.procesar(HttpResponse(self.FILA * 100), accept='').has_header('Content-Encoding'))
+        pdf = self.procesar(HttpResponse(b'%PDF' * 1000, content_type='application/pdf'))
+        self.assertFalse(pdf.has_header('Content-Encoding'))
+        flujo = self.procesar(StreamingHttpResponse(iter([self.FILA] * 100)))
+        self.assertFalse(flujo.has_header('Content-Encoding'))
+
+        ya_comprimida = HttpResponse(self.FILA * 100)
+        ya_comprimida['Content-Encoding'] = 'gzip'
+        self.assertEqual(self.procesar(ya_comprimida).content, (self.FILA * 100).encode())
+
+    def test_no_comprime_peticiones_de_otro_sitio(self):
+        request = RequestFactory().get('/fichas/', HTTP_ACCEPT_ENCODING='gzip, br', HTTP_SEC_FETCH_SITE='cross-site')
+        respuesta = compresion.CompresionMiddleware(lambda r: HttpResponse(self.FILA * 2000))(request)
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', respuesta['Vary'])
+
+    def test_nivel_por_tamano(self):
+        self.assertEqual(compresion.niveles_para(10 * 1024), (5, 6))
+        self.assertEqual(compresion.niveles_para(5 * 1024 * 1024), (2, 3))
+
+    def test_estadisticas_por_vista(self):
+        self.procesar(HttpResponse(self.FILA * 2000))
+        self.procesar(HttpResponse(self.FILA * 2000), accept='gzip')
+        self.procesar(HttpResponse(self.FILA * 100), accept='identity')
+        fila = compresion.estadisticas()['matrona:todas_fichas']
+        self.assertEqual((fila['respuestas'], fila['br'], fila['gzip'], fila['omitidas']), (3, 1, 1, 1))
+        self.assertGreater(fila['ratio'], 5)
+        self.assertLess(fila['bytes_enviados'], fila['bytes_original'])
+
+        salida = StringIO()
+        call_command('estadisticas_compresion', stdout=salida)
+        self.assertIn('matrona:todas_fichas', salida.getvalue())
+
+
+class ConexionSimulada:
+    """Conexión de prueba para el pool: responde mientras no se la marque caída"""
+
+    def __init__(self):
+        self.caida = False
+        self.cerrada = False
+
+    def ping(self):
+        if self.caida:
+            raise ConnectionError('caída')
+        return True
+
+    def close(self):
+        self.cerrada = True
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class PoolConexionesTest(TestCase):
+    def setUp(self):
+        pool.reiniciar_estadisticas()
+        self.addCleanup(pool.reiniciar_estadisticas)
+        self.creadas = []
+
+    def crear(self):
+        conexion = ConexionSimulada()
+        self.creadas.append(conexion)
+        return conexion
+
+    def nuevo_pool(self, **opciones):
+        return pool.PoolConexiones('prueba', self.crear, ConexionSimulada.ping, **opciones)
+
+    def test_reutiliza_y_recuerda_sesion(self):
+        p = self.nuevo_pool()
+        conexion, preparada = p.obtener()
+        self.assertFalse(preparada)
+        p.marcar_preparada(conexion)
+        p.devolver(conexion)
+        self.assertEqual(p.obtener(), (conexion, True))
+        self.assertEqual(len(self.creadas), 1)
+
+    def test_acotado(self):
+        p = self.nuevo_pool(maximo=1, espera=0.01)
+        conexion, _ = p.obtener()
+        with self.assertRaises(pool.PoolAgotado):
+            p.obtener()
+        p.devolver(conexion)
+        self.assertIs(p.obtener()[0], conexion)
+
+    def test_verifica_y_descarta(self):
+        p = self.nuevo_pool(verificar_tras=0)
+        conexion, _ = p.obtener()
+        p.devolver(conexion)
+        conexion.caida = True
+        otra, _ = p.obtener()
+        self.assertIsNot(otra, conexion)
+        self.assertTrue(conexion.cerrada)
+
+        # Devuelta tras un error: se verifica aunque haya estado poco tiempo libre
+        p = self.nuevo_pool(verificar_tras=60)
+        conexion, _ = p.obtener()
+        p.devolver(conexion, sospechosa=True)
+        conexion.caida = True
+        self.assertIsNot(p.obtener()[0], conexion)
+
+    def test_vida_maxima_y_no_reutilizable(self):
+        p = self.nuevo_pool(vida_maxima=0)
+        conexion, _ = p.obtener()
+        p.devolver(conexion)
+        self.assertTrue(conexion.cerrada)
+
+        p = self.nuevo_pool()
+        conexion, _ = p.obtener()
+        p.devolver(conexion, reutilizable=False)
+        self.assertTrue(conexion.cerrada)
+        self.assertEqual(p.metricas(), {'maximo': 10, 'en_uso': 0, 'libres': 0})
+
+    def test_llenar_y_metricas(self):
+        p = self.nuevo_pool(minimo=2)
+        self.assertEqual(p.llenar(), 2)
+        p.devolver(p.obtener()[0])
+        fila = pool.estadisticas(compartidas=False)['prueba']
+        self.assertEqual((fila['creadas'], fila['reutilizadas']), (2, 1))
+
+        salida = StringIO()
+        call_command('estadisticas_pool', stdout=salida)
+        self.assertIn('prueba', salida.getvalue())
+
+
+@unittest.skipUnless(os.environ.get('PRUEBA_MYSQL_HOST'), 'PRUEBA_MYSQL_HOST no definido')
+class BackendMySQLPoolTest(unittest.TestCase):
+    """
+    Contra un MySQL local: PRUEBA_MYSQL_HOST, PRUEBA_MYSQL_USER,
+    PRUEBA_MYSQL_PASSWORD y PRUEBA_MYSQL_NAME (por defecto 'mysql').
+    """
+
+    def wrapper(self):
+        from django.db.utils import ConnectionHandler
+
+        from core.backends.mysql_pool.base import DatabaseWrapper
+
+        ajustes = ConnectionHandler({'default': {
+            'ENGINE': 'core.backends.mysql_pool',
+            'HOST': os.environ['PRUEBA_MYSQL_HOST'],
+            'USER': os.environ.get('PRUEBA_MYSQL_USER', 'root'),
+            'PASSWORD': os.environ.get('PRUEBA_MYSQL_PASSWORD', ''),
+            'NAME': os.environ.get('PRUEBA_MYSQL_NAME', 'mysql'),
+            'POOL': {'MAXIMO': 2},
+        }}).settings['default']
+        return DatabaseWrapper(ajustes, alias='pool_prueba')
+
+    def test_reutiliza_la_conexion(self):
+        primera = self.wrapper()
+        with primera.cursor() as cursor:
+            cursor.execute('SELECT CONNECTION_ID()')
+            identificador = cursor.fetchone()[0]
+        primera.close()
+
+        segunda = self.wrapper()
+        with segunda.cursor() as cursor:
+            cursor.execute('SELECT CONNECTION_ID(), @@SQL_AUTO_IS_NULL')
+            self.assertEqual(cursor.fetchone(), (identificador, 0))
+        segunda.close()
+        segunda.pool.cerrar_libres()
+
+
+# La BD 'legacy' de pruebas hace de réplica: tiene las mismas tablas pero
+# no los datos escritos en 'default', así se ve a dónde fue cada lectura.
+# TransactionTestCase: dentro de una transacción en 'default' la réplica no se usa.
+@override_settings(REPLICA_ALIAS='legacy', REPLICA_RETRASO_MAXIMO=5)
+class ReplicaTest(TransactionTestCase):
+    databases = {'default', 'legacy'}
+
+    def setUp(self):
+        replica.reiniciar_salud()
+        self.addCleanup(replica.reiniciar_salud)
+        self.persona = crear_persona('Réplica')
+
+    def existe(self):
+        return Persona.objects.filter(pk=self.persona.pk).exists()
+
+    def test_solo_dentro_del_contexto(self):
+        self.assertTrue(self.existe())
+        with replica.usar_replica():
+            self.assertFalse(self.existe())
+            with replica.forzar_principal():
+                self.assertTrue(self.existe())
+        self.assertEqual(replica.estado_replica(), {'alias': 'legacy', 'disponible': True, 'retraso': 0})
+
+        @replica.usar_replica
+        def vista():
+            return self.existe()
+        self.assertFalse(vista())
+
+    def test_transaccion_y_retraso_usan_principal(self):
+        with replica.usar_replica():
+            with transaction.atomic():
+                self.assertTrue(self.existe())
+        replica.reiniciar_salud()
+        with override_settings(REPLICA_RETRASO_MAXIMO=-1), replica.usar_replica():
+            self.assertTrue(self.existe())
+        self.assertFalse(replica.estado_replica()['disponible'])
+
+    def test_objeto_de_replica_se_guarda_en_principal(self):
+        copia = Persona.objects.using('legacy').create(
+            Rut=generar_rut_aleatorio(), Nombre='Copia', Apellido_Paterno='Soto', Apellido_Materno='Rojas',
+            Fecha_nacimiento=date(1990, 1, 1), Sexo='Femenino',
+        )
+        from obstetric_care.dbrouters import ReplicaRouter
+        self.assertEqual(ReplicaRouter().db_for_write(Persona, instance=copia), 'default')
+
+    def test_post_deja_lecturas_en_principal(self):
+        fabrica = RequestFactory()
+        middleware = ReplicaMiddleware(replica.usar_replica(lambda request: HttpResponse(str(self.existe()))))
+
+        respuesta = middleware(fabrica.post('/partos/registrar/'))
+        self.assertIn('leer_principal', respuesta.cookies)
+        self.assertEqual(middleware(fabrica.get('/partos/')).content, b'False')
+
+        pegada = fabrica.get('/partos/')
+        pegada.COOKIES['leer_principal'] = '1'
+        self.assertEqual(middleware(pegada).content, b'True')
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class EstablecimientoTest(TestCase):
+    def setUp(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        self.norte = Establecimiento.objects.create(codigo='NORTE', nombre='Maternidad Norte')
+        self.sur = Establecimiento.objects.create(codigo='SUR', nombre='Maternidad Sur')
+        self.paciente = crear_paciente('Elena')
+        self.matrona = crear_matrona('Inés', registro='MAT-002', experiencia=3, turno='Tarde')
+
+    def crear_ficha(self, numero):
+        return FichaObstetrica.objects.create(
+            paciente=self.paciente, matrona_responsable=self.matrona, numero_ficha=numero,
+        )
+
+    def test_manager_filtra_por_establecimiento_activo(self):
+        with en_establecimiento('NORTE'):
+            ficha_norte = self.crear_ficha('FO-N1')
+        with en_establecimiento('SUR'):
+            self.crear_ficha('FO-S1')
+            self.assertEqual(list(FichaObstetrica.objects.values_list('numero_ficha', flat=True)), ['FO-S1'])
+            self.assertEqual(FichaObstetrica.todos.count(), 2)
+        self.assertEqual(ficha_norte.establecimiento_id, 'NORTE')
+        self.assertEqual(FichaObstetrica.objects.count(), 2)
+
+    def test_hijo_hereda_establecimiento_del_padre(self):
+        with en_establecimiento('NORTE'):
+            ficha = self.crear_ficha('FO-N2')
+        medicamentos = MedicamentoFicha.objects.bulk_create([
+            MedicamentoFicha(ficha=ficha, nombre_medicamento='Oxitocina', dosis='10 UI',
+                             via_administracion='endovenosa', frecuencia='SOS',
+                             fecha_inicio=date(2025, 1, 1), fecha_termino=date(2025, 1, 2)),
+        ])
+        self.assertEqual(medicamentos[0].establecimiento_id, 'NORTE')
+
+    def test_middleware_elige_establecimiento_del_usuario(self):
+        usuario = User.objects.create_user('matrona_sur', password='x')
+        self.norte.usuarios.add(usuario)
+        self.sur.usuarios.add(usuario)
+        vistos = []
+        middleware = EstablecimientoMiddleware(lambda request: vistos.append(
+            (request.establecimiento, FichaObstetrica.objects.count())) or HttpResponse())
+        with en_establecimiento('NORTE'):
+            self.crear_ficha('FO-N3')
+
+        request = RequestFactory().get('/')
+        request.user, request.session = usuario, {'establecimiento': 'SUR'}
+        middleware(request)
+        request.session = {}
+        middleware(request)
+        self.assertEqual(vistos, [('SUR', 0), ('NORTE', 1)])
+
+        with override_settings(ESTABLECIMIENTO_OBLIGATORIO=True):
+            request.user = User.objects.create_user('sin_asignar', password='x')
+            with self.assertRaises(PermissionDenied):
+                middleware(request)
+
+    def test_cache_y_resumen_separados_por_establecimiento(self):
+        clave_global = cache.clave('x', [FichaObstetrica])
+        with en_establecimiento('NORTE'):
+            self.crear_ficha('FO-N4')
+            self.crear_ficha('FO-N5')
+        with en_establecimiento('SUR'):
+            self.crear_ficha('FO-S2')
+            self.assertNotEqual(cache.clave('x', [FichaObstetrica]), clave_global)
+            self.assertEqual(
+                [(fila['codigo'], fila['fichas_activas']) for fila in resumen_por_establecimiento()],
+                [('SUR', 1)],
+            )
+        self.assertEqual(
+            [(fila['nombre'], fila['fichas_activas']) for fila in resumen_por_establecimiento()],
+            [('Maternidad Norte', 2), ('Maternidad Sur', 1)],
+        )
+
+    def test_numeracion_y_unicos_son_globales(self):
+        with en_establecimiento('NORTE'):
+            ficha_norte = self.crear_ficha('FO-N6')
+            parto_norte = RegistroParto.objects.create(
+                ficha=ficha_norte, fecha_hora_admision=timezone.now(), edad_gestacional_semanas=39,
+            )
+        with en_establecimiento('SUR'):
+            ficha_sur = self.crear_ficha('FO-S3')
+            parto_sur = RegistroParto.objects.create(
+                ficha=ficha_sur, fecha_hora_admision=timezone.now(), edad_gestacional_semanas=38,
+            )
+            self.assertNotEqual(parto_sur.numero_registro, parto_norte.numero_registro)
+
+            repetida = FichaObstetrica(paciente=self.paciente, matrona_responsable=self.matrona,
+                                       numero_ficha='FO-N6')
+            with self.assertRaises(ValidationError) as error:
+                repetida.validate_unique()
+            self.assertIn('numero_ficha', error.exception.message_dict)
+
+    def test_comando_asigna_registros_sin_establecimiento(self):
+        ficha = self.crear_ficha('FO-0')
+        self.assertIsNone(ficha.establecimiento_id)
+        call_command('asignar_establecimiento', codigo='SUR', stdout=StringIO())
+        ficha.refresh_from_db()
+        self.assertEqual(ficha.establecimiento_id, 'SUR')
+
+
+@override_settings(CACHES=CACHES_PRUEBA, SESION_DIFERIR_SEGUNDOS=60, SESION_PURGAR_CADA=0)
+class SesionesTest(TestCase):
+    def setUp(self):
+        for nivel in (cache.cache_local(), cache.cache_compartida()):
+            nivel.clear()
+            self.addCleanup(nivel.clear)
+        self.usuario = User.objects.create_user('tens_turno', password='x')
+
+    def nueva_sesion(self, **datos):
+        sesion = sesiones.SessionStore()
+        sesion.update(datos)
+        sesion.create()
+        return sesion.session_key
+
+    def datos_en_bd(self, clave):
+        return sesiones.SessionStore().decode(Sesion.objects.get(pk=clave).session_data)
+
+    def test_cambios_se_agrupan_y_los_iguales_se_omiten(self):
+        clave = self.nueva_sesion(ficha_id=1)
+
+        sesion = sesiones.SessionStore(clave)
+        sesion['ficha_id'] = 1
+        with self.assertNumQueries(0):
+            sesion.save()
+
+        sesion = sesiones.SessionStore(clave)
+        sesion['ficha_id'] = 2
+        with self.assertNumQueries(0):
+            sesion.save()
+        self.assertEqual(sesiones.SessionStore(clave)['ficha_id'], 2)
+        self.assertEqual(self.datos_en_bd(clave)['ficha_id'], 1)
+
+        with override_settings(SESION_DIFERIR_SEGUNDOS=0):
+            sesion = sesiones.SessionStore(clave)
+            del sesion['ficha_id']
+            sesion.save()
+        self.assertNotIn('ficha_id', self.datos_en_bd(clave))
+
+    def test_inicio_de_sesion_se_escribe_y_se_cierra_por_usuario(self):
+        self.client.force_login(self.usuario)
+        otra = self.nueva_sesion()
+        fila = Sesion.objects.get(usuario_id=self.usuario.pk)
+
+        call_command('cerrar_sesiones', usuario=['tens_turno'], stdout=StringIO())
+        self.assertFalse(Sesion.objects.filter(pk=fila.pk).exists())
+        self.assertNotIn('_auth_user_id', sesiones.SessionStore(fila.pk).load())
+        self.assertTrue(Sesion.objects.filter(pk=otra).exists())
+
+    def test_purga_por_lotes_solo_vencidas(self):
+        vigente = self.nueva_sesion()
+        vencida = timezone.now() - timedelta(days=1)
+        Sesion.objects.bulk_create([
+            Sesion(session_key=f'vencida{i:025d}', session_data='', expire_date=vencida) for i in range(5)
+        ])
+        self.assertEqual(sesiones.purgar_expiradas(lote=2), 5)
+        self.assertEqual(list(Sesion.objects.values_list('pk', flat=True)), [vigente])
+
+
+class AuditoriaTest(TestCase):
+    def setUp(self):
+        self.paciente = crear_paciente('Lucía')
+        self.matrona = crear_matrona('Rosa', registro='MAT-003', experiencia=8, turno='Noche')
+
+    def crear_ficha(self):
+        return FichaObstetrica.objects.create(
+            paciente=self.paciente, matrona_responsable=self.matrona, numero_ficha='FO-A1',
+        )
+
+    def editar(self, ficha, **valores):
+        ficha = FichaObstetrica.objects.get(pk=ficha.pk)
+        for campo, valor in valores.items():
+            setattr(ficha, campo, valor)
+        ficha.save()
+        return ficha
+
+    def test_solo_campos_modificados(self):
+        ficha = self.crear_ficha()
+        self.editar(ficha, numero_gestas=2, sala='B-12')
+        self.editar(ficha, sala='B-12')  # sin cambios: no hay versión
+
+        creacion, edicion = auditoria.historial(ficha)
+        self.assertEqual(creacion.operacion, CambioAuditoria.CREADO)
+        self.assertEqual(creacion.estado['numero_ficha'], 'FO-A1')
+        self.assertEqual(edicion.cambios, {'numero_gestas': 2, 'sala': 'B-12'})
+        self.assertIsNone(edicion.estado)
+
+    def test_guardados_de_una_peticion_se_combinan(self):
+        ficha = self.crear_ficha()
+        with auditoria.en_lote(lambda: 7):
+            ficha = self.editar(ficha, numero_gestas=1)
+            ficha.numero_partos = 1
+            ficha.save()
+        self.assertEqual(auditoria.historial(ficha).count(), 2)
+
+        edicion = auditoria.historial(ficha).last()
+        self.assertEqual(edicion.cambios, {'numero_gestas': 1, 'numero_partos': 1})
+        self.assertEqual((edicion.numero, edicion.usuario_id), (2, 7))
+
+    def test_auditoria_en_la_transaccion_del_guardado(self):
+        ficha = self.crear_ficha()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.editar(ficha, sala='B-01')
+            raise RuntimeError
+        self.assertEqual(auditoria.historial(ficha).count(), 1)
+
+        # Si la versión no se puede escribir, el guardado tampoco queda
+        with patch('core.auditoria.CambioAuditoria.objects.bulk_create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.editar(ficha, sala='B-02')
+        self.assertEqual(FichaObstetrica.objects.get(pk=ficha.pk).sala, 'PREPARTO')
+        self.assertEqual(auditoria.historial(ficha).count(), 1)
+
+    def test_instancia_con_campos_diferidos(self):
+        FichaObstetrica.objects.bulk_create([
+            FichaObstetrica(paciente=self.paciente, matrona_responsable=self.matrona,
+                            numero_ficha='FO-OLD', numero_gestas=3)
+        ])
+        ficha = FichaObstetrica.objects.only('pk', 'version', 'sala').get(numero_ficha='FO-OLD')
+        ficha.sala = 'C-01'
+        ficha.save()
+
+        inicial, edicion = auditoria.historial(ficha)
+        self.assertEqual(inicial.estado['numero_ficha'], 'FO-OLD')
+        self.assertEqual(inicial.estado['numero_gestas'], 3)
+        self.assertEqual(edicion.cambios, {'sala': 'C-01'})
+        self.assertEqual(auditoria.version(FichaObstetrica, ficha.pk, 2).numero_gestas, 3)
+
+    @override_settings(AUDITORIA_PUNTO_CONTROL_CADA=3)
+    def test_reconstruye_versiones_desde_puntos_de_control(self):
+        ficha = self.crear_ficha()
+        for gestas in range(1, 8):
+            self.editar(ficha, numero_gestas=gestas)
+
+        puntos = list(auditoria.historial(ficha).exclude(estado=None).values_list('numero', flat=True))
+        self.assertEqual(puntos, [1, 3, 6])
+        for numero in range(2, 9):
+            self.assertEqual(auditoria.version(FichaObstetrica, ficha.pk, numero).numero_gestas, numero - 1)
+        self.assertEqual(auditoria.version(FichaObstetrica, ficha.pk, 1).numero_ficha, 'FO-A1')
+
+    def test_registro_previo_a_la_auditoria(self):
+        FichaObstetrica.objects.bulk_create([
+            FichaObstetrica(paciente=self.paciente, matrona_responsable=self.matrona, numero_ficha='FO-OLD')
+        ])
+        ficha = self.editar(FichaObstetrica.objects.get(numero_ficha='FO-OLD'), sala='C-01')
+
+        inicial, edicion = auditoria.historial(ficha)
+        self.assertEqual(inicial.operacion, CambioAuditoria.INICIAL)
+        self.assertEqual(edicion.cambios, {'sala': 'C-01'})
+        self.assertEqual(auditoria.version(FichaObstetrica, ficha.pk, 1).sala, inicial.estado['sala'])
+
+
+class VersionadoTest(TestCase):
+    def setUp(self):
+        paciente = crear_paciente('Paula')
+        matrona = crear_matrona('Ana', registro='MAT-004', experiencia=2)
+        ficha = FichaObstetrica.objects.create(
+            paciente=paciente, matrona_responsable=matrona, numero_ficha='FO-V1',
+        )
+        self.medicamento = MedicamentoFicha.objects.create(
+            ficha=ficha, nombre_medicamento='Paracetamol', dosis='500 mg', via_administracion='oral',
+            frecuencia='Cada_8_horas', fecha_inicio=date(2025, 3, 1), fecha_termino=date(2025, 3, 5),
+        )
+
+    def abrir_formulario(self):
+        """Datos que enviaría el navegador con el formulario recién abierto"""
+        form = MedicamentoFichaForm(instance=MedicamentoFicha.objects.get(pk=self.medicamento.pk))
+        datos = {}
+        for bf in form:
+            valor = '' if bf.value() is None else str(bf.value())
+            datos[bf.html_name] = valor
+            if bf.field.show_hidden_initial:
+                datos[bf.html_initial_name] = valor
+        return datos
+
+    def enviar(self, datos):
+        return MedicamentoFichaForm(datos, instance=MedicamentoFicha.objects.get(pk=self.medicamento.pk))
+
+    def test_guardado_concurrente_lanza_conflicto(self):
+        primera = MedicamentoFicha.objects.get(pk=self.medicamento.pk)
+        segunda = MedicamentoFicha.objects.get(pk=self.medicamento.pk)
+        primera.dosis = '1 g'
+        primera.save()
+        self.assertEqual(primera.version, 2)
+
+        segunda.observaciones = 'Con comida'
+        with self.assertRaises(ConflictoVersion):
+            segunda.save()
+        self.assertEqual(segunda.version, 1)
+        self.assertEqual(MedicamentoFicha.objects.get(pk=self.medicamento.pk).dosis, '1 g')
+
+    def test_campos_distintos_se_combinan(self):
+        mis_datos = self.abrir_formulario()
+        self.enviar({**self.abrir_formulario(), 'dosis': '1 g'}).save()
+
+        form = self.enviar({**mis_datos, 'observaciones': 'Con comida'})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.combinados, ['dosis'])
+        form.save()
+
+        guardado = MedicamentoFicha.objects.get(pk=self.medicamento.pk)
+        self.assertEqual((guardado.dosis, guardado.observaciones, guardado.version), ('1 g', 'Con comida', 3))
+
+    def test_mismo_campo_es_conflicto_y_reenvio_prevalece(self):
+        mis_datos = self.abrir_formulario()
+        self.enviar({**self.abrir_formulario(), 'dosis': '1 g'}).save()
+
+        form = self.enviar({**mis_datos, 'dosis': '750 mg'})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.conflictos, ['dosis'])
+        self.assertIn('1 g', form.errors['dosis'][0])
+
+        form = self.enviar(form.data)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(MedicamentoFicha.objects.get(pk=self.medicamento.pk).dosis, '750 mg')
+
+    def test_acciones_sin_formulario_reintentan(self):
+        usuario = User.objects.create_user('matrona', password='clave-segura')
+        usuario.groups.add(Group.objects.create(name='Matrona'))
+        self.client.force_login(usuario)
+        ficha = FichaObstetrica.objects.get(pk=self.medicamento.ficha_id)
+        vista = FichaObstetrica.objects.get(pk=ficha.pk)
+        ficha.numero_gestas = 2
+        ficha.save()
+
+        # La vista cargó la ficha antes del guardado ajeno
+        with patch('matronaApp.views.get_object_or_404', return_value=vista):
+            respuesta = self.client.post(reverse('matrona:toggle_ficha', kwargs={'pk': ficha.pk}))
+        self.assertRedirects(respuesta, reverse('matrona:detalle_ficha', kwargs={'pk': ficha.pk}),
+                             fetch_redirect_response=False)
+        ficha.refresh_from_db()
+        self.assertEqual((ficha.activa, ficha.numero_gestas, ficha.version), (False, 2, 3))
+
+        medicamento = MedicamentoFicha.objects.get(pk=self.medicamento.pk)
+        self.enviar({**self.abrir_formulario(), 'dosis': '1 g'}).save()
+        self.assertTrue(guardar_campos(medicamento, lambda m: setattr(m, 'activo', False), ['activo']))
+        medicamento = MedicamentoFicha.objects.get(pk=self.medicamento.pk)
+        self.assertEqual((medicamento.activo, medicamento.dosis), (False, '1 g'))
+
+
+# ============================================
+# PROYECCIONES DE LISTADOS
+# ============================================
+
+class ProyeccionesTest(TestCase):
+    def setUp(self):
+        self.persona = crear_paciente('Paula').persona
+        matrona = crear_matrona('Ana', registro='MAT-005', experiencia=2)
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=Paciente.objects.get(pk=self.persona.pk), matrona_responsable=matrona,
+            numero_ficha='FO-P1', edad_gestacional_semanas=38, edad_gestacional_dias=2,
+        )
+
+    def test_fila_sin_dict_con_etiquetas_y_calculados(self):
+        [fila] = FilaPaciente.de(Paciente.objects.all())
+        self.assertFalse(hasattr(fila, '__dict__'))
+        self.assertEqual(fila.pk, self.persona.pk)
+        self.assertEqual((fila.estado_civil, fila.prevision), ('Soltera', 'FONASA A'))
+        self.assertEqual(fila.edad, self.persona.calcular_edad())
+
+    def test_patologias_en_una_consulta(self):
+        otra = FichaObstetrica.objects.create(
+            paciente=self.ficha.paciente, matrona_responsable=self.ficha.matrona_responsable, numero_ficha='FO-P2',
+        )
+        self.ficha.patologias.add(
+            Patologias.objects.create(nombre='Preeclampsia', codigo_cie_10='O14', estado='Activo'),
+            Patologias.objects.create(nombre='Anemia', codigo_cie_10='O99', estado='Activo'),
+        )
+        with self.assertNumQueries(2):
+            filas = {fila.numero_ficha: fila for fila in FilaFicha.de(FichaObstetrica.objects.all())}
+        self.assertEqual(filas['FO-P1'].patologias, ['Anemia', 'Preeclampsia'])
+        self.assertEqual(filas['FO-P1'].edad_gestacional, '38 semanas + 2 días')
+        self.assertEqual((filas['FO-P2'].patologias, filas['FO-P2'].edad_gestacional), ([], None))
+        self.assertEqual(filas['FO-P1'].matrona_nombre, 'Ana')
+        self.assertEqual(otra.paciente_id, filas['FO-P2'].paciente_id)
+
+    def test_pagina_proyecta_solo_la_pagina(self):
+        for numero in range(2, 4):
+            FichaObstetrica.objects.create(
+                paciente=self.ficha.paciente, matrona_responsable=self.ficha.matrona_responsable,
+                numero_ficha=f'FO-P{numero}',
+            )
+        pagina = FilaFicha.pagina(FichaObstetrica.objects.order_by('numero_ficha'), 2, 2)
+        self.assertEqual(pagina.paginator.count, 3)
+        self.assertEqual([fila.numero_ficha for fila in pagina], ['FO-P3'])
+
+    def test_benchmark(self):
+        salida = StringIO()
+        call_command('benchmark_proyecciones', '--listado', 'fichas', '--repeticiones', '1', stdout=salida)
+        self.assertIn('FilaFicha: n=1', salida.getvalue())
@@ -0,0 +1,224 @@
+# core/versionado.py
+"""
+Control de concurrencia optimista para los formularios de edición clínica
+
+Los modelos que heredan de ConVersion tienen una columna `version` y cada
+save() de un registro existente es un
+
+    UPDATE ... SET ..., version = n + 1 WHERE id = ... AND version = n
+
+Si otra petición lo guardó entre medio no se actualiza nada y se lanza
+ConflictoVersion: nunca se pisa un cambio ajeno sin saberlo y no se
+bloquean filas mientras el usuario tiene el formulario abierto.
+
+VersionadoFormMixin (antes de forms.ModelForm en las bases) envía en el
+formulario la versión y los valores que vio el usuario. Si al enviarlo el
+registro cambió:
+- los campos que solo cambió el otro usuario conservan su valor;
+- los que solo cambió este usuario se guardan;
+- los que cambiaron ambos con valores distintos son un conflicto: el
+  formulario queda inválido mostrando el valor actual, y si el usuario lo
+  vuelve a enviar se guarda lo suyo.
+
+    form = FichaObstetricaForm(request.POST, instance=ficha)
+    if form.is_valid():
+        try:
+            form.save()
+        except ConflictoVersion:
+            form.agregar_conflicto()        # otro guardado entre is_valid() y save()
+        else:
+            if form.combinados: ...          # campos del otro usuario conservados
+"""
+from django import forms
+from django.core.exceptions import FieldDoesNotExist
+from django.forms.models import model_to_dict
+from django.db import models, router, transaction
+
+_DESCONOCIDO = object()
+
+MENSAJE_CONFLICTO = (
+    'Otro usuario modificó este registro mientras lo editaba. '
+    'Revise los valores actuales y vuelva a guardar.'
+)
+
+
+class ConflictoVersion(Exception):
+    def __init__(self, instancia, version_esperada):
+        self.instancia = instancia
+        self.version_esperada = version_esperada
+        super().__init__(
+            f'{instancia._meta.label} {instancia.pk}: se esperaba la versión {version_esperada}'
+        )
+
+
+# ============================================
+# MODELOS
+# ============================================
+
+class ConVersion(models.Model):
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name='Versión')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        esperada = self.version
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        self.version = esperada + 1
+        self._version_esperada = esperada
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            # Savepoint: un conflicto no deja inutilizable la transacción del llamador
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        except BaseException:
+            self.version = esperada
+            raise
+        finally:
+            self._version_esperada = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        esperada = getattr(self, '_version_esperada', None)
+        if esperada is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if super()._do_update(base_qs.filter(version=esperada), using, pk_val, values, update_fields, forced_update):
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise ConflictoVersion(self, esperada)
+        # El registro ya no existe: Django intentará el INSERT como siempre
+        return False
+
+
+def guardar_campos(instancia, aplicar, campos, intentos=3):
+    """
+    Para acciones sin formulario (cerrar una ficha, trasladarla, desactivar
+    un medicamento): `aplicar(instancia)` asigna los valores y se guardan
+    solo `campos`. Si otro guardado se adelanta se recarga el registro y se
+    vuelve a aplicar. False si no se logra en `intentos`.
+    """
+    for _intento in range(intentos):
+        aplicar(instancia)
+        try:
+            instancia.save(update_fields=campos)
+            return True
+        except ConflictoVersion:
+            instancia.refresh_from_db()
+    return False
+
+
+# ============================================
+# FORMULARIOS
+# ============================================
+
+class VersionadoFormMixin:
+    """
+    Para ModelForm de modelos ConVersion. Después de is_valid(),
+    `combinados` tiene los campos en que se conservó el cambio de otro
+    usuario y `conflictos` los que ambos cambiaron.
+    """
+
+    campo_version = 'version_vista'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.combinados = []
+        self.conflictos = []
+        if self.instance.pk is None:
+            return
+        for campo in self.fields.values():
+            if not isinstance(campo, forms.FileField):
+                # Django envía el valor inicial en un <input type="hidden">
+                campo.show_hidden_initial = True
+        self.fields[self.campo_version] = forms.IntegerField(
+            widget=forms.HiddenInput, required=False, initial=self.instance.version,
+        )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk is None:
+            return cleaned_data
+        vista = cleaned_data.get(self.campo_version)
+        if vista is None or vista == self.instance.version:
+            return cleaned_data
+
+        # El registro cambió desde que se abrió el formulario
+        for nombre, campo in self.fields.items():
+            if nombre not in cleaned_data or not campo.show_hidden_initial:
+                continue
+            try:
+                campo_modelo = self.instance._meta.get_field(nombre)
+            except FieldDoesNotExist:
+                continue
+            bf = self[nombre]
+            actual = campo.prepare_value(bf.initial)
+            cambio_mio = campo.has_changed(actual, bf.data)
+            visto = self._valor_visto(bf)
+            cambio_ajeno = True if visto is _DESCONOCIDO else campo.has_changed(visto, actual)
+            if not cambio_ajeno:
+                continue
+            if visto is not _DESCONOCIDO and not campo.has_changed(visto, bf.data):
+                # Solo lo cambió el otro usuario: se conserva su valor
+                cleaned_data[nombre] = list(bf.initial) if campo_modelo.many_to_many else getattr(self.instance, nombre)
+                self.combinados.append(nombre)
+            elif cambio_mio:
+                self.conflictos.append(nombre)
+
+        if self.conflictos:
+            for nombre in self.conflictos:
+                actual = self[nombre].initial
+                self.add_error(nombre, f'Valor actual guardado por otro usuario: {_mostrar(self.fields[nombre], actual)}')
+            self.add_error(None, MENSAJE_CONFLICTO)
+            self._tomar_version_actual()
+        return cleaned_data
+
+    def _valor_visto(self, bf):
+        if bf.html_initial_name not in self.data:
+            return _DESCONOCIDO
+        valor = self._widget_data_value(bf.field.hidden_widget(), bf.html_initial_name)
+        try:
+            return bf.field.to_python(valor)
+        except forms.ValidationError:
+            return _DESCONOCIDO
+
+    def _tomar_version_actual(self):
+        """
+        Al volver a mostrar el formulario, los valores "vistos" pasan a ser
+        los actuales: si el usuario guarda de nuevo, prevalece lo suyo.
+        """
+        datos = self.data.copy()
+        for nombre, campo in self.fields.items():
+            if nombre == self.campo_version or not campo.show_hidden_initial:
+                continue
+            bf = self[nombre]
+            valor = campo.prepare_value(bf.initial)
+            if isinstance(valor, (list, tuple)) and hasattr(datos, 'setlist'):
+                datos.setlist(bf.html_initial_name, [str(v) for v in valor])
+            else:
+                datos[bf.html_initial_name] = '' if valor is None else valor
+        datos[self.add_prefix(self.campo_version)] = self.instance.version
+        self.data = datos
+
+    def etiquetas_combinadas(self):
+        return ', '.join(str(self.fields[nombre].label or nombre) for nombre in self.combinados)
+
+    def agregar_conflicto(self):
+        """Para ConflictoVersion en save(): otro guardado entre is_valid() y save()"""
+        self.instance.refresh_from_db()
+        self.initial.update(model_to_dict(self.instance, self._meta.fields, self._meta.exclude))
+        for bf in self:
+            bf.__dict__.pop('initial', None)
+        self._tomar_version_actual()
+        self.add_error(None, MENSAJE_CONFLICTO)
+
+
+def _mostrar(campo, valor):
+    if valor in (None, ''):
+        return '(vacío)'
+    if isinstance(campo, forms.ModelMultipleChoiceField):
+        return ', '.join(str(objeto) for objeto in valor) or '(vacío)'
+    if getattr(campo, 'choices', None):
+        return dict(campo.choices).get(campo.prepare_value(valor), valor)
+    return valor
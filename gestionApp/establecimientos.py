@@ -0,0 +1,60 @@
+# gestionApp/establecimientos.py
+"""
+Resumen de actividad por establecimiento (maternidad)
+
+Un GROUP BY por tabla sobre la columna establecimiento, que es la primera
+de sus índices compuestos. Con un establecimiento activo el manager filtra
+y el resultado tiene solo esa fila; sin él, una fila por maternidad.
+Se cachea hasta que cambie alguno de los modelos contados.
+"""
+from django.db.models import Count
+from django.utils import timezone
+
+from core import cache
+from matronaApp.models import FichaObstetrica
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+from tensApp.models import Tratamiento_aplicado
+
+from .models import Establecimiento
+
+SIN_ESTABLECIMIENTO = 'Sin establecimiento'
+
+
+def _contar(queryset):
+    """{codigo: total} agrupando por establecimiento"""
+    filas = queryset.order_by().values('establecimiento_id').annotate(total=Count('pk'))
+    return {fila['establecimiento_id']: fila['total'] for fila in filas}
+
+
+def _calcular(inicio_mes):
+    conteos = {
+        'fichas_activas': _contar(FichaObstetrica.objects.filter(activa=True)),
+        'partos_mes': _contar(RegistroParto.objects.filter(activo=True, fecha_hora_admision__gte=inicio_mes)),
+        'recien_nacidos_mes': _contar(RegistroRecienNacido.objects.filter(fecha_nacimiento__gte=inicio_mes)),
+        'tratamientos_activos': _contar(Tratamiento_aplicado.objects.filter(activo=True)),
+    }
+    codigos = set().union(*conteos.values())
+    nombres = dict(Establecimiento.objects.filter(pk__in=codigos - {None}).values_list('codigo', 'nombre'))
+
+    filas = []
+    for codigo in sorted(codigos, key=lambda c: (c is None, c or '')):
+        fila = {'codigo': codigo, 'nombre': nombres.get(codigo, SIN_ESTABLECIMIENTO if codigo is None else codigo)}
+        fila.update({indicador: valores.get(codigo, 0) for indicador, valores in conteos.items()})
+        filas.append(fila)
+    return filas
+
+
+def resumen_por_establecimiento():
+    """
+    [{'codigo', 'nombre', 'fichas_activas', 'partos_mes', 'recien_nacidos_mes',
+    'tratamientos_activos'}], una fila por establecimiento con registros
+    (los registros anteriores a la partición salen como "Sin establecimiento").
+    """
+    inicio_mes = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return cache.cacheado(
+        'gestion:establecimientos',
+        [Establecimiento, FichaObstetrica, RegistroParto, RegistroRecienNacido, Tratamiento_aplicado],
+        lambda: _calcular(inicio_mes),
+        mes=inicio_mes.date().isoformat(),
+    )
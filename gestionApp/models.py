@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from utilidad.rut_validator import validar_rut, normalizar_rut, validar_rut_chileno
 from datetime import date
 from django.utils import timezone
+from core.outbox import OutboxMixin
+
+
+def edad_desde(fecha_nacimiento):
+    """Edad en años cumplidos a hoy (None sin fecha)"""
+    if not fecha_nacimiento:
+        return None
+    hoy = date.today()
+    return hoy.year - fecha_nacimiento.year - ((hoy.month, hoy.day) < (fecha_nacimiento.month, fecha_nacimiento.day))
 
 
 # ============================================
@@ -74,11 +84,7 @@ class Persona(models.Model):
     
     def calcular_edad(self):
         """Calcula la edad actual basada en la fecha de nacimiento"""
-        if not self.Fecha_nacimiento:
-            return None
-        hoy = date.today()
-        edad = hoy.year - self.Fecha_nacimiento.year - ((hoy.month, hoy.day) < (self.Fecha_nacimiento.month, self.Fecha_nacimiento.day))
-        return edad
+        return edad_desde(self.Fecha_nacimiento)
     
     def clean(self):
         super().clean()
@@ -106,7 +112,7 @@ class Persona(models.Model):
 # ============================================
 # MODELO PACIENTE
 # ============================================
-class Paciente(models.Model):
+class Paciente(OutboxMixin, models.Model):
     """Rol de Paciente vinculado a Persona"""
     ESTADO_CIVIL_CHOICES = [
         ('SOLTERA', 'Soltera'),
@@ -278,4 +284,34 @@ class Tens(models.Model):
     Activo = models.BooleanField(default=True)
     
     def __str__(self):
-        return f"TENS: {self.persona.Nombre} {self.persona.Apellido_Paterno} {self.persona.Apellido_Materno} - {self.Nivel}"
\ No newline at end of file
+        return f"TENS: {self.persona.Nombre} {self.persona.Apellido_Paterno} {self.persona.Apellido_Materno} - {self.Nivel}"
+
+
+# ============================================
+# MODELO ESTABLECIMIENTO
+# ============================================
+class Establecimiento(models.Model):
+    """
+    Maternidad que atiende en este despliegue. Los registros clínicos
+    pertenecen a una (core.establecimientos) y cada usuario ve los de las
+    maternidades a las que está asignado.
+    """
+    codigo = models.CharField(max_length=20, primary_key=True, verbose_name="Código",
+                              help_text="Código corto y estable, ej. HCHM")
+    nombre = models.CharField(max_length=150, verbose_name="Nombre")
+    comuna = models.CharField(max_length=80, blank=True, verbose_name="Comuna")
+    usuarios = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        related_name='establecimientos',
+        blank=True,
+        verbose_name="Usuarios asignados",
+    )
+    activo = models.BooleanField(default=True, verbose_name="Activo")
+
+    def __str__(self):
+        return f"{self.nombre} ({self.codigo})"
+
+    class Meta:
+        verbose_name = "Establecimiento"
+        verbose_name_plural = "Establecimientos"
+        ordering = ['codigo']
@@ -0,0 +1,13 @@
+# gestionApp/signals.py
+"""
+Invalidación de la caché compartida (core.cache): el dashboard
+administrativo depende de las personas y de los roles registrados, y los
+establecimientos de cada usuario se cachean hasta que cambie su asignación
+"""
+from core.cache import vigilar_modelo
+
+from .models import Establecimiento, Persona, Paciente, Medico, Matrona, Tens
+
+
+def conectar():
+    vigilar_modelo(Persona, Paciente, Medico, Matrona, Tens, Establecimiento)
@@ -7,6 +7,8 @@ from .forms.Gestion_form import PersonaForm, PacienteForm, MedicoForm, MatronaFo
 from .models import Persona, Medico, Matrona, Tens
 from matronaApp.models import Paciente
 from datetime import datetime
+from core import cache
+from .establecimientos import resumen_por_establecimiento
 
 
 # ============================================
@@ -118,7 +120,7 @@ def agregar_tens(request):
 # API REST (AJAX)
 # ============================================
 
-def buscar_persona_api(request):
+async def buscar_persona_api(request):
     """Buscar persona por RUT vía AJAX (retorna JSON)"""
     rut = request.GET.get('rut', '').strip()
     
@@ -129,7 +131,7 @@ def buscar_persona_api(request):
         from utilidad.rut_validator import normalizar_rut
         rut_normalizado = normalizar_rut(rut)
         
-        persona = Persona.objects.filter(Rut=rut_normalizado, Activo=True).first()
+        persona = await Persona.objects.filter(Rut=rut_normalizado, Activo=True).afirst()
         
         if persona:
             return JsonResponse({
@@ -286,32 +288,37 @@ def asignar_rol_tens(request, pk):
 # DASHBOARD ADMINISTRATIVO
 # ============================================
 
-def dashboard_admin(request):
-    """
-    Vista principal del dashboard administrativo.
-    Muestra estadísticas generales y accesos rápidos.
-    """
-    
+def _totales_dashboard():
+    """Conteos del dashboard (cacheados hasta que cambie alguno de los modelos)"""
     # Contar todos los roles activos
     total_medicos = Medico.objects.filter(Activo=True).count()
     total_matronas = Matrona.objects.filter(Activo=True).count()
     total_tens = Tens.objects.filter(Activo=True).count()
     total_pacientes = Paciente.objects.filter(activo=True).count()
-    
-    # Total de usuarios en el sistema
-    total_usuarios = total_medicos + total_matronas + total_tens + total_pacientes
-    
-    # Total de personas registradas
-    total_personas = Persona.objects.filter(Activo=True).count()
-    
-    # Contexto para el template
-    context = {
+
+    return {
         'total_medicos': total_medicos,
         'total_matronas': total_matronas,
         'total_tens': total_tens,
         'total_pacientes': total_pacientes,
-        'total_usuarios': total_usuarios,
-        'total_personas': total_personas,
+        # Total de usuarios en el sistema
+        'total_usuarios': total_medicos + total_matronas + total_tens + total_pacientes,
+        # Total de personas registradas
+        'total_personas': Persona.objects.filter(Activo=True).count(),
+    }
+
+
+def dashboard_admin(request):
+    """
+    Vista principal del dashboard administrativo.
+    Muestra estadísticas generales y accesos rápidos.
+    """
+    totales = cache.cacheado(
+        'gestion:dashboard', [Persona, Paciente, Medico, Matrona, Tens], _totales_dashboard,
+    )
+    context = {
+        **totales,
+        'resumen_establecimientos': resumen_por_establecimiento(),
         'fecha_actual': datetime.now().strftime('%d/%m/%Y'),
     }
     
@@ -10,6 +10,7 @@ from ingresoPartoApp.models import FichaParto
 from matronaApp.models import FichaObstetrica, Paciente
 from gestionApp.models import Persona
 from utilidad.rut_validator import normalizar_rut, RutValidator
+from core.opciones import usar_opciones_cacheadas
 from django.utils import timezone
 
 
@@ -175,10 +176,12 @@ class DatosGeneralesIngresoForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar solo fichas obstétricas activas
-        self.fields['ficha_obstetrica'].queryset = FichaObstetrica.objects.filter(
-            activa=True
-        ).select_related('paciente__persona')
+        # Filtrar solo fichas obstétricas activas (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'ficha_obstetrica',
+            FichaObstetrica.objects.filter(activa=True).select_related('paciente__persona'),
+            modelos=[Paciente, Persona],
+        )
 
 
 # ============================================
@@ -490,10 +493,12 @@ class FichaPartoCompletaForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar fichas activas
-        self.fields['ficha_obstetrica'].queryset = FichaObstetrica.objects.filter(
-            activa=True
-        ).select_related('paciente__persona')
+        # Filtrar fichas activas (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'ficha_obstetrica',
+            FichaObstetrica.objects.filter(activa=True).select_related('paciente__persona'),
+            modelos=[Paciente, Persona],
+        )
 
 
 # ============================================
@@ -1,9 +1,10 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.establecimientos import ConEstablecimiento
 
 
-class FichaParto(models.Model):
+class FichaParto(ConEstablecimiento):
     """
     Ficha de ingreso para el proceso de parto
     Se crea cuando la paciente ingresa a la unidad
@@ -20,6 +21,7 @@ class FichaParto(models.Model):
         related_name='fichas_ingreso_parto',
         verbose_name='Ficha Obstétrica'
     )
+    campo_padre_establecimiento = 'ficha_obstetrica'
     
     numero_ficha_parto = models.CharField(
         max_length=20,
@@ -256,6 +258,7 @@ class FichaParto(models.Model):
         indexes = [
             models.Index(fields=['numero_ficha_parto']),
             models.Index(fields=['ficha_obstetrica', '-fecha_ingreso']),
+            models.Index(fields=['establecimiento', '-fecha_ingreso']),
         ]
     
     def __str__(self):
@@ -264,7 +267,8 @@ class FichaParto(models.Model):
     def save(self, *args, **kwargs):
         """Generar número automático si no existe"""
         if not self.numero_ficha_parto:
-            ultima = FichaParto.objects.order_by('-id').first()
+            # Numeración global: `objects` solo ve el establecimiento activo
+            ultima = FichaParto.todos.order_by('-id').first()
             if ultima:
                 try:
                     numero = int(ultima.numero_ficha_parto.split('-')[1]) + 1
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MatronaappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'matronaApp'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
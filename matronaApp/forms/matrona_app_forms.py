@@ -4,6 +4,8 @@ from matronaApp.models import FichaObstetrica, MedicamentoFicha, IngresoPaciente
 from gestionApp.models import Persona, Paciente, Matrona
 from medicoApp.models import Patologias
 from utilidad.rut_validator import normalizar_rut, RutValidator
+from core.opciones import OpcionesCacheadasMultipleField, usar_opciones_cacheadas
+from core.versionado import VersionadoFormMixin
 from django.utils import timezone
 from datetime import date
 
@@ -80,7 +82,7 @@ class BuscarPacienteFichaForm(forms.Form):
 # FORMULARIO 2: FICHA OBSTÉTRICA COMPLETA
 # ============================================
 
-class FichaObstetricaForm(forms.ModelForm):
+class FichaObstetricaForm(VersionadoFormMixin, forms.ModelForm):
     """
     Formulario completo para crear y editar fichas obstétricas.
     Incluye todos los campos del modelo con validaciones robustas.
@@ -97,6 +99,7 @@ class FichaObstetricaForm(forms.ModelForm):
         fields = [
             'paciente_id',
             'matrona_responsable',
+            'sala',
             'nombre_acompanante',
             # Antecedentes obstétricos
             'numero_gestas',
@@ -143,6 +146,9 @@ class FichaObstetricaForm(forms.ModelForm):
                 'class': 'form-select',
                 'required': True
             }),
+            'sala': forms.Select(attrs={
+                'class': 'form-select'
+            }),
             'nombre_acompanante': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'Nombre del acompañante'
@@ -319,15 +325,18 @@ class FichaObstetricaForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        # Filtrar solo matronas activas
-        self.fields['matrona_responsable'].queryset = Matrona.objects.filter(
-            Activo=True
-        ).select_related('persona')
+        # Filtrar solo matronas activas (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'matrona_responsable',
+            Matrona.objects.filter(Activo=True).select_related('persona'),
+            modelos=[Persona],
+        )
         
         # Filtrar solo patologías activas
-        self.fields['patologias'].queryset = Patologias.objects.filter(
-            estado=True
-        ).order_by('nombre')
+        usar_opciones_cacheadas(
+            self, 'patologias',
+            Patologias.objects.filter(estado='Activo').order_by('nombre'),
+        )
     
     def clean_paciente_id(self):
         """Validar que el paciente exista y esté activo"""
@@ -480,7 +489,7 @@ class FichaObstetricaSimpleForm(forms.ModelForm):
 # FORMULARIO 4: ASIGNAR MEDICAMENTO A FICHA
 # ============================================
 
-class MedicamentoFichaForm(forms.ModelForm):
+class MedicamentoFichaForm(VersionadoFormMixin, forms.ModelForm):
     """
     Formulario para que la matrona asigne medicamentos a una ficha obstétrica.
     """
@@ -570,8 +579,8 @@ class AsignarPatologiasFichaForm(forms.ModelForm):
     Las patologías son gestionadas por el médico.
     """
     
-    patologias = forms.ModelMultipleChoiceField(
-        queryset=Patologias.objects.filter(estado=True).order_by('nombre'),
+    patologias = OpcionesCacheadasMultipleField(
+        queryset=Patologias.objects.filter(estado='Activo').order_by('codigo_cie_10', 'nombre'),
         widget=forms.CheckboxSelectMultiple(attrs={
             'class': 'form-check-input'
         }),
@@ -595,13 +604,6 @@ class AsignarPatologiasFichaForm(forms.ModelForm):
             })
         }
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # Ordenar patologías por código CIE-10
-        self.fields['patologias'].queryset = Patologias.objects.filter(
-            estado=True
-        ).order_by('codigo_cie_10', 'nombre')
 
 
 # ============================================
@@ -3,13 +3,17 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from gestionApp.models import Paciente, Matrona, Tens
 from medicoApp.models import Patologias
+from core.auditoria import AuditadoMixin
+from core.establecimientos import ConEstablecimiento
+from core.outbox import OutboxMixin
+from core.versionado import ConVersion
 
 
 # ============================================
 # MODELO: INGRESO PACIENTE
 # ============================================
 
-class IngresoPaciente(models.Model):
+class IngresoPaciente(ConEstablecimiento):
     """
     Registro del ingreso de una paciente a la unidad obstétrica
     """
@@ -70,16 +74,30 @@ class IngresoPaciente(models.Model):
         verbose_name = 'Ingreso de Paciente'
         verbose_name_plural = 'Ingresos de Pacientes'
         ordering = ['-fecha_ingreso']
+        indexes = [
+            models.Index(fields=['establecimiento', '-fecha_ingreso']),
+            # Línea de tiempo de la paciente (apiApp.linea_tiempo)
+            models.Index(fields=['paciente', '-fecha_ingreso', '-hora_ingreso']),
+        ]
     
     def __str__(self):
         return f"Ingreso {self.numero_ficha} - {self.paciente.persona.Nombre} {self.paciente.persona.Apellido_Paterno}"
 
 
+def texto_edad_gestacional(semanas, dias):
+    """'XX semanas + X días' (None sin semanas)"""
+    if semanas is None:
+        return None
+    if dias:
+        return f"{semanas} semanas + {dias} días"
+    return f"{semanas} semanas"
+
+
 # ============================================
 # MODELO: FICHA OBSTÉTRICA
 # ============================================
 
-class FichaObstetrica(models.Model):
+class FichaObstetrica(OutboxMixin, AuditadoMixin, ConVersion, ConEstablecimiento):
     """
     Ficha clínica obstétrica completa de una paciente
     Contiene todos los antecedentes y datos del embarazo
@@ -108,6 +126,22 @@ class FichaObstetrica(models.Model):
         help_text='Se genera automáticamente'
     )
     
+    # Sala (unidad) donde se encuentra hospitalizada la paciente
+    SALA_CHOICES = [
+        ('PREPARTO', 'Preparto'),
+        ('PARTO', 'Sala de Parto'),
+        ('PUERPERIO', 'Puerperio'),
+        ('ARO', 'Alto Riesgo Obstétrico'),
+    ]
+    
+    sala = models.CharField(
+        max_length=20,
+        choices=SALA_CHOICES,
+        default='PREPARTO',
+        verbose_name='Sala',
+        help_text='Unidad donde se encuentra la paciente'
+    )
+    
     # Acompañante
     nombre_acompanante = models.CharField(
         max_length=200,
@@ -415,7 +449,11 @@ class FichaObstetrica(models.Model):
         indexes = [
             models.Index(fields=['numero_ficha']),
             models.Index(fields=['paciente', 'activa']),
+            models.Index(fields=['paciente', '-fecha_creacion']),
             models.Index(fields=['-fecha_creacion']),
+            models.Index(fields=['sala', 'activa']),
+            models.Index(fields=['establecimiento', 'activa', '-fecha_creacion']),
+            models.Index(fields=['establecimiento', 'sala', 'activa']),
         ]
     
     def __str__(self):
@@ -424,18 +462,14 @@ class FichaObstetrica(models.Model):
     @property
     def edad_gestacional_completa(self):
         """Retorna la edad gestacional en formato 'XX semanas + X días'"""
-        if self.edad_gestacional_semanas is not None:
-            if self.edad_gestacional_dias:
-                return f"{self.edad_gestacional_semanas} semanas + {self.edad_gestacional_dias} días"
-            return f"{self.edad_gestacional_semanas} semanas"
-        return "No especificada"
+        return texto_edad_gestacional(self.edad_gestacional_semanas, self.edad_gestacional_dias) or "No especificada"
 
 
 # ============================================
 # MODELO: MEDICAMENTO FICHA
 # ============================================
 
-class MedicamentoFicha(models.Model):
+class MedicamentoFicha(AuditadoMixin, ConVersion, ConEstablecimiento):
     """
     Medicamentos asignados a una ficha obstétrica
     Registrados por la matrona para administración por TENS
@@ -447,6 +481,7 @@ class MedicamentoFicha(models.Model):
         related_name='medicamentos',
         verbose_name='Ficha Obstétrica'
     )
+    campo_padre_establecimiento = 'ficha'
     
     nombre_medicamento = models.CharField(
         max_length=200,
@@ -519,6 +554,8 @@ class MedicamentoFicha(models.Model):
         ordering = ['-fecha_inicio']
         indexes = [
             models.Index(fields=['ficha', 'activo']),
+            models.Index(fields=['ficha', '-fecha_inicio']),
+            models.Index(fields=['establecimiento', 'activo', '-fecha_inicio']),
         ]
     
     def __str__(self):
@@ -529,7 +566,7 @@ class MedicamentoFicha(models.Model):
 # MODELO: ADMINISTRACIÓN DE MEDICAMENTO (TENS)
 # ============================================
 
-class AdministracionMedicamento(models.Model):
+class AdministracionMedicamento(OutboxMixin, ConEstablecimiento):
     """
     Registro de administración de medicamentos por parte del TENS
     """
@@ -540,6 +577,7 @@ class AdministracionMedicamento(models.Model):
         related_name='administraciones',
         verbose_name='Medicamento Asignado'
     )
+    campo_padre_establecimiento = 'medicamento_ficha'
     
     tens = models.ForeignKey(
         Tens,
@@ -591,6 +629,7 @@ class AdministracionMedicamento(models.Model):
         indexes = [
             models.Index(fields=['medicamento_ficha', '-fecha_hora_administracion']),
             models.Index(fields=['tens', '-fecha_hora_administracion']),
+            models.Index(fields=['establecimiento', '-fecha_hora_administracion']),
         ]
     
     def __str__(self):
@@ -0,0 +1,69 @@
+# matronaApp/proyecciones.py
+"""
+Filas de los listados de pacientes y fichas (ver core.proyecciones)
+"""
+from core.proyecciones import Display, Proyeccion
+from gestionApp.models import Paciente, edad_desde
+from matronaApp.models import FichaObstetrica, texto_edad_gestacional
+
+
+class FilaPaciente(Proyeccion):
+    """Matrona/Data/paciente_list.html"""
+    modelo = Paciente
+    columnas = {
+        'pk': 'pk',
+        'rut': 'persona__Rut',
+        'nombre': 'persona__Nombre',
+        'apellido_paterno': 'persona__Apellido_Paterno',
+        'apellido_materno': 'persona__Apellido_Materno',
+        'fecha_nacimiento': 'persona__Fecha_nacimiento',
+        'estado_civil': Display('Estado_civil'),
+        'prevision': Display('Previcion'),
+        'contacto_emergencia': 'Contacto_emergencia',
+    }
+    calculados = ('edad',)
+
+    def calcular(self):
+        self.edad = edad_desde(self.fecha_nacimiento)
+
+
+class FilaFicha(Proyeccion):
+    """Matrona/Data/todas_fichas.html"""
+    modelo = FichaObstetrica
+    columnas = {
+        'pk': 'pk',
+        'numero_ficha': 'numero_ficha',
+        'activa': 'activa',
+        'fecha_creacion': 'fecha_creacion',
+        'paciente_id': 'paciente_id',
+        'rut': 'paciente__persona__Rut',
+        'nombre': 'paciente__persona__Nombre',
+        'apellido_paterno': 'paciente__persona__Apellido_Paterno',
+        'apellido_materno': 'paciente__persona__Apellido_Materno',
+        'fecha_nacimiento': 'paciente__persona__Fecha_nacimiento',
+        'matrona_nombre': 'matrona_responsable__persona__Nombre',
+        'matrona_apellido': 'matrona_responsable__persona__Apellido_Paterno',
+        'semanas': 'edad_gestacional_semanas',
+        'dias': 'edad_gestacional_dias',
+    }
+    calculados = ('edad', 'edad_gestacional', 'patologias')
+
+    def calcular(self):
+        self.edad = edad_desde(self.fecha_nacimiento)
+        self.edad_gestacional = texto_edad_gestacional(self.semanas, self.dias)
+
+    @classmethod
+    def completar(cls, filas):
+        """Nombres de las patologías de todas las fichas en una consulta"""
+        por_ficha = {}
+        for fila in filas:
+            fila.patologias = []
+            por_ficha[fila.pk] = fila
+        if not por_ficha:
+            return
+        asociaciones = (FichaObstetrica.patologias.through.objects
+                        .filter(fichaobstetrica_id__in=por_ficha)
+                        .order_by('patologias__nombre')
+                        .values_list('fichaobstetrica_id', 'patologias__nombre'))
+        for ficha_id, nombre in asociaciones:
+            por_ficha[ficha_id].patologias.append(nombre)
@@ -0,0 +1,37 @@
+# matronaApp/signals.py
+"""
+Invalidación de la caché de fragmentos de la ficha obstétrica
+
+La página de detalle de la ficha (matrona y TENS) depende de la ficha, de
+los datos de la paciente y de la matrona responsable; los medicamentos y
+las patologías invalidan la ficha a la que pertenecen.
+"""
+from core.cache import vigilar_modelo
+from core.fragmentos import vigilar, vigilar_m2m
+from gestionApp.models import Persona, Paciente, Matrona
+
+from .models import FichaObstetrica, MedicamentoFicha, AdministracionMedicamento
+
+
+def dependencias_ficha(ficha):
+    """(modelo, pk) de los que depende el contenido renderizado de una ficha"""
+    dependencias = [
+        (FichaObstetrica, ficha.pk),
+        (Paciente, ficha.paciente_id),
+        (Persona, ficha.paciente_id),
+    ]
+    if ficha.matrona_responsable_id:
+        dependencias.append((Persona, ficha.matrona_responsable.persona_id))
+    return dependencias
+
+
+def conectar():
+    vigilar(Persona, lambda persona: [(Persona, persona.pk)])
+    vigilar(Paciente, lambda paciente: [(Paciente, paciente.pk)])
+    vigilar(Matrona, lambda matrona: [(Persona, matrona.persona_id)])
+    vigilar(FichaObstetrica, lambda ficha: [(FichaObstetrica, ficha.pk)])
+    vigilar(MedicamentoFicha, lambda medicamento: [(FichaObstetrica, medicamento.ficha_id)])
+    vigilar_m2m(FichaObstetrica.patologias, FichaObstetrica)
+
+    # Conteos del menú TENS (core.cache)
+    vigilar_modelo(FichaObstetrica, AdministracionMedicamento)
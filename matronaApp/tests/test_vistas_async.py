@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.concurrencia import consultar_legacy, en_paralelo
+from core.pruebas import crear_paciente
+
+
+class ConcurrenciaLegacyTest(TestCase):
+    def test_timeout_legacy_degrada(self):
+        def lenta():
+            time.sleep(0.5)
+            return ['no debería llegar']
+
+        resultado = asyncio.run(consultar_legacy(lenta, por_defecto=[], timeout=0.05))
+        self.assertEqual(resultado, ([], False))
+
+    def test_en_paralelo_solapa_tareas(self):
+        async def esperar(valor):
+            await asyncio.sleep(0.1)
+            return valor
+
+        inicio = time.perf_counter()
+        datos = asyncio.run(en_paralelo(a=esperar(1), b=esperar(2)))
+        self.assertEqual(datos, {'a': 1, 'b': 2})
+        self.assertLess(time.perf_counter() - inicio, 0.19)
+
+
+class PacienteDetailAsyncTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura'))
+        self.persona = crear_paciente('Ana').persona
+
+    def test_detalle_sin_legacy_igual_renderiza(self):
+        # En pruebas la tabla legacy no existe: la vista debe degradar
+        r = self.client.get(reverse('matrona:detalle_paciente', args=[self.persona.pk]))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['paciente'].pk, self.persona.pk)
+        self.assertTrue(r.context['legacy_error'])
+
+    def test_detalle_paciente_inexistente(self):
+        r = self.client.get(reverse('matrona:detalle_paciente', args=[999999]))
+        self.assertEqual(r.status_code, 404)
+
+    def test_buscar_persona_api_async(self):
+        r = self.client.get(reverse('matrona:api_buscar_persona'), {'rut': self.persona.Rut})
+        datos = r.json()
+        self.assertTrue(datos['encontrado'])
+        self.assertTrue(datos['es_paciente'])
+        self.assertEqual(datos['paciente_id'], self.persona.pk)
+
+    def test_historial_clinico_async(self):
+        r = self.client.get(reverse('medico:historial_clinico', args=[self.persona.pk]))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['total_fichas'], 0)
+        self.assertEqual(r.context['legacy_total'], 0)
@@ -59,6 +59,10 @@ urlpatterns = [
         views.desactivar_ficha, 
         name='toggle_ficha'),
     
+    path('ficha/<int:pk>/trasladar/', 
+        views.trasladar_ficha, 
+        name='trasladar_ficha'),
+    
     # Listado general de todas las fichas
     path('fichas/', 
         views.lista_todas_fichas, 
@@ -1,14 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
-from django.views.generic import ListView, DetailView
-from django.http import JsonResponse
+from django.views import View
+from django.views.generic import ListView
+from django.http import JsonResponse, Http404
 from django.db.models import Q, Count, Prefetch
 
 from matronaApp.models import IngresoPaciente, FichaObstetrica, MedicamentoFicha
 from gestionApp.models import Persona, Paciente, Matrona
 from gestionApp.forms.Gestion_form import PacienteForm
-from matronaApp.forms import IngresoPacienteForm, FichaObstetricaForm  # <-- ESTA LÍNEA ES LA IMPORTANTE
+from matronaApp.forms import IngresoPacienteForm, FichaObstetricaForm, MedicamentoFichaForm  # <-- ESTA LÍNEA ES LA IMPORTANTE
 from legacyApp.models import ControlesPrevios
+from core.concurrencia import consultar_legacy, en_paralelo
+from core.fragmentos import fragmento_cacheado
+from core.replica import usar_replica
+from core.versionado import ConflictoVersion, guardar_campos
+from matronaApp.proyecciones import FilaFicha, FilaPaciente
+from matronaApp.signals import dependencias_ficha
+from asgiref.sync import sync_to_async
 
 
 
@@ -35,34 +44,46 @@ class PacienteListView(ListView):
     context_object_name = 'pacientes'
     
     def get_queryset(self):
-        return Paciente.objects.filter(activo=True).select_related('persona')
+        return FilaPaciente.de(Paciente.objects.filter(activo=True))
 
 
-class PacienteDetailView(DetailView):
-    """Detalle de un paciente específico"""
-    model = Paciente
-    template_name = 'Matrona/Data/paciente_detail.html'
-    context_object_name = 'paciente'
+def _controles_legacy(rut):
+    """Controles previos de la BD histórica (se ejecuta en el hilo legacy)"""
+    return list(ControlesPrevios.objects
+                .using("legacy")
+                .filter(paciente_rut__iexact=rut)
+                .order_by("-fecha_control"))
 
-    def get_queryset(self):
-        return Paciente.objects.select_related('persona')
 
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        paciente = ctx["paciente"]
-        rut = (paciente.persona.Rut or "").strip()
+class PacienteDetailView(View):
+    """
+    Detalle de un paciente específico
 
-        try:
-            # Consulta SIEMPRE contra la BD legacy
-            controles = (ControlesPrevios.objects
-                         .using("legacy")
-                         .filter(paciente_rut__iexact=rut)
-                         .order_by("-fecha_control"))
+    Vista async: la ficha de la paciente (BD principal) y sus controles
+    previos (BD legacy) se consultan en paralelo. Si la BD legacy falla o
+    supera LEGACY_TIMEOUT_SEGUNDOS, el detalle se muestra sin ese panel.
+    """
+    template_name = 'Matrona/Data/paciente_detail.html'
 
-            controles = list(controles)   # materializa para el template
+    async def get(self, request, pk):
+        # Paciente.pk == Persona.pk: el RUT se obtiene con una consulta por PK
+        rut = await (Persona.objects
+                     .filter(pk=pk, paciente__isnull=False)
+                     .values_list('Rut', flat=True)
+                     .afirst())
+        if rut is None:
+            raise Http404("Paciente no encontrado")
+
+        datos = await en_paralelo(
+            paciente=Paciente.objects.select_related('persona').aget(pk=pk),
+            legacy=consultar_legacy(_controles_legacy, rut.strip(), por_defecto=None),
+        )
+        controles, legacy_ok = datos['legacy']
+        ctx = {'paciente': datos['paciente'], 'object': datos['paciente']}
 
+        if legacy_ok:
             # seleccionar control por ?ctrl=<id> (o el más reciente)
-            sel_id = self.request.GET.get("ctrl")
+            sel_id = request.GET.get("ctrl")
             seleccionado = None
             if controles:
                 if sel_id:
@@ -77,10 +98,7 @@ class PacienteDetailView(DetailView):
                 "legacy_selected_id": getattr(seleccionado, "id", None),
                 "legacy_fuente": "Base de datos histórica (LEGACY)",
             })
-        except Exception as e:
-            # si algo falla, no rompas el detalle
-            import logging
-            logging.getLogger(__name__).exception("Fallo consultando LEGACY: %s", e)
+        else:
             ctx.update({
                 "legacy_controles": [],
                 "legacy_total": 0,
@@ -90,7 +108,11 @@ class PacienteDetailView(DetailView):
                 "legacy_error": True,
             })
 
-        return ctx
+        # Nombres usados por el template
+        ctx["controles_legacy"] = ctx["legacy_controles"]
+        ctx["control_seleccionado"] = ctx["legacy_selected"]
+
+        return await sync_to_async(render)(request, self.template_name, ctx)
 
 
 def registrar_paciente(request):
@@ -250,10 +272,8 @@ def lista_fichas_paciente(request, paciente_pk):
         'fichas': fichas
     })
 
-def detalle_ficha(request, pk):
-    """
-    Ver detalle completo de una ficha obstétrica
-    """
+def _contexto_detalle_ficha(pk):
+    """Renderiza el contenido de la ficha y retorna (contexto, dependencias)"""
     ficha = get_object_or_404(
         FichaObstetrica.objects.select_related(
             'paciente__persona',
@@ -268,11 +288,25 @@ def detalle_ficha(request, pk):
         activo=True
     ).order_by('-fecha_inicio')
     
-    return render(request, 'Matrona/Data/detalle_ficha.html', {
+    contenido = render_to_string('Matrona/Data/detalle_ficha_contenido.html', {
         'ficha': ficha,
         'paciente': ficha.paciente,
         'medicamentos': medicamentos,
     })
+    return {'contenido': contenido}, dependencias_ficha(ficha)
+
+
+def detalle_ficha(request, pk):
+    """
+    Ver detalle completo de una ficha obstétrica
+    El contenido se sirve desde la caché de fragmentos mientras la ficha,
+    la paciente y los medicamentos no cambien
+    """
+    contexto = fragmento_cacheado(
+        'matrona:detalle_ficha', FichaObstetrica, pk,
+        lambda: _contexto_detalle_ficha(pk),
+    )
+    return render(request, 'Matrona/Data/detalle_ficha.html', contexto)
 
 def editar_ficha(request, pk):
     """
@@ -306,17 +340,26 @@ def editar_ficha(request, pk):
             # Guardar sin commit para asegurar el paciente
             ficha_actualizada = form.save(commit=False)
             ficha_actualizada.paciente = paciente  # Mantener el mismo paciente
-            ficha_actualizada.save()
-            
-            # Guardar relaciones ManyToMany (patologías)
-            form.save_m2m()
-            
-            messages.success(
-                request, 
-                f"✅ Ficha obstétrica {ficha.numero_ficha} actualizada exitosamente."
-            )
-            return redirect('matrona:detalle_ficha', pk=ficha.pk)
-        else:
+            try:
+                ficha_actualizada.save()
+            except ConflictoVersion:
+                # Otra matrona guardó entre la validación y el guardado
+                form.agregar_conflicto()
+            else:
+                # Guardar relaciones ManyToMany (patologías)
+                form.save_m2m()
+
+                if form.combinados:
+                    messages.info(
+                        request,
+                        f"ℹ️ Se conservaron los cambios de otro usuario en: {form.etiquetas_combinadas()}."
+                    )
+                messages.success(
+                    request, 
+                    f"✅ Ficha obstétrica {ficha.numero_ficha} actualizada exitosamente."
+                )
+                return redirect('matrona:detalle_ficha', pk=ficha.pk)
+        if form.errors:
             messages.error(
                 request, 
                 "❌ Por favor corrige los errores en el formulario."
@@ -346,8 +389,10 @@ def desactivar_ficha(request, pk):
     ficha = get_object_or_404(FichaObstetrica, pk=pk)
     
     if request.method == 'POST':
-        ficha.activa = not ficha.activa
-        ficha.save()
+        activa = not ficha.activa
+        if not guardar_campos(ficha, lambda f: setattr(f, 'activa', activa), ['activa', 'fecha_modificacion']):
+            messages.error(request, "❌ La ficha se está modificando en este momento. Intente nuevamente.")
+            return redirect('matrona:detalle_ficha', pk=ficha.pk)
         
         estado = "activada" if ficha.activa else "cerrada"
         messages.success(request, f"✅ Ficha {ficha.numero_ficha} {estado} exitosamente.")
@@ -358,14 +403,48 @@ def desactivar_ficha(request, pk):
         'ficha': ficha
     })
 
+def trasladar_ficha(request, pk):
+    """
+    Trasladar la paciente de una ficha activa a otra sala (preparto,
+    parto, puerperio, ARO). Solo se guarda la sala: si otro usuario guardó
+    la ficha entre medio se recarga y se vuelve a aplicar el traslado.
+    """
+    ficha = get_object_or_404(
+        FichaObstetrica.objects.select_related('paciente__persona'),
+        pk=pk
+    )
+
+    if not ficha.activa:
+        messages.warning(request, "⚠️ No se puede trasladar una ficha cerrada.")
+        return redirect('matrona:detalle_ficha', pk=ficha.pk)
+
+    salas = dict(FichaObstetrica.SALA_CHOICES)
+
+    if request.method == 'POST':
+        sala = request.POST.get('sala')
+        if sala not in salas:
+            messages.error(request, "❌ Seleccione una sala válida.")
+        elif sala == ficha.sala:
+            messages.info(request, f"ℹ️ La paciente ya se encuentra en {salas[sala]}.")
+            return redirect('matrona:detalle_ficha', pk=ficha.pk)
+        elif not guardar_campos(ficha, lambda f: setattr(f, 'sala', sala), ['sala', 'fecha_modificacion']):
+            messages.error(request, "❌ La ficha se está modificando en este momento. Intente nuevamente.")
+            return redirect('matrona:detalle_ficha', pk=ficha.pk)
+        else:
+            messages.success(request, f"✅ Ficha {ficha.numero_ficha} trasladada a {salas[sala]}.")
+            return redirect('matrona:detalle_ficha', pk=ficha.pk)
+
+    return render(request, 'Matrona/Formularios/trasladar_ficha.html', {
+        'ficha': ficha,
+        'salas': FichaObstetrica.SALA_CHOICES,
+    })
+
+@usar_replica
 def lista_todas_fichas(request):
     """
     Listado general de todas las fichas obstétricas del sistema
     """
-    fichas = FichaObstetrica.objects.select_related(
-        'paciente__persona',
-        'matrona_responsable__persona'
-    ).order_by('-fecha_creacion')
+    fichas = FichaObstetrica.objects.order_by('-fecha_creacion')
     
     # Filtros opcionales
     activa = request.GET.get('activa')
@@ -375,7 +454,7 @@ def lista_todas_fichas(request):
         fichas = fichas.filter(activa=False)
     
     return render(request, 'Matrona/Data/todas_fichas.html', {
-        'fichas': fichas
+        'fichas': FilaFicha.de(fichas)
     })
 
 def registrar_ficha(request):
@@ -400,10 +479,17 @@ def eliminar_patologia(request, paciente_pk, patologia_pk):
 # ============================================
 # API REST (AJAX) - Para búsquedas dinámicas
 # ============================================
-def buscar_paciente_api(request):
+def _contar_controles_legacy(rut):
+    return ControlesPrevios.objects.using("legacy").filter(paciente_rut__iexact=rut).count()
+
+
+async def buscar_paciente_api(request):
     """
     Buscar paciente vía AJAX (retorna JSON)
     Usado en formularios para autocompletar datos
+
+    La paciente (BD principal) y la cantidad de controles previos (BD legacy)
+    se consultan en paralelo; 'controles_legacy' es null si legacy no responde.
     """
     rut = request.GET.get('rut', '').strip()
     
@@ -414,10 +500,15 @@ def buscar_paciente_api(request):
         })
     
     try:
-        paciente = Paciente.objects.select_related('persona').get(
-            persona__Rut=rut,
-            activo=True
+        datos = await en_paralelo(
+            paciente=Paciente.objects.select_related('persona').aget(
+                persona__Rut=rut,
+                activo=True
+            ),
+            legacy=consultar_legacy(_contar_controles_legacy, rut),
         )
+        paciente = datos['paciente']
+        controles_legacy, _ok = datos['legacy']
         
         return JsonResponse({
             'encontrado': True,
@@ -431,6 +522,7 @@ def buscar_paciente_api(request):
                 'prevision': paciente.get_Previcion_display(),
                 'acompanante': paciente.Acompañante or '',
                 'contacto_emergencia': paciente.Contacto_emergencia or '',
+                'controles_legacy': controles_legacy,
             }
         })
     except Paciente.DoesNotExist:
@@ -439,7 +531,7 @@ def buscar_paciente_api(request):
             'mensaje': 'No se encontró un paciente activo con ese RUT'
         })
 
-def buscar_persona_api(request):
+async def buscar_persona_api(request):
     """
     Buscar persona vía AJAX (retorna JSON)
     Usado para verificar si una persona existe antes de crear paciente
@@ -453,7 +545,8 @@ def buscar_persona_api(request):
         })
     
     try:
-        persona = Persona.objects.get(Rut=rut, Activo=True)
+        # select_related evita una consulta síncrona al revisar persona.paciente
+        persona = await Persona.objects.select_related('paciente').aget(Rut=rut, Activo=True)
         
         # Verificar si ya es paciente
         es_paciente = hasattr(persona, 'paciente')
@@ -492,8 +585,6 @@ def agregar_medicamento_ficha(request, ficha_pk):
     """
     Vista para que la MATRONA asigne un medicamento a una ficha
     """
-    from matronaApp.forms.medicamento_forms import MatronaAsignarMedicamento
-    
     ficha = get_object_or_404(
         FichaObstetrica.objects.select_related('paciente__persona'),
         pk=ficha_pk
@@ -505,7 +596,7 @@ def agregar_medicamento_ficha(request, ficha_pk):
         return redirect('matrona:detalle_ficha', pk=ficha.pk)
     
     if request.method == 'POST':
-        form = MatronaAsignarMedicamento(request.POST)
+        form = MedicamentoFichaForm(request.POST)
         
         if form.is_valid():
             medicamento = form.save(commit=False)
@@ -520,7 +611,7 @@ def agregar_medicamento_ficha(request, ficha_pk):
         else:
             messages.error(request, "❌ Por favor corrige los errores en el formulario.")
     else:
-        form = MatronaAsignarMedicamento()
+        form = MedicamentoFichaForm()
     
     return render(request, 'Matrona/Formularios/agregar_medicamento.html', {
         'form': form,
@@ -532,8 +623,6 @@ def editar_medicamento_ficha(request, medicamento_pk):
     """
     Vista para que la MATRONA edite un medicamento asignado
     """
-    from matronaApp.forms.medicamento_forms import MatronaAsignarMedicamento
-    
     medicamento = get_object_or_404(
         MedicamentoFicha.objects.select_related('ficha__paciente__persona'),
         pk=medicamento_pk
@@ -547,16 +636,25 @@ def editar_medicamento_ficha(request, medicamento_pk):
         return redirect('matrona:detalle_ficha', pk=ficha.pk)
     
     if request.method == 'POST':
-        form = MatronaAsignarMedicamento(request.POST, instance=medicamento)
+        form = MedicamentoFichaForm(request.POST, instance=medicamento)
         
         if form.is_valid():
-            form.save()
-            messages.success(request, "✅ Medicamento actualizado exitosamente.")
-            return redirect('matrona:detalle_ficha', pk=ficha.pk)
-        else:
+            try:
+                form.save()
+            except ConflictoVersion:
+                form.agregar_conflicto()
+            else:
+                if form.combinados:
+                    messages.info(
+                        request,
+                        f"ℹ️ Se conservaron los cambios de otro usuario en: {form.etiquetas_combinadas()}."
+                    )
+                messages.success(request, "✅ Medicamento actualizado exitosamente.")
+                return redirect('matrona:detalle_ficha', pk=ficha.pk)
+        if form.errors:
             messages.error(request, "❌ Por favor corrige los errores en el formulario.")
     else:
-        form = MatronaAsignarMedicamento(instance=medicamento)
+        form = MedicamentoFichaForm(instance=medicamento)
     
     return render(request, 'Matrona/Formularios/editar_medicamento.html', {
         'form': form,
@@ -572,8 +670,9 @@ def desactivar_medicamento_ficha(request, medicamento_pk):
     medicamento = get_object_or_404(MedicamentoFicha, pk=medicamento_pk)
     
     if request.method == 'POST':
-        medicamento.activo = False
-        medicamento.save()
+        if not guardar_campos(medicamento, lambda m: setattr(m, 'activo', False), ['activo']):
+            messages.error(request, "❌ El medicamento se está modificando en este momento. Intente nuevamente.")
+            return redirect('matrona:detalle_ficha', pk=medicamento.ficha_id)
         
         messages.success(
             request,
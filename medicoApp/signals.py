@@ -0,0 +1,11 @@
+# medicoApp/signals.py
+"""
+Invalidación de la caché compartida (core.cache) del catálogo de patologías
+"""
+from core.cache import vigilar_modelo
+
+from .models import Patologias
+
+
+def conectar():
+    vigilar_modelo(Patologias)
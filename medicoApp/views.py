@@ -7,6 +7,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db.models import Q, Count
 from medicoApp.models import Patologias
+from core import cache
 # cargamos los decoradores para validar los accesos
 from core.decorators import role_required
 
@@ -17,15 +18,12 @@ from core.decorators import role_required
 @role_required("Médico") # Llamada al decorador para validar el acceso va de la mani con app_name
 def menu_medico(request):
     """Vista principal del módulo Médico"""
-    context = {
-        'total_patologias': Patologias.objects.count(),
-        'patologias_activas': Patologias.objects.filter(estado='Activo').count(),
-        'patologias_inactivas': Patologias.objects.filter(estado='Inactivo').count(),
-        'patologias_alto_riesgo': Patologias.objects.filter(
-            nivel_de_riesgo__in=['Alto', 'Crítico'],
-            estado='Activo'
-        ).count(),
-    }
+    context = cache.cacheado('medico:totales_patologias', [Patologias], lambda: Patologias.objects.aggregate(
+        total_patologias=Count('id'),
+        patologias_activas=Count('id', filter=Q(estado='Activo')),
+        patologias_inactivas=Count('id', filter=Q(estado='Inactivo')),
+        patologias_alto_riesgo=Count('id', filter=Q(nivel_de_riesgo__in=['Alto', 'Crítico'], estado='Activo')),
+    ))
     return render(request, 'Medico/menu_medico.html', context)
 
 
@@ -176,16 +174,23 @@ def buscar_paciente_medico(request):
     })
 
 
-def ver_historial_clinico(request, paciente_pk):
+async def ver_historial_clinico(request, paciente_pk):
     """
     Ver el historial clínico completo de un paciente
     Muestra todas las fichas obstétricas con sus detalles
+
+    Las fichas (BD principal) y los controles previos (BD legacy) se
+    consultan en paralelo; si legacy no responde a tiempo se omiten.
     """
+    from asgiref.sync import sync_to_async
+    from django.shortcuts import aget_object_or_404
+    from core.concurrencia import consultar_legacy, en_paralelo
     from gestionApp.models import Paciente
     from matronaApp.models import FichaObstetrica
+    from legacyApp.models import ControlesPrevios
     from django.db.models import Prefetch, Count
     
-    paciente = get_object_or_404(
+    paciente = await aget_object_or_404(
         Paciente.objects.select_related('persona'),
         pk=paciente_pk,
         activo=True
@@ -203,9 +208,24 @@ def ver_historial_clinico(request, paciente_pk):
         num_medicamentos=Count('medicamentos', filter=Q(medicamentos__activo=True)),
         num_patologias=Count('patologias')
     ).order_by('-fecha_creacion')
+
+    def controles_previos(rut):
+        return list(ControlesPrevios.objects.using('legacy')
+                    .filter(paciente_rut__iexact=rut)
+                    .order_by('-fecha_control'))
+
+    datos = await en_paralelo(
+        fichas=sync_to_async(list)(fichas),
+        legacy=consultar_legacy(controles_previos, (paciente.persona.Rut or '').strip(), por_defecto=[]),
+    )
+    fichas = datos['fichas']
+    controles, legacy_ok = datos['legacy']
     
-    return render(request, 'Medico/Data/historial_clinico.html', {
+    return await sync_to_async(render)(request, 'Medico/Data/historial_clinico.html', {
         'paciente': paciente,
         'fichas': fichas,
-        'total_fichas': fichas.count()
+        'total_fichas': len(fichas),
+        'legacy_controles': controles,
+        'legacy_total': len(controles),
+        'legacy_error': not legacy_ok,
     })
\ No newline at end of file
@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Despliegue ASGI (vistas async con consultas paralelas a default/legacy):
+    uvicorn obstetric_care.asgi:application --workers 4 --host 0.0.0.0 --port 8000
 """
 
 import os
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'obstetric_care.settings')
 
 application = get_asgi_application()
+
+# Calentar el worker antes de que reciba tráfico (ver WARMUP_AL_INICIAR)
+from core.calentamiento import calentar_al_iniciar  # noqa: E402
+
+calentar_al_iniciar()
@@ -1,3 +1,8 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from core.replica import alias_replica, leer_de_replica
+
+
 class LegacyRouter:
     app_label = "legacyApp"
 
@@ -20,3 +25,34 @@ class LegacyRouter:
         if app_label == self.app_label:
             return False
         return None
+
+
+class ReplicaRouter:
+    """
+    Lecturas a la réplica (REPLICA_ALIAS) solo dentro de core.replica.usar_replica
+    y mientras esté disponible; escrituras siempre a la principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = leer_de_replica()
+        if alias is not None:
+            return alias
+        # Relaciones de un objeto leído de la réplica fuera del contexto
+        return self._principal_si_viene_de_replica(hints)
+
+    def db_for_write(self, model, **hints):
+        # Un objeto leído de la réplica se guarda en la principal
+        return self._principal_si_viene_de_replica(hints)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == alias_replica():
+            return False
+        return None
+
+    @staticmethod
+    def _principal_si_viene_de_replica(hints):
+        instancia = hints.get('instance')
+        replica = alias_replica()
+        if replica is not None and instancia is not None and instancia._state.db == replica:
+            return DEFAULT_DB_ALIAS
+        return None
@@ -70,14 +70,27 @@ INSTALLED_APPS = [
     'partosApp',
     'ingresoPartoApp',
     'recienNacidoApp',
+    'apiApp',                    # API REST de solo lectura (v1)
+    'tareasApp',                 # Cola de tareas en segundo plano (run_workers)
+    'tableroApp',                # Tablero de sala en vivo (SSE)
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Estáticos con huella y precomprimidos (antes de sesión/autenticación)
+    'core.middleware.estaticos.EstaticosComprimidosMiddleware',
+    # Brotli/gzip de las páginas (después de sesión y CSRF, que tocan Vary)
+    'core.middleware.compresion.CompresionMiddleware',
+    # Lecturas a la principal justo después de un POST (core.replica)
+    'core.middleware.replica.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Filtra los datos clínicos por la maternidad del usuario (core.establecimientos)
+    'core.middleware.establecimiento.EstablecimientoMiddleware',
+    # Auditoría por campo de fichas y partos, con el usuario de la petición (core.auditoria)
+    'core.middleware.auditoria.AuditoriaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
@@ -129,29 +142,109 @@ pymysql.install_as_MySQLdb()
 DATABASES = {
     # Base principal del sistema (es la que usa Django para migraciones nuevas)
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # MySQL con pool de conexiones por proceso (core.backends.mysql_pool)
+        'ENGINE': 'core.backends.mysql_pool',
         'NAME': 'obstetric_carebdd',
         'USER': 'root',
         'PASSWORD': '12345678',
         'HOST': '127.0.0.1',
         'PORT': '3306',
         'OPTIONS': {'charset': 'utf8mb4'},
+        # Cada petición devuelve su conexión al pool; el calentamiento deja
+        # MINIMO conexiones abiertas (ver WARMUP_AL_INICIAR)
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MAXIMO': 10, 'MINIMO': 2, 'VIDA_MAXIMA': 1800, 'VERIFICAR_TRAS': 30, 'ESPERA': 5},
     },
 
     # Base histórica (solo lectura)
     'legacy': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'core.backends.mysql_pool',
         'NAME': 'legacy_obstetric',
         'USER': 'root',
         'PASSWORD': '12345678',
         'HOST': '127.0.0.1',
         'PORT': '3306',
-        'OPTIONS': {'charset': 'utf8mb4'},
+        # Tiempos acotados: una BD histórica lenta no debe retener hilos
+        'OPTIONS': {'charset': 'utf8mb4', 'connect_timeout': 3, 'read_timeout': 5},
+        'CONN_MAX_AGE': 0,
+        # Poco tráfico: pool chico y espera corta si está agotado
+        'POOL': {'MAXIMO': 4, 'MINIMO': 1, 'VIDA_MAXIMA': 1800, 'VERIFICAR_TRAS': 30, 'ESPERA': 2},
     },
 }
 
-# Router para impedir migraciones y escrituras en la base legacy
-DATABASE_ROUTERS = ['obstetric_care.dbrouters.LegacyRouter']
+# Réplica de lectura de 'default' (opcional, se activa con REPLICA_DB_HOST).
+# Solo la usan los reportes y listados marcados con core.replica.usar_replica;
+# si no responde o se atrasa más de REPLICA_RETRASO_MAXIMO segundos se lee de
+# la principal. REPLICA_PEGAJOSA_SEGUNDOS: tras un POST, ese navegador lee de
+# la principal (core.middleware.replica).
+REPLICA_ALIAS = 'replica'
+REPLICA_RETRASO_MAXIMO = 5
+REPLICA_VERIFICAR_CADA = 10
+REPLICA_PEGAJOSA_SEGUNDOS = 10
+if os.environ.get('REPLICA_DB_HOST'):
+    DATABASES[REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['REPLICA_DB_HOST'],
+        'PORT': os.environ.get('REPLICA_DB_PORT', '3306'),
+        'OPTIONS': {'charset': 'utf8mb4', 'connect_timeout': 2},
+        'POOL': {'MAXIMO': 6, 'MINIMO': 1, 'VIDA_MAXIMA': 1800, 'VERIFICAR_TRAS': 30, 'ESPERA': 2},
+        # En pruebas la "réplica" es la misma BD de pruebas
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Calentar cada worker WSGI al iniciar (core.calentamiento): importa vistas y
+# formularios, compila los templates, abre las conexiones y arma los
+# catálogos antes de la primera petición. Con `gunicorn --preload` excluir
+# 'bd' de WARMUP_FASES: las conexiones no deben abrirse antes del fork.
+WARMUP_AL_INICIAR = not DEBUG
+WARMUP_FASES = None  # None = todas; ej. ['urls', 'modulos', 'templates', 'catalogos']
+
+# Tiempo máximo (segundos) que las vistas async esperan a la BD legacy
+# antes de mostrar la página sin el panel histórico (core.concurrencia)
+LEGACY_TIMEOUT_SEGUNDOS = 2.0
+
+# Cachés (core.cache): 'default' es la L1 en memoria de cada proceso y
+# 'compartida' la L2 que ven todos los workers del servidor; las versiones
+# por modelo y el contenido de las páginas de detalle (core.fragmentos)
+# viven en L2, por lo que las invalidaciones se ven en todos los procesos.
+# En varios hosts usar Redis o Memcached para 'compartida' en vez de archivos.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'compartida': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'compartida',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Sesiones (core.sesiones): leídas de la caché compartida y escritas en la
+# BD a lo más cada SESION_DIFERIR_SEGUNDOS, salvo inicio/cierre de sesión.
+# Las vencidas se borran por lotes en la tarea 'purgar_sesiones', que se
+# encola cada SESION_PURGAR_CADA segundos (0 = solo con `clearsessions`).
+SESSION_ENGINE = 'core.sesiones'
+SESSION_CACHE_ALIAS = 'compartida'
+SESION_DIFERIR_SEGUNDOS = 60
+SESION_PURGAR_CADA = 3600
+
+# Auditoría por campo (core.auditoria): cada cuántas versiones de un
+# registro se guarda completo (punto de control para reconstruir versiones)
+AUDITORIA_PUNTO_CONTROL_CADA = 20
+
+# Horas que se conserva un registro de parto por pasos sin terminar
+# (partosApp.BorradorParto; purgar con `purgar_borradores_parto`)
+BORRADOR_PARTO_HORAS = 24
+
+# Con varias maternidades en el mismo despliegue, los usuarios sin
+# establecimiento asignado (salvo superusuarios) no acceden a datos clínicos
+ESTABLECIMIENTO_OBLIGATORIO = False
+
+# Routers: impedir migraciones y escrituras en la base legacy; lecturas
+# opcionales a la réplica (core.replica)
+DATABASE_ROUTERS = ['obstetric_care.dbrouters.LegacyRouter', 'obstetric_care.dbrouters.ReplicaRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -187,10 +280,46 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Huella de contenido + variantes .br/.gz (core.estaticos); construir con
+# `python manage.py construir_estaticos` en cada despliegue
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.estaticos.EstaticosComprimidosStorage'},
+}
+
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# PDF clínicos generados (partosApp.pdf). Fuera de MEDIA_ROOT: contienen datos
+# de pacientes y solo se sirven a través de vistas con login.
+PDF_ROOT = BASE_DIR / 'pdf_generados'
+
+# Exportaciones FHIR asíncronas (apiApp.tareas). Fuera de MEDIA_ROOT por lo
+# mismo: se descargan por la API, solo quien pidió la exportación.
+EXPORTACIONES_ROOT = BASE_DIR / 'exportaciones_fhir'
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# ============================================
+# API REST (Django REST framework)
+# ============================================
+REST_FRAMEWORK = {
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'DEFAULT_VERSION': 'v1',
+    'ALLOWED_VERSIONS': ['v1'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apiApp.pagination.CursorClinicoPagination',
+    'PAGE_SIZE': 50,
+}
@@ -31,6 +31,13 @@ urlpatterns = [
     path('medico/', include('medicoApp.urls')),
     path('tens/', include('tensApp.urls')),
     path('partos/', include('partosApp.urls')),
+    path('tareas/', include('tareasApp.urls')),
+    path('tablero/', include('tableroApp.urls')),
+
+    # ============================================
+    # API REST VERSIONADA
+    # ============================================
+    path('api/<str:version>/', include('apiApp.urls')),
 
     # ============================================
     # AUTENTICACIÓN 2FA (TEMPORALMENTE DESACTIVADO)
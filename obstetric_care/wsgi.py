@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'obstetric_care.settings')
 
 application = get_wsgi_application()
+
+# Calentar el worker antes de que reciba tráfico (ver WARMUP_AL_INICIAR)
+from core.calentamiento import calentar_al_iniciar  # noqa: E402
+
+calentar_al_iniciar()
@@ -14,4 +14,5 @@ class PartosappConfig(AppConfig):
         Método que se ejecuta cuando la aplicación está lista
         Aquí se pueden importar signals si es necesario
         """
-        pass
\ No newline at end of file
+        from . import signals
+        signals.conectar()
\ No newline at end of file
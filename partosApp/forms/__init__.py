@@ -17,6 +17,8 @@ from .recien_nacido_forms import (
     RegistroRecienNacidoForm,
     DatosRecienNacidoForm,
     ApegoAcompanamientoForm,
+    RecienNacidoMultipleForm,
+    RecienNacidoMultipleFormSet,
 )
 
 from .documentos_forms import (
@@ -36,6 +38,8 @@ __all__ = [
     'RegistroRecienNacidoForm',
     'DatosRecienNacidoForm',
     'ApegoAcompanamientoForm',
+    'RecienNacidoMultipleForm',
+    'RecienNacidoMultipleFormSet',
     # Formularios de Documentos
     'DocumentosPartoForm',
 ]
\ No newline at end of file
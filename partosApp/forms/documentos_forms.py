@@ -5,6 +5,8 @@ CORREGIDO: Usar registro_recien_nacido en lugar de registro_parto
 """
 from django import forms
 from recienNacidoApp.models import DocumentosParto, RegistroRecienNacido  # ✅ Importación corregida
+from partosApp.models import RegistroParto
+from core.opciones import usar_opciones_cacheadas
 
 
 class DocumentosPartoForm(forms.ModelForm):
@@ -84,9 +86,11 @@ class DocumentosPartoForm(forms.ModelForm):
             self.fields['registro_recien_nacido'].initial = registro_rn
             self.fields['registro_recien_nacido'].widget = forms.HiddenInput()
         
-        # Filtrar solo registros de RN
-        self.fields['registro_recien_nacido'].queryset = RegistroRecienNacido.objects.select_related(
-            'registro_parto__ficha__paciente__persona'
+        # Filtrar solo registros de RN (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'registro_recien_nacido',
+            RegistroRecienNacido.objects.select_related('registro_parto'),
+            modelos=[RegistroParto],
         )
         
         # Todos los campos son opcionales excepto registro_recien_nacido
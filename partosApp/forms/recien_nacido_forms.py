@@ -7,6 +7,9 @@ from django import forms
 from django.core.exceptions import ValidationError
 from recienNacidoApp.models import RegistroRecienNacido  # ✅ Importación corregida
 from partosApp.models import RegistroParto
+from matronaApp.models import FichaObstetrica
+from gestionApp.models import Persona
+from core.opciones import usar_opciones_cacheadas
 
 
 class RegistroRecienNacidoForm(forms.ModelForm):
@@ -148,10 +151,12 @@ class RegistroRecienNacidoForm(forms.ModelForm):
             self.fields['registro_parto'].initial = registro_parto
             self.fields['registro_parto'].widget = forms.HiddenInput()
         
-        # Filtrar solo registros de parto activos
-        self.fields['registro_parto'].queryset = RegistroParto.objects.filter(
-            activo=True
-        ).select_related('ficha__paciente__persona')
+        # Filtrar solo registros de parto activos (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'registro_parto',
+            RegistroParto.objects.filter(activo=True).select_related('ficha__paciente__persona'),
+            modelos=[FichaObstetrica, Persona],
+        )
     
     def clean(self):
         """Validaciones personalizadas"""
@@ -319,4 +324,71 @@ class ApegoAcompanamientoForm(forms.ModelForm):
             'motivo_no_acompanado': 'Motivo de NO Acompañamiento',  # ✅ Corregido
             'persona_acompanante': 'Persona Acompañante',
             'acompanante_secciona_cordon': 'Acompañante Cortó el Cordón',
-        }
\ No newline at end of file
+        }
+
+# ============================================
+# PARTO MÚLTIPLE (GEMELOS, TRILLIZOS, ...)
+# ============================================
+
+class RecienNacidoMultipleForm(RegistroRecienNacidoForm):
+    """
+    Un RN dentro del formset de parto múltiple: el registro de parto no
+    viaja en el POST, lo fija el formset para todos los RN
+    """
+    def __init__(self, *args, **kwargs):
+        registro_parto = kwargs.pop('registro_parto')
+        super().__init__(*args, **kwargs)
+        del self.fields['registro_parto']
+        self.instance.registro_parto = registro_parto
+
+
+class BaseRecienNacidoMultipleFormSet(forms.BaseModelFormSet):
+    """
+    Valida en conjunto los RN de un mismo parto. Solo crea registros nuevos:
+    el guardado lo hace la vista con un único INSERT (crear_en_lote).
+    """
+    def __init__(self, *args, registro_parto, cantidad=None, **kwargs):
+        self.registro_parto = registro_parto
+        if cantidad:
+            # Formularios en blanco a mostrar (sin POST)
+            self.extra = max(cantidad - self.min_num, 0)
+        kwargs.setdefault('queryset', RegistroRecienNacido.objects.none())
+        kwargs.setdefault('prefix', 'rn')
+        super().__init__(*args, **kwargs)
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        kwargs['registro_parto'] = self.registro_parto
+        return kwargs
+
+    def clean(self):
+        super().clean()
+        if any(self.errors):
+            return
+
+        admision = self.registro_parto.fecha_hora_admision
+        for form in self.forms:
+            nacimiento = form.cleaned_data.get('fecha_nacimiento')
+            if admision and nacimiento and nacimiento < admision:
+                raise ValidationError(
+                    'La fecha de nacimiento de un RN no puede ser anterior a la admisión del parto.'
+                )
+
+    def instancias_nuevas(self):
+        """RN sin guardar de los formularios con datos"""
+        return [
+            form.instance for form in self.forms
+            if form.has_changed() and not self._should_delete_form(form)
+        ]
+
+
+RecienNacidoMultipleFormSet = forms.modelformset_factory(
+    RegistroRecienNacido,
+    form=RecienNacidoMultipleForm,
+    formset=BaseRecienNacidoMultipleFormSet,
+    extra=0,
+    min_num=2,
+    validate_min=True,
+    max_num=8,
+    validate_max=True,
+)
@@ -3,6 +3,9 @@ from django import forms
 from django.core.exceptions import ValidationError
 from partosApp.models import RegistroParto
 from matronaApp.models import FichaObstetrica
+from gestionApp.models import Paciente, Persona
+from core.opciones import usar_opciones_cacheadas
+from core.versionado import VersionadoFormMixin
 
 
 class RegistroPartoBaseForm(forms.ModelForm):
@@ -39,10 +42,12 @@ class RegistroPartoBaseForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar solo fichas activas
-        self.fields['ficha'].queryset = FichaObstetrica.objects.filter(
-            activa=True
-        ).select_related('paciente__persona')
+        # Filtrar solo fichas activas (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'ficha',
+            FichaObstetrica.objects.filter(activa=True).select_related('paciente__persona'),
+            modelos=[Paciente, Persona],
+        )
 
 
 class TrabajoDePartoForm(forms.ModelForm):
@@ -368,7 +373,7 @@ class ProfesionalesForm(forms.ModelForm):
         }
 
 
-class RegistroPartoCompletoForm(forms.ModelForm):
+class RegistroPartoCompletoForm(VersionadoFormMixin, forms.ModelForm):
     """
     Formulario completo del parto (todas las secciones en uno)
     Usar solo si se quiere capturar todo en una sola vista
@@ -392,10 +397,12 @@ class RegistroPartoCompletoForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Filtrar fichas activas
-        self.fields['ficha'].queryset = FichaObstetrica.objects.filter(
-            activa=True
-        ).select_related('paciente__persona')
+        # Filtrar fichas activas (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'ficha',
+            FichaObstetrica.objects.filter(activa=True).select_related('paciente__persona'),
+            modelos=[Paciente, Persona],
+        )
         
         # Hacer campos opcionales según corresponda
         campos_opcionales = [
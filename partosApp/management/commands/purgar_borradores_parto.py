@@ -0,0 +1,17 @@
+"""
+Elimina borradores del registro de parto por pasos que ya expiraron
+Uso: python manage.py purgar_borradores_parto
+
+La vigencia se define con BORRADOR_PARTO_HORAS en settings (24 por defecto).
+"""
+from django.core.management.base import BaseCommand
+
+from partosApp.models import BorradorParto
+
+
+class Command(BaseCommand):
+    help = 'Elimina borradores de parto sin modificar dentro de la vigencia'
+
+    def handle(self, *args, **options):
+        total, _detalle = BorradorParto.expirados().delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} borradores eliminados'))
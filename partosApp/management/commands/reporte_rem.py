@@ -0,0 +1,91 @@
+"""
+Genera el REM mensual de partos en XLSX
+Uso:
+    python manage.py reporte_rem --desde 2025-03 --destino /srv/rem
+    python manage.py reporte_rem --desde 2021-01 --hasta 2025-12 --procesos 4 --destino /srv/rem
+
+Genera <destino>/REM_<año>_<mes>.xlsx por mes y, si hay más de un mes,
+<destino>/REM_resumen_<desde>_<hasta>.xlsx con una columna por mes. Los
+meses son independientes entre sí, por lo que una carga de varios años se
+reparte en --procesos procesos (cada uno con su propia conexión a la BD).
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.replica import usar_replica
+from partosApp import rem
+
+
+def _parsear_mes(texto):
+    try:
+        anio, mes = (int(parte) for parte in texto.split('-'))
+    except ValueError:
+        raise CommandError(f"Mes inválido '{texto}' (formato AAAA-MM)")
+    if not 1 <= mes <= 12:
+        raise CommandError(f"Mes inválido '{texto}' (formato AAAA-MM)")
+    return anio, mes
+
+
+def _meses(desde, hasta):
+    anio, mes = desde
+    while (anio, mes) <= hasta:
+        yield anio, mes
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def _generar_mes(anio, mes, destino):
+    """Punto de entrada de cada proceso: calcula y escribe un mes"""
+    import django
+    django.setup()  # necesario si el sistema usa 'spawn' en vez de 'fork'
+    connections.close_all()  # no reutilizar la conexión heredada del padre
+
+    with usar_replica():
+        valores = rem.valores_mes(anio, mes)
+        rem.escribir_xlsx(anio, mes, str(Path(destino) / f'REM_{anio}_{mes:02d}.xlsx'), valores=valores)
+    return anio, mes, valores
+
+
+class Command(BaseCommand):
+    help = 'Genera el Reporte Estadístico Mensual (REM) de partos y recién nacidos en XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', required=True, help='Primer mes (AAAA-MM)')
+        parser.add_argument('--hasta', default=None, help='Último mes (AAAA-MM); por defecto igual a --desde')
+        parser.add_argument('--destino', required=True, help='Directorio de salida')
+        parser.add_argument('--procesos', type=int, default=1, help='Procesos en paralelo')
+
+    def handle(self, *args, **options):
+        desde = _parsear_mes(options['desde'])
+        hasta = _parsear_mes(options['hasta']) if options['hasta'] else desde
+        if hasta < desde:
+            raise CommandError('--hasta no puede ser anterior a --desde')
+
+        destino = Path(options['destino'])
+        destino.mkdir(parents=True, exist_ok=True)
+        meses = list(_meses(desde, hasta))
+        resultados = {}
+
+        if options['procesos'] <= 1 or len(meses) == 1:
+            for anio, mes in meses:
+                with usar_replica():
+                    resultados[(anio, mes)] = rem.valores_mes(anio, mes)
+                    rem.escribir_xlsx(anio, mes, str(destino / f'REM_{anio}_{mes:02d}.xlsx'),
+                                      valores=resultados[(anio, mes)])
+                self.stdout.write(f'  {anio}-{mes:02d}: {resultados[(anio, mes)]["partos_total"]} partos')
+        else:
+            connections.close_all()  # los hijos abren su propia conexión
+            with ProcessPoolExecutor(max_workers=options['procesos']) as pool:
+                futuros = [pool.submit(_generar_mes, anio, mes, str(destino)) for anio, mes in meses]
+                for futuro in as_completed(futuros):
+                    anio, mes, valores = futuro.result()
+                    resultados[(anio, mes)] = valores
+                    self.stdout.write(f'  {anio}-{mes:02d}: {valores["partos_total"]} partos')
+
+        if len(meses) > 1:
+            nombre = f'REM_resumen_{desde[0]}_{desde[1]:02d}_{hasta[0]}_{hasta[1]:02d}.xlsx'
+            rem.escribir_resumen_xlsx(resultados, str(destino / nombre))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ REM generado para {len(meses)} mes(es) en {destino}'))
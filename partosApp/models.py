@@ -1,9 +1,13 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.auditoria import AuditadoMixin
+from core.establecimientos import ConEstablecimiento
+from core.outbox import OutboxMixin
+from core.versionado import ConVersion
 
 
-class RegistroParto(models.Model):
+class RegistroParto(OutboxMixin, AuditadoMixin, ConVersion, ConEstablecimiento):
 
     # ============================================
     # RELACIONES
@@ -15,6 +19,7 @@ class RegistroParto(models.Model):
         related_name='registros_parto',
         verbose_name='Ficha Obstétrica'
     )
+    campo_padre_establecimiento = 'ficha'
     
     ficha_ingreso = models.OneToOneField(
         'ingresoPartoApp.FichaParto',
@@ -458,6 +463,8 @@ class RegistroParto(models.Model):
             models.Index(fields=['numero_registro']),
             models.Index(fields=['ficha', '-fecha_hora_admision']),
             models.Index(fields=['-fecha_hora_parto']),
+            models.Index(fields=['establecimiento', 'activo', '-fecha_hora_admision']),
+            models.Index(fields=['establecimiento', '-fecha_hora_parto']),
         ]
     
     def __str__(self):
@@ -466,7 +473,8 @@ class RegistroParto(models.Model):
     def save(self, *args, **kwargs):
         """Generar número automático si no existe"""
         if not self.numero_registro:
-            ultimo = RegistroParto.objects.order_by('-id').first()
+            # Numeración global: `objects` solo ve el establecimiento activo
+            ultimo = RegistroParto.todos.order_by('-id').first()
             if ultimo:
                 try:
                     numero = int(ultimo.numero_registro.split('-')[1]) + 1
@@ -511,4 +519,119 @@ class RegistroParto(models.Model):
         if self.analgesia_no_farmacologica:
             analgesias.append('No Farmacológica')
         
-        return ', '.join(analgesias) if analgesias else 'Sin analgesia registrada'
\ No newline at end of file
+        return ', '.join(analgesias) if analgesias else 'Sin analgesia registrada'
+
+# ============================================
+# BORRADOR DEL ASISTENTE DE REGISTRO DE PARTO
+# ============================================
+
+class BorradorParto(models.Model):
+    """
+    Borrador del asistente de 6 pasos para registrar un parto
+
+    Cada paso guarda aquí su cleaned_data (serializado a JSON) en vez de
+    actualizar un RegistroParto a medio llenar. Al completar el paso 6 se
+    construye el registro y se inserta una sola vez; el borrador se elimina.
+    Un borrador por usuario y ficha: si se abandona, se puede retomar hasta
+    que expire (ver BORRADOR_PARTO_HORAS y el comando purgar_borradores_parto).
+    """
+
+    TOTAL_PASOS = 6
+    HORAS_VIGENCIA = 24
+
+    usuario = models.ForeignKey(
+        'auth.User',
+        on_delete=models.CASCADE,
+        related_name='borradores_parto',
+        verbose_name='Usuario'
+    )
+
+    ficha = models.ForeignKey(
+        'matronaApp.FichaObstetrica',
+        on_delete=models.CASCADE,
+        related_name='borradores_parto',
+        verbose_name='Ficha Obstétrica'
+    )
+
+    datos = models.JSONField(
+        default=dict,
+        verbose_name='Datos por Paso',
+        help_text='{"1": {...cleaned_data...}, "2": {...}}'
+    )
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name='Última Modificación')
+
+    class Meta:
+        verbose_name = 'Borrador de Parto'
+        verbose_name_plural = 'Borradores de Parto'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'ficha'], name='borrador_parto_unico_usuario_ficha'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha_modificacion']),
+        ]
+
+    def __str__(self):
+        return f"Borrador parto ficha {self.ficha_id} ({self.usuario_id}) - paso {self.siguiente_paso}"
+
+    @classmethod
+    def vigencia(cls):
+        from django.conf import settings
+        from datetime import timedelta
+        return timedelta(hours=getattr(settings, 'BORRADOR_PARTO_HORAS', cls.HORAS_VIGENCIA))
+
+    @classmethod
+    def vigentes(cls):
+        return cls.objects.filter(fecha_modificacion__gte=timezone.now() - cls.vigencia())
+
+    @classmethod
+    def expirados(cls):
+        return cls.objects.filter(fecha_modificacion__lt=timezone.now() - cls.vigencia())
+
+    # ---------- pasos ----------
+
+    @property
+    def pasos_completos(self):
+        return sorted(int(paso) for paso in self.datos)
+
+    @property
+    def siguiente_paso(self):
+        """Primer paso sin datos (TOTAL_PASOS + 1 si está completo)"""
+        for paso in range(1, self.TOTAL_PASOS + 1):
+            if str(paso) not in self.datos:
+                return paso
+        return self.TOTAL_PASOS + 1
+
+    @property
+    def completo(self):
+        return self.siguiente_paso > self.TOTAL_PASOS
+
+    def guardar_paso(self, paso, cleaned_data):
+        """Guarda el cleaned_data de un paso (los objetos relacionados se guardan por pk)"""
+        import json
+        from django.core.serializers.json import DjangoJSONEncoder
+
+        valores = {
+            nombre: valor.pk if isinstance(valor, models.Model) else valor
+            for nombre, valor in cleaned_data.items()
+        }
+        self.datos[str(paso)] = json.loads(json.dumps(valores, cls=DjangoJSONEncoder))
+        self.save(update_fields=['datos', 'fecha_modificacion'])
+
+    def valores_paso(self, paso):
+        """Valores de un paso convertidos a los tipos del modelo (para initial)"""
+        valores = {}
+        for nombre, valor in self.datos.get(str(paso), {}).items():
+            campo = RegistroParto._meta.get_field(nombre)
+            valores[nombre] = None if valor is None else campo.to_python(valor)
+        return valores
+
+    def construir_parto(self):
+        """RegistroParto sin guardar con todos los datos acumulados"""
+        parto = RegistroParto(ficha_id=self.ficha_id)
+        for paso in self.pasos_completos:
+            for nombre, valor in self.valores_paso(paso).items():
+                campo = RegistroParto._meta.get_field(nombre)
+                setattr(parto, campo.attname, valor)
+        return parto
@@ -0,0 +1,265 @@
+# partosApp/pdf.py
+"""
+PDF imprimibles: registro de parto, registro de RN y entrega de turno
+
+El armado se hace en dos etapas:
+1. datos_*(): lee la BD y arma un documento en datos simples
+   ({'titulo', 'subtitulo', 'secciones': [{'titulo', 'filas' | 'tabla'}]}).
+2. renderizar(): convierte uno o más documentos en un PDF con reportlab,
+   sin tocar la BD.
+
+Cada PDF se guarda con el hash de sus datos como nombre
+(PDF_ROOT/<tipo>/<ab>/<hash>.pdf): si el registro no cambió, la
+reimpresión sirve el archivo existente; si cambió, el hash es otro y se
+genera un PDF nuevo. El renderizado corre en los workers de tareasApp
+(ver partosApp/tareas.py).
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from matronaApp.models import FichaObstetrica
+from tensApp.models import RegistroTens
+
+from .models import RegistroParto
+
+# Subir al cambiar el diseño del PDF: invalida todos los archivos generados
+FORMATO = 1
+
+PARTO = 'parto'
+RECIEN_NACIDO = 'rn'
+ENTREGA_TURNO = 'entrega_turno'
+PARTOS_DEL_DIA = 'partos_del_dia'
+
+CAMPOS_OMITIDOS = {'id', 'ficha', 'registro_parto', 'activo', 'fecha_creacion', 'fecha_modificacion'}
+
+
+# ============================================
+# DATOS DE CADA DOCUMENTO
+# ============================================
+
+def _valor(objeto, campo):
+    if campo.choices:
+        valor = getattr(objeto, f'get_{campo.name}_display')()
+    else:
+        valor = getattr(objeto, campo.attname)
+    if valor is None or valor == '':
+        return '-'
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.strftime('%d/%m/%Y %H:%M')
+    if isinstance(valor, date):
+        return valor.strftime('%d/%m/%Y')
+    return str(valor)
+
+
+def _filas(objeto):
+    """(etiqueta, valor) de todos los campos clínicos del registro"""
+    return [
+        [str(campo.verbose_name), _valor(objeto, campo)]
+        for campo in objeto._meta.concrete_fields
+        if campo.name not in CAMPOS_OMITIDOS and not campo.is_relation
+    ]
+
+
+def _identificacion(ficha):
+    persona = ficha.paciente.persona
+    return [
+        ['Paciente', f'{persona.Nombre} {persona.Apellido_Paterno} {persona.Apellido_Materno}'],
+        ['RUT', persona.Rut],
+        ['Ficha', ficha.numero_ficha],
+    ]
+
+
+def datos_parto(parto):
+    """Documento del registro de parto completo (con resumen de sus RN)"""
+    recien_nacidos = [
+        [rn.get_sexo_display(), f'{rn.peso} g', f'{rn.talla} cm',
+         f'{rn.apgar_1_minuto}/{rn.apgar_5_minutos}', _valor(rn, rn._meta.get_field('fecha_nacimiento'))]
+        for rn in parto.recien_nacidos.all()
+    ]
+    secciones = [
+        {'titulo': 'Identificación', 'filas': _identificacion(parto.ficha)},
+        {'titulo': 'Registro de parto', 'filas': _filas(parto)},
+    ]
+    if recien_nacidos:
+        secciones.append({
+            'titulo': 'Recién nacidos',
+            'tabla': [['Sexo', 'Peso', 'Talla', 'Apgar 1/5', 'Nacimiento']] + recien_nacidos,
+        })
+    return {
+        'titulo': f'Registro de Parto {parto.numero_registro}',
+        'subtitulo': f'Ficha {parto.ficha.numero_ficha}',
+        'secciones': secciones,
+    }
+
+
+def datos_rn(rn):
+    parto = rn.registro_parto
+    return {
+        'titulo': 'Registro de Recién Nacido',
+        'subtitulo': f'Parto {parto.numero_registro}',
+        'secciones': [
+            {'titulo': 'Madre', 'filas': _identificacion(parto.ficha)},
+            {'titulo': 'Recién nacido', 'filas': _filas(rn)},
+        ],
+    }
+
+
+def datos_entrega_turno(sala, fecha=None):
+    """Lista de entrega de turno: fichas activas de la sala con su último control TENS"""
+    fecha = fecha or timezone.localdate()
+    ultimo_control = RegistroTens.objects.filter(ficha=OuterRef('pk')).order_by('-fecha', '-fecha_registro')
+    fichas = (FichaObstetrica.objects
+              .filter(sala=sala, activa=True)
+              .select_related('paciente__persona')
+              .annotate(
+                  medicamentos_activos=Count('medicamentos', filter=Q(medicamentos__activo=True)),
+                  ultimo_control_id=Subquery(ultimo_control.values('pk')[:1]),
+              )
+              .order_by('numero_ficha'))
+    fichas = list(fichas)
+    controles = RegistroTens.objects.in_bulk([f.ultimo_control_id for f in fichas if f.ultimo_control_id])
+
+    filas = []
+    for ficha in fichas:
+        persona = ficha.paciente.persona
+        control = controles.get(ficha.ultimo_control_id)
+        filas.append([
+            ficha.numero_ficha,
+            f'{persona.Nombre} {persona.Apellido_Paterno}',
+            f'{ficha.edad_gestacional_semanas or "-"}+{ficha.edad_gestacional_dias or 0}',
+            str(ficha.medicamentos_activos),
+            (f'T° {control.temperatura or "-"} · PA {control.presion_arterial} · FC {control.frecuencia_cardiaca or "-"}'
+             if control else 'Sin controles'),
+        ])
+
+    return {
+        'titulo': f'Entrega de Turno - Sala {dict(FichaObstetrica.SALA_CHOICES).get(sala, sala)}',
+        'subtitulo': fecha.strftime('%d/%m/%Y'),
+        'secciones': [{
+            'titulo': f'{len(filas)} pacientes',
+            'tabla': [['Ficha', 'Paciente', 'EG', 'Medic.', 'Último control']] + filas,
+        }],
+    }
+
+
+def partos_del_dia(fecha):
+    return (RegistroParto.objects
+            .filter(activo=True, fecha_hora_parto__date=fecha)
+            .select_related('ficha__paciente__persona')
+            .prefetch_related('recien_nacidos')
+            .order_by('fecha_hora_parto', 'pk'))
+
+
+# ============================================
+# DIRECCIONAMIENTO POR CONTENIDO
+# ============================================
+
+def huella(documentos):
+    contenido = json.dumps([FORMATO, documentos], cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def directorio_pdf():
+    return Path(getattr(settings, 'PDF_ROOT', Path(settings.BASE_DIR) / 'pdf_generados'))
+
+
+def ruta_pdf(tipo, hash_pdf):
+    return directorio_pdf() / tipo / hash_pdf[:2] / f'{hash_pdf}.pdf'
+
+
+def asegurar_pdf(tipo, documentos):
+    """
+    Retorna (hash, ruta) del PDF de `documentos`, renderizándolo solo si no
+    existe aún un archivo con ese contenido
+    """
+    hash_pdf = huella(documentos)
+    ruta = ruta_pdf(tipo, hash_pdf)
+    if not ruta.exists():
+        renderizar(documentos, ruta)
+    return hash_pdf, ruta
+
+
+# ============================================
+# RENDERIZADO
+# ============================================
+
+def _tabla(filas, anchos=None, encabezado=False):
+    estilos = getSampleStyleSheet()
+    celdas = [[Paragraph(escape(str(valor)), estilos['BodyText']) for valor in fila] for fila in filas]
+    tabla = Table(celdas, colWidths=anchos, repeatRows=1 if encabezado else 0)
+    estilo = [
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]
+    if encabezado:
+        estilo.append(('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e9ecef')))
+    else:
+        estilo.append(('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f8f9fa')))
+    tabla.setStyle(TableStyle(estilo))
+    return tabla
+
+
+def _elementos(documento):
+    estilos = getSampleStyleSheet()
+    elementos = [
+        Paragraph(escape(documento['titulo']), estilos['Title']),
+        Paragraph(escape(documento.get('subtitulo', '')), estilos['Heading3']),
+    ]
+    for seccion in documento['secciones']:
+        elementos.append(Paragraph(escape(seccion['titulo']), estilos['Heading2']))
+        if 'filas' in seccion:
+            elementos.append(_tabla(seccion['filas'], anchos=[7 * cm, 10 * cm]))
+        else:
+            elementos.append(_tabla(seccion['tabla'], encabezado=True))
+        elementos.append(Spacer(1, 0.4 * cm))
+    return elementos
+
+
+def renderizar(documentos, ruta):
+    """
+    Escribe `documentos` (uno por página nueva) en `ruta`. Se escribe a un
+    temporal y se renombra: un lector nunca ve un PDF a medio escribir.
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    elementos = []
+    for i, documento in enumerate(documentos):
+        if i:
+            elementos.append(PageBreak())
+        elementos.extend(_elementos(documento))
+
+    descriptor, temporal = tempfile.mkstemp(suffix='.pdf', dir=ruta.parent)
+    os.close(descriptor)
+    try:
+        SimpleDocTemplate(
+            temporal, pagesize=A4,
+            leftMargin=2 * cm, rightMargin=2 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+            title=documentos[0]['titulo'] if documentos else '',
+        ).build(elementos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return ruta
@@ -0,0 +1,25 @@
+# partosApp/proyecciones.py
+"""
+Filas del listado de partos (ver core.proyecciones)
+"""
+from core.proyecciones import Display, Proyeccion
+from partosApp.models import RegistroParto
+
+
+class FilaParto(Proyeccion):
+    """Partos/Data/listar_partos.html"""
+    modelo = RegistroParto
+    columnas = {
+        'pk': 'pk',
+        'numero_registro': 'numero_registro',
+        'fecha_hora_admision': 'fecha_hora_admision',
+        'fecha_hora_parto': 'fecha_hora_parto',
+        'tipo_parto': 'tipo_parto',
+        'tipo_parto_display': Display('tipo_parto'),
+        'ficha_id': 'ficha_id',
+        'numero_ficha': 'ficha__numero_ficha',
+        'paciente_id': 'ficha__paciente_id',
+        'rut': 'ficha__paciente__persona__Rut',
+        'nombre': 'ficha__paciente__persona__Nombre',
+        'apellido_paterno': 'ficha__paciente__persona__Apellido_Paterno',
+    }
@@ -0,0 +1,230 @@
+# partosApp/rem.py
+"""
+Reporte Estadístico Mensual (REM) de partos y recién nacidos
+
+Todos los indicadores de un mes se calculan con dos consultas de agregación
+condicional (una sobre RegistroParto y otra sobre RegistroRecienNacido):
+cada indicador es un COUNT(... FILTER/CASE WHEN ...) dentro del mismo
+SELECT, en vez de una consulta por indicador.
+
+Uso:
+    filas = indicadores_mes(2025, 3)        # [(sección, código, nombre, valor), ...]
+    escribir_xlsx(2025, 3, 'REM_2025_03.xlsx')
+
+Para varios meses ver el comando `reporte_rem` (calcula los meses en
+paralelo en procesos separados).
+"""
+from datetime import date, datetime, time
+
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from recienNacidoApp.models import RegistroRecienNacido
+
+from .models import RegistroParto
+
+
+class Indicador:
+    """Un valor del REM: COUNT filtrado (o el agregado indicado)"""
+
+    def __init__(self, seccion, codigo, nombre, filtro=None, agregado=None):
+        self.seccion = seccion
+        self.codigo = codigo
+        self.nombre = nombre
+        self.agregado = agregado or Count('pk', filter=filtro)
+
+
+def _por_opcion(seccion, prefijo, campo, choices):
+    return [
+        Indicador(seccion, f'{prefijo}_{valor}'.lower().replace('.', '_').replace(' ', '_'),
+                  etiqueta, Q(**{campo: valor}))
+        for valor, etiqueta in choices
+    ]
+
+
+COMPLICACIONES = (
+    'inercia_uterina', 'restos_placentarios', 'trauma', 'alteracion_coagulacion',
+    'manejo_quirurgico_inercia', 'histerectomia_obstetrica', 'transfusion_sanguinea',
+)
+ANALGESIA_FARMACOLOGICA = (
+    'anestesia_neuroaxial', 'oxido_nitroso', 'analgesia_endovenosa',
+    'anestesia_general', 'anestesia_local',
+)
+
+
+def _alguno(campos):
+    filtro = Q()
+    for campo in campos:
+        filtro |= Q(**{campo: True})
+    return filtro
+
+
+def _verbose(modelo, campo):
+    return str(modelo._meta.get_field(campo).verbose_name)
+
+
+INDICADORES_PARTO = [
+    Indicador('Partos', 'partos_total', 'Total de partos'),
+    *_por_opcion('Tipo de parto', 'tipo', 'tipo_parto', RegistroParto.TIPO_PARTO_CHOICES),
+    Indicador('Tipo de parto', 'vaginal_inducido', 'Parto vaginal con inducción',
+              Q(tipo_parto__in=['EUTOCICO', 'DISTOCICO'], induccion=True)),
+    Indicador('Tipo de parto', 'prematuro', 'Parto prematuro (< 37 semanas)',
+              Q(edad_gestacional_semanas__lt=37)),
+    *_por_opcion('Clasificación de Robson', 'robson', 'clasificacion_robson', RegistroParto.ROBSON_CHOICES),
+    *[Indicador('Analgesia', campo, _verbose(RegistroParto, campo), Q(**{campo: True}))
+      for campo in ANALGESIA_FARMACOLOGICA + ('analgesia_no_farmacologica',
+                                              'peridural_solicitada_paciente', 'peridural_administrada')],
+    Indicador('Analgesia', 'analgesia_farmacologica', 'Con alguna analgesia farmacológica',
+              _alguno(ANALGESIA_FARMACOLOGICA)),
+    *[Indicador('Complicaciones', campo, _verbose(RegistroParto, campo), Q(**{campo: True}))
+      for campo in COMPLICACIONES],
+    Indicador('Complicaciones', 'con_complicaciones', 'Partos con alguna complicación',
+              _alguno(COMPLICACIONES)),
+    Indicador('Periné', 'episiotomia', 'Episiotomía', Q(estado_perine='EPISIOTOMIA')),
+    Indicador('Periné', 'desgarro_severo', 'Desgarro grado 3 o 4',
+              Q(estado_perine__startswith='DESGARRO_G3') | Q(estado_perine='DESGARRO_G4')),
+    *[Indicador('Atención respetada', campo, _verbose(RegistroParto, campo), Q(**{campo: True}))
+      for campo in ('libertad_movimiento', 'ofrecimiento_posiciones_alternativas',
+                    'alumbramiento_dirigido', 'uso_sala_saip')],
+    Indicador('Atención respetada', 'esterilizacion', 'Esterilización', Q(esterilizacion=True)),
+]
+
+INDICADORES_RN = [
+    Indicador('Recién nacidos', 'rn_total', 'Total de recién nacidos'),
+    *_por_opcion('Recién nacidos', 'rn_sexo', 'sexo', RegistroRecienNacido.SEXO_CHOICES),
+    Indicador('Peso al nacer', 'peso_menor_1500', 'Menos de 1.500 g', Q(peso__lt=1500)),
+    Indicador('Peso al nacer', 'peso_1500_2499', '1.500 a 2.499 g', Q(peso__gte=1500, peso__lt=2500)),
+    Indicador('Peso al nacer', 'peso_2500_3999', '2.500 a 3.999 g', Q(peso__gte=2500, peso__lt=4000)),
+    Indicador('Peso al nacer', 'peso_4000_o_mas', '4.000 g o más', Q(peso__gte=4000)),
+    Indicador('Peso al nacer', 'peso_promedio', 'Peso promedio (g)', agregado=Avg('peso')),
+    Indicador('Apgar', 'apgar1_menor_7', 'Apgar 1 minuto menor a 7', Q(apgar_1_minuto__lt=7)),
+    Indicador('Apgar', 'apgar5_0_3', 'Apgar 5 minutos 0 a 3', Q(apgar_5_minutos__lte=3)),
+    Indicador('Apgar', 'apgar5_4_6', 'Apgar 5 minutos 4 a 6', Q(apgar_5_minutos__gte=4, apgar_5_minutos__lte=6)),
+    Indicador('Apgar', 'apgar5_7_10', 'Apgar 5 minutos 7 a 10', Q(apgar_5_minutos__gte=7)),
+    Indicador('Apego', 'apego_canguro', 'Apego canguro', Q(apego_canguro=True)),
+    Indicador('Apego', 'apego_30_min', 'Apego de 30 minutos o más', Q(tiempo_apego__gte=30)),
+    Indicador('Apego', 'ligadura_tardia', 'Ligadura tardía del cordón', Q(ligadura_tardia_cordon=True)),
+    *[Indicador('Acompañamiento', campo, _verbose(RegistroRecienNacido, campo), Q(**{campo: True}))
+      for campo in ('acompanamiento_preparto', 'acompanamiento_parto', 'acompanamiento_rn',
+                    'acompanante_secciona_cordon')],
+    *_por_opcion('Parto no acompañado', 'no_acompanado', 'motivo_no_acompanado',
+                 RegistroRecienNacido.MOTIVO_NO_ACOMP_CHOICES),
+]
+
+INDICADORES = INDICADORES_PARTO + INDICADORES_RN
+
+
+# ============================================
+# CÁLCULO
+# ============================================
+
+def rango_mes(anio, mes):
+    inicio = timezone.make_aware(datetime.combine(date(anio, mes, 1), time.min))
+    siguiente = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return inicio, timezone.make_aware(datetime.combine(siguiente, time.min))
+
+
+def partos_del_mes(anio, mes):
+    inicio, fin = rango_mes(anio, mes)
+    return RegistroParto.objects.filter(activo=True, fecha_hora_parto__gte=inicio, fecha_hora_parto__lt=fin)
+
+
+def recien_nacidos_del_mes(anio, mes):
+    inicio, fin = rango_mes(anio, mes)
+    return RegistroRecienNacido.objects.filter(
+        registro_parto__activo=True, fecha_nacimiento__gte=inicio, fecha_nacimiento__lt=fin,
+    )
+
+
+def _agregar(queryset, indicadores):
+    # Alias con prefijo: varios códigos coinciden con nombres de campos del modelo
+    valores = queryset.aggregate(**{f'rem_{i.codigo}': i.agregado for i in indicadores})
+    return {i.codigo: valores[f'rem_{i.codigo}'] for i in indicadores}
+
+
+def valores_mes(anio, mes):
+    """{código: valor} de todos los indicadores del mes (2 consultas)"""
+    valores = _agregar(partos_del_mes(anio, mes), INDICADORES_PARTO)
+    valores.update(_agregar(recien_nacidos_del_mes(anio, mes), INDICADORES_RN))
+    if valores['peso_promedio'] is not None:
+        valores['peso_promedio'] = round(valores['peso_promedio'], 1)
+    return valores
+
+
+def indicadores_mes(anio, mes):
+    """[(sección, código, nombre, valor), ...] en el orden del reporte"""
+    valores = valores_mes(anio, mes)
+    return [(i.seccion, i.codigo, i.nombre, valores[i.codigo]) for i in INDICADORES]
+
+
+# ============================================
+# EXPORTACIÓN XLSX
+# ============================================
+
+COLUMNAS_DETALLE = (
+    ('numero_registro', 'N° Registro'),
+    ('ficha__numero_ficha', 'Ficha'),
+    ('fecha_hora_parto', 'Fecha parto'),
+    ('tipo_parto', 'Tipo'),
+    ('clasificacion_robson', 'Robson'),
+    ('edad_gestacional_semanas', 'EG (sem)'),
+    ('estado_perine', 'Periné'),
+    ('anestesia_neuroaxial', 'Neuroaxial'),
+    ('induccion', 'Inducción'),
+)
+
+
+def escribir_xlsx(anio, mes, destino, valores=None):
+    """
+    Escribe el REM del mes en `destino` (ruta o archivo binario): hoja
+    'REM' con los indicadores y hoja 'Partos' con el detalle. El detalle se
+    lee con iterator() y se escribe fila a fila (constant_memory), por lo
+    que la memoria no crece con la cantidad de partos.
+    """
+    import xlsxwriter
+
+    if valores is None:
+        valores = valores_mes(anio, mes)
+
+    libro = xlsxwriter.Workbook(destino, {'constant_memory': True, 'remove_timezone': True})
+    negrita = libro.add_format({'bold': True})
+    formato_fecha = libro.add_format({'num_format': 'dd/mm/yyyy hh:mm'})
+
+    hoja = libro.add_worksheet('REM')
+    hoja.set_column(0, 0, 26)
+    hoja.set_column(1, 1, 48)
+    hoja.write_row(0, 0, [f'REM Partos y Recién Nacidos {mes:02d}/{anio}'], negrita)
+    hoja.write_row(2, 0, ['Sección', 'Indicador', 'Valor', 'Código'], negrita)
+    for fila, indicador in enumerate(INDICADORES, start=3):
+        hoja.write_row(fila, 0, [indicador.seccion, indicador.nombre, valores[indicador.codigo], indicador.codigo])
+
+    detalle = libro.add_worksheet('Partos')
+    detalle.write_row(0, 0, [titulo for _campo, titulo in COLUMNAS_DETALLE], negrita)
+    campos = [campo for campo, _titulo in COLUMNAS_DETALLE]
+    partos = partos_del_mes(anio, mes).order_by('fecha_hora_parto', 'pk').values_list(*campos)
+    for fila, valores_fila in enumerate(partos.iterator(chunk_size=2000), start=1):
+        for columna, valor in enumerate(valores_fila):
+            if isinstance(valor, datetime):
+                detalle.write_datetime(fila, columna, timezone.localtime(valor), formato_fecha)
+            else:
+                detalle.write(fila, columna, valor)
+
+    libro.close()
+    return destino
+
+
+def escribir_resumen_xlsx(meses, destino):
+    """Una columna por mes ({(anio, mes): valores}) para las cargas de varios años"""
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(destino)
+    negrita = libro.add_format({'bold': True})
+    hoja = libro.add_worksheet('Resumen')
+    hoja.set_column(0, 0, 48)
+    orden = sorted(meses)
+    hoja.write_row(0, 0, ['Indicador'] + [f'{anio}-{mes:02d}' for anio, mes in orden], negrita)
+    for fila, indicador in enumerate(INDICADORES, start=1):
+        hoja.write(fila, 0, f'{indicador.seccion}: {indicador.nombre}')
+        hoja.write_row(fila, 1, [meses[clave][indicador.codigo] for clave in orden])
+    libro.close()
+    return destino
@@ -0,0 +1,32 @@
+# partosApp/signals.py
+"""
+Invalidación de la caché de fragmentos de parto y recién nacido
+
+Un RN invalida su parto (el detalle del parto lista sus RN) y los
+documentos invalidan el RN y el parto.
+"""
+from core.cache import vigilar_modelo
+from core.fragmentos import vigilar
+from recienNacidoApp.models import RegistroRecienNacido, DocumentosParto
+
+from .models import RegistroParto
+
+
+def _afectados_documentos(documentos):
+    rn = RegistroRecienNacido.objects.filter(pk=documentos.registro_recien_nacido_id).only('registro_parto_id').first()
+    afectados = [(RegistroRecienNacido, documentos.registro_recien_nacido_id)]
+    if rn is not None:
+        afectados.append((RegistroParto, rn.registro_parto_id))
+    return afectados
+
+
+def conectar():
+    vigilar(RegistroParto, lambda parto: [(RegistroParto, parto.pk)])
+    vigilar(RegistroRecienNacido, lambda rn: [
+        (RegistroRecienNacido, rn.pk),
+        (RegistroParto, rn.registro_parto_id),
+    ])
+    vigilar(DocumentosParto, _afectados_documentos)
+
+    # Conteos del menú de partos (core.cache)
+    vigilar_modelo(RegistroParto, RegistroRecienNacido)
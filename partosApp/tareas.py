@@ -0,0 +1,65 @@
+# partosApp/tareas.py
+"""
+Tareas en segundo plano de partos (ver tareasApp.cola): PDF imprimibles
+"""
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+
+from recienNacidoApp.models import RegistroRecienNacido
+from tareasApp.cola import tarea
+
+from . import pdf
+from .models import RegistroParto
+
+
+def _resultado(tipo, hash_pdf, **extra):
+    return {
+        'tipo': tipo,
+        'hash': hash_pdf,
+        'url': reverse('partos:descargar_pdf', args=[tipo, hash_pdf]),
+        **extra,
+    }
+
+
+@tarea('pdf_parto')
+def pdf_parto(parto_id):
+    parto = (RegistroParto.objects
+             .select_related('ficha__paciente__persona')
+             .prefetch_related('recien_nacidos')
+             .get(pk=parto_id))
+    hash_pdf, _ruta = pdf.asegurar_pdf(pdf.PARTO, [pdf.datos_parto(parto)])
+    return _resultado(pdf.PARTO, hash_pdf)
+
+
+@tarea('pdf_rn')
+def pdf_rn(rn_id):
+    rn = RegistroRecienNacido.objects.select_related('registro_parto__ficha__paciente__persona').get(pk=rn_id)
+    hash_pdf, _ruta = pdf.asegurar_pdf(pdf.RECIEN_NACIDO, [pdf.datos_rn(rn)])
+    return _resultado(pdf.RECIEN_NACIDO, hash_pdf)
+
+
+@tarea('pdf_entrega_turno')
+def pdf_entrega_turno(sala):
+    hash_pdf, _ruta = pdf.asegurar_pdf(pdf.ENTREGA_TURNO, [pdf.datos_entrega_turno(sala)])
+    return _resultado(pdf.ENTREGA_TURNO, hash_pdf)
+
+
+@tarea('pdf_partos_del_dia')
+def pdf_partos_del_dia(fecha):
+    """
+    Un único trabajo para todos los partos del día: deja el PDF individual
+    de cada parto (reutilizando los que ya existen) y un PDF con todos
+    """
+    documentos = [pdf.datos_parto(parto) for parto in pdf.partos_del_dia(parse_date(fecha))]
+    if not documentos:
+        return {'tipo': pdf.PARTOS_DEL_DIA, 'partos': 0}
+
+    generados = 0
+    for documento in documentos:
+        hash_pdf = pdf.huella([documento])
+        if not pdf.ruta_pdf(pdf.PARTO, hash_pdf).exists():
+            pdf.renderizar([documento], pdf.ruta_pdf(pdf.PARTO, hash_pdf))
+            generados += 1
+
+    hash_pdf, _ruta = pdf.asegurar_pdf(pdf.PARTOS_DEL_DIA, documentos)
+    return _resultado(pdf.PARTOS_DEL_DIA, hash_pdf, partos=len(documentos), generados=generados)
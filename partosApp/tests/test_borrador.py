@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.forms.models import model_to_dict
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import FichaObstetrica
+from partosApp.models import RegistroParto, BorradorParto
+from partosApp.views import PASOS_PARTO
+
+
+class BorradorPartoTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user('matrona', password='clave-segura')
+        self.client.force_login(self.usuario)
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+        )
+        ahora = timezone.now().replace(microsecond=0)
+        self.referencia = RegistroParto(
+            ficha=self.ficha,
+            fecha_hora_admision=ahora - timedelta(hours=6),
+            fecha_hora_parto=ahora,
+            edad_gestacional_semanas=39,
+            tipo_parto='EUTOCICO',
+            clasificacion_robson='Grupo 1',
+            posicion_materna_parto='SEMISENTADA',
+            estado_perine='INDEMNE',
+            profesional_responsable='Marta Soto',
+        )
+
+    def datos_paso(self, paso):
+        """POST de un paso armado con los valores del parto de referencia"""
+        form_class, _template = PASOS_PARTO[paso]
+        valores = model_to_dict(self.referencia, fields=form_class.base_fields)
+        return {
+            nombre: valor.isoformat() if hasattr(valor, 'isoformat') else valor
+            for nombre, valor in valores.items()
+            if valor is not None and valor is not False
+        }
+
+    def url_paso(self, paso):
+        if paso == 1:
+            return reverse('partos:registrar_parto_paso1', kwargs={'ficha_pk': self.ficha.pk})
+        return reverse(f'partos:registrar_parto_paso{paso}')
+
+    def test_pasos_no_escriben_hasta_el_final(self):
+        for paso in range(1, 6):
+            respuesta = self.client.post(self.url_paso(paso), self.datos_paso(paso))
+            self.assertRedirects(respuesta, self.url_paso(paso + 1), fetch_redirect_response=False)
+            self.assertFalse(RegistroParto.objects.exists())
+
+        borrador = BorradorParto.objects.get(usuario=self.usuario, ficha=self.ficha)
+        self.assertEqual(borrador.pasos_completos, [1, 2, 3, 4, 5])
+
+        respuesta = self.client.post(self.url_paso(6), self.datos_paso(6))
+        parto = RegistroParto.objects.get()
+        self.assertRedirects(
+            respuesta, reverse('partos:detalle_parto', kwargs={'pk': parto.pk}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(parto.ficha, self.ficha)
+        self.assertEqual(parto.edad_gestacional_semanas, 39)
+        self.assertEqual(parto.fecha_hora_parto, self.referencia.fecha_hora_parto)
+        self.assertTrue(parto.numero_registro)
+        self.assertFalse(BorradorParto.objects.exists())
+        self.assertNotIn('borrador_parto_id', self.client.session)
+
+    def test_doble_envio_del_ultimo_paso(self):
+        for paso in range(1, 6):
+            self.client.post(self.url_paso(paso), self.datos_paso(paso))
+        # El segundo envío leyó el borrador antes de que el primero lo eliminara
+        borrador = BorradorParto.objects.get()
+        self.client.post(self.url_paso(6), self.datos_paso(6))
+
+        with mock.patch('partosApp.views._borrador_en_sesion', return_value=borrador):
+            respuesta = self.client.post(self.url_paso(6), self.datos_paso(6))
+
+        parto = RegistroParto.objects.get()
+        self.assertRedirects(
+            respuesta, reverse('partos:detalle_parto', kwargs={'pk': parto.pk}),
+            fetch_redirect_response=False,
+        )
+
+    def test_no_se_puede_saltar_pasos(self):
+        self.client.post(self.url_paso(1), self.datos_paso(1))
+        respuesta = self.client.post(self.url_paso(4), self.datos_paso(4))
+        self.assertRedirects(respuesta, self.url_paso(2), fetch_redirect_response=False)
+        self.assertEqual(BorradorParto.objects.get().pasos_completos, [1])
+
+    def test_descartar_y_purgar_borradores(self):
+        self.client.post(self.url_paso(1), self.datos_paso(1))
+        self.client.post(reverse('partos:descartar_borrador_parto'))
+        self.assertFalse(BorradorParto.objects.exists())
+
+        viejo = BorradorParto.objects.create(usuario=self.usuario, ficha=self.ficha)
+        BorradorParto.objects.filter(pk=viejo.pk).update(
+            fecha_modificacion=timezone.now() - BorradorParto.vigencia() - timedelta(minutes=1)
+        )
+        salida = StringIO()
+        call_command('purgar_borradores_parto', stdout=salida)
+        self.assertIn('1 borradores eliminados', salida.getvalue())
+        self.assertFalse(BorradorParto.objects.exists())
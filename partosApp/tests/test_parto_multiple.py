@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import EventoOutbox
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import FichaObstetrica
+from partosApp.forms import RecienNacidoMultipleFormSet
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+
+class PartoMultipleTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('matrona', password='clave-segura'))
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+        )
+        self.nacimiento = timezone.now().replace(microsecond=0)
+        self.parto = RegistroParto.objects.create(
+            ficha=ficha,
+            fecha_hora_admision=self.nacimiento - timedelta(hours=5),
+            edad_gestacional_semanas=36,
+            tipo_parto='CESAREA_URGENCIA',
+            clasificacion_robson='Grupo 8',
+            posicion_materna_parto='SEMISENTADA',
+            estado_perine='INDEMNE',
+            profesional_responsable='Marta Soto',
+        )
+        self.url = reverse('partos:registrar_gemelos', kwargs={'parto_pk': self.parto.pk})
+
+    def datos(self, pesos, nacimiento=None):
+        datos = {
+            'rn-TOTAL_FORMS': str(len(pesos)),
+            'rn-INITIAL_FORMS': '0',
+            'rn-MIN_NUM_FORMS': '2',
+            'rn-MAX_NUM_FORMS': '8',
+        }
+        for i, peso in enumerate(pesos):
+            datos.update({
+                f'rn-{i}-sexo': 'FEMENINO',
+                f'rn-{i}-peso': str(peso),
+                f'rn-{i}-talla': '44',
+                f'rn-{i}-apgar_1_minuto': '8',
+                f'rn-{i}-apgar_5_minutos': '9',
+                f'rn-{i}-fecha_nacimiento': (nacimiento or self.nacimiento).isoformat(),
+            })
+        return datos
+
+    def test_trillizos_en_un_insert(self):
+        creados = []
+
+        def receptor(sender, instance, created, **kwargs):
+            creados.append((instance.pk, created))
+
+        post_save.connect(receptor, sender=RegistroRecienNacido)
+        self.addCleanup(post_save.disconnect, receptor, sender=RegistroRecienNacido)
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post(self.url, self.datos([2100, 1950, 2300]))
+        self.assertRedirects(
+            respuesta, reverse('partos:detalle_parto', kwargs={'pk': self.parto.pk}),
+            fetch_redirect_response=False,
+        )
+        inserts_rn = [
+            c for c in consultas.captured_queries
+            if c['sql'].startswith('INSERT INTO "recienNacidoApp_registroreciennacido"')
+        ]
+        self.assertEqual(len(inserts_rn), 1)
+
+        recien_nacidos = RegistroRecienNacido.objects.filter(registro_parto=self.parto)
+        self.assertEqual(sorted(recien_nacidos.values_list('peso', flat=True)), [1950, 2100, 2300])
+        ids = set(recien_nacidos.values_list('pk', flat=True))
+        eventos = EventoOutbox.objects.filter(tipo='recienNacidoApp.registroreciennacido')
+        self.assertEqual(set(eventos.values_list('objeto_id', flat=True)), ids)
+        self.assertEqual(set(creados), {(pk, True) for pk in ids})
+
+    def test_valida_todos_los_rn_juntos(self):
+        formset = RecienNacidoMultipleFormSet(self.datos([2100, 200]), registro_parto=self.parto)
+        self.assertFalse(formset.is_valid())
+        self.assertIn('peso', formset.errors[1])
+
+        formset = RecienNacidoMultipleFormSet(self.datos([2100]), registro_parto=self.parto)
+        self.assertFalse(formset.is_valid())
+
+        antes_de_admision = self.parto.fecha_hora_admision - timedelta(hours=1)
+        formset = RecienNacidoMultipleFormSet(
+            self.datos([2100, 2000], nacimiento=antes_de_admision), registro_parto=self.parto
+        )
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.non_form_errors())
+
+    def test_recupera_ids_sin_returning(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.client.post(self.url, self.datos([2100, 1950]))
+        ids = set(RegistroRecienNacido.objects.values_list('pk', flat=True))
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(set(EventoOutbox.objects.filter(
+            tipo='recienNacidoApp.registroreciennacido'
+        ).values_list('objeto_id', flat=True)), ids)
@@ -0,0 +1,100 @@
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import FichaObstetrica
+from partosApp import pdf
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+from tareasApp import cola
+from tareasApp.models import Tarea
+
+
+class ImpresionPdfTest(TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ajustes = override_settings(PDF_ROOT=directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.client.force_login(User.objects.create_user('matrona', password='clave-segura'))
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+            sala='PARTO',
+        )
+        self.partos = [
+            RegistroParto.objects.create(
+                ficha=self.ficha,
+                edad_gestacional_semanas=39,
+                tipo_parto='EUTOCICO',
+                clasificacion_robson='Grupo 1',
+                posicion_materna_parto='SEMISENTADA',
+                estado_perine='INDEMNE',
+                profesional_responsable='Marta Soto',
+                fecha_hora_parto=timezone.now(),
+            )
+            for _ in range(2)
+        ]
+        RegistroRecienNacido.objects.create(
+            registro_parto=self.partos[0],
+            sexo='FEMENINO',
+            peso=3300,
+            talla=50,
+            apgar_1_minuto=8,
+            apgar_5_minutos=9,
+            fecha_nacimiento=timezone.now(),
+        )
+
+    def test_genera_en_worker_y_reimprime_desde_disco(self):
+        url = reverse('partos:imprimir_parto', kwargs={'pk': self.partos[0].pk})
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 202)
+        self.assertEqual(self.client.get(url).json()['id'], respuesta.json()['id'])  # deduplicada
+
+        tarea = cola.ejecutar_siguiente('test')
+        self.assertEqual(tarea.estado, Tarea.COMPLETADA, tarea.error)
+
+        impresion = self.client.get(url)
+        self.assertEqual(impresion.status_code, 200)
+        self.assertEqual(impresion['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(impresion.streaming_content).startswith(b'%PDF'))
+        descarga = self.client.get(tarea.resultado['url'])
+        self.assertEqual(descarga.status_code, 200)
+
+        # Un cambio en el registro produce otro contenido y otro archivo
+        RegistroParto.objects.filter(pk=self.partos[0].pk).update(profesional_responsable='Otra Matrona')
+        self.assertEqual(self.client.get(url).status_code, 202)
+
+    def test_lote_del_dia_deja_los_pdf_individuales(self):
+        respuesta = self.client.get(reverse('partos:imprimir_partos_del_dia'))
+        self.assertEqual(respuesta.status_code, 202)
+
+        tarea = cola.ejecutar_siguiente('test')
+        self.assertEqual(tarea.resultado['partos'], 2)
+        self.assertEqual(tarea.resultado['generados'], 2)
+
+        for parto in self.partos:
+            url = reverse('partos:imprimir_parto', kwargs={'pk': parto.pk})
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(reverse('partos:imprimir_partos_del_dia')).status_code, 200)
+
+    def test_entrega_de_turno(self):
+        url = reverse('partos:imprimir_entrega_turno', kwargs={'sala': 'PARTO'})
+        self.assertEqual(self.client.get(url).status_code, 202)
+        cola.ejecutar_siguiente('test')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        documento = pdf.datos_entrega_turno('PARTO')
+        self.assertEqual(documento['secciones'][0]['tabla'][1][0], 'FO-0001')
+        self.assertEqual(self.client.get(
+            reverse('partos:imprimir_entrega_turno', kwargs={'sala': 'OTRA'})
+        ).status_code, 404)
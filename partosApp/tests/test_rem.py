@@ -0,0 +1,94 @@
+from datetime import datetime
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import FichaObstetrica
+from partosApp import rem
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+
+def en_marzo(dia):
+    return timezone.make_aware(datetime(2025, 3, dia, 10, 0))
+
+
+class ReporteRemTest(TestCase):
+    def setUp(self):
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+            sala='PARTO',
+        )
+
+        def parto(fecha, **campos):
+            return RegistroParto.objects.create(
+                ficha=ficha,
+                edad_gestacional_semanas=campos.pop('semanas', 39),
+                tipo_parto=campos.pop('tipo_parto', 'EUTOCICO'),
+                clasificacion_robson='Grupo 1',
+                posicion_materna_parto='SEMISENTADA',
+                estado_perine=campos.pop('estado_perine', 'INDEMNE'),
+                profesional_responsable='Marta Soto',
+                fecha_hora_parto=fecha,
+                **campos,
+            )
+
+        def rn(registro, peso, apgar_5):
+            return RegistroRecienNacido.objects.create(
+                registro_parto=registro, sexo='FEMENINO', peso=peso, talla=50,
+                apgar_1_minuto=8, apgar_5_minutos=apgar_5, fecha_nacimiento=registro.fecha_hora_parto,
+            )
+
+        primero = parto(en_marzo(3), anestesia_neuroaxial=True, inercia_uterina=True)
+        segundo = parto(en_marzo(20), tipo_parto='CESAREA_URGENCIA', semanas=35, estado_perine='EPISIOTOMIA')
+        rn(primero, 3400, 9)
+        rn(segundo, 2200, 5)
+        rn(segundo, 1400, 3)
+
+        # Fuera del mes o inactivo: no cuentan
+        parto(timezone.make_aware(datetime(2025, 4, 1, 0, 30)))
+        parto(en_marzo(5), activo=False)
+
+    def test_indicadores_del_mes_en_dos_consultas(self):
+        with self.assertNumQueries(2):
+            valores = rem.valores_mes(2025, 3)
+
+        self.assertEqual(valores['partos_total'], 2)
+        self.assertEqual(valores['tipo_eutocico'], 1)
+        self.assertEqual(valores['tipo_cesarea_urgencia'], 1)
+        self.assertEqual(valores['prematuro'], 1)
+        self.assertEqual(valores['anestesia_neuroaxial'], 1)
+        self.assertEqual(valores['analgesia_farmacologica'], 1)
+        self.assertEqual(valores['con_complicaciones'], 1)
+        self.assertEqual(valores['episiotomia'], 1)
+
+        self.assertEqual(valores['rn_total'], 3)
+        self.assertEqual(valores['peso_menor_1500'], 1)
+        self.assertEqual(valores['peso_1500_2499'], 1)
+        self.assertEqual(valores['peso_2500_3999'], 1)
+        self.assertEqual(valores['apgar5_0_3'], 1)
+        self.assertEqual(valores['apgar5_4_6'], 1)
+        self.assertEqual(valores['apgar5_7_10'], 1)
+
+    def test_filas_en_el_orden_del_reporte(self):
+        filas = rem.indicadores_mes(2025, 3)
+        self.assertEqual(len(filas), len(rem.INDICADORES))
+        self.assertEqual(filas[0], ('Partos', 'partos_total', 'Total de partos', 2))
+        self.assertEqual(len({codigo for _s, codigo, _n, _v in filas}), len(filas))
+
+    def test_mes_sin_registros(self):
+        valores = rem.valores_mes(2024, 12)
+        self.assertEqual(valores['partos_total'], 0)
+        self.assertIsNone(valores['peso_promedio'])
+
+    def test_comando_valida_meses(self):
+        with self.assertRaises(CommandError):
+            call_command('reporte_rem', desde='2025-13', destino='/tmp/rem')
+        with self.assertRaises(CommandError):
+            call_command('reporte_rem', desde='2025-03', hasta='2025-01', destino='/tmp/rem')
@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'partos'  # Namespace importante
@@ -43,6 +43,10 @@ urlpatterns = [
         views.registrar_parto_paso6, 
         name='registrar_parto_paso6'),
     
+    path('parto/borrador/descartar/', 
+        views.descartar_borrador_parto, 
+        name='descartar_borrador_parto'),
+    
     # ============================================
     # REGISTRO DE PARTO - OPCIÓN 2: COMPLETO
     # ============================================
@@ -98,6 +102,29 @@ urlpatterns = [
         views.estadisticas_partos, 
         name='estadisticas'),
     
+    # ============================================
+    # IMPRESIÓN EN PDF
+    # ============================================
+    path('parto/<int:pk>/pdf/', 
+        views.imprimir_parto, 
+        name='imprimir_parto'),
+    
+    path('rn/<int:pk>/pdf/', 
+        views.imprimir_recien_nacido, 
+        name='imprimir_rn'),
+    
+    path('sala/<str:sala>/entrega-turno/pdf/', 
+        views.imprimir_entrega_turno, 
+        name='imprimir_entrega_turno'),
+    
+    path('partos/dia/pdf/', 
+        views.imprimir_partos_del_dia, 
+        name='imprimir_partos_del_dia'),
+    
+    re_path(r'^pdf/(?P<tipo>[a-z_]+)/(?P<hash_pdf>[0-9a-f]{64})\.pdf$', 
+        views.descargar_pdf, 
+        name='descargar_pdf'),
+    
     # ============================================
     # API Y BÚSQUEDAS AJAX
     # ============================================
@@ -1,14 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.db.models import Q, Count, Prefetch
 from django.utils import timezone
-from django.core.paginator import Paginator
+from django.utils.dateparse import parse_date
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
 
-from partosApp.models import RegistroParto
+from partosApp.models import RegistroParto, BorradorParto
 from recienNacidoApp.models import RegistroRecienNacido, DocumentosParto
 from matronaApp.models import FichaObstetrica
-from gestionApp.models import Paciente
+from gestionApp.models import Paciente, Persona
+from core import cache
+from core.fragmentos import fragmento_cacheado
+from core.outbox import crear_en_lote
+from core.replica import usar_replica
+from core.versionado import ConflictoVersion
+from matronaApp.signals import dependencias_ficha
+from tareasApp.cola import encolar
+from tareasApp.models import Tarea
+from tareasApp.views import respuesta_encolada
+
+from partosApp import pdf
+from partosApp.proyecciones import FilaParto
 
 from partosApp.forms import (
     # Formularios de Parto
@@ -23,6 +38,7 @@ from partosApp.forms import (
     RegistroRecienNacidoForm,
     DatosRecienNacidoForm,
     ApegoAcompanamientoForm,
+    RecienNacidoMultipleFormSet,
     # Formularios de Documentos
     DocumentosPartoForm,
 )
@@ -37,32 +53,28 @@ def menu_partos(request):
     
     # Estadísticas generales
     hoy = timezone.now().date()
-    
-    context = {
-        'total_partos': RegistroParto.objects.filter(activo=True).count(),
-        'partos_hoy': RegistroParto.objects.filter(
-            fecha_hora_admision__date=hoy,
-            activo=True
-        ).count(),
-        'partos_mes': RegistroParto.objects.filter(
-            fecha_hora_admision__year=hoy.year,
-            fecha_hora_admision__month=hoy.month,
-            activo=True
-        ).count(),
-        'total_rn': RegistroRecienNacido.objects.count(),
-        'rn_hoy': RegistroRecienNacido.objects.filter(
-            fecha_nacimiento__date=hoy
-        ).count(),
-        # Estadísticas por tipo de parto
-        'partos_eutocicos': RegistroParto.objects.filter(
-            tipo_parto='EUTOCICO',
-            activo=True
-        ).count(),
-        'cesareas': RegistroParto.objects.filter(
-            tipo_parto__in=['CESAREA_URGENCIA', 'CESAREA_ELECTIVA'],
-            activo=True
-        ).count(),
-    }
+    partos = RegistroParto.objects.filter(activo=True)
+
+    def contar():
+        return {
+            **partos.aggregate(
+                total_partos=Count('id'),
+                partos_hoy=Count('id', filter=Q(fecha_hora_admision__date=hoy)),
+                partos_mes=Count('id', filter=Q(
+                    fecha_hora_admision__year=hoy.year,
+                    fecha_hora_admision__month=hoy.month,
+                )),
+                # Estadísticas por tipo de parto
+                partos_eutocicos=Count('id', filter=Q(tipo_parto='EUTOCICO')),
+                cesareas=Count('id', filter=Q(tipo_parto__in=['CESAREA_URGENCIA', 'CESAREA_ELECTIVA'])),
+            ),
+            **RegistroRecienNacido.objects.aggregate(
+                total_rn=Count('id'),
+                rn_hoy=Count('id', filter=Q(fecha_nacimiento__date=hoy)),
+            ),
+        }
+
+    context = cache.cacheado('partos:menu', [RegistroParto, RegistroRecienNacido], contar, fecha=hoy)
     
     return render(request, 'Partos/menu_partos.html', context)
 
@@ -102,205 +114,226 @@ def seleccionar_ficha_parto(request):
 # ============================================
 # REGISTRO DE PARTO - OPCIÓN 1: POR PASOS
 # ============================================
+#
+# Los pasos no escriben en RegistroParto: cada uno valida su formulario y
+# guarda el cleaned_data en un BorradorParto. El registro se inserta una sola
+# vez, en una transacción, al completar el paso 6.
+
+PASOS_PARTO = {
+    1: (RegistroPartoBaseForm, 'Partos/Formularios/paso1_base.html'),
+    2: (TrabajoDePartoForm, 'Partos/Formularios/paso2_trabajo.html'),
+    3: (InformacionPartoForm, 'Partos/Formularios/paso3_info.html'),
+    4: (PuerperioForm, 'Partos/Formularios/paso4_puerperio.html'),
+    5: (AnestesiaAnalgesiaForm, 'Partos/Formularios/paso5_anestesia.html'),
+    6: (ProfesionalesForm, 'Partos/Formularios/paso6_profesionales.html'),
+}
+
+
+def _redirigir_paso(paso, borrador):
+    if paso == 1:
+        return redirect('partos:registrar_parto_paso1', ficha_pk=borrador.ficha_id)
+    return redirect(f'partos:registrar_parto_paso{paso}')
+
+
+def _borrador_en_sesion(request):
+    """Borrador vigente del usuario guardado en la sesión, o None"""
+    borrador_id = request.session.get('borrador_parto_id')
+    if not borrador_id:
+        return None
+    return (BorradorParto.vigentes()
+            .select_related('ficha__paciente__persona')
+            .filter(pk=borrador_id, usuario=request.user)
+            .first())
+
+
+def _paso_parto(request, paso, borrador, mensaje):
+    """Valida y guarda en el borrador un paso intermedio (2 a 5)"""
+    if borrador is None:
+        messages.warning(request, '⚠️ Sesión expirada. Inicia nuevamente el registro.')
+        return redirect('partos:seleccionar_ficha')
+    if borrador.siguiente_paso < paso:
+        return _redirigir_paso(borrador.siguiente_paso, borrador)
+
+    form_class, template = PASOS_PARTO[paso]
+    parto = borrador.construir_parto()
+
+    if request.method == 'POST':
+        form = form_class(request.POST, instance=parto)
+        if form.is_valid():
+            borrador.guardar_paso(paso, form.cleaned_data)
+            messages.success(request, mensaje)
+            return _redirigir_paso(paso + 1, borrador)
+        else:
+            messages.error(request, '❌ Por favor corrige los errores.')
+    else:
+        form = form_class(instance=parto)
 
+    context = {
+        'form': form,
+        'parto': parto,
+        'borrador': borrador,
+        'paso': paso,
+        'total_pasos': BorradorParto.TOTAL_PASOS,
+    }
+
+    return render(request, template, context)
+
+
+@login_required(login_url='authentication:login')
 def registrar_parto_paso1(request, ficha_pk):
     """
     PASO 1: Información básica del parto
+
+    Crea (o retoma) el borrador del usuario para esta ficha.
     """
     ficha = get_object_or_404(
         FichaObstetrica.objects.select_related('paciente__persona'),
         pk=ficha_pk,
         activa=True
     )
-    
+
+    BorradorParto.expirados().filter(usuario=request.user, ficha=ficha).delete()
+    borrador, creado = BorradorParto.objects.get_or_create(usuario=request.user, ficha=ficha)
+    request.session['borrador_parto_id'] = borrador.pk
+    parto = borrador.construir_parto()
+
     if request.method == 'POST':
-        form = RegistroPartoBaseForm(request.POST)
+        form = RegistroPartoBaseForm(request.POST, instance=parto)
         if form.is_valid():
-            parto = form.save()
-            # Guardar el ID en sesión para los siguientes pasos
-            request.session['parto_actual_id'] = parto.pk
-            messages.success(request, f'✅ Parto {parto.numero_registro} iniciado correctamente.')
-            return redirect('partos:registrar_parto_paso2')
-        else:
-            messages.error(request, '❌ Por favor corrige los errores en el formulario.')
+            if form.cleaned_data['ficha'].pk != ficha.pk:
+                form.add_error('ficha', 'La ficha no corresponde al registro en curso.')
+            else:
+                borrador.guardar_paso(1, form.cleaned_data)
+                messages.success(request, '✅ Información básica guardada.')
+                return redirect('partos:registrar_parto_paso2')
+        messages.error(request, '❌ Por favor corrige los errores en el formulario.')
     else:
+        if not creado and borrador.pasos_completos:
+            messages.info(request, f'ℹ️ Retomando el registro en curso (paso {borrador.siguiente_paso}).')
         # Pre-seleccionar la ficha
-        form = RegistroPartoBaseForm(initial={'ficha': ficha})
-    
+        form = RegistroPartoBaseForm(instance=parto, initial={'ficha': ficha})
+
     context = {
         'form': form,
         'ficha': ficha,
         'paciente': ficha.paciente,
+        'borrador': borrador,
         'paso': 1,
-        'total_pasos': 6,
+        'total_pasos': BorradorParto.TOTAL_PASOS,
     }
-    
+
     return render(request, 'Partos/Formularios/paso1_base.html', context)
 
 
+@login_required(login_url='authentication:login')
 def registrar_parto_paso2(request):
     """
     PASO 2: Trabajo de parto
     """
-    parto_id = request.session.get('parto_actual_id')
-    if not parto_id:
-        messages.warning(request, '⚠️ Sesión expirada. Inicia nuevamente el registro.')
-        return redirect('partos:seleccionar_ficha')
-    
-    parto = get_object_or_404(RegistroParto, pk=parto_id)
-    
-    if request.method == 'POST':
-        form = TrabajoDePartoForm(request.POST, instance=parto)
-        if form.is_valid():
-            form.save()
-            messages.success(request, '✅ Información de trabajo de parto guardada.')
-            return redirect('partos:registrar_parto_paso3')
-        else:
-            messages.error(request, '❌ Por favor corrige los errores.')
-    else:
-        form = TrabajoDePartoForm(instance=parto)
-    
-    context = {
-        'form': form,
-        'parto': parto,
-        'paso': 2,
-        'total_pasos': 6,
-    }
-    
-    return render(request, 'Partos/Formularios/paso2_trabajo.html', context)
+    return _paso_parto(request, 2, _borrador_en_sesion(request),
+                       '✅ Información de trabajo de parto guardada.')
 
 
+@login_required(login_url='authentication:login')
 def registrar_parto_paso3(request):
     """
     PASO 3: Información del parto
     """
-    parto_id = request.session.get('parto_actual_id')
-    if not parto_id:
-        messages.warning(request, '⚠️ Sesión expirada.')
-        return redirect('partos:seleccionar_ficha')
-    
-    parto = get_object_or_404(RegistroParto, pk=parto_id)
-    
-    if request.method == 'POST':
-        form = InformacionPartoForm(request.POST, instance=parto)
-        if form.is_valid():
-            form.save()
-            messages.success(request, '✅ Información del parto guardada.')
-            return redirect('partos:registrar_parto_paso4')
-        else:
-            messages.error(request, '❌ Por favor corrige los errores.')
-    else:
-        form = InformacionPartoForm(instance=parto)
-    
-    context = {
-        'form': form,
-        'parto': parto,
-        'paso': 3,
-        'total_pasos': 6,
-    }
-    
-    return render(request, 'Partos/Formularios/paso3_info.html', context)
+    return _paso_parto(request, 3, _borrador_en_sesion(request),
+                       '✅ Información del parto guardada.')
 
 
+@login_required(login_url='authentication:login')
 def registrar_parto_paso4(request):
     """
     PASO 4: Puerperio
     """
-    parto_id = request.session.get('parto_actual_id')
-    if not parto_id:
-        messages.warning(request, '⚠️ Sesión expirada.')
-        return redirect('partos:seleccionar_ficha')
-    
-    parto = get_object_or_404(RegistroParto, pk=parto_id)
-    
-    if request.method == 'POST':
-        form = PuerperioForm(request.POST, instance=parto)
-        if form.is_valid():
-            form.save()
-            messages.success(request, '✅ Información de puerperio guardada.')
-            return redirect('partos:registrar_parto_paso5')
-        else:
-            messages.error(request, '❌ Por favor corrige los errores.')
-    else:
-        form = PuerperioForm(instance=parto)
-    
-    context = {
-        'form': form,
-        'parto': parto,
-        'paso': 4,
-        'total_pasos': 6,
-    }
-    
-    return render(request, 'Partos/Formularios/paso4_puerperio.html', context)
+    return _paso_parto(request, 4, _borrador_en_sesion(request),
+                       '✅ Información de puerperio guardada.')
 
 
+@login_required(login_url='authentication:login')
 def registrar_parto_paso5(request):
     """
     PASO 5: Anestesia y Analgesia
     """
-    parto_id = request.session.get('parto_actual_id')
-    if not parto_id:
-        messages.warning(request, '⚠️ Sesión expirada.')
-        return redirect('partos:seleccionar_ficha')
-    
-    parto = get_object_or_404(RegistroParto, pk=parto_id)
-    
-    if request.method == 'POST':
-        form = AnestesiaAnalgesiaForm(request.POST, instance=parto)
-        if form.is_valid():
-            form.save()
-            messages.success(request, '✅ Información de anestesia guardada.')
-            return redirect('partos:registrar_parto_paso6')
-        else:
-            messages.error(request, '❌ Por favor corrige los errores.')
-    else:
-        form = AnestesiaAnalgesiaForm(instance=parto)
-    
-    context = {
-        'form': form,
-        'parto': parto,
-        'paso': 5,
-        'total_pasos': 6,
-    }
-    
-    return render(request, 'Partos/Formularios/paso5_anestesia.html', context)
+    return _paso_parto(request, 5, _borrador_en_sesion(request),
+                       '✅ Información de anestesia guardada.')
 
 
+@login_required(login_url='authentication:login')
 def registrar_parto_paso6(request):
     """
     PASO 6: Profesionales y finalización
+
+    Único punto donde se escribe RegistroParto: se arma con los datos del
+    borrador y se inserta en una transacción junto con el borrado del borrador.
     """
-    parto_id = request.session.get('parto_actual_id')
-    if not parto_id:
+    borrador = _borrador_en_sesion(request)
+    if borrador is None:
         messages.warning(request, '⚠️ Sesión expirada.')
         return redirect('partos:seleccionar_ficha')
-    
-    parto = get_object_or_404(RegistroParto, pk=parto_id)
-    
+    if borrador.siguiente_paso < 6:
+        return _redirigir_paso(borrador.siguiente_paso, borrador)
+
+    parto = borrador.construir_parto()
+
     if request.method == 'POST':
         form = ProfesionalesForm(request.POST, instance=parto)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                # Bloquear el borrador evita un doble INSERT por doble envío
+                bloqueado = BorradorParto.objects.select_for_update().filter(pk=borrador.pk).first()
+                if bloqueado is None:
+                    # Otro envío ya lo finalizó: mostrar el registro que creó
+                    request.session.pop('borrador_parto_id', None)
+                    creado = (RegistroParto.objects
+                              .filter(ficha_id=borrador.ficha_id, fecha_creacion__gte=borrador.fecha_creacion)
+                              .order_by('-pk')
+                              .first())
+                    if creado is None:
+                        messages.warning(request, '⚠️ Este registro ya fue finalizado.')
+                        return redirect('partos:listar_partos')
+                    messages.info(request, f'ℹ️ El registro de parto {creado.numero_registro} ya fue completado.')
+                    return redirect('partos:detalle_parto', pk=creado.pk)
+                bloqueado.guardar_paso(6, form.cleaned_data)
+                parto = bloqueado.construir_parto()
+                parto.save()
+                bloqueado.delete()
             # Limpiar sesión
-            if 'parto_actual_id' in request.session:
-                del request.session['parto_actual_id']
+            request.session.pop('borrador_parto_id', None)
             messages.success(request, f'🎉 Registro de parto {parto.numero_registro} completado exitosamente.')
             return redirect('partos:detalle_parto', pk=parto.pk)
         else:
             messages.error(request, '❌ Por favor corrige los errores.')
     else:
         form = ProfesionalesForm(instance=parto)
-    
+
     context = {
         'form': form,
         'parto': parto,
+        'borrador': borrador,
         'paso': 6,
-        'total_pasos': 6,
+        'total_pasos': BorradorParto.TOTAL_PASOS,
     }
-    
+
     return render(request, 'Partos/Formularios/paso6_profesionales.html', context)
 
 
+@login_required(login_url='authentication:login')
+def descartar_borrador_parto(request):
+    """
+    Descarta el registro por pasos en curso (POST)
+    """
+    if request.method == 'POST':
+        borrador = _borrador_en_sesion(request)
+        if borrador is not None:
+            borrador.delete()
+            messages.info(request, 'ℹ️ Registro en curso descartado.')
+        request.session.pop('borrador_parto_id', None)
+    return redirect('partos:seleccionar_ficha')
+
+
 # ============================================
 # REGISTRO DE PARTO - OPCIÓN 2: COMPLETO
 # ============================================
@@ -340,14 +373,13 @@ def registrar_parto_completo(request, ficha_pk):
 # LISTADO Y DETALLE DE PARTOS
 # ============================================
 
+@usar_replica
 def listar_partos(request):
     """
     Listar todos los partos con filtros y búsqueda
     """
     partos = RegistroParto.objects.filter(
         activo=True
-    ).select_related(
-        'ficha__paciente__persona'
     ).order_by('-fecha_hora_admision')
     
     # Filtros
@@ -374,14 +406,12 @@ def listar_partos(request):
     if fecha_fin:
         partos = partos.filter(fecha_hora_admision__lte=fecha_fin)
     
-    # Paginación
-    paginator = Paginator(partos, 20)  # 20 partos por página
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Paginación: solo se proyectan los 20 partos de la página
+    page_obj = FilaParto.pagina(partos, request.GET.get('page'), 20)
     
     context = {
         'partos': page_obj,
-        'total_partos': partos.count(),
+        'total_partos': page_obj.paginator.count,
         'busqueda': busqueda,
         'tipo_parto': tipo_parto,
     }
@@ -389,10 +419,8 @@ def listar_partos(request):
     return render(request, 'Partos/Data/listar_partos.html', context)
 
 
-def detalle_parto(request, pk):
-    """
-    Ver detalle completo de un parto
-    """
+def _contexto_detalle_parto(pk):
+    """Renderiza el contenido del parto y retorna (contexto, dependencias)"""
     parto = get_object_or_404(
         RegistroParto.objects.select_related(
             'ficha__paciente__persona',
@@ -403,21 +431,33 @@ def detalle_parto(request, pk):
         pk=pk
     )
     
-    # Obtener documentos asociados (si existen)
-    try:
-        documentos = parto.documentos
-    except DocumentosParto.DoesNotExist:
-        documentos = None
+    # Documentos asociados a los RN del parto (si existen)
+    documentos = DocumentosParto.objects.filter(
+        registro_recien_nacido__registro_parto=parto
+    ).first()
     
-    context = {
+    contenido = render_to_string('Partos/Data/detalle_parto_contenido.html', {
         'parto': parto,
         'ficha': parto.ficha,
         'paciente': parto.ficha.paciente,
         'documentos': documentos,
         'recien_nacidos': parto.recien_nacidos.all(),
-    }
-    
-    return render(request, 'Partos/Data/detalle_parto.html', context)
+    })
+    contexto = {'contenido': contenido, 'numero_registro': parto.numero_registro}
+    return contexto, [(RegistroParto, parto.pk)] + dependencias_ficha(parto.ficha)
+
+
+def detalle_parto(request, pk):
+    """
+    Ver detalle completo de un parto
+    El contenido se sirve desde la caché de fragmentos; se invalida al
+    modificar el parto, sus RN o documentos, la ficha o la paciente
+    """
+    contexto = fragmento_cacheado(
+        'partos:detalle_parto', RegistroParto, pk,
+        lambda: _contexto_detalle_parto(pk),
+    )
+    return render(request, 'Partos/Data/detalle_parto.html', contexto)
 
 
 def editar_parto(request, pk):
@@ -429,10 +469,19 @@ def editar_parto(request, pk):
     if request.method == 'POST':
         form = RegistroPartoCompletoForm(request.POST, instance=parto)
         if form.is_valid():
-            form.save()
-            messages.success(request, f'✅ Parto {parto.numero_registro} actualizado correctamente.')
-            return redirect('partos:detalle_parto', pk=parto.pk)
-        else:
+            try:
+                form.save()
+            except ConflictoVersion:
+                form.agregar_conflicto()
+            else:
+                if form.combinados:
+                    messages.info(
+                        request,
+                        f'ℹ️ Se conservaron los cambios de otro usuario en: {form.etiquetas_combinadas()}.'
+                    )
+                messages.success(request, f'✅ Parto {parto.numero_registro} actualizado correctamente.')
+                return redirect('partos:detalle_parto', pk=parto.pk)
+        if form.errors:
             messages.error(request, '❌ Por favor corrige los errores.')
     else:
         form = RegistroPartoCompletoForm(instance=parto)
@@ -483,6 +532,9 @@ def registrar_recien_nacido(request, parto_pk):
 def registrar_gemelos(request, parto_pk):
     """
     Registrar gemelos o múltiples (2 o más RN del mismo parto)
+
+    Todos los RN se validan juntos (formset) y se insertan en una sola
+    transacción con un único INSERT. ?cantidad=3 muestra tres formularios.
     """
     parto = get_object_or_404(
         RegistroParto.objects.select_related('ficha__paciente__persona'),
@@ -491,33 +543,29 @@ def registrar_gemelos(request, parto_pk):
     )
     
     if request.method == 'POST':
-        # Gemelo 1
-        form1 = RegistroRecienNacidoForm(
-            request.POST,
-            prefix='gemelo1',
-            registro_parto=parto
-        )
-        # Gemelo 2
-        form2 = RegistroRecienNacidoForm(
-            request.POST,
-            prefix='gemelo2',
-            registro_parto=parto
-        )
-        
-        if form1.is_valid() and form2.is_valid():
-            rn1 = form1.save()
-            rn2 = form2.save()
-            messages.success(request, f'✅ Gemelos registrados exitosamente.')
+        formset = RecienNacidoMultipleFormSet(request.POST, registro_parto=parto)
+        if formset.is_valid():
+            with transaction.atomic():
+                # Bloquear el parto serializa registros múltiples concurrentes
+                RegistroParto.objects.select_for_update().filter(pk=parto.pk).first()
+                recien_nacidos = crear_en_lote(
+                    RegistroRecienNacido,
+                    formset.instancias_nuevas(),
+                    ambito=RegistroRecienNacido.objects.filter(registro_parto=parto),
+                )
+            messages.success(request, f'✅ {len(recien_nacidos)} recién nacidos registrados exitosamente.')
             return redirect('partos:detalle_parto', pk=parto.pk)
         else:
             messages.error(request, '❌ Por favor corrige los errores.')
     else:
-        form1 = RegistroRecienNacidoForm(prefix='gemelo1', registro_parto=parto)
-        form2 = RegistroRecienNacidoForm(prefix='gemelo2', registro_parto=parto)
+        try:
+            cantidad = int(request.GET.get('cantidad', 2))
+        except ValueError:
+            cantidad = 2
+        formset = RecienNacidoMultipleFormSet(registro_parto=parto, cantidad=cantidad)
     
     context = {
-        'form1': form1,
-        'form2': form2,
+        'formset': formset,
         'parto': parto,
         'paciente': parto.ficha.paciente,
     }
@@ -525,10 +573,8 @@ def registrar_gemelos(request, parto_pk):
     return render(request, 'Partos/Formularios/registrar_gemelos.html', context)
 
 
-def detalle_recien_nacido(request, pk):
-    """
-    Ver detalle completo de un recién nacido
-    """
+def _contexto_detalle_recien_nacido(pk):
+    """Renderiza el contenido del RN y retorna (contexto, dependencias)"""
     rn = get_object_or_404(
         RegistroRecienNacido.objects.select_related(
             'registro_parto__ficha__paciente__persona'
@@ -536,13 +582,29 @@ def detalle_recien_nacido(request, pk):
         pk=pk
     )
     
-    context = {
+    paciente_id = rn.registro_parto.ficha.paciente_id
+    contenido = render_to_string('Partos/Data/detalle_rn_contenido.html', {
         'rn': rn,
         'parto': rn.registro_parto,
         'paciente': rn.registro_parto.ficha.paciente,
-    }
-    
-    return render(request, 'Partos/Data/detalle_rn.html', context)
+    })
+    return {'contenido': contenido}, [
+        (RegistroRecienNacido, rn.pk),
+        (RegistroParto, rn.registro_parto_id),
+        (Paciente, paciente_id),
+        (Persona, paciente_id),
+    ]
+
+
+def detalle_recien_nacido(request, pk):
+    """
+    Ver detalle completo de un recién nacido (con caché de fragmentos)
+    """
+    contexto = fragmento_cacheado(
+        'partos:detalle_rn', RegistroRecienNacido, pk,
+        lambda: _contexto_detalle_recien_nacido(pk),
+    )
+    return render(request, 'Partos/Data/detalle_rn.html', contexto)
 
 
 def editar_recien_nacido(request, pk):
@@ -625,6 +687,7 @@ def gestionar_documentos(request, parto_pk):
 # REPORTES Y ESTADÍSTICAS
 # ============================================
 
+@usar_replica
 def estadisticas_partos(request):
     """
     Vista con estadísticas y gráficos de partos
@@ -639,13 +702,13 @@ def estadisticas_partos(request):
         activo=True
     )
     
-    # Por tipo de parto
-    stats_tipo = {
-        'eutocico': partos_mes.filter(tipo_parto='EUTOCICO').count(),
-        'distocico': partos_mes.filter(tipo_parto='DISTOCICO').count(),
-        'cesarea_urgencia': partos_mes.filter(tipo_parto='CESAREA_URGENCIA').count(),
-        'cesarea_electiva': partos_mes.filter(tipo_parto='CESAREA_ELECTIVA').count(),
-    }
+    # Por tipo de parto (una sola consulta con conteos condicionales)
+    stats_tipo = partos_mes.aggregate(
+        eutocico=Count('id', filter=Q(tipo_parto='EUTOCICO')),
+        distocico=Count('id', filter=Q(tipo_parto='DISTOCICO')),
+        cesarea_urgencia=Count('id', filter=Q(tipo_parto='CESAREA_URGENCIA')),
+        cesarea_electiva=Count('id', filter=Q(tipo_parto='CESAREA_ELECTIVA')),
+    )
     
     # Por clasificación de Robson
     stats_robson = {}
@@ -664,6 +727,84 @@ def estadisticas_partos(request):
     return render(request, 'Partos/Data/estadisticas.html', context)
 
 
+# ============================================
+# IMPRESIÓN EN PDF
+# ============================================
+
+def _servir_o_encolar(request, tipo, documentos, nombre_tarea, **argumentos):
+    """
+    Sirve el PDF si ya existe uno con este mismo contenido; si no, encola
+    su generación y responde 202 con la URL de estado de la tarea
+    """
+    hash_pdf = pdf.huella(documentos)
+    ruta = pdf.ruta_pdf(tipo, hash_pdf)
+    if ruta.exists():
+        return FileResponse(open(ruta, 'rb'), content_type='application/pdf', filename=f'{tipo}.pdf')
+
+    tarea = encolar(
+        nombre_tarea,
+        clave=f'pdf:{tipo}:{hash_pdf}',
+        prioridad=Tarea.PRIORIDAD_ALTA,
+        solicitada_por=request.user,
+        **argumentos
+    )
+    return respuesta_encolada(tarea)
+
+
+@login_required(login_url='authentication:login')
+def imprimir_parto(request, pk):
+    """PDF del registro de parto completo"""
+    parto = get_object_or_404(
+        RegistroParto.objects.select_related('ficha__paciente__persona').prefetch_related('recien_nacidos'),
+        pk=pk
+    )
+    return _servir_o_encolar(request, pdf.PARTO, [pdf.datos_parto(parto)], 'pdf_parto', parto_id=parto.pk)
+
+
+@login_required(login_url='authentication:login')
+def imprimir_recien_nacido(request, pk):
+    """PDF del registro del recién nacido"""
+    rn = get_object_or_404(
+        RegistroRecienNacido.objects.select_related('registro_parto__ficha__paciente__persona'),
+        pk=pk
+    )
+    return _servir_o_encolar(request, pdf.RECIEN_NACIDO, [pdf.datos_rn(rn)], 'pdf_rn', rn_id=rn.pk)
+
+
+@login_required(login_url='authentication:login')
+def imprimir_entrega_turno(request, sala):
+    """PDF de la lista de entrega de turno de una sala"""
+    if sala not in dict(FichaObstetrica.SALA_CHOICES):
+        raise Http404('Sala inválida')
+    return _servir_o_encolar(
+        request, pdf.ENTREGA_TURNO, [pdf.datos_entrega_turno(sala)], 'pdf_entrega_turno', sala=sala
+    )
+
+
+@login_required(login_url='authentication:login')
+def imprimir_partos_del_dia(request):
+    """PDF con todos los partos de un día (?fecha=YYYY-MM-DD, hoy por defecto)"""
+    fecha = parse_date(request.GET.get('fecha', '')) or timezone.localdate()
+    documentos = [pdf.datos_parto(parto) for parto in pdf.partos_del_dia(fecha)]
+    if not documentos:
+        messages.info(request, f'ℹ️ No hay partos registrados el {fecha:%d/%m/%Y}.')
+        return redirect('partos:listar_partos')
+    return _servir_o_encolar(
+        request, pdf.PARTOS_DEL_DIA, documentos, 'pdf_partos_del_dia', fecha=fecha.isoformat()
+    )
+
+
+@login_required(login_url='authentication:login')
+def descargar_pdf(request, tipo, hash_pdf):
+    """Descarga un PDF ya generado (URL retornada por las tareas de impresión)"""
+    if tipo not in (pdf.PARTO, pdf.RECIEN_NACIDO, pdf.ENTREGA_TURNO, pdf.PARTOS_DEL_DIA):
+        raise Http404('Tipo de documento inválido')
+    ruta = pdf.ruta_pdf(tipo, hash_pdf)
+    if not ruta.exists():
+        raise Http404('Documento no generado')
+    return FileResponse(open(ruta, 'rb'), content_type='application/pdf', filename=f'{tipo}.pdf')
+
+
 # ============================================
 # API Y BÚSQUEDAS AJAX
 # ============================================
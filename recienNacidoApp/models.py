@@ -1,13 +1,16 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from core.auditoria import AuditadoMixin
+from core.establecimientos import ConEstablecimiento
+from core.outbox import OutboxMixin
 
 
 # ============================================
 # ✅ REGISTRO DE RECIÉN NACIDO (ÚNICO LUGAR)
 # ============================================
 
-class RegistroRecienNacido(models.Model):
+class RegistroRecienNacido(OutboxMixin, AuditadoMixin, ConEstablecimiento):
     """
     Registro del recién nacido
     Se crea después del parto
@@ -24,6 +27,7 @@ class RegistroRecienNacido(models.Model):
         related_name='recien_nacidos',
         verbose_name='Registro de Parto'
     )
+    campo_padre_establecimiento = 'registro_parto'
     
     # ============================================
     # SECCIÓN 1: DATOS DEL RECIÉN NACIDO
@@ -172,6 +176,7 @@ class RegistroRecienNacido(models.Model):
         verbose_name_plural = 'Registros de Recién Nacidos'
         indexes = [
             models.Index(fields=['registro_parto', '-fecha_nacimiento']),
+            models.Index(fields=['establecimiento', '-fecha_nacimiento']),
         ]
     
     def __str__(self):
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class TableroappConfig(AppConfig):
+    """
+    Configuración de la aplicación tableroApp (tablero de sala en vivo)
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tableroApp'
+    verbose_name = 'Tablero de Sala en Vivo'
@@ -0,0 +1,92 @@
+# tableroApp/eventos.py
+"""
+Eventos del tablero de sala a partir de los registros clínicos nuevos
+
+Los registros se detectan en el outbox (tableroApp.sondeo), así que solo
+se publican registros confirmados: una pantalla nunca muestra un registro
+que luego se revirtió.
+"""
+from matronaApp.models import AdministracionMedicamento
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+from tensApp.models import RegistroTens
+
+from .publicador import publicador
+
+
+def _fecha(valor):
+    return valor.isoformat() if valor else None
+
+
+def evento_registro_tens(registro):
+    return registro.ficha, {
+        'tipo': 'registro_tens',
+        'titulo': 'Signos vitales',
+        'detalle': ', '.join(filter(None, [
+            f"T° {registro.temperatura}" if registro.temperatura else '',
+            f"PA {registro.presion_arterial}" if registro.presion_arterial else '',
+            f"FC {registro.frecuencia_cardiaca}" if registro.frecuencia_cardiaca else '',
+        ])),
+        'fecha': _fecha(registro.fecha),
+    }
+
+
+def evento_administracion(administracion):
+    medicamento = administracion.medicamento_ficha
+    return medicamento.ficha, {
+        'tipo': 'administracion',
+        'titulo': 'Medicamento administrado',
+        'detalle': f"{medicamento.nombre_medicamento} {medicamento.dosis}",
+        'fecha': _fecha(administracion.fecha_hora_administracion),
+    }
+
+
+def evento_parto(parto):
+    return parto.ficha, {
+        'tipo': 'parto',
+        'titulo': 'Registro de parto',
+        'detalle': f"{parto.numero_registro} - {parto.get_tipo_parto_display()}",
+        'fecha': _fecha(parto.fecha_hora_parto or parto.fecha_hora_admision),
+    }
+
+
+def evento_recien_nacido(rn):
+    return rn.registro_parto.ficha, {
+        'tipo': 'recien_nacido',
+        'titulo': 'Recién nacido',
+        'detalle': f"{rn.get_sexo_display()}, {rn.peso} g, Apgar {rn.apgar_1_minuto}/{rn.apgar_5_minutos}",
+        'fecha': _fecha(rn.fecha_nacimiento),
+    }
+
+
+# modelo -> (relaciones a cargar, constructor del evento)
+FUENTES = {
+    RegistroTens: (('ficha',), evento_registro_tens),
+    AdministracionMedicamento: (('medicamento_ficha__ficha',), evento_administracion),
+    RegistroParto: (('ficha',), evento_parto),
+    RegistroRecienNacido: (('registro_parto__ficha',), evento_recien_nacido),
+}
+
+# tipo de EventoOutbox (app_label.modelo) -> modelo
+FUENTES_POR_TIPO = {modelo._meta.label_lower: modelo for modelo in FUENTES}
+
+
+def publicar_registro(modelo, pk):
+    """
+    Publica el registro a las pantallas de su sala y establecimiento
+    conectadas a este proceso. El sondeo corre sin establecimiento activo:
+    se lee sin filtro y se publica con el de la ficha.
+    """
+    relaciones, construir = FUENTES[modelo]
+    instancia = modelo._default_manager.select_related(*relaciones).filter(pk=pk).first()
+    if instancia is None:
+        return
+    ficha, evento = construir(instancia)
+    evento.update({
+        'id': instancia.pk,
+        'ficha_id': ficha.pk,
+        'numero_ficha': ficha.numero_ficha,
+        'sala': ficha.sala,
+        'establecimiento': ficha.establecimiento_id,
+    })
+    publicador.publicar(ficha.sala, evento, ficha.establecimiento_id)
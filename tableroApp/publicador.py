@@ -0,0 +1,92 @@
+# tableroApp/publicador.py
+"""
+Publicador en proceso para el tablero de sala (server-sent events)
+
+Cada pantalla abierta mantiene UNA conexión SSE con su sala y recibe los
+eventos nuevos sin consultar la base de datos por su cuenta. Los eventos se
+publican desde un hilo síncrono (el sondeo del outbox, uno por proceso) y
+se entregan a las colas asyncio de cada suscriptor con call_soon_threadsafe.
+
+Las suscripciones son por (establecimiento, sala): los códigos de sala se
+repiten entre maternidades y cada pantalla solo recibe los registros de la
+suya. Una pantalla sin establecimiento (superusuario viendo todos) recibe
+los de la sala en todos.
+
+El publicador reparte en memoria a las pantallas conectadas a este
+proceso; los eventos le llegan desde el outbox compartido (tableroApp.sondeo),
+por lo que con varios workers ASGI o servidores cada pantalla recibe los
+registros guardados en cualquiera de ellos.
+"""
+import asyncio
+import itertools
+import threading
+
+TAMANO_COLA = 100
+
+
+class Suscripcion:
+    """Cola de eventos de una pantalla conectada"""
+
+    def __init__(self, canal, loop):
+        self.canal = canal
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=TAMANO_COLA)
+        # Si la pantalla no consume a tiempo se descartan eventos y se le
+        # pide recargar el estado completo (evento 'resync')
+        self.desbordada = False
+
+    def entregar(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+    async def siguiente(self, timeout):
+        return await asyncio.wait_for(self.cola.get(), timeout=timeout)
+
+
+class Publicador:
+    def __init__(self):
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+        self._secuencia = itertools.count(1)
+
+    def suscribir(self, sala, establecimiento=None):
+        suscripcion = Suscripcion((establecimiento, sala), asyncio.get_running_loop())
+        with self._lock:
+            self._suscripciones.setdefault(suscripcion.canal, set()).add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            suscriptores = self._suscripciones.get(suscripcion.canal)
+            if suscriptores is not None:
+                suscriptores.discard(suscripcion)
+                if not suscriptores:
+                    del self._suscripciones[suscripcion.canal]
+
+    def hay_suscriptores(self):
+        with self._lock:
+            return bool(self._suscripciones)
+
+    def suscriptores(self, sala, establecimiento=None):
+        with self._lock:
+            return len(self._suscripciones.get((establecimiento, sala), ()))
+
+    def publicar(self, sala, evento, establecimiento=None):
+        """
+        Entrega `evento` (dict) a las pantallas de la sala en `establecimiento`
+        y a las que ven todos los establecimientos. Seguro entre hilos.
+        """
+        evento = dict(evento, seq=next(self._secuencia))
+        canales = {(establecimiento, sala), (None, sala)}
+        with self._lock:
+            destinos = [s for canal in canales for s in self._suscripciones.get(canal, ())]
+        for suscripcion in destinos:
+            if suscripcion.loop.is_closed():
+                self.desuscribir(suscripcion)
+                continue
+            suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, evento)
+        return len(destinos)
+
+publicador = Publicador()
@@ -0,0 +1,129 @@
+# tableroApp/sondeo.py
+"""
+Bus compartido del tablero: sondeo del outbox (core.outbox)
+
+Los registros clínicos se guardan en cualquier proceso (workers WSGI,
+tareas, otros servidores), pero cada pantalla está conectada a un solo
+proceso ASGI. Cada proceso con pantallas conectadas corre UN hilo que lee
+de la base de datos los EventoOutbox nuevos de las FUENTES del tablero y
+los publica a sus propias pantallas; así todas las salas ven todos los
+registros, sin importar en qué proceso se guardaron.
+
+El outbox se escribe en la misma transacción que el registro, por lo que
+solo se ven registros confirmados. Los ids autoincrementales pueden
+confirmarse fuera de orden: se vuelven a revisar los eventos de los
+últimos VENTANA_SEGUNDOS para no saltarse uno que se confirmó tarde.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from core.models import EventoOutbox
+
+from .eventos import FUENTES_POR_TIPO, publicar_registro
+from .publicador import publicador
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_SEGUNDOS = 1.0
+VENTANA_SEGUNDOS = 30
+LIMITE_POR_REVISION = 500
+
+
+class Sondeo:
+    """Lee los registros nuevos del outbox y los publica en este proceso"""
+
+    def __init__(self, publicador, intervalo=INTERVALO_SEGUNDOS):
+        self.publicador = publicador
+        self.intervalo = intervalo
+        self.piso = None      # ids <= piso ya no se revisan
+        self.vistos = {}      # id -> fecha_creacion, dentro de la ventana
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+
+    def asegurar(self):
+        """Inicia el hilo de sondeo si no está corriendo. Llamar al suscribir una pantalla."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._correr, name='tablero-sondeo', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        hilo = self._hilo
+        if hilo is not None:
+            hilo.join()
+
+    def _correr(self):
+        try:
+            # Termina cuando se desconecta la última pantalla; la próxima lo reinicia
+            while self.publicador.hay_suscriptores() and not self._detener.is_set():
+                try:
+                    self.revisar()
+                except Exception:
+                    logger.exception("Error al leer el outbox para el tablero")
+                self._detener.wait(self.intervalo)
+        finally:
+            self.piso = None
+            self.vistos.clear()
+            connection.close()  # conexión propia de este hilo
+
+    def revisar(self):
+        """Publica los registros nuevos desde la última revisión. Retorna cuántos publicó."""
+        ahora = timezone.now()
+        if self.piso is None:
+            # Primera revisión: solo lo que se guarde desde ahora
+            self.piso = EventoOutbox.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+            return 0
+
+        nuevos = list(
+            EventoOutbox.objects
+            .filter(id__gt=self.piso, tipo__in=FUENTES_POR_TIPO, operacion=EventoOutbox.GUARDADO)
+            .exclude(id__in=list(self.vistos))
+            .order_by('id')
+            .values_list('id', 'tipo', 'objeto_id', 'fecha_creacion')[:LIMITE_POR_REVISION]
+        )
+
+        publicados = 0
+        if nuevos:
+            # Solo registros nuevos: el primer evento de cada objeto es su creación
+            primeros = {
+                (fila['tipo'], fila['objeto_id']): fila['primero']
+                for fila in EventoOutbox.objects
+                .filter(tipo__in={tipo for _id, tipo, _o, _f in nuevos},
+                        objeto_id__in={objeto_id for _id, _t, objeto_id, _f in nuevos})
+                .values('tipo', 'objeto_id')
+                .annotate(primero=Min('id'))
+            }
+            for id_evento, tipo, objeto_id, fecha in nuevos:
+                self.vistos[id_evento] = fecha
+                if primeros.get((tipo, objeto_id)) != id_evento:
+                    continue
+                try:
+                    publicar_registro(FUENTES_POR_TIPO[tipo], objeto_id)
+                    publicados += 1
+                except Exception:
+                    # El tablero nunca debe afectar el registro clínico
+                    logger.exception("No se pudo publicar %s #%s en el tablero", tipo, objeto_id)
+
+        # Los eventos fuera de la ventana ya no pueden aparecer: avanzar el piso
+        limite = ahora - timedelta(seconds=VENTANA_SEGUNDOS)
+        for id_evento, fecha in list(self.vistos.items()):
+            if fecha < limite:
+                self.piso = max(self.piso, id_evento)
+                del self.vistos[id_evento]
+        if len(nuevos) == LIMITE_POR_REVISION:
+            # Atraso grande (ej. carga masiva): no volver a leer lo ya publicado
+            self.piso = max(self.piso, max(self.vistos, default=self.piso))
+            self.vistos.clear()
+        return publicados
+
+
+sondeo = Sondeo(publicador)
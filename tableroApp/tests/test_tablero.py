@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.pruebas import crear_matrona, crear_paciente
+from gestionApp.models import Establecimiento
+from matronaApp.models import FichaObstetrica
+from tableroApp import views
+from tableroApp.eventos import publicar_registro
+from tableroApp.publicador import Publicador, publicador
+from tableroApp.sondeo import Sondeo, sondeo
+from tensApp.models import RegistroTens
+
+
+class PublicadorTest(TestCase):
+    def test_publicar_desde_otro_hilo(self):
+        hub = Publicador()
+
+        async def escuchar():
+            suscripcion = hub.suscribir('PARTO')
+            hilo = threading.Thread(target=hub.publicar, args=('PARTO', {'tipo': 'parto'}))
+            hilo.start()
+            evento = await suscripcion.siguiente(timeout=1)
+            hilo.join()
+            hub.desuscribir(suscripcion)
+            return evento
+
+        evento = asyncio.run(escuchar())
+        self.assertEqual(evento['tipo'], 'parto')
+        self.assertFalse(hub.hay_suscriptores())
+
+    def test_otra_sala_no_recibe(self):
+        hub = Publicador()
+
+        async def escuchar():
+            suscripcion = hub.suscribir('ARO')
+            entregados = hub.publicar('PARTO', {'tipo': 'parto'})
+            with self.assertRaises(asyncio.TimeoutError):
+                await suscripcion.siguiente(timeout=0.05)
+            return entregados
+
+        self.assertEqual(asyncio.run(escuchar()), 0)
+
+    def test_misma_sala_de_otro_establecimiento_no_recibe(self):
+        hub = Publicador()
+
+        async def escuchar():
+            norte = hub.suscribir('PREPARTO', 'NORTE')
+            todos = hub.suscribir('PREPARTO')
+            entregados = hub.publicar('PREPARTO', {'tipo': 'parto'}, 'SUR')
+            evento = await todos.siguiente(timeout=1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await norte.siguiente(timeout=0.05)
+            return entregados, evento
+
+        entregados, evento = asyncio.run(escuchar())
+        self.assertEqual((entregados, evento['tipo']), (1, 'parto'))
+
+
+class TableroSalaTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('tens', password='clave-segura'))
+        paciente = crear_paciente('Carla')
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente=paciente,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+            sala='PUERPERIO',
+        )
+
+    def test_registro_nuevo_llega_al_stream(self):
+        # El stream corre en un event loop aparte (como bajo ASGI). El hilo
+        # de sondeo no ve la transacción de la prueba: se revisa desde aquí
+        self.addCleanup(setattr, sondeo, 'piso', None)
+        loop = asyncio.new_event_loop()
+        hilo = threading.Thread(target=loop.run_forever)
+        hilo.start()
+        try:
+            with mock.patch.object(sondeo, 'asegurar') as asegurar:
+                stream = views._eventos_sse('PUERPERIO')
+                primero = asyncio.run_coroutine_threadsafe(stream.__anext__(), loop).result(1)
+            asegurar.assert_called_once_with()
+            self.assertTrue(primero.startswith('retry:'))
+            siguiente = asyncio.run_coroutine_threadsafe(stream.__anext__(), loop)
+
+            sondeo.revisar()
+            RegistroTens.objects.create(ficha=self.ficha, temperatura=Decimal('37.2'))
+            self.assertEqual(sondeo.revisar(), 1)
+
+            mensaje = siguiente.result(1)
+            asyncio.run_coroutine_threadsafe(stream.aclose(), loop).result(1)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            hilo.join()
+            loop.close()
+
+        self.assertIn('event: registro', mensaje)
+        datos = json.loads(mensaje.split('data: ', 1)[1])
+        self.assertEqual(datos['tipo'], 'registro_tens')
+        self.assertEqual(datos['numero_ficha'], 'FO-0001')
+        self.assertFalse(publicador.hay_suscriptores())
+
+    def test_sondeo_publica_solo_registros_nuevos(self):
+        hub = Publicador()
+        bus = Sondeo(hub)
+        loop = asyncio.new_event_loop()
+        hilo = threading.Thread(target=loop.run_forever)
+        hilo.start()
+
+        async def suscribir():
+            return hub.suscribir('PUERPERIO')
+
+        try:
+            suscripcion = asyncio.run_coroutine_threadsafe(suscribir(), loop).result(1)
+            bus.revisar()
+            with mock.patch('tableroApp.eventos.publicador', hub):
+                # Guardado en otro proceso: solo queda en el outbox
+                registro = RegistroTens.objects.create(ficha=self.ficha, temperatura=Decimal('38.1'))
+                self.assertEqual(bus.revisar(), 1)
+                evento = asyncio.run_coroutine_threadsafe(suscripcion.siguiente(timeout=1), loop).result(2)
+
+                # Una modificación no es un registro nuevo
+                registro.temperatura = Decimal('38.4')
+                registro.save()
+                self.assertEqual(bus.revisar(), 0)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            hilo.join()
+            loop.close()
+
+        self.assertEqual(evento['tipo'], 'registro_tens')
+        self.assertEqual(evento['sala'], 'PUERPERIO')
+
+    def test_publica_con_el_establecimiento_de_la_ficha(self):
+        Establecimiento.objects.create(codigo='SUR', nombre='Maternidad Sur')
+        FichaObstetrica.objects.filter(pk=self.ficha.pk).update(establecimiento_id='SUR')
+        registro = RegistroTens.objects.create(ficha=self.ficha, temperatura=Decimal('37.0'))
+        with mock.patch('tableroApp.eventos.publicador') as hub:
+            publicar_registro(RegistroTens, registro.pk)
+        sala, evento, establecimiento = hub.publicar.call_args.args
+        self.assertEqual((sala, establecimiento, evento['establecimiento']), ('PUERPERIO', 'SUR', 'SUR'))
+
+    def test_stream_bajo_wsgi_termina(self):
+        with mock.patch.object(sondeo, 'asegurar'), mock.patch.object(views, 'STREAM_WSGI_SEGUNDOS', 0.1):
+            r = self.client.get(reverse('tablero:stream_sala', args=['PUERPERIO']))
+            self.assertEqual(r.status_code, 200)
+            self.assertFalse(r.is_async)
+            contenido = b''.join(r.streaming_content).decode()
+        self.assertTrue(contenido.startswith('retry: 1000'))
+        self.assertFalse(publicador.hay_suscriptores())
+
+    def test_pagina_muestra_eventos_recientes(self):
+        RegistroTens.objects.create(ficha=self.ficha, temperatura=Decimal('36.8'))
+        r = self.client.get(reverse('tablero:tablero_sala', args=['PUERPERIO']))
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(json.loads(r.context['eventos_json'])[0]['tipo'], 'registro_tens')
+
+    def test_sala_inexistente(self):
+        r = self.client.get(reverse('tablero:tablero_sala', args=['COCINA']))
+        self.assertEqual(r.status_code, 404)
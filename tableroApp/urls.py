@@ -0,0 +1,13 @@
+# tableroApp/urls.py
+"""
+URLs del tablero de sala en vivo
+"""
+from django.urls import path
+from . import views
+
+app_name = 'tablero'
+
+urlpatterns = [
+    path('<str:sala>/', views.tablero_sala, name='tablero_sala'),
+    path('<str:sala>/stream/', views.stream_sala, name='stream_sala'),
+]
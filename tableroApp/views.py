@@ -0,0 +1,148 @@
+# tableroApp/views.py
+"""
+Tablero de sala en vivo
+
+- tablero_sala: página con el estado inicial (una sola vez)
+- stream_sala: conexión SSE que empuja los registros nuevos de la sala
+
+Bajo ASGI la conexión SSE queda abierta indefinidamente. Bajo WSGI cada
+conexión ocupa un worker: el stream se corta a los STREAM_WSGI_SEGUNDOS y
+EventSource se reconecta solo (`retry`).
+"""
+import asyncio
+import json
+import time
+
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from matronaApp.models import FichaObstetrica
+
+from .eventos import FUENTES
+from .publicador import publicador
+from .sondeo import sondeo
+
+LATIDO_SEGUNDOS = 15
+STREAM_WSGI_SEGUNDOS = 25
+EVENTOS_INICIALES = 20
+
+
+def _validar_sala(sala):
+    salas = dict(FichaObstetrica.SALA_CHOICES)
+    if sala not in salas:
+        raise Http404("Sala no existe")
+    return salas[sala]
+
+
+def eventos_recientes(sala, limite=EVENTOS_INICIALES):
+    """Últimos registros de la sala, con el mismo formato que los eventos SSE"""
+    eventos = []
+    for modelo, (relaciones, construir) in FUENTES.items():
+        ruta_ficha = relaciones[0]
+        recientes = (modelo._default_manager
+                     .select_related(*relaciones)
+                     .filter(**{f'{ruta_ficha}__sala': sala})
+                     .order_by('-pk')[:limite])
+        for instancia in recientes:
+            ficha, evento = construir(instancia)
+            evento.update({'id': instancia.pk, 'ficha_id': ficha.pk, 'numero_ficha': ficha.numero_ficha})
+            eventos.append(evento)
+    eventos.sort(key=lambda e: e['fecha'] or '', reverse=True)
+    return eventos[:limite]
+
+
+# ============================================
+# PÁGINA DEL TABLERO
+# ============================================
+
+@login_required(login_url='authentication:login')
+def tablero_sala(request, sala):
+    nombre_sala = _validar_sala(sala)
+    hoy = timezone.localdate()
+    fichas_activas = FichaObstetrica.objects.filter(sala=sala, activa=True).count()
+
+    return render(request, 'Tablero/tablero_sala.html', {
+        'sala': sala,
+        'nombre_sala': nombre_sala,
+        'salas': FichaObstetrica.SALA_CHOICES,
+        'fichas_activas': fichas_activas,
+        'eventos_json': json.dumps(eventos_recientes(sala)),
+        'hoy': hoy,
+    })
+
+
+# ============================================
+# STREAM SSE
+# ============================================
+
+def _formato_sse(evento, nombre='registro'):
+    return f"id: {evento.get('seq', '')}\nevent: {nombre}\ndata: {json.dumps(evento)}\n\n"
+
+
+async def _eventos_sse(sala, establecimiento=None, duracion=None, retry=5000):
+    """Mensajes SSE de la sala; indefinidamente o durante `duracion` segundos"""
+    suscripcion = publicador.suscribir(sala, establecimiento)
+    sondeo.asegurar()
+    fin = None if duracion is None else time.monotonic() + duracion
+    try:
+        yield f"retry: {retry}\n\n"
+        while True:
+            if suscripcion.desbordada:
+                # La pantalla se atrasó: pedirle que recargue el estado completo
+                suscripcion.desbordada = False
+                yield "event: resync\ndata: {}\n\n"
+            espera = LATIDO_SEGUNDOS
+            if fin is not None:
+                espera = min(espera, fin - time.monotonic())
+                if espera <= 0:
+                    return
+            try:
+                evento = await suscripcion.siguiente(timeout=espera)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ": latido\n\n"
+                continue
+            yield _formato_sse(evento)
+    finally:
+        publicador.desuscribir(suscripcion)
+
+
+def _eventos_sse_wsgi(sala, establecimiento):
+    """
+    _eventos_sse acotado, como iterador síncrono: WSGI no puede recorrer un
+    generador asíncrono sin acumularlo entero. Corre en un event loop propio;
+    el publicador le entrega los eventos con call_soon_threadsafe.
+    """
+    loop = asyncio.new_event_loop()
+    eventos = _eventos_sse(sala, establecimiento, duracion=STREAM_WSGI_SEGUNDOS, retry=1000)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(eventos.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(eventos.aclose())
+        loop.close()
+
+
+async def stream_sala(request, sala):
+    usuario = await request.auser()
+    if not usuario.is_authenticated:
+        return HttpResponseForbidden()
+    _validar_sala(sala)
+
+    # El generador corre fuera del bloque de EstablecimientoMiddleware: se
+    # suscribe con el establecimiento del usuario
+    establecimiento = getattr(request, 'establecimiento', None)
+    if isinstance(request, ASGIRequest):
+        eventos = _eventos_sse(sala, establecimiento)
+    else:
+        eventos = _eventos_sse_wsgi(sala, establecimiento)
+    respuesta = StreamingHttpResponse(eventos, content_type='text/event-stream')
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'  # nginx: no acumular el stream
+    return respuesta
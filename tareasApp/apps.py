@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class TareasappConfig(AppConfig):
+    """
+    Configuración de la aplicación tareasApp (cola de tareas en segundo plano)
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tareasApp'
+    verbose_name = 'Tareas en Segundo Plano'
+
+    def ready(self):
+        """Registra las tareas declaradas en los módulos <app>/tareas.py"""
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tareas')
@@ -0,0 +1,288 @@
+# tareasApp/cola.py
+"""
+Cola de tareas respaldada por la base de datos (sin broker externo)
+
+Declarar una tarea en <app>/tareas.py:
+
+    from tareasApp.cola import tarea
+
+    @tarea('exportar_fhir')
+    def exportar_fhir(destino, since=None):
+        ...
+        return {'archivos': 5}      # se guarda como resultado (JSON)
+
+Encolar desde una vista:
+
+    from tareasApp.cola import encolar
+    t = encolar('exportar_fhir', destino='/srv/exp', clave='fhir-diario',
+                solicitada_por=request.user)
+
+y consultar el estado en /tareas/<id>/estado/ hasta que `terminada` sea true.
+
+Mientras ejecuta una tarea, el worker renueva `fecha_latido` cada
+INTERVALO_LATIDO. liberar_colgadas() (run_workers la llama periódicamente)
+devuelve a la cola las tareas sin latido por más de TIMEOUT_LATIDO y marca
+FALLIDA la que ya agotó sus intentos: una tarea que mata a su worker no se
+reintenta para siempre. Si un worker pierde su tarea así, no sobrescribe
+el resultado del que la reclamó después.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+RETRASO_BASE_SEGUNDOS = 10
+RETRASO_MAXIMO_SEGUNDOS = 3600
+INTERVALO_LATIDO = timedelta(seconds=30)
+TIMEOUT_LATIDO = timedelta(minutes=5)
+
+_registro = {}
+
+
+class TareaNoRegistrada(Exception):
+    pass
+
+
+# ============================================
+# REGISTRO
+# ============================================
+
+def tarea(nombre=None):
+    """Decorador que registra una función como tarea ejecutable por los workers"""
+    def decorador(funcion):
+        _registro[nombre or funcion.__name__] = funcion
+        return funcion
+    return decorador
+
+
+def obtener(nombre):
+    try:
+        return _registro[nombre]
+    except KeyError:
+        raise TareaNoRegistrada(f"Tarea '{nombre}' no registrada")
+
+
+def registradas():
+    return sorted(_registro)
+
+
+# ============================================
+# ENCOLAR
+# ============================================
+
+def encolar(nombre, *, prioridad=Tarea.PRIORIDAD_NORMAL, clave='', max_intentos=3,
+            retraso=None, solicitada_por=None, **argumentos):
+    """
+    Crea una tarea PENDIENTE y la retorna.
+
+    Si `clave` no está vacía y ya existe una tarea activa (pendiente o en
+    proceso) con esa clave, no se crea otra: se retorna la existente.
+    """
+    obtener(nombre)  # falla temprano si el nombre no existe
+
+    campos = dict(
+        nombre=nombre,
+        argumentos=argumentos,
+        prioridad=prioridad,
+        clave=clave,
+        clave_activa=clave or None,
+        max_intentos=max_intentos,
+        solicitada_por=solicitada_por,
+    )
+    if retraso:
+        campos['disponible_desde'] = timezone.now() + timedelta(seconds=retraso)
+
+    try:
+        with transaction.atomic():
+            return Tarea.objects.create(**campos)
+    except IntegrityError:
+        if not clave:
+            raise
+        existente = Tarea.objects.filter(clave_activa=clave).first()
+        if existente is None:
+            # Terminó entre el INSERT y la lectura: reintentar una vez
+            with transaction.atomic():
+                return Tarea.objects.create(**campos)
+        return existente
+
+
+# ============================================
+# RECLAMO Y EJECUCIÓN
+# ============================================
+
+def identificador_trabajador():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def reclamar(trabajador=None, nombres=None):
+    """
+    Toma la siguiente tarea disponible (mayor prioridad, más antigua) y la
+    marca EN_PROCESO. Retorna None si no hay trabajo.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        pendientes = Tarea.objects.filter(estado=Tarea.PENDIENTE, disponible_desde__lte=ahora)
+        if nombres:
+            pendientes = pendientes.filter(nombre__in=nombres)
+        tarea_obj = (pendientes
+                     .select_for_update(skip_locked=True)
+                     .order_by('-prioridad', 'disponible_desde', 'id')
+                     .first())
+        if tarea_obj is None:
+            return None
+
+        tarea_obj.estado = Tarea.EN_PROCESO
+        tarea_obj.intentos += 1
+        tarea_obj.fecha_inicio = ahora
+        tarea_obj.fecha_latido = ahora
+        tarea_obj.trabajador = trabajador or identificador_trabajador()
+        tarea_obj.save(update_fields=['estado', 'intentos', 'fecha_inicio', 'fecha_latido', 'trabajador'])
+    return tarea_obj
+
+
+def _esta_reclamo(tarea_obj):
+    """La tarea sigue EN_PROCESO por este mismo reclamo (no fue liberada ni reclamada por otro)"""
+    return Tarea.objects.filter(
+        pk=tarea_obj.pk,
+        estado=Tarea.EN_PROCESO,
+        trabajador=tarea_obj.trabajador,
+        intentos=tarea_obj.intentos,
+    )
+
+
+def renovar(tarea_obj):
+    """Renueva el latido de una tarea en ejecución. False si ya no le pertenece al worker."""
+    return bool(_esta_reclamo(tarea_obj).update(fecha_latido=timezone.now()))
+
+
+class _Latido(threading.Thread):
+    """Renueva el latido de la tarea en un hilo mientras la función se ejecuta"""
+
+    def __init__(self, tarea_obj, intervalo=INTERVALO_LATIDO):
+        super().__init__(name=f'latido-tarea-{tarea_obj.pk}', daemon=True)
+        self.tarea_obj = tarea_obj
+        self.intervalo = intervalo.total_seconds()
+        self._detener = threading.Event()
+
+    def run(self):
+        usada = False
+        try:
+            while not self._detener.wait(self.intervalo):
+                usada = True
+                if not renovar(self.tarea_obj):
+                    logger.warning("Tarea %s fue liberada mientras se ejecutaba", self.tarea_obj)
+                    return
+        except Exception:
+            logger.exception("No se pudo renovar el latido de la tarea %s", self.tarea_obj)
+        finally:
+            if usada:
+                connection.close()  # conexión propia de este hilo
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+
+def retraso_reintento(intentos):
+    """Backoff exponencial: 10s, 20s, 40s, ... hasta 1 hora"""
+    return min(RETRASO_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0), RETRASO_MAXIMO_SEGUNDOS)
+
+
+def ejecutar(tarea_obj):
+    """Ejecuta una tarea ya reclamada y registra su resultado o el error"""
+    latido = _Latido(tarea_obj)
+    latido.start()
+    try:
+        resultado = obtener(tarea_obj.nombre)(**tarea_obj.argumentos)
+    except Exception as e:
+        logger.exception("Tarea %s falló (intento %s)", tarea_obj, tarea_obj.intentos)
+        tarea_obj.error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        if tarea_obj.intentos < tarea_obj.max_intentos and not isinstance(e, TareaNoRegistrada):
+            tarea_obj.estado = Tarea.PENDIENTE
+            tarea_obj.disponible_desde = timezone.now() + timedelta(
+                seconds=retraso_reintento(tarea_obj.intentos)
+            )
+        else:
+            tarea_obj.estado = Tarea.FALLIDA
+            tarea_obj.clave_activa = None
+            tarea_obj.fecha_termino = timezone.now()
+    else:
+        tarea_obj.estado = Tarea.COMPLETADA
+        tarea_obj.resultado = resultado
+        tarea_obj.error = ''
+        tarea_obj.clave_activa = None
+        tarea_obj.fecha_termino = timezone.now()
+    finally:
+        latido.detener()
+
+    campos = ('estado', 'resultado', 'error', 'clave_activa', 'disponible_desde', 'fecha_termino')
+    if not _esta_reclamo(tarea_obj).update(**{campo: getattr(tarea_obj, campo) for campo in campos}):
+        # Se liberó por falta de latido: el estado lo decide quien la tenga ahora
+        logger.warning("Tarea %s terminó después de ser liberada; se descarta su resultado", tarea_obj)
+        tarea_obj.refresh_from_db()
+    return tarea_obj
+
+
+def liberar_colgadas(timeout=TIMEOUT_LATIDO):
+    """
+    Libera las tareas EN_PROCESO cuyo worker murió (sin latido por más de
+    `timeout`): vuelven a PENDIENTE con backoff, o quedan FALLIDA si ya
+    usaron sus `max_intentos` (cada reclamo cuenta como intento).
+    Retorna cuántas liberó.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        colgadas = list(
+            Tarea.objects
+            .annotate(ultimo_latido=Coalesce('fecha_latido', 'fecha_inicio'))
+            .filter(estado=Tarea.EN_PROCESO, ultimo_latido__lt=ahora - timeout)
+            .select_for_update(skip_locked=True)
+        )
+        for tarea_obj in colgadas:
+            tarea_obj.error = f'El worker {tarea_obj.trabajador} dejó de responder (intento {tarea_obj.intentos})'
+            if tarea_obj.intentos < tarea_obj.max_intentos:
+                tarea_obj.estado = Tarea.PENDIENTE
+                tarea_obj.disponible_desde = ahora + timedelta(seconds=retraso_reintento(tarea_obj.intentos))
+            else:
+                tarea_obj.estado = Tarea.FALLIDA
+                tarea_obj.clave_activa = None
+                tarea_obj.fecha_termino = ahora
+            logger.warning("Tarea %s liberada: %s", tarea_obj, tarea_obj.error)
+        Tarea.objects.bulk_update(
+            colgadas, ['estado', 'error', 'disponible_desde', 'clave_activa', 'fecha_termino']
+        )
+    return len(colgadas)
+
+
+def ejecutar_siguiente(trabajador=None, nombres=None):
+    """Reclama y ejecuta una tarea. Retorna la tarea o None si no había."""
+    tarea_obj = reclamar(trabajador, nombres)
+    if tarea_obj is not None:
+        ejecutar(tarea_obj)
+    return tarea_obj
+
+
+def bucle_trabajador(trabajador=None, pausa=1.0, debe_parar=lambda: False, max_tareas=0):
+    """Bucle de un worker: ejecuta tareas hasta que `debe_parar()` sea verdadero"""
+    trabajador = trabajador or identificador_trabajador()
+    ejecutadas = 0
+    while not debe_parar():
+        close_old_connections()
+        if ejecutar_siguiente(trabajador) is None:
+            time.sleep(pausa)
+            continue
+        ejecutadas += 1
+        if max_tareas and ejecutadas >= max_tareas:
+            break
+    return ejecutadas
@@ -0,0 +1,106 @@
+"""
+Ejecuta workers de la cola de tareas en un pool de procesos
+Uso:
+    python manage.py run_workers --procs 4
+    python manage.py run_workers --procs 1 --una-vez    # drena la cola y termina
+
+Cada proceso reclama tareas con SELECT ... FOR UPDATE SKIP LOCKED, por lo
+que pueden correr varios procesos (o varios servidores) a la vez. Un
+proceso que muere se reemplaza; SIGTERM/Ctrl+C detiene todo limpiamente.
+Cada minuto se liberan las tareas cuyo worker dejó de renovar su latido
+(incluidas las de otros servidores).
+"""
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tareasApp import cola
+
+REVISAR_COLGADAS_CADA = 60  # segundos
+
+
+def _proceso_worker(pausa, max_tareas):
+    """Punto de entrada de cada proceso hijo"""
+    import django
+    django.setup()  # necesario si el sistema usa 'spawn' en vez de 'fork'
+
+    detener = multiprocessing.Event()
+
+    def al_recibir_senal(*_):
+        detener.set()
+
+    signal.signal(signal.SIGTERM, al_recibir_senal)
+    signal.signal(signal.SIGINT, al_recibir_senal)
+    cola.bucle_trabajador(pausa=pausa, debe_parar=detener.is_set, max_tareas=max_tareas)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta N procesos worker para la cola de tareas en base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procs', type=int, default=2, help='Cantidad de procesos worker')
+        parser.add_argument('--pausa', type=float, default=1.0, help='Segundos de espera sin tareas')
+        parser.add_argument('--max-tareas', type=int, default=0,
+                            help='Reciclar cada proceso tras N tareas (0 = nunca)')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Ejecutar las tareas disponibles en este proceso y terminar')
+
+    def liberar_colgadas(self):
+        liberadas = cola.liberar_colgadas()
+        if liberadas:
+            self.stdout.write(self.style.WARNING(f'⚠️ {liberadas} tareas colgadas liberadas'))
+
+    def handle(self, *args, **options):
+        self.liberar_colgadas()
+
+        if options['una_vez']:
+            total = 0
+            while cola.ejecutar_siguiente() is not None:
+                total += 1
+            self.stdout.write(self.style.SUCCESS(f'✅ {total} tareas ejecutadas'))
+            return
+
+        # Las conexiones abiertas no deben heredarse a los procesos hijos
+        connections.close_all()
+
+        detener = False
+
+        def al_recibir_senal(*_):
+            nonlocal detener
+            detener = True
+
+        signal.signal(signal.SIGTERM, al_recibir_senal)
+        signal.signal(signal.SIGINT, al_recibir_senal)
+
+        def lanzar():
+            proceso = multiprocessing.Process(
+                target=_proceso_worker,
+                args=(options['pausa'], options['max_tareas']),
+                daemon=True,
+            )
+            proceso.start()
+            return proceso
+
+        procesos = [lanzar() for _ in range(options['procs'])]
+        self.stdout.write(self.style.SUCCESS(f"✅ {options['procs']} workers iniciados"))
+
+        revision = time.monotonic()
+        while not detener:
+            time.sleep(1)
+            if time.monotonic() - revision >= REVISAR_COLGADAS_CADA:
+                revision = time.monotonic()
+                self.liberar_colgadas()
+                # No heredar la conexión del supervisor a los procesos que se relancen
+                connections.close_all()
+            for i, proceso in enumerate(procesos):
+                if not proceso.is_alive():
+                    procesos[i] = lanzar()
+
+        for proceso in procesos:
+            proceso.terminate()
+        for proceso in procesos:
+            proceso.join(timeout=30)
+        self.stdout.write('Workers detenidos')
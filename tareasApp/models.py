@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+# ============================================
+# TAREA EN SEGUNDO PLANO
+# ============================================
+
+class Tarea(models.Model):
+    """
+    Trabajo pesado (PDF, exportación, recálculos, sincronización legacy)
+    que se ejecuta fuera del ciclo de la petición.
+
+    Los workers (`run_workers`) reclaman filas PENDIENTE con
+    SELECT ... FOR UPDATE SKIP LOCKED, así varios procesos pueden leer la
+    misma tabla sin bloquearse ni tomar dos veces la misma tarea.
+    """
+
+    PENDIENTE = 'PENDIENTE'
+    EN_PROCESO = 'EN_PROCESO'
+    COMPLETADA = 'COMPLETADA'
+    FALLIDA = 'FALLIDA'
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (COMPLETADA, 'Completada'),
+        (FALLIDA, 'Fallida'),
+    ]
+
+    PRIORIDAD_BAJA = 0
+    PRIORIDAD_NORMAL = 5
+    PRIORIDAD_ALTA = 10
+
+    nombre = models.CharField(
+        max_length=100,
+        verbose_name='Tarea',
+        help_text='Nombre registrado con @tarea'
+    )
+    argumentos = models.JSONField(default=dict, blank=True, verbose_name='Argumentos')
+    prioridad = models.SmallIntegerField(default=PRIORIDAD_NORMAL, verbose_name='Prioridad')
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=PENDIENTE,
+        verbose_name='Estado'
+    )
+
+    # Deduplicación: mientras la tarea está activa, `clave_activa` = clave;
+    # al terminar se libera (NULL) y la misma clave puede encolarse otra vez
+    clave = models.CharField(max_length=200, blank=True, verbose_name='Clave de Deduplicación')
+    clave_activa = models.CharField(max_length=200, null=True, blank=True, unique=True, editable=False)
+
+    # Reintentos
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    max_intentos = models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de Intentos')
+    disponible_desde = models.DateTimeField(default=timezone.now, verbose_name='Disponible Desde')
+
+    # Resultado
+    resultado = models.JSONField(null=True, blank=True, verbose_name='Resultado')
+    error = models.TextField(blank=True, verbose_name='Último Error')
+    trabajador = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+
+    solicitada_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tareas',
+        verbose_name='Solicitada por'
+    )
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Inicio')
+    fecha_termino = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Término')
+    # El worker lo renueva mientras ejecuta; si deja de hacerlo, murió
+    fecha_latido = models.DateTimeField(null=True, blank=True, verbose_name='Último Latido')
+
+    class Meta:
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        indexes = [
+            # Orden de reclamo: estado, prioridad desc, disponibilidad
+            models.Index(fields=['estado', '-prioridad', 'disponible_desde', 'id']),
+            models.Index(fields=['nombre', 'estado']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.nombre} ({self.estado})"
+
+    @property
+    def terminada(self):
+        return self.estado in (self.COMPLETADA, self.FALLIDA)
+
+    def como_dict(self):
+        """Representación para el endpoint de consulta (polling)"""
+        return {
+            'id': self.pk,
+            'nombre': self.nombre,
+            'estado': self.estado,
+            'terminada': self.terminada,
+            'intentos': self.intentos,
+            'resultado': self.resultado,
+            'error': self.error if self.estado == self.FALLIDA else '',
+            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
+            'fecha_termino': self.fecha_termino.isoformat() if self.fecha_termino else None,
+        }
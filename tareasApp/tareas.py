@@ -0,0 +1,26 @@
+# tareasApp/tareas.py
+"""
+Tareas de mantenimiento del sistema
+"""
+from core import outbox, sesiones
+
+from .cola import tarea
+
+
+@tarea('despachar_outbox')
+def despachar_outbox(lote=500):
+    """Drena el outbox transaccional (ver core.outbox)"""
+    procesados = fallidos = 0
+    while True:
+        ok, error = outbox.despachar_lote(lote)
+        procesados += ok
+        fallidos += error
+        if not ok:
+            break
+    return {'procesados': procesados, 'fallidos': fallidos}
+
+
+@tarea('purgar_sesiones')
+def purgar_sesiones(lote=1000):
+    """Borra por lotes las sesiones vencidas (ver core.sesiones)"""
+    return {'borradas': sesiones.purgar_expiradas(lote)}
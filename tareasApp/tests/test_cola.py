@@ -0,0 +1,137 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tareasApp import cola
+from tareasApp.models import Tarea
+
+
+@cola.tarea('prueba_sumar')
+def sumar(a, b):
+    return {'suma': a + b}
+
+
+@cola.tarea('prueba_fallar')
+def fallar():
+    raise ValueError('sin conexión')
+
+
+class ColaTareasTest(TestCase):
+    def test_prioridad_y_resultado(self):
+        baja = cola.encolar('prueba_sumar', a=1, b=1, prioridad=Tarea.PRIORIDAD_BAJA)
+        alta = cola.encolar('prueba_sumar', a=2, b=3, prioridad=Tarea.PRIORIDAD_ALTA)
+
+        primera = cola.ejecutar_siguiente('test')
+        self.assertEqual(primera.pk, alta.pk)
+        self.assertEqual(primera.estado, Tarea.COMPLETADA)
+        self.assertEqual(primera.resultado, {'suma': 5})
+        self.assertEqual(cola.ejecutar_siguiente('test').pk, baja.pk)
+        self.assertIsNone(cola.ejecutar_siguiente('test'))
+
+    def test_clave_deduplica_tareas_activas(self):
+        t1 = cola.encolar('prueba_sumar', a=1, b=2, clave='diaria')
+        t2 = cola.encolar('prueba_sumar', a=1, b=2, clave='diaria')
+        self.assertEqual(t1.pk, t2.pk)
+
+        cola.ejecutar_siguiente('test')
+        t3 = cola.encolar('prueba_sumar', a=1, b=2, clave='diaria')
+        self.assertNotEqual(t3.pk, t1.pk)
+
+    def test_reintento_con_backoff_y_fallo_final(self):
+        tarea = cola.encolar('prueba_fallar', max_intentos=2)
+
+        cola.ejecutar_siguiente('test')
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.PENDIENTE)
+        self.assertGreater(tarea.disponible_desde, timezone.now())
+        self.assertIsNone(cola.reclamar('test'))  # aún en espera
+
+        Tarea.objects.filter(pk=tarea.pk).update(disponible_desde=timezone.now())
+        cola.ejecutar_siguiente('test')
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.FALLIDA)
+        self.assertIn('sin conexión', tarea.error)
+
+    def test_liberar_colgadas_por_latido(self):
+        cola.encolar('prueba_sumar', a=1, b=1)
+        cola.encolar('prueba_sumar', a=2, b=2)
+        viva = cola.reclamar('w1')
+        muerta = cola.reclamar('w2')
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        Tarea.objects.update(fecha_inicio=hace_una_hora, fecha_latido=hace_una_hora)
+        self.assertTrue(cola.renovar(viva))  # tarea larga, pero su worker sigue vivo
+
+        self.assertEqual(cola.liberar_colgadas(), 1)
+        viva.refresh_from_db()
+        self.assertEqual(viva.estado, Tarea.EN_PROCESO)
+        liberada = Tarea.objects.get(pk=muerta.pk)
+        self.assertEqual(liberada.estado, Tarea.PENDIENTE)
+        self.assertIn('w2', liberada.error)
+
+        # El worker original ya no puede renovar ni guardar su resultado
+        self.assertFalse(cola.renovar(muerta))
+        Tarea.objects.filter(pk=muerta.pk).update(disponible_desde=timezone.now())
+        nueva = cola.reclamar('w3')
+        cola.ejecutar(muerta)
+        nueva.refresh_from_db()
+        self.assertEqual(nueva.estado, Tarea.EN_PROCESO)
+        self.assertEqual(nueva.trabajador, 'w3')
+
+    def test_liberar_colgadas_respeta_max_intentos(self):
+        tarea = cola.encolar('prueba_sumar', a=1, b=1, clave='pdf', max_intentos=2)
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        for intento in (1, 2):
+            Tarea.objects.filter(pk=tarea.pk).update(disponible_desde=timezone.now())
+            self.assertEqual(cola.reclamar('w1').intentos, intento)
+            Tarea.objects.filter(pk=tarea.pk).update(fecha_latido=hace_una_hora)
+            self.assertEqual(cola.liberar_colgadas(), 1)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, Tarea.FALLIDA)
+        self.assertIsNone(tarea.clave_activa)
+        self.assertIsNone(cola.reclamar('w1'))
+
+    def test_tarea_no_registrada(self):
+        with self.assertRaises(cola.TareaNoRegistrada):
+            cola.encolar('no_existe')
+
+    def test_run_workers_una_vez(self):
+        cola.encolar('prueba_sumar', a=1, b=1)
+        cola.encolar('prueba_sumar', a=2, b=2)
+        salida = StringIO()
+        call_command('run_workers', una_vez=True, stdout=salida)
+        self.assertIn('2 tareas ejecutadas', salida.getvalue())
+
+
+class VistasTareasTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user('matrona', password='clave-segura')
+        self.client.force_login(self.usuario)
+
+    def test_polling_estado(self):
+        tarea = cola.encolar('prueba_sumar', a=1, b=1, solicitada_por=self.usuario)
+        url = reverse('tareas:estado_tarea', args=[tarea.pk])
+        self.assertFalse(self.client.get(url).json()['terminada'])
+
+        cola.ejecutar_siguiente('test')
+        datos = self.client.get(url).json()
+        self.assertTrue(datos['terminada'])
+        self.assertEqual(datos['resultado'], {'suma': 2})
+
+    def test_estado_de_otro_usuario_prohibido(self):
+        tarea = cola.encolar('prueba_sumar', a=1, b=1)
+        r = self.client.get(reverse('tareas:estado_tarea', args=[tarea.pk]))
+        self.assertEqual(r.status_code, 403)
+
+    def test_panel_solo_administradores(self):
+        self.assertEqual(self.client.get(reverse('tareas:panel_tareas')).status_code, 302)
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'clave'))
+        cola.encolar('prueba_sumar', a=1, b=1)
+        r = self.client.get(reverse('tareas:panel_tareas'))
+        self.assertEqual(r.status_code, 200)
+        self.assertContains(r, 'prueba_sumar')
@@ -0,0 +1,13 @@
+# tareasApp/urls.py
+"""
+URLs de la cola de tareas en segundo plano
+"""
+from django.urls import path
+from . import views
+
+app_name = 'tareas'
+
+urlpatterns = [
+    path('', views.panel_tareas, name='panel_tareas'),
+    path('<int:pk>/estado/', views.estado_tarea, name='estado_tarea'),
+]
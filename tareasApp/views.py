@@ -0,0 +1,72 @@
+# tareasApp/views.py
+"""
+Vistas de la cola de tareas
+- Panel de estado (administradores)
+- Consulta de estado de una tarea (polling desde el navegador)
+"""
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import Count
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+
+from .models import Tarea
+
+
+def es_administrador(user):
+    return user.is_authenticated and (
+        user.is_superuser or user.groups.filter(name='Administrador').exists()
+    )
+
+
+def respuesta_encolada(tarea):
+    """
+    Respuesta 202 estándar para vistas que encolan trabajo: el cliente
+    consulta `estado_url` hasta que `terminada` sea true.
+    """
+    datos = tarea.como_dict()
+    datos['estado_url'] = reverse('tareas:estado_tarea', args=[tarea.pk])
+    respuesta = JsonResponse(datos, status=202)
+    respuesta['Location'] = datos['estado_url']
+    return respuesta
+
+
+# ============================================
+# PANEL DE ESTADO
+# ============================================
+
+@user_passes_test(es_administrador, login_url='authentication:login')
+def panel_tareas(request):
+    """Resumen por estado y últimas tareas"""
+    estado = request.GET.get('estado', '')
+
+    conteos = dict(
+        Tarea.objects.values_list('estado').annotate(total=Count('id')).order_by()
+    )
+    resumen = [
+        {'estado': clave, 'nombre': nombre, 'total': conteos.get(clave, 0)}
+        for clave, nombre in Tarea.ESTADO_CHOICES
+    ]
+
+    tareas = Tarea.objects.select_related('solicitada_por')
+    if estado:
+        tareas = tareas.filter(estado=estado)
+
+    return render(request, 'Tareas/panel_tareas.html', {
+        'resumen': resumen,
+        'tareas': tareas[:100],
+        'estado': estado,
+    })
+
+
+# ============================================
+# POLLING
+# ============================================
+
+@login_required(login_url='authentication:login')
+def estado_tarea(request, pk):
+    """Estado de una tarea en JSON (solo quien la solicitó o un administrador)"""
+    tarea = get_object_or_404(Tarea, pk=pk)
+    if tarea.solicitada_por_id != request.user.pk and not es_administrador(request.user):
+        return JsonResponse({'detalle': 'No autorizado.'}, status=403)
+    return JsonResponse(tarea.como_dict())
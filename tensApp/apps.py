@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TensappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tensApp'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()
@@ -1,7 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from matronaApp.models import AdministracionMedicamento, MedicamentoFicha
-from gestionApp.models import Tens
+from gestionApp.models import Tens, Persona
+from core.opciones import usar_opciones_cacheadas
 from django.utils import timezone
 
 
@@ -89,10 +90,12 @@ class AdministracionMedicamentoForm(forms.ModelForm):
         # Configurar formato de datetime
         self.fields['fecha_hora_administracion'].input_formats = ['%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M:%S']
         
-        # Filtrar solo TENS activos
-        self.fields['tens'].queryset = Tens.objects.filter(
-            Activo=True
-        ).select_related('persona')
+        # Filtrar solo TENS activos (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'tens',
+            Tens.objects.filter(Activo=True).select_related('persona'),
+            modelos=[Persona],
+        )
         
         # Hacer campos opcionales
         self.fields['observaciones'].required = False
@@ -210,10 +213,12 @@ class RegistroRapidoAdministracionForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        # Filtrar solo TENS activos
-        self.fields['tens'].queryset = Tens.objects.filter(
-            Activo=True
-        ).select_related('persona')
+        # Filtrar solo TENS activos (opciones cacheadas, ver core.opciones)
+        usar_opciones_cacheadas(
+            self, 'tens',
+            Tens.objects.filter(Activo=True).select_related('persona'),
+            modelos=[Persona],
+        )
         
         self.fields['observaciones'].required = False
         
@@ -3,13 +3,16 @@ from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from gestionApp.models import Tens, Paciente
 from matronaApp.models import FichaObstetrica, MedicamentoFicha
+from core.auditoria import AuditadoMixin
+from core.establecimientos import ConEstablecimiento
+from core.outbox import OutboxMixin
 
 
 # ============================================
 # MODELO: REGISTRO TENS (Signos Vitales)
 # ============================================
 
-class RegistroTens(models.Model):
+class RegistroTens(OutboxMixin, ConEstablecimiento):
     """
     Registro de signos vitales por TENS
     Los TENS registran temperatura, presión arterial, etc.
@@ -28,6 +31,7 @@ class RegistroTens(models.Model):
         related_name='registros_tens',
         verbose_name='Ficha Obstétrica'
     )
+    campo_padre_establecimiento = 'ficha'
     
     tens_responsable = models.ForeignKey(
         Tens,
@@ -120,6 +124,7 @@ class RegistroTens(models.Model):
         indexes = [
             models.Index(fields=['ficha', '-fecha']),
             models.Index(fields=['tens_responsable', '-fecha']),
+            models.Index(fields=['establecimiento', '-fecha']),
         ]
     
     def __str__(self):
@@ -137,7 +142,7 @@ class RegistroTens(models.Model):
 # MODELO: TRATAMIENTO APLICADO
 # ============================================
 
-class Tratamiento_aplicado(models.Model):
+class Tratamiento_aplicado(AuditadoMixin, ConEstablecimiento):
     """
     Registro de tratamientos/medicamentos aplicados por TENS
     Vinculado a una ficha obstétrica y opcionalmente a un medicamento prescrito
@@ -162,6 +167,7 @@ class Tratamiento_aplicado(models.Model):
         related_name='tratamientos_aplicados',
         verbose_name='Ficha Obstétrica'
     )
+    campo_padre_establecimiento = 'ficha'
     
     paciente = models.ForeignKey(
         Paciente,
@@ -282,9 +288,10 @@ class Tratamiento_aplicado(models.Model):
         verbose_name_plural = 'Tratamientos Aplicados'
         indexes = [
             models.Index(fields=['ficha', '-fecha_aplicacion']),
-            models.Index(fields=['paciente', '-fecha_aplicacion']),
+            models.Index(fields=['paciente', '-fecha_aplicacion', '-hora_aplicacion']),
             models.Index(fields=['tens', '-fecha_aplicacion']),
             models.Index(fields=['medicamento_ficha', '-fecha_aplicacion']),
+            models.Index(fields=['establecimiento', 'activo', '-fecha_aplicacion']),
         ]
     
     def __str__(self):
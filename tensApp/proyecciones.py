@@ -0,0 +1,28 @@
+# tensApp/proyecciones.py
+"""
+Filas de los listados de tratamientos (ver core.proyecciones)
+"""
+from core.proyecciones import Display, Proyeccion
+from tensApp.models import Tratamiento_aplicado
+
+
+class FilaTratamiento(Proyeccion):
+    """Tens/Formularios/listar_tratamientos.html"""
+    modelo = Tratamiento_aplicado
+    columnas = {
+        'pk': 'pk',
+        'activo': 'activo',
+        'fecha_aplicacion': 'fecha_aplicacion',
+        'hora_aplicacion': 'hora_aplicacion',
+        'ficha_id': 'ficha_id',
+        'numero_ficha': 'ficha__numero_ficha',
+        'paciente_nombre': 'paciente__persona__Nombre',
+        'paciente_apellido': 'paciente__persona__Apellido_Paterno',
+        'paciente_rut': 'paciente__persona__Rut',
+        'nombre_medicamento': 'nombre_medicamento',
+        'medicamento_ficha_id': 'medicamento_ficha_id',
+        'dosis': 'dosis',
+        'via_administracion': Display('via_administracion'),
+        'tens_nombre': 'tens__persona__Nombre',
+        'tens_apellido': 'tens__persona__Apellido_Paterno',
+    }
@@ -0,0 +1,13 @@
+# tensApp/signals.py
+"""
+Invalidación de la caché de fragmentos: un tratamiento aplicado cambia el
+detalle de la ficha que ve el TENS
+"""
+from core.fragmentos import vigilar
+from matronaApp.models import FichaObstetrica
+
+from .models import Tratamiento_aplicado
+
+
+def conectar():
+    vigilar(Tratamiento_aplicado, lambda tratamiento: [(FichaObstetrica, tratamiento.ficha_id)])
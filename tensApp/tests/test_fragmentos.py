@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import fragmentos
+from core.pruebas import crear_matrona, crear_paciente
+from matronaApp.models import FichaObstetrica, MedicamentoFicha
+from partosApp.models import RegistroParto
+from recienNacidoApp.models import RegistroRecienNacido
+
+
+CACHES_PRUEBA = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'compartida': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'compartida-test'},
+}
+
+
+@override_settings(CACHES=CACHES_PRUEBA)
+class CacheFragmentosTest(TestCase):
+    def setUp(self):
+        fragmentos.cache_fragmentos().clear()
+        self.addCleanup(fragmentos.cache_fragmentos().clear)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura'))
+        self.persona = crear_paciente('Carla').persona
+        matrona = crear_matrona('Marta')
+        self.ficha = FichaObstetrica.objects.create(
+            paciente_id=self.persona.pk,
+            matrona_responsable=matrona,
+            numero_ficha='FO-0001',
+        )
+        self.url = reverse('tens:detalle_ficha', kwargs={'ficha_pk': self.ficha.pk})
+
+    def consultas_clinicas(self, consultas):
+        return [
+            c['sql'] for c in consultas.captured_queries
+            if 'matronaApp_' in c['sql'] or 'gestionApp_' in c['sql'] or 'tensApp_' in c['sql']
+        ]
+
+    def test_segunda_visita_no_consulta_ni_renderiza(self):
+        primera = self.client.get(self.url)
+        self.assertContains(primera, 'FO-0001')
+
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self.client.get(self.url)
+        self.assertEqual(self.consultas_clinicas(consultas), [])
+        self.assertEqual(segunda.content, primera.content)
+
+    def test_medicamento_y_paciente_invalidan_la_ficha(self):
+        self.client.get(self.url)
+        MedicamentoFicha.objects.create(
+            ficha=self.ficha,
+            nombre_medicamento='Oxitocina',
+            dosis='10 UI',
+            via_administracion=MedicamentoFicha.VIA_ADMINISTRACION_CHOICES[0][0],
+            frecuencia='SOS',
+            fecha_inicio=date.today(),
+            fecha_termino=date.today() + timedelta(days=1),
+        )
+        self.assertContains(self.client.get(self.url), 'SOS (según necesidad)')
+
+        self.persona.Telefono = '+56911112222'
+        self.persona.save()
+        self.assertContains(self.client.get(self.url), '+56911112222')
+
+    def test_rn_invalida_su_parto(self):
+        parto = RegistroParto.objects.create(
+            ficha=self.ficha,
+            edad_gestacional_semanas=39,
+            tipo_parto='EUTOCICO',
+            clasificacion_robson='Grupo 1',
+            posicion_materna_parto='SEMISENTADA',
+            estado_perine='INDEMNE',
+            profesional_responsable='Marta Soto',
+        )
+        clave = fragmentos.clave_version(RegistroParto, parto.pk)
+        antes = fragmentos.versiones([clave])[clave]
+
+        RegistroRecienNacido.objects.create(
+            registro_parto=parto,
+            sexo='FEMENINO',
+            peso=3300,
+            talla=50,
+            apgar_1_minuto=8,
+            apgar_5_minutos=9,
+            fecha_nacimiento=timezone.now(),
+        )
+        self.assertNotEqual(fragmentos.versiones([clave])[clave], antes)
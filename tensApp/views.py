@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib import messages
 from django.http import JsonResponse
 from django.db.models import Q, Count, Prefetch
@@ -15,8 +16,13 @@ from tensApp.models import  RegistroTens
 from tensApp.models import Tratamiento_aplicado
 # from gestionApp.forms.tens_forms import FormularioTratamientoAplicado  # ❌ COMENTAR ESTA LÍNEA
 from tensApp.models import Tratamiento_aplicado
+from tensApp.proyecciones import FilaTratamiento
 from gestionApp.models import Paciente
 from matronaApp.models import FichaObstetrica,MedicamentoFicha, AdministracionMedicamento
+from matronaApp.signals import dependencias_ficha
+from core import cache
+from core.fragmentos import fragmento_cacheado
+from core.replica import usar_replica
 # ============================================
 # MENÚ PRINCIPAL TENS
 # ============================================
@@ -27,15 +33,19 @@ def menu_tens(request):
     # Obtener la fecha de hoy
     hoy = timezone.now().date()
     
-    # Contar administraciones de hoy
-    administraciones_hoy = AdministracionMedicamento.objects.filter(
-        fecha_hora_administracion__date=hoy
-    ).count()
-    
+    def contar():
+        return {
+            'total_pacientes': Paciente.objects.filter(activo=True).count(),
+            'total_fichas_activas': FichaObstetrica.objects.filter(activa=True).count(),
+            # Administraciones de hoy
+            'administraciones_hoy': AdministracionMedicamento.objects.filter(
+                fecha_hora_administracion__date=hoy
+            ).count(),
+        }
+
     context = {
-        'total_pacientes': Paciente.objects.filter(activo=True).count(),
-        'total_fichas_activas': FichaObstetrica.objects.filter(activa=True).count(),
-        'administraciones_hoy': administraciones_hoy,
+        **cache.cacheado('tens:menu', [Paciente, FichaObstetrica, AdministracionMedicamento], contar, fecha=hoy),
+        'salas': FichaObstetrica.SALA_CHOICES,
     }
     
     return render(request, 'Tens/Data/menu_tens.html', context)
@@ -125,8 +135,8 @@ def ver_fichas_paciente(request, paciente_pk):
     })
 
 
-def detalle_ficha_tens(request, ficha_pk):
-    """Detalle de ficha obstétrica, medicamentos y tratamientos aplicados"""
+def _contexto_detalle_ficha_tens(ficha_pk):
+    """Renderiza el contenido de la ficha y retorna (contexto, dependencias)"""
     ficha = get_object_or_404(
         FichaObstetrica.objects.select_related(
             'paciente__persona',
@@ -154,7 +164,7 @@ def detalle_ficha_tens(request, ficha_pk):
     total_medicamentos = medicamentos.count()
     total_tratamientos = tratamientos.count()
 
-    return render(request, 'tens/formularios/detalle_ficha.html', {
+    contenido = render_to_string('Tens/Formularios/detalle_ficha_contenido.html', {
         'ficha': ficha,
         'paciente': ficha.paciente,
         'medicamentos': medicamentos,
@@ -162,6 +172,17 @@ def detalle_ficha_tens(request, ficha_pk):
         'total_medicamentos': total_medicamentos,
         'total_tratamientos': total_tratamientos,
     })
+    contexto = {'contenido': contenido, 'numero_ficha': ficha.numero_ficha}
+    return contexto, dependencias_ficha(ficha)
+
+
+def detalle_ficha_tens(request, ficha_pk):
+    """Detalle de ficha obstétrica, medicamentos y tratamientos aplicados (con caché de fragmentos)"""
+    contexto = fragmento_cacheado(
+        'tens:detalle_ficha', FichaObstetrica, ficha_pk,
+        lambda: _contexto_detalle_ficha_tens(ficha_pk),
+    )
+    return render(request, 'Tens/Formularios/detalle_ficha.html', contexto)
 
 # ============================================
 # ADMINISTRACIÓN DE MEDICAMENTOS
@@ -578,55 +599,49 @@ def restaurar_tratamiento(request, tratamiento_pk):
 # LISTADOS GENERALES DE TRATAMIENTOS (OPCIONAL)
 # ============================================
 
+@usar_replica
 def listar_todos_tratamientos(request):
     """
     Listar todos los tratamientos del sistema (para reportes)
     """
-    tratamientos = Tratamiento_aplicado.objects.select_related(
-        'ficha__paciente__persona',
-        'tens__persona',
-        'ficha'
-    ).order_by('-fecha_aplicacion', '-hora_aplicacion')
+    tratamientos = Tratamiento_aplicado.objects.order_by('-fecha_aplicacion', '-hora_aplicacion')
+    filas = FilaTratamiento.de(tratamientos)
     
     return render(request, 'tens/formularios/listar_tratamientos.html', {
         'titulo': 'Todos los Tratamientos Aplicados',
-        'tratamientos': tratamientos,
-        'total_tratamientos': tratamientos.count(),
+        'tratamientos': filas,
+        'total_tratamientos': len(filas),
         'fecha_actual': timezone.now(),
     })
 
 
+@usar_replica
 def listar_tratamientos_activos(request):
     """Listar solo tratamientos activos"""
     tratamientos = Tratamiento_aplicado.objects.filter(
         activo=True
-    ).select_related(
-        'ficha__paciente__persona',
-        'tens__persona',
-        'ficha'
     ).order_by('-fecha_aplicacion', '-hora_aplicacion')
+    filas = FilaTratamiento.de(tratamientos)
     
     return render(request, 'tens/formularios/listar_tratamientos.html', {
         'titulo': 'Tratamientos Activos',
-        'tratamientos': tratamientos,
-        'total_tratamientos': tratamientos.count(),
+        'tratamientos': filas,
+        'total_tratamientos': len(filas),
         'fecha_actual': timezone.now(),
     })
 
 
+@usar_replica
 def listar_tratamientos_inactivos(request):
     """Listar solo tratamientos inactivos/eliminados"""
     tratamientos = Tratamiento_aplicado.objects.filter(
         activo=False
-    ).select_related(
-        'ficha__paciente__persona',
-        'tens__persona',
-        'ficha'
     ).order_by('-fecha_aplicacion', '-hora_aplicacion')
+    filas = FilaTratamiento.de(tratamientos)
     
     return render(request, 'tens/formularios/listar_tratamientos.html', {
         'titulo': 'Tratamientos Inactivos',
-        'tratamientos': tratamientos,
-        'total_tratamientos': tratamientos.count(),
+        'tratamientos': filas,
+        'total_tratamientos': len(filas),
         'fecha_actual': timezone.now(),
     })
\ No newline at end of file